@@ -16,6 +16,7 @@ a = Analysis(
         'src.gui.views.help',
         'src.gui.views.settings',
         'src.drivers.usn_journal',
+        'pypinyin',  # 可选：模板搜索的拼音匹配，构建环境未安装时仅告警
     ],
     hookspath=[],
     hooksconfig={},
@@ -44,6 +44,7 @@ USER_CONFIG_FILE = DATA_DIR / "config.json"
 USER_CATEGORIES_FILE = DATA_DIR / "categories.json"
 USER_TEMPLATES_FILE = DATA_DIR / "templates.json"
 USER_LINKS_FILE = DATA_DIR / "links.json"
+USER_DATABASE_FILE = DATA_DIR / "ghost_dir.db"  # SQLite 存储后端（可选）
 
 # --- 兼容性别名（逐步废弃）---
 CONFIG_FILE = USER_CONFIG_FILE  # 兼容旧代码
@@ -55,6 +56,12 @@ DEFAULT_TEMPLATES_CONFIG = DEFAULT_TEMPLATES_FILE  # 兼容旧代码
 TEMPLATE_CACHE_FILE = DATA_DIR / "template_cache.json"
 CATEGORY_LOG_FILE = DATA_DIR / "category_log.json"
 LOCK_FILE = DATA_DIR / ".ghost.lock"
+SIZE_CACHE_FILE = DATA_DIR / "size_cache.db"  # 目录空间增量统计缓存
+MIGRATION_JOURNAL_FILE = DATA_DIR / "migration.journal"  # 旧版单一迁移日志（启动检查时仍会读取）
+MIGRATION_JOURNAL_DIR = DATA_DIR / "journals"  # 可续传的迁移日志（每个 源/目标 一个文件）
+MIGRATION_MANIFEST_DIR = DATA_DIR / "manifests"  # 校验迁移的摘要清单
+USN_INDEX_FILE = DATA_DIR / "usn_index.db"  # 各卷目录/Reparse Point 索引与 USN 日志游标
+REGISTRY_CACHE_FILE = DATA_DIR / "registry_cache.json"  # 已安装程序清单缓存（按 Uninstall 键写入时间失效）
 
 # 日志目录
 LOG_DIR = DATA_DIR / "logs"
@@ -107,6 +114,12 @@ DEFAULT_TARGET_ROOT = "D:\\Ghost_Library"
 # 分类默认值
 DEFAULT_CATEGORY = "未分类"
 
+# 存储后端默认值
+DEFAULT_STORAGE_BACKEND = "json"  # 可选值: "json", "sqlite"
+
+# 迁移时是否边复制边计算摘要并生成校验清单
+DEFAULT_MIGRATION_VERIFY = False
+
 # 主题默认值
 DEFAULT_THEME = "system"  # 可选值: "light", "dark", "system"
 DEFAULT_THEME_COLOR = "system"  # 可选值: "system" 或 十六进制颜色值如 "#009FAA"
@@ -173,6 +186,7 @@ BLACKLIST_PATHS = CORE_BLACKLIST + CONTAINER_BLACKLIST
 # UI 常量
 WINDOW_MIN_WIDTH = 1000
 WINDOW_MIN_HEIGHT = 700
+SEARCH_DEBOUNCE_MS = 150  # 搜索框输入防抖：停止输入后再执行查询
 
 # 状态颜色
 STATUS_COLORS = {
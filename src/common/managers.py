@@ -4,15 +4,15 @@ Temporary Manager Wrappers
 Decouples UI from the new Service layer during transition.
 """
 from typing import List, Set
-from src.dao import TemplateDAO, LinkDAO, CategoryDAO
+from src.dao import create_template_dao, create_link_dao, create_category_dao
 from src.services import TemplateService, LinkService, CategoryService
 
 class TemplateManager:
     def __init__(self):
-        self._dao = TemplateDAO()
+        self._dao = create_template_dao()
         self._service = TemplateService(self._dao)
         # 初始化 CategoryService 以支持递归分类查询
-        self._category_service = CategoryService(CategoryDAO())
+        self._category_service = CategoryService(create_category_dao())
         self.templates = {}
         self.load_templates()
 
@@ -45,19 +45,8 @@ class TemplateManager:
 
     def get_templates_by_category_recursive(self, category_id: str) -> List:
         """递归获取目标分类及其所有子孙分类下的模板"""
-        # 1. 收集目标分类的所有后代 ID（含自身）
-        all_ids: Set[str] = set()
-        queue = [category_id]
-        while queue:
-            current_id = queue.pop()
-            all_ids.add(current_id)
-            # 通过 CategoryService 获取直接子分类
-            children = self._category_service.get_children(current_id)
-            for child in children:
-                if child.id not in all_ids:
-                    queue.append(child.id)
-
-        # 2. 过滤所有模板，保留 category_id 在集合内的
+        # 子树分类 ID 由层级索引的先序区间一次取出，过滤时每个模板一次集合查找
+        all_ids: Set[str] = self._category_service.get_descendant_ids(category_id)
         all_templates = self._service.get_all_templates()
         return [t for t in all_templates if getattr(t, 'category_id', None) in all_ids]
 
@@ -66,7 +55,7 @@ class TemplateManager:
 
 class CategoryManager:
     def __init__(self):
-        self._dao = CategoryDAO()
+        self._dao = create_category_dao()
         self._service = CategoryService(self._dao)
         self.categories = {}
         self.load_categories()
@@ -109,7 +98,7 @@ class CategoryManager:
 
 class UserManager:
     def __init__(self):
-        self._dao = LinkDAO()
+        self._dao = create_link_dao()
         self._service = LinkService(self._dao)
 
     def get_all_links(self, category_id: str = "all"):
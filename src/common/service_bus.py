@@ -2,8 +2,9 @@
 """
 服务总线 - 全局 Service 访问点
 """
-from src.dao import TemplateDAO, LinkDAO, CategoryDAO
-from src.services import TemplateService, LinkService, CategoryService, ConfigService
+from src.dao import create_template_dao, create_link_dao, create_category_dao
+from src.services import TemplateService, LinkService, CategoryService, ConfigService, LinkWatchService, CategoryStatsService
+from src.common.signals import signal_bus
 from src.common.managers import TemplateManager, CategoryManager, UserManager
 
 class ServiceBus:
@@ -21,15 +22,19 @@ class ServiceBus:
             return
 
         # 1. 初始化 DAO 层
-        self._template_dao = TemplateDAO()
-        self._link_dao = LinkDAO()
-        self._category_dao = CategoryDAO()
+        self._template_dao = create_template_dao()
+        self._link_dao = create_link_dao()
+        self._category_dao = create_category_dao()
 
         # 2. 初始化 Service 层
-        self.template_service = TemplateService(self._template_dao)
+        self.template_service = TemplateService(self._template_dao, self._category_dao)
         self.link_service = LinkService(self._link_dao)
         self.category_service = CategoryService(self._category_dao)
         self.config_service = ConfigService()
+        self.watch_service = LinkWatchService(self.link_service)
+        self.category_stats_service = CategoryStatsService(self.category_service, self.link_service)
+        signal_bus.data_refreshed.connect(self.category_stats_service.invalidate)
+        signal_bus.categories_changed.connect(self.category_stats_service.invalidate_categories)
 
         # 3. 初始化 Manager 层 (显式持有)
         self.template_manager = TemplateManager()
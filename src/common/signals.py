@@ -39,6 +39,9 @@ class SignalBus(QObject):
     # 主题色变更信号
     theme_color_changed = Signal(str)  # color_hex
 
+    # UI 批量刷新指标（性能观测）
+    ui_batch_applied = Signal(str, int, float)  # source, batch_size, apply_ms
+
 
 # 全局单例
 signal_bus = SignalBus()
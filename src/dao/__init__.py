@@ -3,5 +3,9 @@
 from .template_dao import TemplateDAO
 from .link_dao import LinkDAO
 from .category_dao import CategoryDAO
+from .factory import get_storage_backend, create_template_dao, create_link_dao, create_category_dao
 
-__all__ = ['TemplateDAO', 'LinkDAO', 'CategoryDAO']
+__all__ = [
+    'TemplateDAO', 'LinkDAO', 'CategoryDAO',
+    'get_storage_backend', 'create_template_dao', 'create_link_dao', 'create_category_dao'
+]
@@ -0,0 +1,38 @@
+# coding: utf-8
+"""DAO 工厂 - 根据用户配置选择 JSON 或 SQLite 存储后端"""
+import json
+from src.common.config import USER_CONFIG_FILE, DEFAULT_STORAGE_BACKEND
+
+
+def get_storage_backend() -> str:
+    """读取 config.json 中的 storage_backend（DAO 层不依赖 ConfigService）"""
+    try:
+        with open(USER_CONFIG_FILE, 'r', encoding='utf-8') as f:
+            backend = json.load(f).get('storage_backend', DEFAULT_STORAGE_BACKEND)
+    except Exception:
+        backend = DEFAULT_STORAGE_BACKEND
+    return backend if backend in ('json', 'sqlite') else DEFAULT_STORAGE_BACKEND
+
+
+def create_template_dao():
+    if get_storage_backend() == 'sqlite':
+        from src.dao.sqlite_dao import SQLiteTemplateDAO
+        return SQLiteTemplateDAO()
+    from src.dao.template_dao import TemplateDAO
+    return TemplateDAO()
+
+
+def create_link_dao():
+    if get_storage_backend() == 'sqlite':
+        from src.dao.sqlite_dao import SQLiteLinkDAO
+        return SQLiteLinkDAO()
+    from src.dao.link_dao import LinkDAO
+    return LinkDAO()
+
+
+def create_category_dao():
+    if get_storage_backend() == 'sqlite':
+        from src.dao.sqlite_dao import SQLiteCategoryDAO
+        return SQLiteCategoryDAO()
+    from src.dao.category_dao import CategoryDAO
+    return CategoryDAO()
@@ -1,11 +1,245 @@
 # coding: utf-8
 """链接数据访问对象"""
-from typing import List, Optional
-from src.models.link import UserLink
+from typing import Dict, List, Optional
+from src.models.link import UserLink, LinkStatus
 from src.common.config import get_config_path
+import atexit
 import json
 import os
 import sys
+import threading
+
+
+# 写回防抖间隔（秒）：窗口内的多次修改合并为一次落盘
+FLUSH_DELAY = 0.5
+
+# 写回失败后的重试间隔上限（秒）：每次失败间隔翻倍，直到成功写回
+FLUSH_MAX_RETRY_DELAY = 30.0
+
+
+def normalize_source_path(path: str) -> str:
+    """源路径索引键：展开环境变量、规范分隔符并统一小写"""
+    if not path:
+        return ""
+    return os.path.normpath(os.path.expandvars(path)).lower()
+
+
+def serialize_fields(fields: dict) -> dict:
+    """将局部更新中的枚举等值转为 links.json 中的存储格式"""
+    return {k: (v.value if isinstance(v, LinkStatus) else v) for k, v in fields.items()}
+
+
+class _LinkStore:
+    """
+    常驻内存的链接仓库
+
+    - 以 id / 标准化源路径 / 分类 三组字典建立索引
+    - 读取时仅比对文件 mtime，外部修改（如配置编辑器）才触发重新解析
+    - 写入经防抖合并后一次性原子落盘，失败时按退避间隔重新布置写回
+    """
+
+    def __init__(self, config_file: str, flush_delay: float = FLUSH_DELAY):
+        self.config_file = config_file
+        self.flush_delay = flush_delay
+        self._lock = threading.RLock()
+        self._records: Dict[str, dict] = {}  # id -> 序列化记录（保持文件顺序）
+        self._by_source: Dict[str, str] = {}  # 标准化源路径 -> id
+        self._by_category: Dict[Optional[str], Dict[str, None]] = {}  # 分类 -> 有序 id 集合
+        self._file_sig = None  # 上次载入/写出时的 (mtime_ns, size)
+        self._dirty = False
+        self._timer: Optional[threading.Timer] = None
+        self._retry_delay = flush_delay  # 下一次失败重试的等待时间
+
+    # ---------- 载入与索引 ----------
+
+    def _stat_sig(self):
+        try:
+            st = os.stat(self.config_file)
+            return st.st_mtime_ns, st.st_size
+        except OSError:
+            return None
+
+    def _ensure_fresh(self):
+        """文件在外部被修改时重新载入（存在未落盘修改时以内存为准）"""
+        if self._dirty:
+            return
+        sig = self._stat_sig()
+        if sig is not None and sig == self._file_sig:
+            return
+        self._load()
+        self._file_sig = sig
+
+    def _load(self):
+        try:
+            with open(self.config_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except Exception:
+            data = []
+        if not isinstance(data, list):
+            data = []
+
+        self._records = {}
+        self._by_source = {}
+        self._by_category = {}
+        for item in data:
+            if isinstance(item, dict):
+                self._index(item)
+
+    def _index(self, record: dict):
+        lid = record.get('id')
+        self._records[lid] = record
+        self._by_source[normalize_source_path(record.get('source_path', ''))] = lid
+        self._by_category.setdefault(record.get('category'), {})[lid] = None
+
+    def _unindex(self, record: dict):
+        lid = record.get('id')
+        src_key = normalize_source_path(record.get('source_path', ''))
+        if self._by_source.get(src_key) == lid:
+            del self._by_source[src_key]
+        bucket = self._by_category.get(record.get('category'))
+        if bucket is not None:
+            bucket.pop(lid, None)
+            if not bucket:
+                del self._by_category[record.get('category')]
+
+    # ---------- 查询 ----------
+
+    def all(self) -> List[dict]:
+        with self._lock:
+            self._ensure_fresh()
+            return list(self._records.values())
+
+    def get(self, lid: str) -> Optional[dict]:
+        with self._lock:
+            self._ensure_fresh()
+            return self._records.get(lid)
+
+    def get_by_source(self, source_path: str) -> Optional[dict]:
+        with self._lock:
+            self._ensure_fresh()
+            lid = self._by_source.get(normalize_source_path(source_path))
+            return self._records.get(lid) if lid is not None else None
+
+    def get_by_category(self, category: Optional[str]) -> List[dict]:
+        with self._lock:
+            self._ensure_fresh()
+            return [self._records[lid] for lid in self._by_category.get(category, ())]
+
+    # ---------- 修改 ----------
+
+    def put(self, record: dict, must_exist: bool = False) -> bool:
+        with self._lock:
+            self._ensure_fresh()
+            old = self._records.get(record.get('id'))
+            if old is None and must_exist:
+                return False
+            if old is not None:
+                self._unindex(old)
+            self._index(record)
+            self._mark_dirty()
+            return True
+
+    def put_many(self, records: List[dict]) -> int:
+        """批量覆盖已存在的记录，仅标记一次脏数据"""
+        with self._lock:
+            self._ensure_fresh()
+            count = 0
+            for record in records:
+                old = self._records.get(record.get('id'))
+                if old is None:
+                    continue
+                self._unindex(old)
+                self._index(record)
+                count += 1
+            if count:
+                self._mark_dirty()
+            return count
+
+    def patch(self, updates: Dict[str, dict]) -> int:
+        """在当前记录上合并字段（读-改-写在同一把锁内完成，避免并发覆盖）"""
+        with self._lock:
+            self._ensure_fresh()
+            count = 0
+            for lid, fields in updates.items():
+                old = self._records.get(lid)
+                if old is None:
+                    continue
+                self._unindex(old)
+                self._index({**old, **fields})
+                count += 1
+            if count:
+                self._mark_dirty()
+            return count
+
+    def remove(self, lids) -> bool:
+        with self._lock:
+            self._ensure_fresh()
+            removed = False
+            for lid in lids:
+                old = self._records.pop(lid, None)
+                if old is not None:
+                    self._unindex(old)
+                    removed = True
+            if removed:
+                self._mark_dirty()
+            return removed
+
+    # ---------- 落盘 ----------
+
+    def _mark_dirty(self):
+        """标记脏数据并按需布置一次延迟写回（窗口内的后续修改直接合并）"""
+        self._dirty = True
+        if self._timer is None:
+            self._schedule(self.flush_delay)
+
+    def _schedule(self, delay: float):
+        self._timer = threading.Timer(delay, self.flush)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def flush(self):
+        """立即将内存数据原子写回 links.json"""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not self._dirty:
+                return
+            data = list(self._records.values())
+            tmp_file = self.config_file + '.tmp'
+            try:
+                with open(tmp_file, 'w', encoding='utf-8') as f:
+                    json.dump(data, f, ensure_ascii=False, indent=2)
+                os.replace(tmp_file, self.config_file)
+                self._dirty = False
+                self._file_sig = self._stat_sig()
+                self._retry_delay = self.flush_delay
+            except Exception as e:
+                # 保留脏数据并退避重试，避免修改只停留在内存中
+                self._retry_delay = min(self._retry_delay * 2, FLUSH_MAX_RETRY_DELAY)
+                print(f"LinkDAO 写回失败，{self._retry_delay:g} 秒后重试: {e}")
+                self._schedule(self._retry_delay)
+
+
+# 同一文件在进程内共享一个仓库，避免多个 DAO 实例之间数据不一致
+_stores: Dict[str, _LinkStore] = {}
+_stores_lock = threading.Lock()
+
+
+def _get_store(config_file: str) -> _LinkStore:
+    key = os.path.normcase(os.path.abspath(config_file))
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            store = _stores[key] = _LinkStore(config_file)
+        return store
+
+
+@atexit.register
+def _flush_all_stores():
+    """进程退出前写回所有未落盘的修改"""
+    for store in list(_stores.values()):
+        store.flush()
 
 
 class LinkDAO:
@@ -13,6 +247,7 @@ class LinkDAO:
         # 链接数据始终存储在用户目录（开发和打包环境都一样）
         self.config_file = get_config_path('links.json')
         self._ensure_exists()
+        self._store = _get_store(self.config_file)
 
     def _ensure_exists(self):
         if not os.path.exists(self.config_file):
@@ -21,45 +256,45 @@ class LinkDAO:
                 json.dump([], f)
 
     def get_all(self) -> List[UserLink]:
-        try:
-            with open(self.config_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            return [UserLink.from_dict(item) for item in data]
-        except:
-            return []
+        return [UserLink.from_dict(item) for item in self._store.all()]
 
     def get_by_id(self, lid: str) -> Optional[UserLink]:
-        for link in self.get_all():
-            if link.id == lid:
-                return link
-        return None
+        record = self._store.get(lid)
+        return UserLink.from_dict(record) if record is not None else None
+
+    def get_by_source_path(self, source_path: str) -> Optional[UserLink]:
+        """按源路径（大小写/分隔符/环境变量不敏感）查找链接"""
+        record = self._store.get_by_source(source_path)
+        return UserLink.from_dict(record) if record is not None else None
+
+    def get_by_category(self, category_id: Optional[str]) -> List[UserLink]:
+        return [UserLink.from_dict(item) for item in self._store.get_by_category(category_id)]
 
     def add(self, link: UserLink) -> bool:
-        data = [l.to_dict() for l in self.get_all()]
-        data.append(link.to_dict())
-        with open(self.config_file, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
-        return True
+        return self._store.put(link.to_dict())
 
     def update(self, link: UserLink) -> bool:
-        data = [l.to_dict() for l in self.get_all()]
-        for i, item in enumerate(data):
-            if item.get('id') == link.id:
-                data[i] = link.to_dict()
-                with open(self.config_file, 'w', encoding='utf-8') as f:
-                    json.dump(data, f, ensure_ascii=False, indent=2)
-                return True
-        return False
+        return self._store.put(link.to_dict(), must_exist=True)
+
+    def update_many(self, links: List[UserLink]) -> int:
+        """批量更新链接，返回实际更新的条数"""
+        return self._store.put_many([link.to_dict() for link in links])
+
+    def update_fields(self, updates: Dict[str, dict]) -> int:
+        """
+        按 id 局部更新字段，如 {link_id: {'status': LinkStatus.CONNECTED, 'last_known_size': 1024}}
+
+        只覆盖给出的字段，不会把调用方持有的旧快照整条写回
+        """
+        return self._store.patch({lid: serialize_fields(fields) for lid, fields in updates.items()})
 
     def delete(self, lid: str) -> bool:
         return self.delete_batch([lid])
 
     def delete_batch(self, lids: List[str]) -> bool:
         if not lids: return False
-        data = [l.to_dict() for l in self.get_all()]
-        new_data = [item for item in data if item.get('id') not in lids]
-        if len(new_data) < len(data):
-            with open(self.config_file, 'w', encoding='utf-8') as f:
-                json.dump(new_data, f, ensure_ascii=False, indent=2)
-            return True
-        return False
+        return self._store.remove(lids)
+
+    def flush(self):
+        """立即写回尚未落盘的修改"""
+        self._store.flush()
@@ -0,0 +1,299 @@
+# coding: utf-8
+"""
+SQLite 存储后端（可选）
+以标准库 sqlite3 实现与 JSON DAO 相同的接口，并提供 JSON 导入/导出桥接
+"""
+from typing import Dict, List, Optional
+from src.models.link import UserLink
+from src.models.template import Template
+from src.models.category import CategoryNode
+from src.common.config import USER_DATABASE_FILE
+from src.common.exceptions import DAOError
+from src.dao.link_dao import normalize_source_path, serialize_fields
+import json
+import os
+import sqlite3
+import threading
+
+
+SCHEMA_VERSION = 1
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS links (
+    id          TEXT PRIMARY KEY,
+    seq         INTEGER NOT NULL,
+    category    TEXT,
+    source_key  TEXT,
+    status      TEXT,
+    data        TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_links_category ON links(category);
+CREATE INDEX IF NOT EXISTS idx_links_source ON links(source_key);
+CREATE INDEX IF NOT EXISTS idx_links_status ON links(status);
+CREATE TABLE IF NOT EXISTS templates (
+    id           TEXT PRIMARY KEY,
+    seq          INTEGER NOT NULL,
+    category_id  TEXT,
+    data         TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_templates_category ON templates(category_id);
+CREATE TABLE IF NOT EXISTS categories (
+    id         TEXT PRIMARY KEY,
+    seq        INTEGER NOT NULL,
+    parent_id  TEXT,
+    data       TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_categories_parent ON categories(parent_id);
+"""
+
+
+class SQLiteDatabase:
+    """共享的数据库连接（WAL 模式，跨线程加锁访问）"""
+
+    def __init__(self, db_file: str):
+        self.db_file = db_file
+        self.lock = threading.RLock()
+        os.makedirs(os.path.dirname(db_file) or '.', exist_ok=True)
+        try:
+            self.conn = sqlite3.connect(db_file, check_same_thread=False)
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("PRAGMA synchronous=NORMAL")
+            self.conn.executescript(_SCHEMA)
+            self.conn.execute(
+                "INSERT OR IGNORE INTO meta(key, value) VALUES ('schema_version', ?)",
+                (str(SCHEMA_VERSION),)
+            )
+            self.conn.commit()
+        except sqlite3.Error as e:
+            raise DAOError(f"无法打开数据库 {db_file}: {e}")
+
+    def get_meta(self, key: str) -> Optional[str]:
+        with self.lock:
+            row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+            return row[0] if row else None
+
+    def set_meta(self, key: str, value: str):
+        with self.lock, self.conn:
+            self.conn.execute(
+                "INSERT INTO meta(key, value) VALUES (?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+                (key, value)
+            )
+
+    # ---------- JSON 桥接 ----------
+
+    def migrate_from_json(self, force: bool = False) -> bool:
+        """
+        首次启动时从 .ghost-dir/*.json 导入数据
+
+        读取路径与 JSON DAO 完全一致，导入完成后在 meta 表中记录，避免重复导入
+        """
+        if not force and self.get_meta('json_migrated'):
+            return False
+
+        from src.dao.template_dao import TemplateDAO
+        from src.dao.category_dao import CategoryDAO
+        from src.dao.link_dao import LinkDAO
+
+        data = {
+            'categories': [c.to_dict() for c in CategoryDAO().get_all()],
+            'templates': [t.to_dict() for t in TemplateDAO().get_all()],
+            'links': [l.to_dict() for l in LinkDAO().get_all()],
+        }
+        self.import_json(data)
+        self.set_meta('json_migrated', '1')
+        return True
+
+    def import_json(self, data: Dict[str, List[dict]]):
+        """以 JSON DAO 的记录格式整表替换（缺省的表保持不变）"""
+        tables = {
+            'categories': SQLiteCategoryDAO,
+            'templates': SQLiteTemplateDAO,
+            'links': SQLiteLinkDAO,
+        }
+        with self.lock, self.conn:
+            for key, dao_cls in tables.items():
+                if key not in data:
+                    continue
+                self.conn.execute(f"DELETE FROM {dao_cls.table}")
+                self.conn.executemany(
+                    dao_cls.insert_sql,
+                    [dao_cls.row_of(record, seq) for seq, record in enumerate(data[key], 1)]
+                )
+
+    def export_json(self, include_categories: bool = True, include_templates: bool = True,
+                    include_links: bool = True) -> Dict[str, List[dict]]:
+        """导出为与 JSON DAO 相同格式的记录数组（TemplateService.export_to_file 写入导出文件）"""
+        result = {}
+        with self.lock:
+            for key, enabled in (('categories', include_categories),
+                                 ('templates', include_templates),
+                                 ('links', include_links)):
+                if enabled:
+                    rows = self.conn.execute(f"SELECT data FROM {key} ORDER BY seq").fetchall()
+                    result[key] = [json.loads(r[0]) for r in rows]
+        return result
+
+
+_databases: Dict[str, SQLiteDatabase] = {}
+_databases_lock = threading.Lock()
+
+
+def get_database(db_file: str = None) -> SQLiteDatabase:
+    """获取（并在首次打开时迁移）共享数据库实例"""
+    db_file = str(db_file or USER_DATABASE_FILE)
+    key = os.path.normcase(os.path.abspath(db_file))
+    with _databases_lock:
+        db = _databases.get(key)
+        if db is None:
+            db = _databases[key] = SQLiteDatabase(db_file)
+            db.migrate_from_json()
+        return db
+
+
+class _SQLiteTableDAO:
+    """单表 DAO 基类：索引列 + 完整 JSON 记录，seq 保持插入顺序"""
+    table = ""
+    model = None
+    columns = ()  # 除 id / seq / data 外的索引列
+
+    insert_sql = ""
+    upsert_sql = ""
+
+    def __init__(self, db: SQLiteDatabase = None):
+        self.db = db or get_database()
+
+    @classmethod
+    def index_values(cls, record: dict) -> tuple:
+        return ()
+
+    @classmethod
+    def row_of(cls, record: dict, seq: int) -> tuple:
+        return (record.get('id'), seq, *cls.index_values(record), json.dumps(record, ensure_ascii=False))
+
+    def _query(self, where: str = "", params: tuple = ()) -> list:
+        sql = f"SELECT data FROM {self.table} {where} ORDER BY seq"
+        with self.db.lock:
+            rows = self.db.conn.execute(sql, params).fetchall()
+        return [self.model.from_dict(json.loads(r[0])) for r in rows]
+
+    def get_all(self) -> list:
+        return self._query()
+
+    def get_by_id(self, item_id: str):
+        items = self._query("WHERE id = ?", (item_id,))
+        return items[0] if items else None
+
+    def add(self, item) -> bool:
+        with self.db.lock, self.db.conn:
+            seq = self.db.conn.execute(f"SELECT COALESCE(MAX(seq), 0) + 1 FROM {self.table}").fetchone()[0]
+            self.db.conn.execute(self.upsert_sql, self.row_of(item.to_dict(), seq))
+        return True
+
+    def update(self, item) -> bool:
+        record = item.to_dict()
+        assignments = ", ".join(f"{c} = ?" for c in self.columns)
+        sql = f"UPDATE {self.table} SET {assignments}, data = ? WHERE id = ?"
+        with self.db.lock, self.db.conn:
+            cur = self.db.conn.execute(
+                sql, (*self.index_values(record), json.dumps(record, ensure_ascii=False), record.get('id'))
+            )
+        return cur.rowcount > 0
+
+    def delete(self, item_id: str) -> bool:
+        return self.delete_batch([item_id])
+
+    def delete_batch(self, item_ids: List[str]) -> bool:
+        if not item_ids: return False
+        with self.db.lock, self.db.conn:
+            cur = self.db.conn.executemany(f"DELETE FROM {self.table} WHERE id = ?", [(i,) for i in item_ids])
+        return cur.rowcount > 0
+
+
+def _sql_for(table: str, columns: tuple):
+    cols = ("id", "seq") + columns + ("data",)
+    placeholders = ", ".join("?" for _ in cols)
+    insert = f"INSERT INTO {table} ({', '.join(cols)}) VALUES ({placeholders})"
+    updates = ", ".join(f"{c} = excluded.{c}" for c in columns + ("data",))
+    upsert = f"{insert} ON CONFLICT(id) DO UPDATE SET {updates}"
+    return insert, upsert
+
+
+class SQLiteLinkDAO(_SQLiteTableDAO):
+    table = "links"
+    model = UserLink
+    columns = ("category", "source_key", "status")
+    insert_sql, upsert_sql = _sql_for(table, columns)
+
+    @classmethod
+    def index_values(cls, record: dict) -> tuple:
+        return (
+            record.get('category'),
+            normalize_source_path(record.get('source_path', '')),
+            record.get('status'),
+        )
+
+    def update_many(self, links: List[UserLink]) -> int:
+        """批量更新链接（单个事务）"""
+        records = [link.to_dict() for link in links]
+        sql = "UPDATE links SET category = ?, source_key = ?, status = ?, data = ? WHERE id = ?"
+        with self.db.lock, self.db.conn:
+            cur = self.db.conn.executemany(sql, [
+                (*self.index_values(r), json.dumps(r, ensure_ascii=False), r.get('id')) for r in records
+            ])
+        return cur.rowcount
+
+    def update_fields(self, updates: Dict[str, dict]) -> int:
+        """按 id 局部更新字段（单个事务内读-改-写）"""
+        count = 0
+        sql = "UPDATE links SET category = ?, source_key = ?, status = ?, data = ? WHERE id = ?"
+        with self.db.lock, self.db.conn:
+            for lid, fields in updates.items():
+                row = self.db.conn.execute("SELECT data FROM links WHERE id = ?", (lid,)).fetchone()
+                if row is None:
+                    continue
+                record = {**json.loads(row[0]), **serialize_fields(fields)}
+                self.db.conn.execute(
+                    sql, (*self.index_values(record), json.dumps(record, ensure_ascii=False), lid)
+                )
+                count += 1
+        return count
+
+    def get_by_source_path(self, source_path: str) -> Optional[UserLink]:
+        items = self._query("WHERE source_key = ?", (normalize_source_path(source_path),))
+        return items[0] if items else None
+
+    def get_by_category(self, category_id: Optional[str]) -> List[UserLink]:
+        if category_id is None:
+            return self._query("WHERE category IS NULL")
+        return self._query("WHERE category = ?", (category_id,))
+
+    def flush(self):
+        """事务已即时提交，保留接口以兼容 JSON 后端"""
+        pass
+
+
+class SQLiteTemplateDAO(_SQLiteTableDAO):
+    table = "templates"
+    model = Template
+    columns = ("category_id",)
+    insert_sql, upsert_sql = _sql_for(table, columns)
+
+    @classmethod
+    def index_values(cls, record: dict) -> tuple:
+        return (record.get('category_id'),)
+
+
+class SQLiteCategoryDAO(_SQLiteTableDAO):
+    table = "categories"
+    model = CategoryNode
+    columns = ("parent_id",)
+    insert_sql, upsert_sql = _sql_for(table, columns)
+
+    @classmethod
+    def index_values(cls, record: dict) -> tuple:
+        return (record.get('parent_id'),)
@@ -0,0 +1,329 @@
+# coding: utf-8
+"""
+文件复制引擎驱动
+
+- 有界线程池同时保持 N 个文件在途，摊薄海量小文件的单文件开销
+- 大文件按可调块大小分段复制，段间检查取消并上报字节进度
+- 优先使用系统零拷贝原语：Linux 的 os.copy_file_range / os.sendfile，Windows 的 CopyFileExW，
+  不可用时退化为复用缓冲区的 readinto 循环
+- 复制完成后按 shutil.copy2 的语义保留元数据（copystat）
+- 校验模式下在同一个读循环中计算摘要，源文件只读一次；仅大文件回读目标端比对
+"""
+import hashlib
+import os
+import shutil
+import sys
+import threading
+import concurrent.futures
+from dataclasses import dataclass
+from typing import Callable, Iterable, Optional
+from src.common.exceptions import DriverError
+
+
+# 默认并发文件数
+DEFAULT_COPY_WORKERS = min(8, (os.cpu_count() or 4))
+# 默认分块大小（字节）
+DEFAULT_CHUNK_SIZE = 8 * 1024 * 1024
+# 超过该大小的文件在 Windows 上使用无缓冲复制，避免污染系统缓存
+UNBUFFERED_THRESHOLD = 256 * 1024 * 1024
+# 不小于该大小的文件先预分配目标空间（posix_fallocate），减少碎片并尽早暴露空间不足
+PREALLOCATE_THRESHOLD = 16 * 1024 * 1024
+# 进度上报的最小间隔（秒）
+PROGRESS_INTERVAL = 0.1
+# 校验模式的摘要算法
+VERIFY_ALGORITHM = "sha256"
+# 校验模式下，不小于该大小的文件复制后回读目标端比对摘要（None 表示从不回读，0 表示全部回读）
+DEFAULT_REREAD_THRESHOLD = 256 * 1024 * 1024
+
+
+@dataclass
+class CopyItem:
+    """一个待复制文件"""
+    src: str
+    dst: str
+    size: int = 0
+    mtime_ns: int = 0
+    digest: str = ""  # 校验模式下的源文件摘要
+
+
+class CopyError(DriverError):
+    """单个文件复制失败（原始异常保存在 error 中）"""
+
+    def __init__(self, item: CopyItem, error: Exception):
+        super().__init__(f"复制失败 {item.src} -> {item.dst}: {error}")
+        self.item = item
+        self.error = error
+
+
+class CopyAborted(DriverError):
+    """复制被取消"""
+    pass
+
+
+class VerifyError(DriverError):
+    """目标端回读摘要与复制时计算的摘要不一致"""
+    pass
+
+
+# ===== 单文件复制 =====
+
+def _copy_buffered(fsrc, fdst, chunk_size: int, on_bytes, is_aborted, hasher=None):
+    """通用路径：复用同一块缓冲区的 readinto 循环（可同时流式计算摘要）"""
+    buf = bytearray(min(chunk_size, 1024 * 1024) if hasher is None else chunk_size)
+    view = memoryview(buf)
+    while True:
+        if is_aborted():
+            raise CopyAborted()
+        n = fsrc.readinto(buf)
+        if not n:
+            break
+        chunk = view[:n]
+        fdst.write(chunk)
+        if hasher is not None:
+            hasher.update(chunk)
+        on_bytes(n)
+
+
+def _copy_kernel(fsrc, fdst, chunk_size: int, on_bytes, is_aborted) -> bool:
+    """
+    Linux 零拷贝路径：copy_file_range，其次 sendfile
+
+    返回 True 表示已复制到文件末尾；返回 False 表示当前系统不支持，
+    此时文件偏移已与已复制字节数保持一致，调用方可用缓冲路径继续。
+    """
+    infd, outfd = fsrc.fileno(), fdst.fileno()
+
+    if hasattr(os, 'copy_file_range'):
+        try:
+            while True:
+                if is_aborted():
+                    raise CopyAborted()
+                n = os.copy_file_range(infd, outfd, chunk_size)
+                if n == 0:
+                    return True
+                on_bytes(n)
+        except OSError:
+            pass  # EXDEV / ENOSYS / EINVAL 等：降级
+
+    if hasattr(os, 'sendfile'):
+        offset = os.lseek(infd, 0, os.SEEK_CUR)
+        try:
+            while True:
+                if is_aborted():
+                    raise CopyAborted()
+                n = os.sendfile(outfd, infd, offset, chunk_size)
+                if n == 0:
+                    return True
+                offset += n
+                on_bytes(n)
+        except OSError:
+            os.lseek(infd, offset, os.SEEK_SET)
+    return False
+
+
+def _copy_windows(src: str, dst: str, size: int, on_bytes, is_aborted):
+    """Windows 路径：CopyFileExW（内核完成分块复制，通过进度例程上报与取消）"""
+    import ctypes
+    from ctypes import wintypes
+
+    PROGRESS_CONTINUE, PROGRESS_CANCEL = 0, 1
+    COPY_FILE_NO_BUFFERING = 0x00001000
+
+    LPPROGRESS_ROUTINE = ctypes.WINFUNCTYPE(
+        wintypes.DWORD,
+        ctypes.c_longlong, ctypes.c_longlong,   # TotalFileSize, TotalBytesTransferred
+        ctypes.c_longlong, ctypes.c_longlong,   # StreamSize, StreamBytesTransferred
+        wintypes.DWORD, wintypes.DWORD,         # dwStreamNumber, dwCallbackReason
+        wintypes.HANDLE, wintypes.HANDLE,       # hSourceFile, hDestinationFile
+        wintypes.LPVOID,                        # lpData
+    )
+    state = {'done': 0}
+
+    def _progress(total, transferred, *_):
+        if transferred > state['done']:
+            on_bytes(transferred - state['done'])
+            state['done'] = transferred
+        return PROGRESS_CANCEL if is_aborted() else PROGRESS_CONTINUE
+
+    routine = LPPROGRESS_ROUTINE(_progress)
+    flags = COPY_FILE_NO_BUFFERING if size >= UNBUFFERED_THRESHOLD else 0
+    ok = ctypes.windll.kernel32.CopyFileExW(src, dst, routine, None, None, flags)
+    if not ok:
+        if is_aborted():
+            raise CopyAborted()
+        raise ctypes.WinError()
+
+
+def copy_file(src: str, dst: str, size: int = 0, chunk_size: int = DEFAULT_CHUNK_SIZE,
+              on_bytes: Callable[[int], None] = None, is_aborted: Callable[[], bool] = None,
+              hasher=None):
+    """
+    复制单个文件并保留元数据（等价于 shutil.copy2）
+
+    Args:
+        size: 文件大小（仅用于选择策略，可为 0）
+        chunk_size: 分块大小，同时决定进度与取消检查的粒度
+        on_bytes: 每复制一块后回调新增字节数
+        is_aborted: 取消检查，取消时抛出 CopyAborted
+        hasher: hashlib 对象；给定时强制走缓冲路径，在复制的同时计算摘要
+    """
+    on_bytes = on_bytes or (lambda n: None)
+    is_aborted = is_aborted or (lambda: False)
+
+    if hasher is None and sys.platform == 'win32':
+        _copy_windows(src, dst, size, on_bytes, is_aborted)
+    else:
+        with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+            # 按打开时的实际大小预分配（清单中的大小可能已过期）
+            actual_size = os.fstat(fsrc.fileno()).st_size
+            if actual_size >= PREALLOCATE_THRESHOLD and hasattr(os, 'posix_fallocate'):
+                try:
+                    os.posix_fallocate(fdst.fileno(), 0, actual_size)
+                except OSError:
+                    pass  # 文件系统不支持时忽略
+            if hasher is not None or not _copy_kernel(fsrc, fdst, chunk_size, on_bytes, is_aborted):
+                _copy_buffered(fsrc, fdst, chunk_size, on_bytes, is_aborted, hasher)
+            # 源文件在复制期间缩小时，截掉预分配的多余部分（否则目标末尾残留零字节）
+            fdst.truncate()
+    shutil.copystat(src, dst)
+
+
+def hash_file(path: str, algorithm: str = VERIFY_ALGORITHM, chunk_size: int = DEFAULT_CHUNK_SIZE,
+              is_aborted: Callable[[], bool] = None) -> str:
+    """计算文件摘要"""
+    is_aborted = is_aborted or (lambda: False)
+    hasher = hashlib.new(algorithm)
+    buf = bytearray(chunk_size)
+    view = memoryview(buf)
+    with open(path, 'rb') as f:
+        while True:
+            if is_aborted():
+                raise CopyAborted()
+            n = f.readinto(buf)
+            if not n:
+                break
+            hasher.update(view[:n])
+    return hasher.hexdigest()
+
+
+def copy_file_verified(src: str, dst: str, size: int = 0, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                       on_bytes: Callable[[int], None] = None, is_aborted: Callable[[], bool] = None,
+                       algorithm: str = VERIFY_ALGORITHM,
+                       reread_threshold: Optional[int] = DEFAULT_REREAD_THRESHOLD) -> str:
+    """
+    边复制边计算摘要，返回源文件摘要
+
+    大小不小于 reread_threshold 的文件会回读目标端重新计算摘要，不一致时抛出 VerifyError。
+    """
+    hasher = hashlib.new(algorithm)
+    copy_file(src, dst, size, chunk_size, on_bytes, is_aborted, hasher=hasher)
+    digest = hasher.hexdigest()
+    if reread_threshold is not None and size >= reread_threshold:
+        if hash_file(dst, algorithm, chunk_size, is_aborted) != digest:
+            raise VerifyError(f"目标文件校验失败: {dst}")
+    return digest
+
+
+# ===== 并发引擎 =====
+
+class CopyEngine:
+    """
+    有界并发复制引擎
+
+    Args:
+        max_workers: 同时在途的文件数
+        chunk_size: 单文件分块大小
+        is_aborted: 协作式取消检查
+        progress_callback: (本次已复制字节数, 当前文件名)，在调用 run 的线程中节流回调
+        on_file_done: (CopyItem) 单个文件复制完成回调，在调用 run 的线程中按完成顺序回调
+        copy_func: 单文件复制函数，签名同 copy_file，返回值（如摘要）写入 CopyItem.digest
+    """
+
+    def __init__(self, max_workers: int = DEFAULT_COPY_WORKERS, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                 is_aborted: Callable[[], bool] = None,
+                 progress_callback: Callable[[int, str], None] = None,
+                 on_file_done: Callable[[CopyItem], None] = None,
+                 copy_func: Callable = None):
+        self.max_workers = max(1, max_workers)
+        self.chunk_size = chunk_size
+        self.is_aborted = is_aborted or (lambda: False)
+        self.progress_callback = progress_callback
+        self.on_file_done = on_file_done
+        self.copy_func = copy_func or copy_file
+
+        self._lock = threading.Lock()
+        self._bytes_done = 0
+        self._current = ""
+        self._failed = False
+
+    def _add_bytes(self, n: int):
+        with self._lock:
+            self._bytes_done += n
+
+    def _should_stop(self) -> bool:
+        """任一文件失败后，其余在途文件也尽快停止"""
+        return self._failed or self.is_aborted()
+
+    def _copy_one(self, item: CopyItem) -> CopyItem:
+        self._current = os.path.basename(item.src)
+        try:
+            item.digest = self.copy_func(item.src, item.dst, size=item.size, chunk_size=self.chunk_size,
+                                         on_bytes=self._add_bytes, is_aborted=self._should_stop) or ""
+        except CopyAborted:
+            raise
+        except Exception as e:
+            raise CopyError(item, e) from e
+        return item
+
+    def _report(self):
+        if self.progress_callback:
+            self.progress_callback(self._bytes_done, self._current)
+
+    def run(self, items: Iterable[CopyItem]) -> int:
+        """
+        按给定顺序复制所有文件，始终保持至多 max_workers 个在途
+
+        Returns:
+            本次复制的总字节数
+        Raises:
+            CopyError: 任一文件失败时（等待在途任务结束后）抛出首个错误
+            CopyAborted: 被取消时抛出
+        """
+        pending = iter(items)
+        error: Optional[BaseException] = None
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            in_flight = set()
+
+            def _fill():
+                while len(in_flight) < self.max_workers and not self._should_stop():
+                    item = next(pending, None)
+                    if item is None:
+                        return
+                    in_flight.add(executor.submit(self._copy_one, item))
+
+            _fill()
+            while in_flight:
+                done, in_flight = concurrent.futures.wait(
+                    in_flight, timeout=PROGRESS_INTERVAL,
+                    return_when=concurrent.futures.FIRST_COMPLETED
+                )
+                for future in done:
+                    try:
+                        item = future.result()
+                    except BaseException as e:
+                        # 保留首个真实错误；取消异常只在没有其他错误时上抛
+                        if error is None or (isinstance(error, CopyAborted) and not isinstance(e, CopyAborted)):
+                            error = e
+                        self._failed = True
+                        continue
+                    if self.on_file_done:
+                        self.on_file_done(item)
+                _fill()
+                self._report()
+
+        if error is None and self.is_aborted():
+            error = CopyAborted()
+        if error is not None:
+            raise error
+        return self._bytes_done
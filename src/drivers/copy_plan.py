@@ -0,0 +1,146 @@
+# coding: utf-8
+"""
+迁移规划驱动
+
+- 一次遍历生成紧凑清单：目录列表 + (相对路径, 大小, mtime_ns) 元组列表，总字节数由清单得出
+  遍历复用 walker.TreeWalker 的共享队列并行枚举；无法读取的目录与遍历器一样跳过，并记入清单
+- 写入任何字节之前用 shutil.disk_usage 预检目标卷剩余空间（按簇大小向上取整估算占用）
+- 执行顺序大小交替，使大文件的顺序吞吐与小文件的元数据开销相互掩盖
+- ThroughputMeter 根据已复制字节估算速度与剩余时间
+"""
+import os
+import shutil
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Iterable, List, Tuple
+from src.common.exceptions import DriverError
+from src.drivers.copy_engine import CopyItem
+from src.drivers.fs import nearest_existing_path
+from src.drivers.walker import DEFAULT_WALK_WORKERS, TreeWalker, scan_listing
+
+
+# 估算磁盘占用时使用的簇大小（NTFS 默认 4 KiB）
+CLUSTER_SIZE = 4096
+
+# 速度估算的平滑系数（指数移动平均）
+SPEED_SMOOTHING = 0.3
+
+
+class InsufficientSpaceError(DriverError):
+    """目标卷剩余空间不足"""
+
+    def __init__(self, required: int, free: int, path: str):
+        super().__init__(f"目标磁盘空间不足: 需要 {required} 字节，可用 {free} 字节 ({path})")
+        self.required = required
+        self.free = free
+        self.path = path
+
+
+@dataclass
+class CopyPlan:
+    """迁移清单（相对路径；单文件迁移时唯一文件的相对路径为 "."）"""
+    source: str
+    target: str
+    dirs: List[str] = field(default_factory=list)  # 相对目录，父目录总在子目录之前
+    files: List[Tuple[str, int, int]] = field(default_factory=list)  # (相对路径, 大小, mtime_ns)
+    total_size: int = 0
+    unreadable: List[str] = field(default_factory=list)  # 无法枚举而被跳过的相对目录
+
+    def items(self) -> List[CopyItem]:
+        """展开为复制任务"""
+        return [
+            CopyItem(self._join(self.source, rel_path), self._join(self.target, rel_path), size, mtime_ns)
+            for rel_path, size, mtime_ns in self.files
+        ]
+
+    @staticmethod
+    def _join(root: str, rel_path: str) -> str:
+        return root if rel_path == "." else os.path.join(root, rel_path)
+
+
+def build_plan(source: str, target: str, is_aborted: Callable[[], bool] = None,
+               max_workers: int = DEFAULT_WALK_WORKERS) -> CopyPlan:
+    """并行遍历源路径生成迁移清单（不跟随链接）"""
+    plan = CopyPlan(source, target)
+
+    if not os.path.isdir(source):
+        st = os.stat(source)
+        plan.files.append((".", st.st_size, st.st_mtime_ns))
+        plan.total_size = st.st_size
+        return plan
+
+    walker = TreeWalker(
+        max_workers=max_workers,
+        list_dir=lambda path, st: scan_listing(path, st, collect_files=True),
+        keep_listings=True,
+        is_aborted=is_aborted,
+    )
+    result = walker.walk(source)
+
+    # 父目录的相对路径是子目录的前缀，字典序保证父目录在前
+    listings = {_rel_dir(source, path): listing for path, (_, listing) in result.listings.items()}
+    for rel_dir in sorted(listings):
+        listing = listings[rel_dir]
+        plan.dirs.append(rel_dir)
+        if listing.error is not None:
+            plan.unreadable.append(rel_dir)
+        for name, size, mtime_ns in listing.files or ():
+            plan.files.append((os.path.join(rel_dir, name) if rel_dir else name, size, mtime_ns))
+    plan.total_size = result.total_size
+    return plan
+
+
+def _rel_dir(source: str, path: str) -> str:
+    """遍历结果中的目录相对源根目录的路径（根目录为空串）"""
+    return path[len(source):].lstrip("\\/") if path != source else ""
+
+
+def estimate_disk_usage(sizes: Iterable[int], cluster_size: int = CLUSTER_SIZE) -> int:
+    """估算文件落盘后的占用（每个文件按簇向上取整）"""
+    return sum(-(-size // cluster_size) * cluster_size for size in sizes)
+
+
+def check_free_space(target: str, required: int):
+    """预检目标卷剩余空间，不足时抛出 InsufficientSpaceError"""
+    anchor = nearest_existing_path(target)
+    if not anchor:
+        return
+    free = shutil.disk_usage(anchor).free
+    if free < required:
+        raise InsufficientSpaceError(required, free, anchor)
+
+
+def interleave_by_size(items: List[CopyItem]) -> List[CopyItem]:
+    """大小交替排列：最大、最小、次大、次小……"""
+    ordered = sorted(items, key=lambda item: item.size)
+    result = []
+    lo, hi = 0, len(ordered) - 1
+    while lo <= hi:
+        result.append(ordered[hi])
+        hi -= 1
+        if lo <= hi:
+            result.append(ordered[lo])
+            lo += 1
+    return result
+
+
+class ThroughputMeter:
+    """根据累计字节数估算速度（字节/秒）与剩余时间（秒）"""
+
+    def __init__(self, total: int, done: int = 0):
+        self.total = total
+        self._last_bytes = done
+        self._last_time = time.monotonic()
+        self.speed = 0.0
+
+    def update(self, done: int) -> Tuple[float, float]:
+        """返回 (速度, 剩余秒数)；速度未知时剩余秒数为 -1"""
+        now = time.monotonic()
+        elapsed = now - self._last_time
+        if elapsed > 0:
+            instant = (done - self._last_bytes) / elapsed
+            self.speed = instant if not self.speed else \
+                SPEED_SMOOTHING * instant + (1 - SPEED_SMOOTHING) * self.speed
+            self._last_bytes, self._last_time = done, now
+        eta = max(self.total - done, 0) / self.speed if self.speed > 0 else -1.0
+        return self.speed, eta
@@ -1,10 +1,31 @@
 # coding: utf-8
 """文件系统操作驱动"""
 import os
+import stat
 import subprocess
+from dataclasses import dataclass
 from pathlib import Path
 
 
+FILE_ATTRIBUTE_REPARSE_POINT = 0x400
+
+
+@dataclass(frozen=True)
+class PathProbe:
+    """单个路径的探测结果（不跟随链接）"""
+    path: str
+    exists: bool = False       # 路径本身存在（悬空链接也算存在）
+    is_reparse: bool = False   # 符号链接 / 联接点 / 其他重解析点
+    target: str = ""           # 链接指向的规范化绝对路径（非链接或无法解析时为空）
+    file_id: int = 0           # st_ino（Windows 下为文件索引号）
+    device: int = 0            # st_dev（Windows 下为卷序列号）
+
+    @property
+    def is_link(self) -> bool:
+        """可解析出目标的链接（符号链接或联接点）"""
+        return bool(self.target)
+
+
 def create_junction(source: str, target: str) -> bool:
     """创建目录联接点"""
     try:
@@ -53,6 +74,66 @@ def is_junction(path: str) -> bool:
     except Exception:
         return False
 
+def nearest_existing_path(path: str) -> str:
+    """沿父目录向上返回 path 自身或第一个存在的祖先（都不存在时返回空字符串）"""
+    path = os.path.abspath(path)
+    while not os.path.exists(path):
+        parent = os.path.dirname(path)
+        if parent == path:
+            return ""
+        path = parent
+    return path
+
+
+def is_same_volume(path_a: str, path_b: str) -> bool:
+    """
+    判断两个路径是否位于同一卷（比较 st_dev，Windows 下即卷序列号）
+
+    路径不存在时沿父目录向上找到第一个存在的祖先再比较。
+    """
+    def _device(path: str):
+        try:
+            return os.stat(nearest_existing_path(path)).st_dev
+        except OSError:
+            return None
+
+    dev_a, dev_b = _device(path_a), _device(path_b)
+    return dev_a is not None and dev_a == dev_b
+
+
+def _strip_long_prefix(path: str) -> str:
+    """剥离 Windows 长路径前缀与 NT 对象路径前缀"""
+    if path.startswith("\\\\?\\UNC\\"):
+        return "\\\\" + path[8:]
+    if path.startswith("\\\\?\\") or path.startswith("\\??\\"):
+        return path[4:]
+    return path
+
+
+def probe_path(path: str) -> PathProbe:
+    """
+    以最少的系统调用探测路径：一次 lstat，若为链接再加一次 readlink
+
+    Windows 下 os.lstat 一次取得属性、重解析标记、文件索引号与卷序列号，
+    os.readlink 读取符号链接与联接点（挂载点）的重解析数据。
+    """
+    try:
+        st = os.lstat(path)
+    except (OSError, ValueError):
+        return PathProbe(path)
+
+    attrs = getattr(st, 'st_file_attributes', 0)
+    is_reparse = stat.S_ISLNK(st.st_mode) or bool(attrs & FILE_ATTRIBUTE_REPARSE_POINT)
+    target = ""
+    if is_reparse:
+        try:
+            target = _strip_long_prefix(os.readlink(path))
+            target = os.path.normpath(os.path.join(os.path.dirname(path), target))
+        except (OSError, ValueError):
+            target = ""  # 非链接类重解析点（如云文件占位符）
+    return PathProbe(path, True, is_reparse, target, st.st_ino, st.st_dev)
+
+
 def get_real_path(path: str) -> str:
     """获取链接指向的真实物理路径 (规范化后)"""
     try:
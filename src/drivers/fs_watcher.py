@@ -0,0 +1,305 @@
+# coding: utf-8
+"""
+目录变更监听驱动
+
+统一接口：DirWatcher(callback).set_dirs(dirs) / start() / stop()
+callback(directory, name) 在监听线程中调用：
+- directory 为发生变化的被监听目录，name 为其中变化的直属条目名（未知时为 None）
+- directory 为 None 表示事件队列溢出，调用方应视为所有目录都可能变化
+
+后端：Linux 使用 inotify（ctypes），Windows 使用 ReadDirectoryChangesW，
+其他平台或初始化失败时退化为轮询目录指纹 (st_ino, st_mtime_ns)。
+"""
+import os
+import sys
+import select
+import struct
+import threading
+from typing import Callable, Dict, Iterable, Optional, Set, Tuple
+
+
+# 轮询后端的默认间隔（秒）
+DEFAULT_POLL_INTERVAL = 2.0
+
+WatchCallback = Callable[[Optional[str], Optional[str]], None]
+
+
+class DirWatcher:
+    """目录监听器基类"""
+
+    def __init__(self, callback: WatchCallback):
+        self.callback = callback
+        self._lock = threading.Lock()
+        self._dirs: Set[str] = set()
+        self._running = False
+
+    @property
+    def dirs(self) -> Set[str]:
+        with self._lock:
+            return set(self._dirs)
+
+    def set_dirs(self, dirs: Iterable[str]):
+        """替换被监听的目录集合（只增删差异部分）"""
+        new = {os.path.normpath(d) for d in dirs}
+        with self._lock:
+            added, removed = new - self._dirs, self._dirs - new
+            self._dirs = new
+        for path in removed:
+            self._remove(path)
+        for path in added:
+            self._add(path)
+
+    def start(self):
+        self._running = True
+
+    def stop(self):
+        self._running = False
+
+    # 子类实现
+    def _add(self, path: str):
+        pass
+
+    def _remove(self, path: str):
+        pass
+
+    def _emit(self, directory: Optional[str], name: Optional[str]):
+        try:
+            self.callback(directory, name)
+        except Exception as e:
+            print(f"[Watcher] 回调异常: {e}")
+
+
+class PollingDirWatcher(DirWatcher):
+    """轮询后端：目录直属条目增删/重命名会改变目录 mtime"""
+
+    def __init__(self, callback: WatchCallback, interval: float = DEFAULT_POLL_INTERVAL):
+        super().__init__(callback)
+        self.interval = interval
+        self._signatures: Dict[str, Optional[Tuple[int, int]]] = {}
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @staticmethod
+    def _signature(path: str) -> Optional[Tuple[int, int]]:
+        try:
+            st = os.stat(path)
+            return st.st_ino, st.st_mtime_ns
+        except OSError:
+            return None
+
+    def _add(self, path: str):
+        self._signatures[path] = self._signature(path)
+
+    def _remove(self, path: str):
+        self._signatures.pop(path, None)
+
+    def start(self):
+        super().start()
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._loop, name="DirWatcher-poll", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        super().stop()
+        self._stop_event.set()
+
+    def _loop(self):
+        while not self._stop_event.wait(self.interval):
+            for path in self.dirs:
+                sig = self._signature(path)
+                if path in self._signatures and self._signatures[path] != sig:
+                    self._signatures[path] = sig
+                    self._emit(path, None)
+
+
+class InotifyDirWatcher(DirWatcher):
+    """Linux inotify 后端（单线程 select 所有 watch）"""
+
+    IN_ATTRIB = 0x00000004
+    IN_MOVED_FROM = 0x00000040
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_DELETE = 0x00000200
+    IN_DELETE_SELF = 0x00000400
+    IN_MOVE_SELF = 0x00000800
+    IN_Q_OVERFLOW = 0x00004000
+    IN_ONLYDIR = 0x01000000
+
+    MASK = (IN_ATTRIB | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+            | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR)
+
+    _EVENT = struct.Struct("iIII")  # wd, mask, cookie, len
+
+    def __init__(self, callback: WatchCallback):
+        super().__init__(callback)
+        import ctypes
+        import ctypes.util
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c") or None, use_errno=True)
+        self._fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 失败")
+        self._wd_to_path: Dict[int, str] = {}
+        self._path_to_wd: Dict[str, int] = {}
+        self._wake_r, self._wake_w = os.pipe()
+        self._thread: Optional[threading.Thread] = None
+
+    def _add(self, path: str):
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(path), self.MASK)
+        if wd >= 0:
+            with self._lock:
+                self._wd_to_path[wd] = path
+                self._path_to_wd[path] = wd
+
+    def _remove(self, path: str):
+        with self._lock:
+            wd = self._path_to_wd.pop(path, None)
+            if wd is not None:
+                self._wd_to_path.pop(wd, None)
+        if wd is not None:
+            self._libc.inotify_rm_watch(self._fd, wd)
+
+    def start(self):
+        super().start()
+        self._thread = threading.Thread(target=self._loop, name="DirWatcher-inotify", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        super().stop()
+        os.write(self._wake_w, b"x")
+
+    def _loop(self):
+        try:
+            while self._running:
+                readable, _, _ = select.select([self._fd, self._wake_r], [], [])
+                if self._wake_r in readable:
+                    break
+                try:
+                    data = os.read(self._fd, 64 * 1024)
+                except BlockingIOError:
+                    continue
+                for directory, name in self._parse(data):
+                    self._emit(directory, name)
+        finally:
+            for fd in (self._fd, self._wake_r, self._wake_w):
+                try:
+                    os.close(fd)
+                except OSError:
+                    pass
+
+    def _parse(self, data: bytes):
+        offset = 0
+        while offset + self._EVENT.size <= len(data):
+            wd, mask, _, length = self._EVENT.unpack_from(data, offset)
+            offset += self._EVENT.size
+            raw_name = data[offset:offset + length].rstrip(b"\0")
+            offset += length
+            if mask & self.IN_Q_OVERFLOW:
+                yield None, None
+                continue
+            with self._lock:
+                directory = self._wd_to_path.get(wd)
+            if directory is not None:
+                yield directory, os.fsdecode(raw_name) if raw_name else None
+
+
+class WindowsDirWatcher(DirWatcher):
+    """Windows ReadDirectoryChangesW 后端（每个目录一个阻塞读取线程，停止时 CancelIoEx）"""
+
+    FILE_LIST_DIRECTORY = 0x0001
+    FILE_SHARE_ALL = 0x00000007  # READ | WRITE | DELETE
+    OPEN_EXISTING = 3
+    FILE_FLAG_BACKUP_SEMANTICS = 0x02000000
+    FILE_NOTIFY_FILTER = 0x00000001 | 0x00000002 | 0x00000004  # FILE_NAME | DIR_NAME | ATTRIBUTES
+    BUFFER_SIZE = 16 * 1024
+
+    _INFO = struct.Struct("<III")  # NextEntryOffset, Action, FileNameLength
+
+    def __init__(self, callback: WatchCallback):
+        super().__init__(callback)
+        import ctypes
+        from ctypes import wintypes
+        self._ctypes = ctypes
+        self._kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
+        self._kernel32.CreateFileW.restype = wintypes.HANDLE
+        self._kernel32.ReadDirectoryChangesW.argtypes = [
+            wintypes.HANDLE, wintypes.LPVOID, wintypes.DWORD, wintypes.BOOL, wintypes.DWORD,
+            ctypes.POINTER(wintypes.DWORD), wintypes.LPVOID, wintypes.LPVOID
+        ]
+        self._kernel32.CancelIoEx.argtypes = [wintypes.HANDLE, wintypes.LPVOID]
+        self._kernel32.CloseHandle.argtypes = [wintypes.HANDLE]
+        self._wintypes = wintypes
+        self._handles: Dict[str, int] = {}
+
+    def _add(self, path: str):
+        if not self._running:
+            return
+        handle = self._kernel32.CreateFileW(
+            path, self.FILE_LIST_DIRECTORY, self.FILE_SHARE_ALL, None,
+            self.OPEN_EXISTING, self.FILE_FLAG_BACKUP_SEMANTICS, None
+        )
+        if not handle or handle == self._ctypes.c_void_p(-1).value:
+            return
+        with self._lock:
+            self._handles[path] = handle
+        threading.Thread(target=self._loop, args=(path, handle),
+                         name="DirWatcher-rdcw", daemon=True).start()
+
+    def _remove(self, path: str):
+        with self._lock:
+            handle = self._handles.pop(path, None)
+        if handle:
+            self._kernel32.CancelIoEx(handle, None)
+
+    def start(self):
+        super().start()
+        for path in self.dirs:
+            self._add(path)
+
+    def stop(self):
+        super().stop()
+        for path in list(self._handles):
+            self._remove(path)
+
+    def _loop(self, path: str, handle: int):
+        ctypes = self._ctypes
+        buf = ctypes.create_string_buffer(self.BUFFER_SIZE)
+        returned = self._wintypes.DWORD(0)
+        try:
+            while self._running:
+                ok = self._kernel32.ReadDirectoryChangesW(
+                    handle, buf, self.BUFFER_SIZE, False, self.FILE_NOTIFY_FILTER,
+                    ctypes.byref(returned), None, None
+                )
+                if not ok:
+                    break  # 被 CancelIoEx 取消或目录已删除
+                if returned.value == 0:
+                    self._emit(None, None)  # 缓冲区溢出
+                    continue
+                for name in self._parse(buf.raw[:returned.value]):
+                    self._emit(path, name)
+        finally:
+            self._kernel32.CloseHandle(handle)
+
+    def _parse(self, data: bytes):
+        offset = 0
+        while True:
+            next_offset, _, length = self._INFO.unpack_from(data, offset)
+            start = offset + self._INFO.size
+            name = data[start:start + length].decode("utf-16-le")
+            # 只关心被监听目录的直属条目
+            yield name.split("\\", 1)[0]
+            if not next_offset:
+                break
+            offset += next_offset
+
+
+def create_dir_watcher(callback: WatchCallback, poll_interval: float = DEFAULT_POLL_INTERVAL) -> DirWatcher:
+    """按平台选择监听后端，原生后端不可用时退化为轮询"""
+    try:
+        if sys.platform == "win32":
+            return WindowsDirWatcher(callback)
+        if sys.platform.startswith("linux"):
+            return InotifyDirWatcher(callback)
+    except Exception as e:
+        print(f"[Watcher] 原生监听不可用，改用轮询: {e}")
+    return PollingDirWatcher(callback, poll_interval)
@@ -0,0 +1,197 @@
+# coding: utf-8
+"""
+已安装程序清单驱动 - 读取注册表 Uninstall 键并缓存到 DATA_DIR
+
+- 每个 Uninstall 键以其自身及各程序子键的最后写入时间为缓存键：全部未变的键直接复用缓存，
+  不再逐个读取子键的值（安装/卸载会增删子键并更新父键的写入时间；升级、修复只改写程序子键的值，
+  父键的写入时间不变，因此还需比对每个子键的写入时间）
+- 清单为多重映射：同名程序（如不同版本/架构）全部保留，并记录版本与发布者
+- 注册表访问通过 RegistryReader 注入，非 Windows 平台可用假注册表测试
+"""
+import json
+import os
+from dataclasses import asdict, dataclass
+from typing import Dict, Iterator, List, Optional, Tuple
+from src.common.config import REGISTRY_CACHE_FILE
+
+
+# (根键, 子键路径)；根键用名称表示以便在非 Windows 平台上构造
+UNINSTALL_KEYS: List[Tuple[str, str]] = [
+    ("HKEY_LOCAL_MACHINE", r"SOFTWARE\Microsoft\Windows\CurrentVersion\Uninstall"),
+    ("HKEY_LOCAL_MACHINE", r"SOFTWARE\WOW6432Node\Microsoft\Windows\CurrentVersion\Uninstall"),
+    ("HKEY_CURRENT_USER", r"Software\Microsoft\Windows\CurrentVersion\Uninstall"),
+]
+
+
+@dataclass
+class InstalledProgram:
+    """一条已安装程序记录"""
+    display_name: str
+    install_location: str
+    version: str = ""
+    publisher: str = ""
+    key: str = ""  # 来源键（根键\子键\程序子键）
+
+
+class RegistryReader:
+    """注册表读取接口"""
+
+    def last_write_time(self, root: str, sub_key: str) -> Optional[int]:
+        """键的最后写入时间（键不存在时返回 None）"""
+        raise NotImplementedError
+
+    def subkey_write_times(self, root: str, sub_key: str) -> Dict[str, int]:
+        """各程序子键的最后写入时间 {子键名: 写入时间}（不支持时返回空字典，仅比对父键）"""
+        return {}
+
+    def read_programs(self, root: str, sub_key: str) -> List[InstalledProgram]:
+        """枚举 Uninstall 键下所有带 DisplayName 与 InstallLocation 的程序"""
+        raise NotImplementedError
+
+
+class WinRegReader(RegistryReader):
+    """基于 winreg 的注册表读取（仅 Windows）"""
+
+    @staticmethod
+    def _root(root: str):
+        import winreg
+        return getattr(winreg, root)
+
+    def last_write_time(self, root: str, sub_key: str) -> Optional[int]:
+        import winreg
+        try:
+            with winreg.OpenKey(self._root(root), sub_key) as key:
+                return winreg.QueryInfoKey(key)[2]
+        except OSError:
+            return None
+
+    def subkey_write_times(self, root: str, sub_key: str) -> Dict[str, int]:
+        import winreg
+        stamps = {}
+        try:
+            with winreg.OpenKey(self._root(root), sub_key) as key:
+                for i in range(winreg.QueryInfoKey(key)[0]):
+                    try:
+                        name = winreg.EnumKey(key, i)
+                        with winreg.OpenKey(key, name) as sub:
+                            stamps[name] = winreg.QueryInfoKey(sub)[2]
+                    except OSError:
+                        continue
+        except OSError:
+            pass
+        return stamps
+
+    def read_programs(self, root: str, sub_key: str) -> List[InstalledProgram]:
+        import winreg
+        programs = []
+        try:
+            with winreg.OpenKey(self._root(root), sub_key) as key:
+                for i in range(winreg.QueryInfoKey(key)[0]):
+                    try:
+                        name = winreg.EnumKey(key, i)
+                        with winreg.OpenKey(key, name) as sub:
+                            values = {}
+                            for value_name in ("DisplayName", "InstallLocation", "DisplayVersion", "Publisher"):
+                                try:
+                                    values[value_name] = str(winreg.QueryValueEx(sub, value_name)[0] or "")
+                                except OSError:
+                                    values[value_name] = ""
+                    except OSError:
+                        continue
+                    if values["DisplayName"] and values["InstallLocation"]:
+                        programs.append(InstalledProgram(
+                            values["DisplayName"], values["InstallLocation"],
+                            values["DisplayVersion"], values["Publisher"], f"{root}\\{sub_key}\\{name}"
+                        ))
+        except OSError:
+            pass
+        return programs
+
+
+class InstallInventory:
+    """已安装程序多重映射：DisplayName -> [InstalledProgram]（保持读取顺序）"""
+
+    def __init__(self, programs: List[InstalledProgram] = None):
+        self.programs: List[InstalledProgram] = list(programs or [])
+        self._by_name: Dict[str, List[InstalledProgram]] = {}
+        for program in self.programs:
+            self._by_name.setdefault(program.display_name, []).append(program)
+
+    def __len__(self) -> int:
+        return len(self.programs)
+
+    def get(self, display_name: str) -> List[InstalledProgram]:
+        return list(self._by_name.get(display_name, ()))
+
+    def names(self) -> List[str]:
+        return list(self._by_name)
+
+    def locations(self) -> Iterator[Tuple[str, str]]:
+        """全部 (DisplayName, InstallLocation) 条目，同名程序各占一条"""
+        return ((p.display_name, p.install_location) for p in self.programs)
+
+
+class RegistryInventoryCache:
+    """以 Uninstall 键及其程序子键的写入时间为键的已安装程序清单缓存"""
+
+    def __init__(self, cache_file: str = None, reader: RegistryReader = None,
+                 keys: List[Tuple[str, str]] = None):
+        self.cache_file = str(cache_file or REGISTRY_CACHE_FILE)
+        self.reader = reader or WinRegReader()
+        self.keys = keys or UNINSTALL_KEYS
+
+    def _load_cache(self) -> dict:
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            return data if isinstance(data, dict) else {}
+        except (OSError, ValueError):
+            return {}
+
+    def _save_cache(self, data: dict):
+        os.makedirs(os.path.dirname(self.cache_file) or '.', exist_ok=True)
+        tmp_file = self.cache_file + ".tmp"
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_file, self.cache_file)
+
+    @staticmethod
+    def _cached_programs(entry: Optional[dict], stamp: int,
+                         subkeys: Dict[str, int]) -> Optional[List[InstalledProgram]]:
+        """父键与各子键的写入时间均一致时返回缓存的程序列表，否则（或缓存格式不符时）返回 None"""
+        if not entry or entry.get("last_write") != stamp or entry.get("subkeys", {}) != subkeys:
+            return None
+        try:
+            return [InstalledProgram(**p) for p in entry.get("programs", [])]
+        except TypeError:
+            return None
+
+    def load(self) -> InstallInventory:
+        """返回当前清单：父键与子键写入时间均未变的键复用缓存，其余键重新读取并写回缓存"""
+        cache = self._load_cache()
+        new_cache = {}
+        programs: List[InstalledProgram] = []
+        changed = False
+
+        for root, sub_key in self.keys:
+            cache_key = f"{root}\\{sub_key}"
+            stamp = self.reader.last_write_time(root, sub_key)
+            if stamp is None:
+                changed = changed or cache_key in cache
+                continue
+
+            subkeys = self.reader.subkey_write_times(root, sub_key)
+            key_programs = self._cached_programs(cache.get(cache_key), stamp, subkeys)
+            if key_programs is None:
+                key_programs = self.reader.read_programs(root, sub_key)
+                changed = True
+            new_cache[cache_key] = {"last_write": stamp, "subkeys": subkeys,
+                                    "programs": [asdict(p) for p in key_programs]}
+            programs.extend(key_programs)
+
+        if changed:
+            try:
+                self._save_cache(new_cache)
+            except OSError as e:
+                print(f"[Registry] 写入安装清单缓存失败: {e}")
+        return InstallInventory(programs)
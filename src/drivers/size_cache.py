@@ -0,0 +1,191 @@
+# coding: utf-8
+"""
+目录空间缓存驱动 - 以 (文件 ID, 目录 mtime) 为指纹的增量空间统计
+
+每个目录记录自身直属文件的字节数/文件数、子目录名单以及整棵子树的汇总值。
+再次统计时只需 stat 目录本身：指纹未变的目录直接复用缓存中的直属统计与子目录名单，
+不再枚举其中的文件；只有指纹变化（增删/重命名了直属条目）的目录才重新 scandir。
+目录任务由 walker.TreeWalker 的共享队列并行消费。
+
+注意：目录 mtime 不会因文件内容原地增长而改变，此类变化需通过 use_cache=False 全量重算
+（链接页刷新按钮的右键菜单"完整重新统计空间"）。
+"""
+import os
+import stat
+import sqlite3
+import threading
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from src.common.config import SIZE_CACHE_FILE
+from src.drivers.walker import DEFAULT_WALK_WORKERS, DirListing, TreeWalker, WalkResult, scan_listing
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS dirs (
+    path         TEXT PRIMARY KEY,
+    file_id      INTEGER NOT NULL,
+    mtime_ns     INTEGER NOT NULL,
+    own_size     INTEGER NOT NULL,
+    own_files    INTEGER NOT NULL,
+    subdirs      TEXT NOT NULL,
+    total_size   INTEGER NOT NULL,
+    total_files  INTEGER NOT NULL
+);
+"""
+
+# (file_id, mtime_ns, own_size, own_files, subdirs, total_size, total_files)
+DirRecord = Tuple[int, int, int, int, str, int, int]
+
+# 子目录名单的分隔符（文件名中不可能出现）
+_NAME_SEP = "\0"
+
+
+class DirSizeCache:
+    """持久化目录空间缓存（线程安全，可被多个统计线程共享）"""
+
+    def __init__(self, db_file: str = None):
+        self.db_file = str(db_file or SIZE_CACHE_FILE)
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(self.db_file) or '.', exist_ok=True)
+        self._conn = sqlite3.connect(self.db_file, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    # ---------- 持久化 ----------
+
+    @staticmethod
+    def _subtree_range(root: str) -> Tuple[str, str]:
+        """root 下所有后代路径的字典序区间 [lo, hi)"""
+        prefix = root.rstrip("\\/") + os.sep
+        return prefix, prefix[:-1] + chr(ord(os.sep) + 1)
+
+    def _load_subtree(self, root: str) -> Dict[str, DirRecord]:
+        lo, hi = self._subtree_range(root)
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM dirs WHERE path = ? OR (path >= ? AND path < ?)", (root, lo, hi)
+            ).fetchall()
+        return {row[0]: tuple(row[1:]) for row in rows}
+
+    def _save_subtree(self, root: str, old: Dict[str, DirRecord], new: Dict[str, DirRecord]):
+        changed = [(path, *rec) for path, rec in new.items() if old.get(path) != rec]
+        vanished = [(path,) for path in old if path not in new]
+        if not changed and not vanished:
+            return
+        with self._lock, self._conn:
+            self._conn.executemany("DELETE FROM dirs WHERE path = ?", vanished)
+            self._conn.executemany("INSERT OR REPLACE INTO dirs VALUES (?, ?, ?, ?, ?, ?, ?, ?)", changed)
+
+    def invalidate(self, root: str):
+        """删除 root 及其子树的缓存（例如迁移/删除之后）"""
+        root = os.path.normpath(root)
+        lo, hi = self._subtree_range(root)
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM dirs WHERE path = ? OR (path >= ? AND path < ?)", (root, lo, hi))
+
+    # ---------- 统计 ----------
+
+    def get_size(self, path: str, is_aborted: Callable[[], bool] = None,
+                 use_cache: bool = True) -> int:
+        """返回路径占用的字节数（文件直接返回大小）"""
+        return self.get_stats(path, is_aborted, use_cache)[0]
+
+    def get_stats(self, path: str, is_aborted: Callable[[], bool] = None,
+                  use_cache: bool = True) -> Tuple[int, int]:
+        """返回 (总字节数, 文件数)"""
+        for _, size, files in self.iter_stats([path], is_aborted, use_cache):
+            return size, files
+        return 0, 0
+
+    def iter_stats(self, paths: Iterable[str], is_aborted: Callable[[], bool] = None,
+                   use_cache: bool = True, max_workers: int = DEFAULT_WALK_WORKERS
+                   ) -> Iterator[Tuple[str, int, int]]:
+        """
+        并行统计多个路径，按完成顺序产出 (输入路径, 总字节数, 文件数)
+
+        所有路径共享同一个遍历线程池；缓存缺失时退化为一次完整遍历，
+        中途取消时产出已统计的部分且不写回缓存。
+        """
+        is_aborted = is_aborted or (lambda: False)
+        inputs: Dict[str, List[str]] = {}
+        for path in paths:
+            inputs.setdefault(os.path.normpath(path), []).append(path)
+
+        old_by_root = {root: self._load_subtree(root) if use_cache else {} for root in inputs}
+        old_all: Dict[str, DirRecord] = {}
+        for old in old_by_root.values():
+            old_all.update(old)
+
+        walker = TreeWalker(
+            max_workers=max_workers,
+            list_dir=lambda path, st: self._list_dir(path, st, old_all),
+            keep_listings=True,
+            is_aborted=is_aborted,
+        )
+        for root, result in walker.iter_walk(inputs):
+            if not is_aborted():
+                if result.listings:
+                    self._save_subtree(root, old_by_root[root], self._build_records(result))
+                elif result.file_count == 0:
+                    # 根路径已不存在
+                    self.invalidate(root)
+            for path in inputs[root]:
+                yield path, result.total_size, result.file_count
+
+    def _list_dir(self, path: str, st: os.stat_result, old: Dict[str, DirRecord]) -> DirListing:
+        """指纹命中时用缓存构造目录内容（只 stat 子目录），否则真实枚举"""
+        cached = old.get(path)
+        if not (cached and cached[0] == st.st_ino and cached[1] == st.st_mtime_ns):
+            return self._scan_dir(path, st)
+
+        listing = DirListing(own_size=cached[2], own_files=cached[3])
+        for name in (cached[4].split(_NAME_SEP) if cached[4] else ()):
+            try:
+                child_st = os.stat(os.path.join(path, name), follow_symlinks=False)
+            except OSError:
+                continue
+            if stat.S_ISDIR(child_st.st_mode):
+                listing.subdirs.append((name, child_st))
+        return listing
+
+    @staticmethod
+    def _scan_dir(path: str, st: os.stat_result = None) -> DirListing:
+        """真实枚举目录的直属条目"""
+        return scan_listing(path, st)
+
+    @staticmethod
+    def _build_records(result: WalkResult) -> Dict[str, DirRecord]:
+        """由各目录的直属统计自底向上汇总子树总量（子路径必然比父路径长）"""
+        totals: Dict[str, Tuple[int, int]] = {}
+        records: Dict[str, DirRecord] = {}
+        for path in sorted(result.listings, key=len, reverse=True):
+            st, listing = result.listings[path]
+            total_size, total_files = listing.own_size, listing.own_files
+            for name, _ in listing.subdirs:
+                child = totals.get(os.path.join(path, name))
+                if child:
+                    total_size += child[0]
+                    total_files += child[1]
+            totals[path] = (total_size, total_files)
+            records[path] = (st.st_ino, st.st_mtime_ns, listing.own_size, listing.own_files,
+                             _NAME_SEP.join(name for name, _ in listing.subdirs),
+                             total_size, total_files)
+        return records
+
+
+_cache: Optional[DirSizeCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_size_cache() -> DirSizeCache:
+    """获取进程内共享的空间缓存实例"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = DirSizeCache()
+        return _cache
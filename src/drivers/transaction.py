@@ -1,34 +1,233 @@
 # coding: utf-8
-"""事务管理驱动"""
+"""
+事务管理驱动
+
+迁移日志为追加写入的 JSON Lines 文件，每个 源/目标 组合一个（MIGRATION_JOURNAL_DIR 下以路径摘要命名），
+开始其他迁移不会覆盖尚未完成的迁移日志：
+首行记录迁移计划（含关联的链接，续传完成后据此建立连接），之后每复制完成一个文件追加一行 (相对路径, 大小, mtime[, 摘要])。
+迁移中断（取消/崩溃/文件被占用）后日志保留，再次执行同一迁移时跳过目标端已校验的文件；
+用户主动取消时追加一行 cancelled 标记，启动检查据此区分"已取消"与"异常中断"。
+"""
 import os
 import json
+import time
+import hashlib
+import threading
+from dataclasses import dataclass, field
 from pathlib import Path
-from src.common.config import DATA_DIR
+from typing import Any, Dict, List, Optional, Tuple
+from src.common.config import DATA_DIR, MIGRATION_JOURNAL_DIR, MIGRATION_JOURNAL_FILE
 
 
 LOCK_FILE = DATA_DIR / ".ghost.lock"
 
+# 日志落盘（fsync）的最小间隔（秒）；每行写入后都会 flush 到系统缓存
+JOURNAL_SYNC_INTERVAL = 1.0
 
-def check_crash_recovery() -> bool:
-    """检查是否需要崩溃恢复"""
-    return LOCK_FILE.exists()
+# 目标端 mtime 校验容差（纳秒），兼容 FAT/exFAT 的 2 秒时间精度
+MTIME_TOLERANCE_NS = 2_000_000_000
 
 
-def recover_from_crash():
-    """从崩溃中恢复"""
-    if LOCK_FILE.exists():
+@dataclass
+class MigrationRecord:
+    """一次（可能未完成的）迁移"""
+    operation: str
+    source_path: str
+    target_path: str
+    cleanup_source: bool = False
+    started_at: float = 0.0
+    completed: Dict[str, Tuple[int, int]] = field(default_factory=dict)  # 相对源路径 -> (大小, mtime_ns)，单文件迁移为 "."
+    digests: Dict[str, str] = field(default_factory=dict)  # 校验模式下的相对源路径 -> 摘要
+    link: Dict[str, Any] = field(default_factory=dict)  # 关联链接：{"id": 链接 ID}，新增链接时为 {"data": 表单数据}
+    cancelled: bool = False  # 由用户主动取消（而非崩溃）而中断
+    journal_file: str = ""  # 记录所在的日志文件
+
+    @property
+    def completed_size(self) -> int:
+        return sum(size for size, _ in self.completed.values())
+
+    def matches(self, source: str, target: str) -> bool:
+        return (os.path.normcase(os.path.abspath(self.source_path)) == os.path.normcase(os.path.abspath(source))
+                and os.path.normcase(os.path.abspath(self.target_path)) == os.path.normcase(os.path.abspath(target)))
+
+
+def journal_path(source: str, target: str, journal_dir=None) -> Path:
+    """一次迁移（源/目标 组合）对应的日志文件"""
+    key = "\n".join(os.path.normcase(os.path.abspath(p)) for p in (source, target))
+    digest = hashlib.sha1(key.encode('utf-8')).hexdigest()[:16]
+    return Path(journal_dir or MIGRATION_JOURNAL_DIR) / f"{digest}.journal"
+
+
+def load_migration_journal(journal_file) -> Optional[MigrationRecord]:
+    """读取迁移日志，无日志或计划行损坏时返回 None（末尾写了一半的行被忽略）"""
+    journal_file = Path(journal_file)
+    try:
+        with open(journal_file, 'r', encoding='utf-8') as f:
+            lines = f.readlines()
+    except OSError:
+        return None
+
+    record = None
+    for line in lines:
         try:
-            with open(LOCK_FILE, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            entry = json.loads(line)
+        except ValueError:
+            break
+        if entry.get('type') == 'plan':
+            record = MigrationRecord(
+                operation=entry.get('operation', 'copy'),
+                source_path=entry.get('source', ''),
+                target_path=entry.get('target', ''),
+                cleanup_source=entry.get('cleanup_source', False),
+                started_at=entry.get('started_at', 0.0),
+                link=entry.get('link') or {},
+                journal_file=str(journal_file),
+            )
+        elif entry.get('type') == 'file' and record is not None:
+            record.completed[entry['path']] = (entry['size'], entry['mtime_ns'])
+            if entry.get('digest'):
+                record.digests[entry['path']] = entry['digest']
+        elif entry.get('type') in ('cancelled', 'resumed') and record is not None:
+            record.cancelled = entry['type'] == 'cancelled'
+    return record
+
+
+def list_migration_journals(journal_dir=None) -> List[MigrationRecord]:
+    """所有未完成的迁移（按开始时间排序，包含旧版单一日志文件）"""
+    journal_dir = Path(journal_dir or MIGRATION_JOURNAL_DIR)
+    files = sorted(journal_dir.glob("*.journal")) if journal_dir.is_dir() else []
+    if journal_dir == MIGRATION_JOURNAL_DIR and MIGRATION_JOURNAL_FILE.exists():
+        files.append(MIGRATION_JOURNAL_FILE)
+    records = [record for record in map(load_migration_journal, files) if record]
+    return sorted(records, key=lambda r: r.started_at)
+
+
+class MigrationJournal:
+    """迁移日志写入器（线程安全）"""
 
-            # 这里可以添加恢复逻辑
-            # 例如回滚未完成的操作
+    def __init__(self, record: MigrationRecord, journal_file, resume: bool = False):
+        self.record = record
+        self.journal_file = Path(journal_file)
+        record.journal_file = str(self.journal_file)
+        self.journal_file.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._last_sync = time.monotonic()
+        self._fp = open(self.journal_file, 'a' if resume else 'w', encoding='utf-8')
+        if not resume:
+            self._append({
+                'type': 'plan', 'operation': record.operation,
+                'source': record.source_path, 'target': record.target_path,
+                'cleanup_source': record.cleanup_source, 'started_at': record.started_at,
+                'link': record.link,
+            }, sync=True)
+        elif record.cancelled:
+            record.cancelled = False
+            self._append({'type': 'resumed'})
 
-            LOCK_FILE.unlink()
-        except Exception:
+    @classmethod
+    def begin(cls, operation: str, source: str, target: str, cleanup_source: bool = False,
+              journal_dir=None, link: Optional[Dict[str, Any]] = None) -> "MigrationJournal":
+        """开始迁移：若存在同一 源/目标 的未完成日志则续写，否则新建（其他迁移的日志不受影响）"""
+        journal_file = journal_path(source, target, journal_dir)
+        existing = load_migration_journal(journal_file)
+        if existing is None and journal_dir is None:
+            # 旧版单一日志中的同一迁移：迁入新位置后续写
+            legacy = load_migration_journal(MIGRATION_JOURNAL_FILE)
+            if legacy and legacy.matches(source, target):
+                journal_file.parent.mkdir(parents=True, exist_ok=True)
+                os.replace(MIGRATION_JOURNAL_FILE, journal_file)
+                existing = load_migration_journal(journal_file)
+        if existing and existing.matches(source, target):
+            return cls(existing, journal_file, resume=True)
+        record = MigrationRecord(operation, source, target, cleanup_source, started_at=time.time(), link=link or {})
+        return cls(record, journal_file)
+
+    def _append(self, entry: dict, sync: bool = False):
+        with self._lock:
+            self._fp.write(json.dumps(entry, ensure_ascii=False) + '\n')
+            self._fp.flush()
+            now = time.monotonic()
+            if sync or now - self._last_sync >= JOURNAL_SYNC_INTERVAL:
+                os.fsync(self._fp.fileno())
+                self._last_sync = now
+
+    def record_file(self, rel_path: str, size: int, mtime_ns: int, digest: str = ""):
+        """记录一个已完整复制（含元数据）的文件"""
+        self.record.completed[rel_path] = (size, mtime_ns)
+        entry = {'type': 'file', 'path': rel_path, 'size': size, 'mtime_ns': mtime_ns}
+        if digest:
+            self.record.digests[rel_path] = digest
+            entry['digest'] = digest
+        self._append(entry)
+
+    def is_completed(self, rel_path: str, size: int, mtime_ns: int, dst: str,
+                     require_digest: bool = False) -> bool:
+        """源文件未变化且目标端文件大小与 mtime 均吻合时视为已完成（校验模式还要求已记录摘要）"""
+        done = self.record.completed.get(rel_path)
+        if done != (size, mtime_ns):
+            return False
+        if require_digest and rel_path not in self.record.digests:
+            return False
+        try:
+            st = os.stat(dst)
+        except OSError:
+            return False
+        return st.st_size == size and abs(st.st_mtime_ns - mtime_ns) <= MTIME_TOLERANCE_NS
+
+    def mark_cancelled(self):
+        """记录迁移由用户取消（保留日志以便续传）"""
+        self.record.cancelled = True
+        self._append({'type': 'cancelled'}, sync=True)
+
+    def close(self):
+        """关闭日志但保留文件，以便之后续传"""
+        with self._lock:
+            if not self._fp.closed:
+                self._fp.flush()
+                os.fsync(self._fp.fileno())
+                self._fp.close()
+
+    def finish(self):
+        """迁移成功：删除日志"""
+        self.close()
+        try:
+            self.journal_file.unlink()
+        except FileNotFoundError:
             pass
 
 
+def check_crash_recovery() -> List[MigrationRecord]:
+    """检查是否存在中断的迁移，返回所有可续传的迁移记录"""
+    return list_migration_journals()
+
+
+def recover_from_crash(record: MigrationRecord) -> bool:
+    """放弃中断的迁移：删除目标端已复制的文件及空目录，并清除该迁移的日志"""
+    try:
+        if record:
+            target = record.target_path
+            if os.path.isfile(target) and '.' in record.completed:
+                os.remove(target)
+            elif os.path.isdir(target):
+                for rel_path in record.completed:
+                    try:
+                        os.remove(os.path.join(target, rel_path))
+                    except FileNotFoundError:
+                        pass
+                # 自底向上删除变空的目录，目标端原有文件不受影响
+                for dirpath, _, _ in sorted(os.walk(target), key=lambda x: len(x[0]), reverse=True):
+                    try:
+                        os.rmdir(dirpath)
+                    except OSError:
+                        pass
+        if record and record.journal_file:
+            Path(record.journal_file).unlink(missing_ok=True)
+        LOCK_FILE.unlink(missing_ok=True)
+        return True
+    except Exception:
+        return False
+
+
 def start_transaction():
     """开始事务"""
     LOCK_FILE.parent.mkdir(parents=True, exist_ok=True)
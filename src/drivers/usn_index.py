@@ -0,0 +1,173 @@
+# coding: utf-8
+"""
+USN 卷索引 - 持久化每个卷的目录表与 USN 日志游标
+
+首次扫描全量枚举 MFT 后，只保存目录条目（路径重建只会经过目录）以及 (日志 ID, 下一个 USN)。
+文件名以原始 UTF-16 字节保存，只在重建路径查询到该条目时才解码。
+之后的扫描只需读取该 USN 之后的变更记录并增量更新本索引；
+日志 ID 变化（日志被删除重建）或游标早于日志最早有效 USN 时由调用方重新全量枚举。
+"""
+import os
+import sqlite3
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+from src.common.config import USN_INDEX_FILE
+from src.drivers.usn_records import (
+    USN_REASON_FILE_DELETE, UsnRecord, decode_name, is_directory, is_user_reparse_dir
+)
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS volumes (
+    drive       TEXT PRIMARY KEY,
+    journal_id  TEXT NOT NULL,
+    next_usn    INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS dirs (
+    drive    TEXT NOT NULL,
+    ref      INTEGER NOT NULL,
+    parent   INTEGER NOT NULL,
+    name     BLOB NOT NULL,
+    attrs    INTEGER NOT NULL,
+    reparse  INTEGER NOT NULL,
+    PRIMARY KEY (drive, ref)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_dirs_reparse ON dirs (drive) WHERE reparse = 1;
+"""
+
+
+def _encode_name(name: Union[str, bytes]) -> bytes:
+    return name if isinstance(name, bytes) else name.encode('utf-16-le')
+
+
+class DirLookup:
+    """按文件引用号查询目录条目（带查询缓存），供 PathResolver 使用"""
+
+    def __init__(self, index: "UsnIndex", drive: str):
+        self._index = index
+        self._drive = drive
+        self._cache: Dict[int, Optional[Tuple[int, str, int]]] = {}
+
+    def get(self, ref: int) -> Optional[Tuple[int, str, int]]:
+        if ref not in self._cache:
+            self._cache[ref] = self._index.get_dir(self._drive, ref)
+        return self._cache[ref]
+
+
+class UsnIndex:
+    """持久化卷索引（线程安全）"""
+
+    def __init__(self, db_file: str = None):
+        self.db_file = str(db_file or USN_INDEX_FILE)
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(self.db_file) or '.', exist_ok=True)
+        self._conn = sqlite3.connect(self.db_file, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    # ---------- 游标 ----------
+
+    def get_state(self, drive: str) -> Optional[Tuple[int, int]]:
+        """返回 (日志 ID, 下一个待读 USN)，未建立索引时返回 None"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT journal_id, next_usn FROM volumes WHERE drive = ?", (drive,)
+            ).fetchone()
+        # 日志 ID 是无符号 64 位，超出 SQLite INTEGER 范围，以文本保存
+        return (int(row[0]), row[1]) if row else None
+
+    def forget(self, drive: str):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM volumes WHERE drive = ?", (drive,))
+            self._conn.execute("DELETE FROM dirs WHERE drive = ?", (drive,))
+
+    # ---------- 写入 ----------
+
+    def replace(self, drive: str, journal_id: int, next_usn: int, records: Iterable[UsnRecord]):
+        """用已解码的记录重建卷索引（records 可以是生成器，只保存目录）"""
+        self.replace_raw(drive, journal_id, next_usn,
+                         ((r.ref, r.parent, r.attributes, _encode_name(r.name)) for r in records))
+
+    def replace_raw(self, drive: str, journal_id: int, next_usn: int,
+                    entries: Iterable[Tuple[int, int, int, bytes]]):
+        """用一次全量枚举的结果重建卷索引：entries 为 (引用, 父目录引用, 属性, 原始文件名)，文件名不解码"""
+        rows = (
+            (drive, ref, parent, raw_name, attrs, int(is_user_reparse_dir(attrs)))
+            for ref, parent, attrs, raw_name in entries if is_directory(attrs)
+        )
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM dirs WHERE drive = ?", (drive,))
+            self._conn.executemany("INSERT OR REPLACE INTO dirs VALUES (?, ?, ?, ?, ?, ?)", rows)
+            self._set_state(drive, journal_id, next_usn)
+
+    def apply(self, drive: str, records: Iterable[UsnRecord], next_usn: int):
+        """
+        按时间顺序应用日志变更记录并推进游标
+
+        记录总是携带变更后的名称/父目录/属性，因此创建、重命名、移动、属性变化都归结为覆盖写入，
+        删除记录移除条目；同一条目的多条记录以最后一条为准。
+        """
+        with self._lock, self._conn:
+            journal_id = self._conn.execute(
+                "SELECT journal_id FROM volumes WHERE drive = ?", (drive,)
+            ).fetchone()[0]
+            for r in records:
+                if not is_directory(r.attributes):
+                    continue
+                if r.reason & USN_REASON_FILE_DELETE:
+                    self._conn.execute("DELETE FROM dirs WHERE drive = ? AND ref = ?", (drive, r.ref))
+                else:
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO dirs VALUES (?, ?, ?, ?, ?, ?)",
+                        (drive, r.ref, r.parent, _encode_name(r.name), r.attributes,
+                         int(is_user_reparse_dir(r.attributes)))
+                    )
+            self._set_state(drive, int(journal_id), next_usn)
+
+    def _set_state(self, drive: str, journal_id: int, next_usn: int):
+        self._conn.execute(
+            "INSERT OR REPLACE INTO volumes VALUES (?, ?, ?)", (drive, str(journal_id), next_usn)
+        )
+
+    # ---------- 查询 ----------
+
+    def get_dir(self, drive: str, ref: int) -> Optional[Tuple[int, str, int]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT parent, name, attrs FROM dirs WHERE drive = ? AND ref = ?", (drive, ref)
+            ).fetchone()
+        if not row:
+            return None
+        parent, name, attrs = row
+        # 旧版本索引以文本保存文件名
+        return parent, decode_name(name) if isinstance(name, bytes) else name, attrs
+
+    def reparse_refs(self, drive: str) -> List[int]:
+        """卷上所有用户 Junction/目录符号链接的文件引用号"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT ref FROM dirs WHERE drive = ? AND reparse = 1", (drive,)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def lookup(self, drive: str) -> DirLookup:
+        return DirLookup(self, drive)
+
+
+_index: Optional[UsnIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_usn_index() -> UsnIndex:
+    """获取进程内共享的卷索引实例"""
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = UsnIndex()
+        return _index
@@ -2,12 +2,18 @@
 """
 USN Journal 驱动 - 通过 NTFS MFT 枚举快速发现磁盘上所有 Reparse Point（Junction/Symlink）
 仅适用于 Windows NTFS 卷，需要管理员权限。
+记录解码见 usn_records，持久化的卷索引与日志游标见 usn_index。
 """
 import os
 import ctypes
 import ctypes.wintypes as wintypes
-import struct
-from typing import List, Dict, Optional, Tuple
+from array import array
+from typing import Callable, List, Dict, Iterable, Iterator, Optional, Tuple
+from src.drivers.usn_index import UsnIndex, get_usn_index
+from src.drivers.usn_records import (
+    MftTable, PathResolver, UsnJournalInfo, UsnRecord, decode_journal_data, next_start,
+    pack_enum_data, pack_read_journal_data, parse_usn_buffer
+)
 
 # ===== Windows API 常量 =====
 GENERIC_READ = 0x80000000
@@ -15,44 +21,43 @@ FILE_SHARE_READ = 0x00000001
 FILE_SHARE_WRITE = 0x00000002
 OPEN_EXISTING = 3
 FSCTL_ENUM_USN_DATA = 0x000900B3
-FILE_ATTRIBUTE_REPARSE_POINT = 0x0400
-FILE_ATTRIBUTE_DIRECTORY = 0x0010
-FILE_ATTRIBUTE_HIDDEN = 0x0002
-FILE_ATTRIBUTE_SYSTEM = 0x0004
+FSCTL_QUERY_USN_JOURNAL = 0x000900F4
+FSCTL_READ_USN_JOURNAL = 0x000900BB
 
-# USN_RECORD_V2 头部固定字段大小（到 FileName 之前）
-USN_RECORD_HEADER_SIZE = 60
+USN_BUFFER_SIZE = 65536
 
 # ===== 声明 Windows API 函数签名（关键：确保 64 位兼容） =====
-kernel32 = ctypes.windll.kernel32
-
-# CreateFileW 返回 HANDLE（指针类型），必须声明为 c_void_p
-kernel32.CreateFileW.restype = ctypes.c_void_p
-kernel32.CreateFileW.argtypes = [
-    ctypes.c_wchar_p,  # lpFileName
-    wintypes.DWORD,    # dwDesiredAccess
-    wintypes.DWORD,    # dwShareMode
-    ctypes.c_void_p,   # lpSecurityAttributes
-    wintypes.DWORD,    # dwCreationDisposition
-    wintypes.DWORD,    # dwFlagsAndAttributes
-    ctypes.c_void_p,   # hTemplateFile
-]
-
-# DeviceIoControl 的 hDevice 也是 HANDLE
-kernel32.DeviceIoControl.restype = wintypes.BOOL
-kernel32.DeviceIoControl.argtypes = [
-    ctypes.c_void_p,        # hDevice
-    wintypes.DWORD,         # dwIoControlCode
-    ctypes.c_void_p,        # lpInBuffer
-    wintypes.DWORD,         # nInBufferSize
-    ctypes.c_void_p,        # lpOutBuffer
-    wintypes.DWORD,         # nOutBufferSize
-    ctypes.POINTER(wintypes.DWORD),  # lpBytesReturned
-    ctypes.c_void_p,        # lpOverlapped
-]
-
-kernel32.CloseHandle.restype = wintypes.BOOL
-kernel32.CloseHandle.argtypes = [ctypes.c_void_p]
+# 非 Windows 平台（如运行单元测试时）模块仍可导入，卷操作一律视为不可用
+kernel32 = ctypes.windll.kernel32 if os.name == "nt" else None
+
+if kernel32 is not None:
+    # CreateFileW 返回 HANDLE（指针类型），必须声明为 c_void_p
+    kernel32.CreateFileW.restype = ctypes.c_void_p
+    kernel32.CreateFileW.argtypes = [
+        ctypes.c_wchar_p,  # lpFileName
+        wintypes.DWORD,    # dwDesiredAccess
+        wintypes.DWORD,    # dwShareMode
+        ctypes.c_void_p,   # lpSecurityAttributes
+        wintypes.DWORD,    # dwCreationDisposition
+        wintypes.DWORD,    # dwFlagsAndAttributes
+        ctypes.c_void_p,   # hTemplateFile
+    ]
+
+    # DeviceIoControl 的 hDevice 也是 HANDLE
+    kernel32.DeviceIoControl.restype = wintypes.BOOL
+    kernel32.DeviceIoControl.argtypes = [
+        ctypes.c_void_p,        # hDevice
+        wintypes.DWORD,         # dwIoControlCode
+        ctypes.c_void_p,        # lpInBuffer
+        wintypes.DWORD,         # nInBufferSize
+        ctypes.c_void_p,        # lpOutBuffer
+        wintypes.DWORD,         # nOutBufferSize
+        ctypes.POINTER(wintypes.DWORD),  # lpBytesReturned
+        ctypes.c_void_p,        # lpOverlapped
+    ]
+
+    kernel32.CloseHandle.restype = wintypes.BOOL
+    kernel32.CloseHandle.argtypes = [ctypes.c_void_p]
 
 # INVALID_HANDLE_VALUE 在 64 位下为 0xFFFFFFFFFFFFFFFF
 INVALID_HANDLE_VALUE = ctypes.c_void_p(-1).value
@@ -60,6 +65,8 @@ INVALID_HANDLE_VALUE = ctypes.c_void_p(-1).value
 
 def _open_volume(drive_letter: str) -> Optional[int]:
     """打开卷句柄（需要管理员权限）"""
+    if kernel32 is None:
+        return None
     volume_path = f"\\\\.\\{drive_letter}:"
     handle = kernel32.CreateFileW(
         volume_path,
@@ -80,12 +87,134 @@ def _close_handle(handle: int):
     kernel32.CloseHandle(handle)
 
 
-def scan_reparse_points(drive_letter: str) -> List[Dict]:
+def _query_journal(handle: int) -> Optional[UsnJournalInfo]:
+    """查询卷的 USN 日志（日志未启用时返回 None）"""
+    buf = ctypes.create_string_buffer(64)
+    bytes_returned = wintypes.DWORD(0)
+    ok = kernel32.DeviceIoControl(
+        handle, FSCTL_QUERY_USN_JOURNAL, None, 0, buf, len(buf), ctypes.byref(bytes_returned), None
+    )
+    return decode_journal_data(buf.raw) if ok else None
+
+
+def _iter_output_buffers(handle: int, control_code: int, make_input: Callable[[int], bytes], start: int,
+                         stop: Callable[[int], bool] = None) -> Iterator[memoryview]:
+    """
+    反复调用 DeviceIoControl，逐个产出有效输出缓冲区
+
+    每个输出缓冲区前 8 字节是下一次调用的起点；调用失败（枚举结束）或只返回起点时停止。
+    产出的是复用缓冲区的视图（不复制），只在下一次迭代之前有效。
+    """
+    # 64KB 缓冲区，提升单次 IO 效率
+    buf = ctypes.create_string_buffer(USN_BUFFER_SIZE)
+    view = memoryview(buf).cast('B')
+    bytes_returned = wintypes.DWORD(0)
+
+    while True:
+        in_buf = ctypes.create_string_buffer(make_input(start))
+        ok = kernel32.DeviceIoControl(
+            handle, control_code, in_buf, len(in_buf), buf, USN_BUFFER_SIZE,
+            ctypes.byref(bytes_returned), None,
+        )
+        if not ok:
+            if control_code == FSCTL_READ_USN_JOURNAL:
+                raise OSError(ctypes.GetLastError(), "读取 USN 日志失败")
+            break
+
+        returned = bytes_returned.value
+        if returned <= 8:
+            break
+
+        data = view[:returned]
+        yield data
+        start = next_start(data)
+        if stop and stop(start):
+            break
+
+
+def _read_changes(handle: int, journal: UsnJournalInfo, start_usn: int) -> Tuple[List[UsnRecord], int]:
+    """
+    读取 start_usn 之后到查询时刻为止的日志变更（只保留目录记录）
+
+    Returns:
+        (变更记录, 下一次应读取的 USN)
+    """
+    records: List[UsnRecord] = []
+    next_usn = start_usn
+    for data in _iter_output_buffers(
+        handle, FSCTL_READ_USN_JOURNAL,
+        lambda usn: pack_read_journal_data(usn, journal.journal_id), start_usn,
+        stop=lambda usn: usn >= journal.next_usn,
+    ):
+        records.extend(parse_usn_buffer(data).directories().records())
+        next_usn = next_start(data)
+    return records, next_usn
+
+
+def _full_scan(handle: int, drive: str, journal: Optional[UsnJournalInfo], index: UsnIndex) -> List[Optional[str]]:
+    """全量枚举 MFT，同时重建卷索引（日志可用时）"""
+    # 路径只会经过目录，文件条目无需保留；目录条目存入紧凑表，文件名延迟解码
+    table = MftTable()
+    reparse_refs = array('Q')
+
+    for data in _iter_output_buffers(handle, FSCTL_ENUM_USN_DATA, pack_enum_data, 0):
+        # 整个缓冲区一次解析，属性筛选按列整批进行
+        batch = parse_usn_buffer(data).directories()
+        table.extend(batch)
+        reparse_refs.extend(batch.select(batch.user_reparse_mask()).column('refs'))
+    table.freeze()
+
+    if journal is not None:
+        # 游标取枚举开始前的 NextUsn：枚举期间发生的变更会在下次扫描时重放（写入幂等）
+        # 直接保存原始文件名字节，不为持久化而解码全部目录名
+        index.replace_raw(drive, journal.journal_id, journal.next_usn, table.iter_raw())
+    else:
+        index.forget(drive)
+    return _resolve_paths(drive, table, reparse_refs)
+
+
+def _resolve_paths(drive: str, records, refs: Iterable[int]) -> List[Optional[str]]:
+    """批量重建路径：共享祖先只解析一次，环、缺失父目录与无法解码的名称汇总报告"""
+    resolver = PathResolver(records, f"{drive}:\\")
+    paths = [resolver.resolve(ref) for ref in refs]
+    if resolver.problems:
+        cycles = sum(1 for p in resolver.problems if p.kind == "cycle")
+        bad_names = sum(1 for p in resolver.problems if p.kind == "bad_name")
+        print(f"[USN] {drive}: {len(resolver.problems)} 个链接无法重建路径"
+              f"（父链成环 {cycles} 个，名称无法解码 {bad_names} 个，"
+              f"缺失父目录 {len(resolver.problems) - cycles - bad_names} 个），已跳过")
+    return paths
+
+
+def _incremental_scan(handle: int, drive: str, journal: UsnJournalInfo, index: UsnIndex) -> Optional[List[str]]:
+    """从持久化的游标续读日志并更新索引；日志已重置或游标失效时返回 None"""
+    state = index.get_state(drive)
+    if state is None or journal is None:
+        return None
+    journal_id, start_usn = state
+    if journal_id != journal.journal_id or start_usn < journal.lowest_valid_usn:
+        return None
+
+    try:
+        records, next_usn = _read_changes(handle, journal, start_usn)
+    except OSError as e:
+        print(f"[USN] {drive}: 日志续读失败，改为全量枚举: {e}")
+        return None
+
+    index.apply(drive, records, next_usn)
+    return _resolve_paths(drive, index.lookup(drive), index.reparse_refs(drive))
+
+
+def scan_reparse_points(drive_letter: str, index: UsnIndex = None) -> List[Dict]:
     """
-    通过 USN Journal 枚举 MFT，扫描指定卷上所有 Reparse Point 目录
+    扫描指定卷上所有 Reparse Point 目录
+
+    首次扫描通过 USN Journal 全量枚举 MFT 并持久化目录索引与日志游标，
+    之后只读取上次扫描以来的日志变更增量更新索引；日志被重置时自动退回全量枚举。
 
     Args:
         drive_letter: 盘符，如 'C'
+        index: 卷索引（默认使用进程共享实例）
 
     Returns:
         [{"path": "C:\\Games\\SomeGame", "name": "SomeGame"}, ...]
@@ -96,108 +225,14 @@ def scan_reparse_points(drive_letter: str) -> List[Dict]:
         return []
 
     try:
-        # {FileReferenceNumber(低48位): (ParentRef, FileName, Attributes)}
-        mft_records: Dict[int, Tuple[int, str, int]] = {}
-        reparse_refs: List[int] = []
-
-        # 64KB 缓冲区，提升单次 IO 效率
-        buf_size = 65536
-        buf = ctypes.create_string_buffer(buf_size)
-        bytes_returned = wintypes.DWORD(0)
-
-        # MFT_ENUM_DATA_V0: StartFileReferenceNumber(Q) + LowUsn(q) + HighUsn(Q)
-        mft_enum_data = struct.pack('<QqQ', 0, 0, 0x7FFFFFFFFFFFFFFF)
-        mft_enum_buf = ctypes.create_string_buffer(mft_enum_data)
-
-        while True:
-            result = kernel32.DeviceIoControl(
-                handle,
-                FSCTL_ENUM_USN_DATA,
-                mft_enum_buf,
-                len(mft_enum_buf),
-                buf,
-                buf_size,
-                ctypes.byref(bytes_returned),
-                None,
-            )
-
-            if not result:
-                break
-
-            returned = bytes_returned.value
-            if returned <= 8:
-                break
-
-            # 前 8 字节是下一次枚举的 StartFileReferenceNumber
-            next_start = struct.unpack_from('<Q', buf.raw, 0)[0]
-            offset = 8
-
-            while offset < returned:
-                if offset + USN_RECORD_HEADER_SIZE > returned:
-                    break
-
-                # 解析 USN_RECORD_V2 头部字段
-                (
-                    record_length,
-                    major_version,
-                    minor_version,
-                    file_ref,
-                    parent_ref,
-                    usn,
-                    timestamp,
-                    reason,
-                    source_info,
-                    security_id,
-                    file_attributes,
-                    file_name_length,
-                    file_name_offset,
-                ) = struct.unpack_from('<IHHQQQQIIIIHH', buf.raw, offset)
-
-                if record_length == 0:
-                    break
-
-                # 提取文件名（UTF-16LE 编码）
-                name_start = offset + file_name_offset
-                name_end = name_start + file_name_length
-                if name_end <= returned:
-                    try:
-                        file_name = buf.raw[name_start:name_end].decode('utf-16-le')
-                    except UnicodeDecodeError:
-                        file_name = ""
-
-                    # 用低 48 位作为键（高 16 位是序列号，会变化）
-                    ref_key = file_ref & 0x0000FFFFFFFFFFFF
-                    parent_key = parent_ref & 0x0000FFFFFFFFFFFF
-
-                    mft_records[ref_key] = (parent_key, file_name, file_attributes)
-
-                    # 筛选：目录 + Reparse Point = Junction 或 Directory Symlink
-                    # 排除 HIDDEN+SYSTEM 的系统兼容链接（如 Content.IE5、All Users 等）
-                    is_reparse_dir = (file_attributes & FILE_ATTRIBUTE_DIRECTORY) and \
-                                     (file_attributes & FILE_ATTRIBUTE_REPARSE_POINT)
-                    is_system_compat = (file_attributes & FILE_ATTRIBUTE_HIDDEN) and \
-                                       (file_attributes & FILE_ATTRIBUTE_SYSTEM)
-                    if is_reparse_dir and not is_system_compat:
-                        reparse_refs.append(ref_key)
-
-                offset += record_length
-
-            # 更新起始位置，继续枚举
-            mft_enum_buf = ctypes.create_string_buffer(
-                struct.pack('<QqQ', next_start, 0, 0x7FFFFFFFFFFFFFFF)
-            )
-
-        # 重建完整路径
-        results = []
-        drive_root = f"{drive_letter}:\\"
-
-        for ref in reparse_refs:
-            path = _build_path(ref, mft_records, drive_root)
-            if path:
-                name = os.path.basename(path)
-                results.append({"path": path, "name": name})
-
-        return results
+        index = index or get_usn_index()
+        journal = _query_journal(handle)
+
+        paths = _incremental_scan(handle, drive_letter, journal, index)
+        if paths is None:
+            paths = _full_scan(handle, drive_letter, journal, index)
+
+        return [{"path": path, "name": os.path.basename(path)} for path in paths if path]
 
     except Exception as e:
         print(f"[USN] 扫描 {drive_letter}: 卷时发生异常: {e}")
@@ -206,40 +241,6 @@ def scan_reparse_points(drive_letter: str) -> List[Dict]:
         _close_handle(handle)
 
 
-def _build_path(ref: int, mft_records: Dict, drive_root: str, max_depth: int = 64) -> Optional[str]:
-    """通过 ParentFileReferenceNumber 链反向拼接完整路径"""
-    parts = []
-    current = ref
-    visited = set()
-
-    for _ in range(max_depth):
-        if current in visited:
-            break
-        visited.add(current)
-
-        record = mft_records.get(current)
-        if record is None:
-            break
-
-        parent_ref, name, _ = record
-
-        # MFT 条目 5 是卷根目录（不加入路径）
-        if current == 5:
-            break
-
-        if name in ('.', '..', ''):
-            break
-
-        parts.append(name)
-        current = parent_ref
-
-    if not parts:
-        return None
-
-    parts.reverse()
-    return os.path.join(drive_root, *parts)
-
-
 def is_usn_available(drive_letter: str = 'C') -> bool:
     """检测 USN Journal 是否可用（管理员权限能否打开卷句柄）"""
     handle = _open_volume(drive_letter)
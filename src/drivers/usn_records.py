@@ -0,0 +1,403 @@
+# coding: utf-8
+"""
+USN 记录解码 - 与平台无关的纯字节解析，可在任何系统上针对录制的缓冲区测试
+
+- FSCTL_ENUM_USN_DATA / FSCTL_READ_USN_JOURNAL 的输出缓冲区：前 8 字节为下一次调用的起点，
+  其后是连续的 USN_RECORD_V2
+- FSCTL_QUERY_USN_JOURNAL 的输出：USN_JOURNAL_DATA_V0
+
+parse_usn_buffer 对整个输出缓冲区做一次解析，得到列式的 UsnBatch，属性筛选按列整批进行；
+安装了 NumPy 时各列由类型化视图按偏移批量取出，否则退化为预编译 struct 的逐条解析。
+全程只读 memoryview，不再为每条记录复制缓冲区。
+"""
+import ntpath
+import struct
+from array import array
+from bisect import bisect_right
+from collections import namedtuple
+from typing import Dict, Iterator, List, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # NumPy 为可选加速依赖
+    np = None
+
+FILE_ATTRIBUTE_HIDDEN = 0x0002
+FILE_ATTRIBUTE_SYSTEM = 0x0004
+FILE_ATTRIBUTE_DIRECTORY = 0x0010
+FILE_ATTRIBUTE_REPARSE_POINT = 0x0400
+
+USN_REASON_FILE_DELETE = 0x00000200
+
+# 文件引用号低 48 位是 MFT 条目号（高 16 位是序列号，会变化）
+REF_MASK = 0x0000FFFFFFFFFFFF
+
+# MFT 条目 5 是卷根目录
+ROOT_REF = 5
+
+# USN_RECORD_V2 头部（到 FileName 之前）
+_RECORD_HEADER = struct.Struct('<IHHQQqqIIIIHH')
+USN_RECORD_HEADER_SIZE = _RECORD_HEADER.size  # 60
+
+# 只取需要的字段：RecordLength, MajorVersion, FileRef, ParentRef, Usn, Reason, Attributes, NameLength, NameOffset
+_RECORD_FIELDS = struct.Struct('<IH2xQQq8xI8xIHH')
+
+# 上述字段在记录内的字节偏移（NumPy 路径按偏移从类型化视图中批量取值）
+_OFF_MAJOR, _OFF_REF, _OFF_PARENT, _OFF_USN = 4, 8, 16, 24
+_OFF_REASON, _OFF_ATTRS, _OFF_NAME_LENGTH, _OFF_NAME_OFFSET = 40, 52, 56, 58
+
+_REPARSE_DIR = FILE_ATTRIBUTE_DIRECTORY | FILE_ATTRIBUTE_REPARSE_POINT
+_SYSTEM_COMPAT = FILE_ATTRIBUTE_HIDDEN | FILE_ATTRIBUTE_SYSTEM
+
+# USN_JOURNAL_DATA_V0
+_JOURNAL_DATA = struct.Struct('<QqqqqQQ')
+
+# MFT_ENUM_DATA_V0: StartFileReferenceNumber + LowUsn + HighUsn
+_MFT_ENUM_DATA = struct.Struct('<QqQ')
+
+# READ_USN_JOURNAL_DATA_V0: StartUsn + ReasonMask + ReturnOnlyOnClose + Timeout + BytesToWaitFor + UsnJournalID
+_READ_JOURNAL_DATA = struct.Struct('<qIIQQQ')
+
+# 已屏蔽序列号的记录：(文件引用, 父目录引用, USN, 变更原因, 文件属性, 文件名)
+UsnRecord = namedtuple('UsnRecord', 'ref parent usn reason attributes name')
+
+UsnJournalInfo = namedtuple('UsnJournalInfo', 'journal_id first_usn next_usn lowest_valid_usn max_usn')
+
+
+class UsnBatch:
+    """一个输出缓冲区解析出的记录列（NumPy 数组或列表），data 为原缓冲区的视图"""
+
+    __slots__ = ('data', 'refs', 'parents', 'usns', 'reasons', 'attributes', 'name_starts', 'name_lengths')
+    COLUMNS = __slots__[1:]
+
+    def __init__(self, data, *columns):
+        self.data = data
+        for name, column in zip(self.COLUMNS, columns):
+            setattr(self, name, column)
+
+    def __len__(self) -> int:
+        return len(self.refs)
+
+    def select(self, keep) -> "UsnBatch":
+        """按布尔列筛选记录"""
+        if np is not None and isinstance(keep, np.ndarray):
+            return UsnBatch(self.data, *(getattr(self, name)[keep] for name in self.COLUMNS))
+        return UsnBatch(self.data, *([v for v, k in zip(getattr(self, name), keep) if k]
+                                     for name in self.COLUMNS))
+
+    def _mask(self, predicate) -> list:
+        attrs = self.attributes
+        if np is not None and isinstance(attrs, np.ndarray):
+            return predicate(attrs)
+        return [predicate(a) for a in attrs]
+
+    def directory_mask(self):
+        return self._mask(lambda a: (a & FILE_ATTRIBUTE_DIRECTORY) != 0)
+
+    def user_reparse_mask(self):
+        """整批判断用户 Junction/目录符号链接（规则同 is_user_reparse_dir）"""
+        return self._mask(lambda a: ((a & _REPARSE_DIR) == _REPARSE_DIR) & ((a & _SYSTEM_COMPAT) != _SYSTEM_COMPAT))
+
+    def directories(self) -> "UsnBatch":
+        return self.select(self.directory_mask())
+
+    def column(self, name: str) -> List[int]:
+        """以 Python int 列表取出一列"""
+        column = getattr(self, name)
+        return column.tolist() if np is not None and isinstance(column, np.ndarray) else column
+
+    def raw_name(self, start: int, length: int):
+        return self.data[start:start + length]
+
+    def rows(self) -> Iterator[Tuple[int, int, int, int, int, int, int]]:
+        """(文件引用, 父目录引用, USN, 变更原因, 文件属性, 名称起始偏移, 名称字节数)"""
+        return zip(*(self.column(name) for name in self.COLUMNS))
+
+    def records(self) -> Iterator[UsnRecord]:
+        for ref, parent, usn, reason, attributes, name_start, name_length in self.rows():
+            yield UsnRecord(ref, parent, usn, reason, attributes, decode_name(self.raw_name(name_start, name_length)))
+
+
+def _record_offsets(view: memoryview, start: int) -> List[int]:
+    """沿 RecordLength 链求出各记录的起始偏移（记录长度总是 8 的倍数，偏移保持 4 字节对齐）"""
+    end = len(view)
+    lengths = view[:end & ~3].cast('I')
+    offsets = []
+    offset = start
+    while offset + USN_RECORD_HEADER_SIZE <= end:
+        length = lengths[offset >> 2]
+        if length == 0 or length & 7:
+            break
+        offsets.append(offset)
+        offset += length
+    return offsets
+
+
+def _parse_struct(view: memoryview, offsets: List[int]) -> UsnBatch:
+    end = len(view)
+    columns = tuple([] for _ in UsnBatch.COLUMNS)
+    refs, parents, usns, reasons, attrs, name_starts, name_lengths = columns
+    unpack = _RECORD_FIELDS.unpack_from
+    for offset in offsets:
+        _, major, ref, parent, usn, reason, attributes, name_length, name_offset = unpack(view, offset)
+        name_start = offset + name_offset
+        if major != 2 or name_start + name_length > end:
+            continue
+        refs.append(ref & REF_MASK)
+        parents.append(parent & REF_MASK)
+        usns.append(usn)
+        reasons.append(reason)
+        attrs.append(attributes)
+        name_starts.append(name_start)
+        name_lengths.append(name_length)
+    return UsnBatch(view, *columns)
+
+
+def _parse_numpy(view: memoryview, offsets: List[int]) -> UsnBatch:
+    end = len(view)
+    off = np.asarray(offsets, dtype=np.int64)
+    u16 = np.frombuffer(view, dtype='<u2', count=end // 2)
+    u32 = np.frombuffer(view, dtype='<u4', count=end // 4)
+    u64 = np.frombuffer(view, dtype='<u8', count=end // 8)
+
+    name_lengths = u16[(off + _OFF_NAME_LENGTH) >> 1].astype(np.int64)
+    name_starts = off + u16[(off + _OFF_NAME_OFFSET) >> 1]
+    keep = (u16[(off + _OFF_MAJOR) >> 1] == 2) & (name_starts + name_lengths <= end)
+    off, name_starts, name_lengths = off[keep], name_starts[keep], name_lengths[keep]
+
+    return UsnBatch(
+        view,
+        u64[(off + _OFF_REF) >> 3] & np.uint64(REF_MASK),
+        u64[(off + _OFF_PARENT) >> 3] & np.uint64(REF_MASK),
+        u64[(off + _OFF_USN) >> 3].view(np.int64),
+        u32[(off + _OFF_REASON) >> 2],
+        u32[(off + _OFF_ATTRS) >> 2],
+        name_starts,
+        name_lengths,
+    )
+
+
+def parse_usn_buffer(data, start: int = 8, use_numpy: bool = True) -> UsnBatch:
+    """
+    一次解析整个输出缓冲区中的 USN_RECORD_V2（跳过其他版本与截断的记录）
+
+    data 可以是 bytes 或任意可 memoryview 的缓冲区（例如 ctypes 缓冲区），解析过程中不复制。
+    """
+    view = memoryview(data).cast('B')
+    offsets = _record_offsets(view, start)
+    # 记录在缓冲区内 8 字节对齐时才能用类型化视图直接按偏移取值
+    if use_numpy and np is not None and offsets and not (offsets[0] & 7):
+        return _parse_numpy(view, offsets)
+    return _parse_struct(view, offsets)
+
+
+def iter_raw_records(data, start: int = 8) -> Iterator[Tuple[int, int, int, int, int, int, int]]:
+    """
+    逐条产出 (文件引用, 父目录引用, USN, 变更原因, 文件属性, 名称起始偏移, 名称字节数)，文件名不解码
+    """
+    return parse_usn_buffer(data, start).rows()
+
+
+def decode_name(raw) -> str:
+    """
+    解码 UTF-16LE 文件名
+
+    NTFS 文件名允许未配对的代理项，以 surrogatepass 原样保留（与 Python 在 Windows 上编码路径的方式一致）；
+    字节数为奇数等无法解码的名称返回空串，由 PathResolver 记为问题而不是当作根目录。
+    """
+    try:
+        return bytes(raw).decode('utf-16-le', errors='surrogatepass')
+    except UnicodeDecodeError:
+        return ""
+
+
+def iter_usn_records(data, start: int = 8) -> Iterator[UsnRecord]:
+    """解析一个输出缓冲区中的 USN_RECORD_V2 并解码文件名"""
+    return parse_usn_buffer(data, start).records()
+
+
+def next_start(data: bytes) -> int:
+    """输出缓冲区头部的下一次调用起点（文件引用号或 USN）"""
+    return struct.unpack_from('<Q', data, 0)[0]
+
+
+def decode_journal_data(data: bytes) -> UsnJournalInfo:
+    journal_id, first_usn, next_usn, lowest_valid_usn, max_usn, _, _ = _JOURNAL_DATA.unpack_from(data, 0)
+    return UsnJournalInfo(journal_id, first_usn, next_usn, lowest_valid_usn, max_usn)
+
+
+def pack_enum_data(start_ref: int = 0) -> bytes:
+    return _MFT_ENUM_DATA.pack(start_ref, 0, 0x7FFFFFFFFFFFFFFF)
+
+
+def pack_read_journal_data(start_usn: int, journal_id: int) -> bytes:
+    # 全部变更原因，不等待 close 汇总，不阻塞
+    return _READ_JOURNAL_DATA.pack(start_usn, 0xFFFFFFFF, 0, 0, 0, journal_id)
+
+
+def is_directory(attributes: int) -> bool:
+    return bool(attributes & FILE_ATTRIBUTE_DIRECTORY)
+
+
+def is_user_reparse_dir(attributes: int) -> bool:
+    """
+    目录 + Reparse Point = Junction 或 Directory Symlink
+    排除 HIDDEN+SYSTEM 的系统兼容链接（如 Content.IE5、All Users 等）
+    """
+    is_reparse_dir = (attributes & FILE_ATTRIBUTE_DIRECTORY) and (attributes & FILE_ATTRIBUTE_REPARSE_POINT)
+    is_system_compat = (attributes & FILE_ATTRIBUTE_HIDDEN) and (attributes & FILE_ATTRIBUTE_SYSTEM)
+    return bool(is_reparse_dir and not is_system_compat)
+
+
+class MftTable:
+    """
+    紧凑的 MFT 条目表
+
+    引用号、父目录引用、属性存放在并行的 array 列中，文件名以原始 UTF-16 字节追加到共享名称池，
+    只记录偏移与长度，直到 get() 重建路径时才解码。
+    全量枚举按 MFT 条目号升序返回，查询直接在 refs 列上二分，无需额外的字典索引。
+    """
+
+    def __init__(self):
+        self.refs = array('Q')
+        self.parents = array('Q')
+        self.attrs = array('I')
+        self.name_offsets = array('Q')
+        self.name_lengths = array('H')
+        self._names = bytearray()
+        self._sorted = True
+
+    def __len__(self) -> int:
+        return len(self.refs)
+
+    @property
+    def nbytes(self) -> int:
+        """表占用的数据字节数（不含对象头）"""
+        columns = (self.refs, self.parents, self.attrs, self.name_offsets, self.name_lengths)
+        return sum(col.itemsize * len(col) for col in columns) + len(self._names)
+
+    def append(self, ref: int, parent: int, attributes: int, raw_name):
+        if self._sorted and self.refs and ref < self.refs[-1]:
+            self._sorted = False
+        self.refs.append(ref)
+        self.parents.append(parent)
+        self.attrs.append(attributes)
+        self.name_offsets.append(len(self._names))
+        self.name_lengths.append(len(raw_name))
+        self._names += raw_name
+
+    def extend(self, batch: UsnBatch):
+        """整批追加一个输出缓冲区解析出的记录"""
+        refs = batch.column('refs')
+        if self._sorted and refs and (
+                (self.refs and refs[0] < self.refs[-1]) or any(b < a for a, b in zip(refs, refs[1:]))):
+            self._sorted = False
+        self.refs.extend(refs)
+        self.parents.extend(batch.column('parents'))
+        self.attrs.extend(batch.column('attributes'))
+        for start, length in zip(batch.column('name_starts'), batch.column('name_lengths')):
+            self.name_offsets.append(len(self._names))
+            self.name_lengths.append(length)
+            self._names += batch.raw_name(start, length)
+
+    def freeze(self):
+        """追加完成后调用：乱序追加时按引用号重排各列（稳定排序，重复条目以后追加者为准）"""
+        if self._sorted:
+            return
+        order = sorted(range(len(self.refs)), key=self.refs.__getitem__)
+        for name in ('refs', 'parents', 'attrs', 'name_offsets', 'name_lengths'):
+            column = getattr(self, name)
+            setattr(self, name, array(column.typecode, (column[i] for i in order)))
+        self._sorted = True
+
+    def _row(self, ref: int) -> int:
+        row = bisect_right(self.refs, ref) - 1
+        return row if row >= 0 and self.refs[row] == ref else -1
+
+    def get(self, ref: int) -> Optional[Tuple[int, str, int]]:
+        """(父目录引用, 文件名, 属性)，与 PathResolver 期望的记录格式一致"""
+        row = self._row(ref)
+        if row < 0:
+            return None
+        return self.parents[row], self._name(row), self.attrs[row]
+
+    def _name(self, row: int) -> str:
+        offset = self.name_offsets[row]
+        return decode_name(self._names[offset:offset + self.name_lengths[row]])
+
+    def iter_records(self) -> Iterator[UsnRecord]:
+        for row in range(len(self.refs)):
+            yield UsnRecord(self.refs[row], self.parents[row], 0, 0, self.attrs[row], self._name(row))
+
+    def iter_raw(self) -> Iterator[Tuple[int, int, int, bytes]]:
+        """(文件引用, 父目录引用, 属性, 原始 UTF-16 文件名)，不解码文件名（供持久化索引直接保存）"""
+        names = self._names
+        for ref, parent, attrs, offset, length in zip(
+                self.refs, self.parents, self.attrs, self.name_offsets, self.name_lengths):
+            yield ref, parent, attrs, bytes(names[offset:offset + length])
+
+
+PathProblem = namedtuple('PathProblem', 'ref kind at')  # kind: "cycle" / "missing_parent" / "bad_name"；at 为出问题的祖先引用
+
+
+class PathResolver:
+    """
+    通过 ParentFileReferenceNumber 链反向拼接完整路径（带前缀缓存）
+
+    records 只需支持 records.get(ref) -> (parent_ref, name, attributes) 或 None。
+    每个祖先目录解析出的路径按引用号缓存，同一次扫描内只解析一次；
+    链上出现环、缺失父目录或名称无法解码时该链上的条目均无法解析，问题记录在 problems 中而不是拼出截断的路径。
+    """
+
+    def __init__(self, records, drive_root: str):
+        self.records = records
+        self.drive_root = drive_root
+        self.problems: List[PathProblem] = []
+        self._resolved: Dict[int, Optional[str]] = {}
+
+    def resolve(self, ref: int) -> Optional[str]:
+        if ref in self._resolved:
+            return self._resolved[ref]
+        chain = []  # [(ref, name)]，从 ref 向根方向
+        on_chain = set()
+        current = ref
+        while True:
+            # 卷根目录不加入路径
+            if current == ROOT_REF:
+                base = self.drive_root
+                break
+            if current in self._resolved:
+                base = self._resolved[current]
+                break
+            if current in on_chain:
+                self.problems.append(PathProblem(ref, "cycle", current))
+                base = None
+                break
+            record = self.records.get(current)
+            if record is None:
+                self.problems.append(PathProblem(ref, "missing_parent", current))
+                base = None
+                break
+
+            parent_ref, name, _ = record
+            if name in ('.', '..'):
+                base = self.drive_root
+                break
+            if not name:
+                self.problems.append(PathProblem(ref, "bad_name", current))
+                base = None
+                break
+
+            on_chain.add(current)
+            chain.append((current, name))
+            current = parent_ref
+
+        for current, name in reversed(chain):
+            base = ntpath.join(base, name) if base is not None else None  # 卷路径总是 Windows 风格
+            self._resolved[current] = base
+        return base if chain else None
+
+
+def build_path(ref: int, records, drive_root: str) -> Optional[str]:
+    """解析单个条目的完整路径（批量解析请复用同一个 PathResolver）"""
+    return PathResolver(records, drive_root).resolve(ref)
@@ -0,0 +1,212 @@
+# coding: utf-8
+"""
+并行目录遍历驱动
+
+所有根目录的子目录都被拆成独立任务放入同一个共享队列，由固定大小的线程池并发消费：
+单个巨型目录树也能按 CPU 与磁盘队列深度扩展，而不是被一个递归线程串行遍历。
+遍历过程中流式汇总字节数、文件数与最大文件，并按根目录完成顺序逐个产出结果。
+"""
+import heapq
+import os
+import queue
+import stat
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+
+# 默认并发度：遍历以 IO 等待为主，线程数可高于核心数
+DEFAULT_WALK_WORKERS = min(16, (os.cpu_count() or 4) * 2)
+
+# 进度回调的最小间隔（秒）
+PROGRESS_INTERVAL = 0.2
+
+
+@dataclass
+class DirListing:
+    """单个目录的直属内容"""
+    own_size: int = 0
+    own_files: int = 0
+    subdirs: List[Tuple[str, os.stat_result]] = field(default_factory=list)  # (名称, lstat 结果)
+    files: Optional[List[Tuple[str, int, int]]] = None  # (名称, 字节数, mtime_ns)，仅在需要逐个文件时填充
+    error: Optional[OSError] = None  # 目录本身无法枚举时的错误（此时内容为空）
+
+
+@dataclass
+class WalkResult:
+    """单个根目录的遍历汇总"""
+    root: str
+    total_size: int = 0
+    file_count: int = 0
+    dir_count: int = 0
+    largest: List[Tuple[int, str]] = field(default_factory=list)  # 按大小降序的 (字节数, 路径)
+    listings: Dict[str, Tuple[os.stat_result, DirListing]] = field(default_factory=dict)
+
+
+def scan_listing(path: str, st: os.stat_result = None, collect_files: bool = False) -> DirListing:
+    """以一次 scandir 枚举目录的直属条目（不跟随链接）"""
+    listing = DirListing(files=[] if collect_files else None)
+    try:
+        with os.scandir(path) as it:
+            for entry in it:
+                try:
+                    if entry.is_file(follow_symlinks=False):
+                        st_entry = entry.stat(follow_symlinks=False)
+                        listing.own_size += st_entry.st_size
+                        listing.own_files += 1
+                        if collect_files:
+                            listing.files.append((entry.name, st_entry.st_size, st_entry.st_mtime_ns))
+                    elif entry.is_dir(follow_symlinks=False):
+                        listing.subdirs.append((entry.name, entry.stat(follow_symlinks=False)))
+                except OSError:
+                    continue
+    except OSError as e:
+        listing.error = e
+    return listing
+
+
+class _RootState:
+    """单个根目录的遍历状态（由 TreeWalker 的锁保护）"""
+
+    def __init__(self, root: str):
+        self.result = WalkResult(root)
+        self.outstanding = 0
+        self.heap: List[Tuple[int, str]] = []
+
+
+class TreeWalker:
+    """
+    共享工作队列的并行目录遍历器
+
+    Args:
+        max_workers: 线程池大小
+        list_dir: 目录枚举函数 (path, stat) -> DirListing，可替换为带缓存的实现
+        top_n: 每个根目录保留的最大文件数量（0 表示不统计）
+        keep_listings: 是否在结果中保留每个目录的 DirListing
+        is_aborted: 协作式取消检查
+        progress_callback: (已统计字节数, 已统计文件数) 流式进度回调，在工作线程中调用
+    """
+
+    def __init__(self, max_workers: int = DEFAULT_WALK_WORKERS,
+                 list_dir: Callable[[str, os.stat_result], DirListing] = None,
+                 top_n: int = 0, keep_listings: bool = False,
+                 is_aborted: Callable[[], bool] = None,
+                 progress_callback: Callable[[int, int], None] = None):
+        self.max_workers = max(1, max_workers)
+        self.top_n = top_n
+        self.list_dir = list_dir or (lambda path, st: scan_listing(path, st, collect_files=top_n > 0))
+        self.keep_listings = keep_listings
+        self.is_aborted = is_aborted or (lambda: False)
+        self.progress_callback = progress_callback
+
+        self._lock = threading.Lock()
+        self._bytes_done = 0
+        self._files_done = 0
+        self._last_progress = 0.0
+
+    def walk(self, root: str) -> WalkResult:
+        """遍历单个根目录"""
+        for _, result in self.iter_walk([root]):
+            return result
+        return WalkResult(root)
+
+    def iter_walk(self, roots: Iterable[str]) -> Iterator[Tuple[str, WalkResult]]:
+        """
+        并发遍历多个根目录，按完成顺序逐个产出 (root, WalkResult)
+
+        根为文件时直接以其大小作为结果；不存在的根产出空结果。
+        """
+        tasks: "queue.SimpleQueue" = queue.SimpleQueue()
+        done: "queue.SimpleQueue" = queue.SimpleQueue()
+        pending_roots = 0
+
+        for root in dict.fromkeys(roots):
+            state = _RootState(root)
+            try:
+                st = os.stat(root, follow_symlinks=False)
+            except OSError:
+                yield root, state.result
+                continue
+            if not stat.S_ISDIR(st.st_mode):
+                state.result.total_size, state.result.file_count = st.st_size, 1
+                if self.top_n:
+                    state.result.largest = [(st.st_size, root)]
+                yield root, state.result
+                continue
+            state.outstanding = 1
+            tasks.put((state, root, st))
+            pending_roots += 1
+
+        if not pending_roots:
+            return
+
+        workers = [
+            threading.Thread(target=self._worker, args=(tasks, done), daemon=True)
+            for _ in range(self.max_workers)
+        ]
+        for w in workers:
+            w.start()
+        try:
+            for _ in range(pending_roots):
+                state = done.get()
+                yield state.result.root, state.result
+        finally:
+            for _ in workers:
+                tasks.put(None)
+
+    def _worker(self, tasks: "queue.SimpleQueue", done: "queue.SimpleQueue"):
+        while True:
+            task = tasks.get()
+            if task is None:
+                return
+            state, path, st = task
+            listing = None
+            if not self.is_aborted():
+                try:
+                    listing = self.list_dir(path, st)
+                except Exception:
+                    listing = DirListing()
+
+            with self._lock:
+                if listing is not None:
+                    self._record(state, path, st, listing)
+                    for name, child_st in listing.subdirs:
+                        state.outstanding += 1
+                        tasks.put((state, os.path.join(path, name), child_st))
+                state.outstanding -= 1
+                finished = state.outstanding == 0
+                if finished and self.top_n:
+                    state.result.largest = sorted(state.heap, reverse=True)
+                report = self._should_report()
+
+            if report:
+                self.progress_callback(self._bytes_done, self._files_done)
+            if finished:
+                done.put(state)
+
+    def _record(self, state: _RootState, path: str, st: os.stat_result, listing: DirListing):
+        result = state.result
+        result.total_size += listing.own_size
+        result.file_count += listing.own_files
+        result.dir_count += 1
+        self._bytes_done += listing.own_size
+        self._files_done += listing.own_files
+        if self.keep_listings:
+            result.listings[path] = (st, listing)
+        if self.top_n and listing.files:
+            heap = state.heap
+            for name, size, _ in listing.files:
+                if len(heap) < self.top_n:
+                    heapq.heappush(heap, (size, os.path.join(path, name)))
+                elif size > heap[0][0]:
+                    heapq.heapreplace(heap, (size, os.path.join(path, name)))
+
+    def _should_report(self) -> bool:
+        if not self.progress_callback:
+            return False
+        now = time.monotonic()
+        if now - self._last_progress < PROGRESS_INTERVAL:
+            return False
+        self._last_progress = now
+        return True
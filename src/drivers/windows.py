@@ -54,3 +54,49 @@ def is_transparency_enabled() -> bool:
     except Exception:
         # 如果无法读取注册表，默认返回 True（启用透明度）
         return True
+
+
+def get_physical_disk_number(drive_root: str):
+    """
+    获取卷所在的物理磁盘编号（IOCTL_STORAGE_GET_DEVICE_NUMBER）
+
+    Args:
+        drive_root: 盘符根路径，如 'C:\\'
+
+    Returns:
+        物理磁盘编号；跨多块磁盘的卷（动态卷/存储空间）或查询失败时返回 None
+    """
+    from ctypes import wintypes
+    IOCTL_STORAGE_GET_DEVICE_NUMBER = 0x002D1080
+    FILE_SHARE_READ_WRITE = 0x00000003
+    OPEN_EXISTING = 3
+
+    kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
+    kernel32.CreateFileW.restype = ctypes.c_void_p
+    kernel32.CreateFileW.argtypes = [
+        ctypes.c_wchar_p, wintypes.DWORD, wintypes.DWORD, ctypes.c_void_p,
+        wintypes.DWORD, wintypes.DWORD, ctypes.c_void_p,
+    ]
+    kernel32.DeviceIoControl.argtypes = [
+        ctypes.c_void_p, wintypes.DWORD, ctypes.c_void_p, wintypes.DWORD,
+        ctypes.c_void_p, wintypes.DWORD, ctypes.POINTER(wintypes.DWORD), ctypes.c_void_p,
+    ]
+    kernel32.CloseHandle.argtypes = [ctypes.c_void_p]
+
+    # 查询设备号不需要读权限，普通用户即可打开卷
+    handle = kernel32.CreateFileW(
+        f"\\\\.\\{drive_root[0]}:", 0, FILE_SHARE_READ_WRITE, None, OPEN_EXISTING, 0, None
+    )
+    if handle is None or handle == ctypes.c_void_p(-1).value:
+        return None
+    try:
+        # STORAGE_DEVICE_NUMBER: DeviceType, DeviceNumber, PartitionNumber
+        out = (wintypes.DWORD * 3)()
+        returned = wintypes.DWORD(0)
+        ok = kernel32.DeviceIoControl(
+            handle, IOCTL_STORAGE_GET_DEVICE_NUMBER, None, 0,
+            out, ctypes.sizeof(out), ctypes.byref(returned), None
+        )
+        return out[1] if ok else None
+    finally:
+        kernel32.CloseHandle(handle)
@@ -61,13 +61,13 @@ class GhostDirApp(QApplication):
 
     def _init_services(self):
         """初始化 Service 层 (按需导入，彻底阻断级联加载)"""
-        from src.dao import TemplateDAO, LinkDAO, CategoryDAO
+        from src.dao import create_template_dao, create_link_dao, create_category_dao
         from src.services import TemplateService, LinkService, CategoryService
 
         # 1. 初始化 DAO 层
-        self.template_dao = TemplateDAO()
-        self.link_dao = LinkDAO()
-        self.category_dao = CategoryDAO()
+        self.template_dao = create_template_dao()
+        self.link_dao = create_link_dao()
+        self.category_dao = create_category_dao()
 
         # 2. 初始化 Service 层 (依赖注入)
         self.template_service = TemplateService(self.template_dao)
@@ -121,6 +121,7 @@ class GhostDirApp(QApplication):
     def _startup_checks(self, splash=None):
         """启动时的安全检查"""
         from src.drivers.transaction import check_crash_recovery, recover_from_crash
+        from src.common.config import format_size
         from qfluentwidgets import MessageBox
         from src.gui.i18n import t
 
@@ -128,23 +129,98 @@ class GhostDirApp(QApplication):
             splash.set_message(t("app.splash_check_data"))
             self.processEvents()
 
-        crash_record = check_crash_recovery()
-        if crash_record:
+        # 每个未完成的迁移各有一份日志，逐个询问
+        for crash_record in check_crash_recovery():
             # 如果有启动页，保持开启作为背景
-            message = f"检测到上次操作异常中断：\n\n" \
+            if crash_record.cancelled:
+                title, headline = "未完成的迁移", "上次迁移已取消，可续传："
+            else:
+                title, headline = "检测到异常中断", "检测到上次迁移异常中断："
+            message = f"{headline}\n\n" \
                      f"操作类型: {crash_record.operation}\n" \
                      f"源路径: {crash_record.source_path}\n" \
-                     f"目标路径: {crash_record.target_path}\n\n" \
-                     f"是否自动恢复到操作前状态？"
-            dialog = MessageBox("检测到异常中断", message, None)
-            dialog.yesButton.setText("是")
-            dialog.cancelButton.setText("否")
+                     f"目标路径: {crash_record.target_path}\n" \
+                     f"已完成: {len(crash_record.completed)} 个文件 ({format_size(crash_record.completed_size)})\n\n" \
+                     f"是否继续完成该迁移？（选择“放弃”将删除已复制的部分）"
+            dialog = MessageBox(title, message, None)
+            dialog.yesButton.setText("继续迁移")
+            dialog.cancelButton.setText("放弃")
 
             if dialog.exec():
-                if recover_from_crash(crash_record):
-                    MessageBox("恢复成功", "已成功恢复到操作前状态，数据未丢失。", None).exec()
-                else:
-                    MessageBox("恢复失败", "自动恢复失败，请手动检查文件状态。", None).exec()
+                self._resume_migration(crash_record)
+            elif not recover_from_crash(crash_record):
+                MessageBox("清理失败", "已复制部分清理失败，请手动检查目标路径。", None).exec()
+
+    def _resume_migration(self, record):
+        """续传中断的迁移（已完成且校验通过的文件会被跳过），完成后为关联链接建立连接"""
+        from qfluentwidgets import MessageBox
+        from src.common.service_bus import service_bus
+        from src.gui.dialogs.migration import MigrationProgressDialog
+        from src.services.migration_service import MigrationService
+
+        link_service = service_bus.link_service
+        link_id = self._resume_link_id(record)
+        # 没有可关联的链接记录时保留源路径，避免数据迁走后无人引用
+        cleanup_source = record.cleanup_source and link_id is not None
+
+        progress_dialog = MigrationProgressDialog(None)
+        migration_service = MigrationService()
+
+        def on_finished(success, msg):
+            progress_dialog.close()
+            if not success:
+                MessageBox("迁移未完成", msg, None).exec()
+                return
+            if link_id is None:
+                hint = "源路径数据已保留，请在添加链接时重新建立连接。" if record.cleanup_source else ""
+                MessageBox("迁移完成", f"中断的迁移已续传完成。{hint}", None).exec()
+                return
+            connected, conn_msg = link_service.establish_connection_by_id(link_id)
+            if connected:
+                MessageBox("迁移完成", "中断的迁移已续传完成，链接已建立。", None).exec()
+            else:
+                MessageBox("建立连接失败", f"中断的迁移已续传完成，但建立连接失败，请在链接管理中重试。\n{conn_msg}",
+                           None).exec()
+
+        migration_service.migrate_async(
+            source=record.source_path,
+            target=record.target_path,
+            mode=record.operation,
+            on_progress=progress_dialog.update_progress,
+            on_eta=progress_dialog.update_eta,
+            on_finished=on_finished,
+            cleanup_source=cleanup_source,
+            link=record.link
+        )
+        progress_dialog.cancel_requested.connect(migration_service.cancel_migration)
+        progress_dialog.exec()
+
+    @staticmethod
+    def _resume_link_id(record):
+        """
+        续传迁移关联的链接 ID
+
+        新增链接的迁移在成功后才写入链接记录，续传前先补建记录，
+        保证源路径被清理时数据始终有链接引用；无法建立记录时返回 None。
+        """
+        from src.common.service_bus import service_bus
+        link_service = service_bus.link_service
+
+        link_id = record.link.get("id")
+        if link_id:
+            return link_id if link_service.get_link_by_id(link_id) else None
+
+        data = record.link.get("data")
+        if not data:
+            return None
+        link = link_service.get_link_by_source_path(data.get("source", ""))
+        if link is None:
+            success, msg = link_service.validate_and_add_link(data, migrated=True)
+            if not success:
+                print(f"[Warning] 续传迁移前补建链接失败: {msg}")
+                return None
+            link = link_service.get_link_by_source_path(data.get("source", ""))
+        return link.id if link else None
 
 
 def run_app():
@@ -223,4 +299,8 @@ def run_app():
     for _ in range(10):
         app.processEvents()
 
+    # 启动链接状态监听（目录变更时只重新探测受影响的链接）
+    service_bus.watch_service.start()
+    app.aboutToQuit.connect(service_bus.watch_service.stop)
+
     sys.exit(app.exec())
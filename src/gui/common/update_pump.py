@@ -0,0 +1,70 @@
+"""
+事件驱动的 UI 更新泵 (Update Pump)
+结果到达时才启动一次性定时器；合并窗口内的全部结果（同一键只保留最新值）后一次性应用，
+队列清空即停止，空闲时没有任何定时唤醒
+"""
+import logging
+import time
+from typing import Callable, Dict, Hashable
+from PySide6.QtCore import QObject, QTimer
+from src.common.signals import signal_bus
+
+logger = logging.getLogger(__name__)
+
+# 合并窗口（毫秒）：窗口内到达的结果合并为一批
+UPDATE_COALESCE_MS = 50
+
+
+class UpdatePump(QObject):
+    """按 (类型, 键) 合并的批量更新泵"""
+
+    def __init__(self, apply: Callable[[Dict[str, Dict[Hashable, object]]], None],
+                 name: str = "", interval_ms: int = UPDATE_COALESCE_MS, parent=None):
+        super().__init__(parent)
+        self._apply = apply
+        self.name = name or type(self).__name__
+        self._pending: Dict[str, Dict[Hashable, object]] = {}
+
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(interval_ms)
+        self._timer.timeout.connect(self.flush)
+
+        # 最近一批的指标
+        self.last_batch_size = 0
+        self.last_apply_ms = 0.0
+
+    def post(self, kind: str, key: Hashable, value):
+        """投递一条结果；空闲时启动合并窗口"""
+        self._pending.setdefault(kind, {})[key] = value
+        if not self._timer.isActive():
+            self._timer.start()
+
+    def is_active(self) -> bool:
+        """是否有待应用的结果（定时器已启动）"""
+        return self._timer.isActive()
+
+    def pending_count(self) -> int:
+        return sum(len(items) for items in self._pending.values())
+
+    def flush(self):
+        """立即应用所有待处理结果，并发布批量大小与耗时"""
+        self._timer.stop()
+        if not self._pending:
+            return
+
+        # 原子交换队列：应用期间新到达的结果进入下一批（post 会重新启动定时器）
+        batch, self._pending = self._pending, {}
+        size = sum(len(items) for items in batch.values())
+
+        start = time.perf_counter()
+        try:
+            self._apply(batch)
+        except Exception as e:
+            print(f"[Error] 批量刷新失败 [{self.name}]: {e}")
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+        self.last_batch_size = size
+        self.last_apply_ms = elapsed_ms
+        logger.debug("%s: applied %d updates in %.2f ms", self.name, size, elapsed_ms)
+        signal_bus.ui_batch_applied.emit(self.name, size, elapsed_ms)
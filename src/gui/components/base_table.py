@@ -5,13 +5,42 @@
 from typing import Optional, List, Dict
 from PySide6.QtCore import Qt, Signal
 from PySide6.QtWidgets import QHeaderView, QWidget, QHBoxLayout, QTableWidgetItem
-from qfluentwidgets import TableWidget, CheckBox, setCustomStyleSheet
+from qfluentwidgets import TableWidget, TableView, CheckBox, setCustomStyleSheet
 from src.gui.styles import (
     get_font_style, get_text_primary, apply_transparent_style,
     get_text_secondary
 )
 
 
+def _table_qss(selector: str) -> str:
+    """表格统一样式（selector 为 QTableWidget 或 QTableView）"""
+    header_text_color = get_text_secondary()
+    text_primary = get_text_primary()
+    font_style = get_font_style(size="md", weight="normal")
+
+    return f"""
+        {selector} {{
+            background: transparent;
+            outline: none;
+            border: none;
+            {font_style}
+        }}
+        QHeaderView::section {{
+            background-color: transparent;
+            border: none;
+            color: {header_text_color};
+            font-size: 13px;
+            font-weight: 600;
+            padding-left: 8px;
+        }}
+        {selector}::item {{
+            color: {text_primary};
+            border: none;
+            padding: 0 8px;
+        }}
+    """
+
+
 class BaseTableWidget(TableWidget):
     """表格基类 - 封装统一样式和全选逻辑"""
 
@@ -94,31 +123,7 @@ class BaseTableWidget(TableWidget):
 
     def _apply_base_style(self):
         """应用主题敏感样式 - 全局统一标准"""
-        header_text_color = get_text_secondary()
-        text_primary = get_text_primary()
-        font_style = get_font_style(size="md", weight="normal")
-
-        qss = f"""
-            QTableWidget {{
-                background: transparent;
-                outline: none;
-                border: none;
-                {font_style}
-            }}
-            QHeaderView::section {{
-                background-color: transparent;
-                border: none;
-                color: {header_text_color};
-                font-size: 13px;
-                font-weight: 600;
-                padding-left: 8px;
-            }}
-            QTableWidget::item {{
-                color: {text_primary};
-                border: none;
-                padding: 0 8px;
-            }}
-        """
+        qss = _table_qss("QTableWidget")
         setCustomStyleSheet(self, qss, qss)
 
     def _connect_base_signals(self):
@@ -228,3 +233,75 @@ class BaseTableWidget(TableWidget):
         # 确保现有行也遵循此高度
         for row in range(self.rowCount()):
             self.setRowHeight(row, 40)
+
+
+class BaseTableView(TableView):
+    """
+    模型/视图表格基类 - 与 BaseTableWidget 相同的视觉与表头全选框
+
+    行内容由模型和委托绘制，不创建单元格控件；勾选状态由子类的模型维护，
+    子类实现 _on_header_checked_changed 并在勾选变化时调用 sync_header_checkbox。
+    """
+
+    checked_changed = Signal(int)  # 勾选状态改变信号 (选中的数量)
+
+    def __init__(self, parent=None, enable_checkbox: bool = True):
+        super().__init__(parent)
+        self.enable_checkbox = enable_checkbox
+        self.header_checkbox: Optional[CheckBox] = None
+        self.header_checkbox_container: Optional[QWidget] = None
+
+        self._init_base_ui()
+        self._connect_base_signals()
+
+    def _init_base_ui(self):
+        """初始化基础 UI 属性"""
+        self.setBorderRadius(8)
+        self.setBorderVisible(False)
+        self.setSelectRightClickedRow(True)
+
+        self.setEditTriggers(TableView.EditTrigger.NoEditTriggers)
+        self.setSelectionBehavior(TableView.SelectionBehavior.SelectRows)
+        self.setSelectionMode(TableView.SelectionMode.SingleSelection)
+        self.setAlternatingRowColors(False)
+        self.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
+        self.setShowGrid(False)
+
+        # 固定行高：视图无需逐行测量尺寸
+        self.verticalHeader().setVisible(False)
+        self.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+        self.verticalHeader().setDefaultSectionSize(40)
+        self.horizontalHeader().setFixedHeight(36)
+
+        apply_transparent_style(self)
+
+        if self.enable_checkbox:
+            self._setup_header_checkbox()
+
+        self._apply_base_style()
+
+    # 表头全选框与 BaseTableWidget 共用实现
+    _setup_header_checkbox = BaseTableWidget._setup_header_checkbox
+    _on_header_section_resized = BaseTableWidget._on_header_section_resized
+    _update_header_checkbox_pos = BaseTableWidget._update_header_checkbox_pos
+
+    def _on_header_checked_changed(self, state):
+        raise NotImplementedError
+
+    def sync_header_checkbox(self, checked: bool):
+        """同步表头全选框状态（不触发全选）"""
+        if self.header_checkbox:
+            self.header_checkbox.blockSignals(True)
+            self.header_checkbox.setChecked(checked)
+            self.header_checkbox.blockSignals(False)
+
+    def _apply_base_style(self):
+        """应用主题敏感样式 - 全局统一标准"""
+        qss = _table_qss("QTableView")
+        setCustomStyleSheet(self, qss, qss)
+
+    def _connect_base_signals(self):
+        """连接全局信号"""
+        from src.common.signals import signal_bus
+        signal_bus.theme_color_changed.connect(self._apply_base_style)
+        signal_bus.theme_changed.connect(self._apply_base_style)
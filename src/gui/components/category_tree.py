@@ -20,13 +20,19 @@ class InternalCategoryTree(TreeWidget):
     delete_category_requested = Signal(str)
 
     def __init__(self, category_manager: CategoryManager, user_manager: Optional['UserManager'] = None,
-                 show_count: bool = False, count_provider: Optional[callable] = None, parent=None):
+                 show_count: bool = False, count_provider: Optional[callable] = None,
+                 stats: Optional['CategoryStatsService'] = None, parent=None):
         super().__init__(parent)
         self.category_manager = category_manager
         self.user_manager = user_manager
         self.show_count = show_count
         self.count_provider = count_provider
+        if stats is None:
+            from src.common.service_bus import service_bus
+            stats = service_bus.category_stats_service
+        self.stats = stats  # 分类结构（邻接表）与数量统计
         self.category_items = {}
+        self._category_names = {}
 
         self._init_ui()
         self._connect_signals()
@@ -104,27 +110,23 @@ class InternalCategoryTree(TreeWidget):
         """加载分类树"""
         self.clear()
         self.category_items.clear()
+        self._category_names.clear()
 
-        root_categories = self.category_manager.get_category_tree()
+        # 结构查询走内存层级索引（分类文件变化或经服务写入后自动重建）
+        root_categories = self.stats.get_roots()
 
         # 1. 手动添加"全部"根节点
         all_item = QTreeWidgetItem(self)
         all_item.setData(0, Qt.ItemDataRole.UserRole, "all")
 
-        # 根据配置决定是否显示数量
-        if self.show_count and self.count_provider:
-            count = self.count_provider("all")
-            all_item.setText(0, f"全部 ({count})")
-        else:
-            all_item.setText(0, "全部")
-
         self.category_items["all"] = all_item
+        self._set_item_text("all")
 
         # 默认选中“全部”
         self.setCurrentItem(all_item)
 
         # 2. 递归构建现有分类树
-        for category in sorted(root_categories, key=lambda x: x.order):
+        for category in root_categories:
             self._add_category_item(category, None)
 
         # 展开所有节点
@@ -138,26 +140,34 @@ class InternalCategoryTree(TreeWidget):
             item = QTreeWidgetItem(self)
 
         item.setData(0, Qt.ItemDataRole.UserRole, category.id)
-
-        # 根据配置决定是否显示数量
-        if self.show_count and self.count_provider:
-            count = self.count_provider(category.id)
-            item.setText(0, f"{category.name} ({count})")
-        else:
-            item.setText(0, category.name)
-
         self.category_items[category.id] = item
-
+        self._category_names[category.id] = category.name
+        self._set_item_text(category.id)
 
         # 为非叶子节点添加工具提示
-        is_leaf = self.category_manager.is_leaf(category.id)
-        if not is_leaf:
+        children = self.stats.get_children(category.id)
+        if children:
             item.setToolTip(0, "此分类包含子分类。点击查看所有子分类下的项。")
 
-        children = self.category_manager.get_children(category.id)
-        for child in sorted(children, key=lambda x: x.order):
+        for child in children:
             self._add_category_item(child, item, depth + 1)
 
+    def _set_item_text(self, category_id: str):
+        """根据配置决定是否显示数量"""
+        item = self.category_items[category_id]
+        name = self._category_names.get(category_id, "全部")
+        if self.show_count and self.count_provider:
+            item.setText(0, f"{name} ({self.count_provider(category_id)})")
+        else:
+            item.setText(0, name)
+
+    def refresh_counts(self):
+        """仅刷新各节点的数量文本（不重建树结构）"""
+        if not (self.show_count and self.count_provider):
+            return
+        for category_id in self.category_items:
+            self._set_item_text(category_id)
+
     def _on_item_clicked(self, item: QTreeWidgetItem, column: int):
         """树项被点击"""
         category_id = item.data(0, Qt.ItemDataRole.UserRole)
@@ -252,12 +262,13 @@ class CategoryTreeWidget(QWidget):
 
     def __init__(self, category_manager: CategoryManager, user_manager: Optional['UserManager'] = None,
                  show_count: bool = False, count_provider: Optional[callable] = None,
-                 title: str = "分类", parent=None):
+                 title: str = "分类", stats: Optional['CategoryStatsService'] = None, parent=None):
         super().__init__(parent)
         self.category_manager = category_manager
         self.user_manager = user_manager
         self.show_count = show_count
         self.count_provider = count_provider
+        self.stats = stats
         self.title_text = title
 
         self._init_ui()
@@ -310,6 +321,7 @@ class CategoryTreeWidget(QWidget):
             self.user_manager,
             show_count=self.show_count,
             count_provider=self.count_provider,
+            stats=self.stats,
             parent=self
         )
         self.main_layout.addWidget(self.tree)
@@ -327,6 +339,9 @@ class CategoryTreeWidget(QWidget):
     def load_categories(self):
         self.tree.load_categories()
 
+    def refresh_counts(self):
+        self.tree.refresh_counts()
+
     def select_category(self, category_id: str):
         self.tree.select_category(category_id)
 
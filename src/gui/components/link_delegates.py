@@ -0,0 +1,392 @@
+"""
+连接列表委托
+直接绘制状态徽章、空间占用、加载动画与操作按钮，替代逐行创建的控件
+
+- 只有视口内可见的行会被绘制，行数不影响控件数量与内存
+- 操作按钮通过 editorEvent 命中测试触发 action_triggered(link_id, action)
+- 加载动画由 LoadingAnimator 统一驱动：模型中存在加载行时才定时重绘视口
+"""
+from typing import Dict, List, Optional, Tuple
+from PySide6.QtCore import Qt, Signal, QObject, QTimer, QEvent, QRect, QRectF, QSize, QPoint
+from PySide6.QtGui import QColor, QPainter, QPen, QFontMetrics
+from PySide6.QtWidgets import QStyledItemDelegate, QStyleOptionViewItem, QToolTip
+from qfluentwidgets import TableItemDelegate, FluentIcon, isDarkTheme, themeColor, getFont
+from src.models.link import LinkStatus
+from src.common.validators import PathValidator
+from src.gui.styles import get_status_colors, get_text_primary, get_text_secondary
+from src.gui.i18n import get_status_text, get_category_text
+from src.gui.components.link_model import (
+    COL_CHECK, COL_STATUS, COL_SIZE, COL_ACTIONS,
+    LINK_ROLE, STATUS_LOADING_ROLE, SIZE_LOADING_ROLE, SIZE_TEXT_ROLE, status_value
+)
+
+
+ACTION_BUTTON_SIZE = 28
+ACTION_ICON_SIZE = 16
+ACTION_SPACING = 8
+SPINNER_SIZE = 16
+
+# 表格视图：未连接 / 就绪 / 错误 视为可修复项
+TABLE_ESTABLISH_STATUSES = (LinkStatus.DISCONNECTED, LinkStatus.READY, LinkStatus.ERROR)
+# 列表视图：未连接 / 就绪 / 失效 可建立连接
+FLAT_ESTABLISH_STATUSES = (LinkStatus.DISCONNECTED, LinkStatus.READY, LinkStatus.INVALID)
+
+
+def link_actions(status, establish_statuses) -> List[Tuple[str, FluentIcon, str]]:
+    """根据状态给出操作按钮 (action, 图标, 提示)"""
+    actions = []
+    if status in establish_statuses:
+        tip = "建立连接" if status == LinkStatus.READY else "修复连接"
+        actions.append(("establish", FluentIcon.PLAY_SOLID, tip))
+    elif status == LinkStatus.CONNECTED:
+        actions.append(("disconnect", FluentIcon.CLOSE, "断开连接"))
+    actions.append(("edit", FluentIcon.EDIT, "编辑连接信息"))
+    actions.append(("delete", FluentIcon.DELETE, "删除链接记录"))
+    return actions
+
+
+def action_rects(rect: QRect, count: int, align_right: bool = False) -> List[QRect]:
+    """操作按钮在单元格内的位置（水平居中或靠右，垂直居中）"""
+    width = count * ACTION_BUTTON_SIZE + max(count - 1, 0) * ACTION_SPACING
+    x = rect.right() - width + 1 if align_right else rect.x() + (rect.width() - width) // 2
+    y = rect.y() + (rect.height() - ACTION_BUTTON_SIZE) // 2
+    return [
+        QRect(x + i * (ACTION_BUTTON_SIZE + ACTION_SPACING), y, ACTION_BUTTON_SIZE, ACTION_BUTTON_SIZE)
+        for i in range(count)
+    ]
+
+
+def paint_actions(painter: QPainter, rects: List[QRect], actions, hover: int = -1):
+    """绘制透明工具按钮（悬停时带浅色底）"""
+    for i, (rect, (_, icon, _)) in enumerate(zip(rects, actions)):
+        if i == hover:
+            c = 255 if isDarkTheme() else 0
+            painter.setPen(Qt.PenStyle.NoPen)
+            painter.setBrush(QColor(c, c, c, 15))
+            painter.drawRoundedRect(rect, 5, 5)
+        offset = (ACTION_BUTTON_SIZE - ACTION_ICON_SIZE) / 2
+        icon.render(painter, QRectF(rect.x() + offset, rect.y() + offset, ACTION_ICON_SIZE, ACTION_ICON_SIZE))
+
+
+def status_badge_size(status, font) -> QSize:
+    text = get_status_text(status_value(status))
+    return QSize(6 + 8 + 6 + QFontMetrics(font).horizontalAdvance(text) + 8, 22)
+
+
+def paint_status_badge(painter: QPainter, rect: QRect, status, font):
+    """绘制状态徽章：半透明底色 + 状态色球 + 状态文本（与 StatusBadge 一致）"""
+    value = status_value(status)
+    colors = get_status_colors()
+    color = QColor(colors.get(value, colors["invalid"]))
+
+    painter.setPen(Qt.PenStyle.NoPen)
+    bg = QColor(color)
+    bg.setAlpha(0x20)
+    painter.setBrush(bg)
+    painter.drawRoundedRect(rect, 4, 4)
+
+    painter.setBrush(color)
+    dot_y = rect.y() + (rect.height() - 8) / 2
+    painter.drawEllipse(QRectF(rect.x() + 6, dot_y, 8, 8))
+
+    painter.setPen(color)
+    painter.setFont(font)
+    text_rect = rect.adjusted(6 + 8 + 6, 0, -8, 0)
+    painter.drawText(text_rect, Qt.AlignmentFlag.AlignVCenter | Qt.AlignmentFlag.AlignLeft, get_status_text(value))
+
+
+def paint_spinner(painter: QPainter, center: QPoint, angle: int, size: int = SPINNER_SIZE):
+    """绘制不确定进度环（angle 由 LoadingAnimator 推进）"""
+    pen = QPen(themeColor(), 2)
+    pen.setCapStyle(Qt.PenCapStyle.RoundCap)
+    painter.setPen(pen)
+    painter.setBrush(Qt.BrushStyle.NoBrush)
+    r = size / 2 - 1
+    painter.drawArc(QRectF(center.x() - r, center.y() - r, 2 * r, 2 * r), -angle * 16, 100 * 16)
+
+
+class LoadingAnimator(QObject):
+    """加载动画节拍器：模型存在加载行时定时推进角度并重绘视口，否则停止"""
+
+    INTERVAL = 40
+
+    def __init__(self, view, model):
+        super().__init__(view)
+        self.view = view
+        self.model = model
+        self.angle = 0
+        self._timer = QTimer(self)
+        self._timer.setInterval(self.INTERVAL)
+        self._timer.timeout.connect(self._tick)
+        model.dataChanged.connect(self.ensure_running)
+        model.modelReset.connect(self.ensure_running)
+
+    def ensure_running(self, *args):
+        if not self._timer.isActive() and self.model.has_loading():
+            self._timer.start()
+
+    def _tick(self):
+        if not self.model.has_loading():
+            self._timer.stop()
+        else:
+            self.angle = (self.angle + 24) % 360
+        self.view.viewport().update()
+
+
+class LinkTableDelegate(TableItemDelegate):
+    """LinkTable 委托：在 Fluent 表格行背景之上绘制复选框、状态徽章、加载环与操作按钮"""
+
+    action_triggered = Signal(str, str)  # (link_id, action)
+
+    def __init__(self, parent):
+        super().__init__(parent)
+        self.animator: Optional[LoadingAnimator] = None
+        self.badge_font = getFont(13)
+        self._hover_action: Tuple[int, int] = (-1, -1)  # (行, 按钮序号)
+
+    def initStyleOption(self, option: QStyleOptionViewItem, index):
+        super().initStyleOption(option, index)
+        # 复选框由 TableItemDelegate 以 Fluent 样式绘制，去掉原生指示器
+        option.features &= ~QStyleOptionViewItem.ViewItemFeature.HasCheckIndicator
+
+    def paint(self, painter, option, index):
+        rect = QRect(option.rect)
+        super().paint(painter, option, index)
+
+        col = index.column()
+        if col not in (COL_STATUS, COL_SIZE, COL_ACTIONS):
+            return
+        link = index.data(LINK_ROLE)
+        angle = self.animator.angle if self.animator else 0
+
+        painter.save()
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        if col == COL_STATUS:
+            if index.data(STATUS_LOADING_ROLE):
+                paint_spinner(painter, rect.center(), angle)
+            else:
+                size = status_badge_size(link.status, self.badge_font)
+                badge = QRect(0, 0, size.width(), size.height())
+                badge.moveCenter(rect.center())
+                paint_status_badge(painter, badge, link.status, self.badge_font)
+        elif col == COL_SIZE:
+            if index.data(SIZE_LOADING_ROLE):
+                paint_spinner(painter, rect.center(), angle)
+        else:
+            actions = link_actions(link.status, TABLE_ESTABLISH_STATUSES)
+            hover_row, hover_i = self._hover_action
+            paint_actions(painter, action_rects(rect, len(actions)), actions,
+                          hover_i if hover_row == index.row() else -1)
+        painter.restore()
+
+    def _action_at(self, index, rect: QRect, pos: QPoint) -> int:
+        link = index.data(LINK_ROLE)
+        actions = link_actions(link.status, TABLE_ESTABLISH_STATUSES)
+        for i, r in enumerate(action_rects(rect, len(actions))):
+            if r.contains(pos):
+                return i
+        return -1
+
+    def update_hover(self, index, rect: QRect, pos: QPoint) -> bool:
+        """记录鼠标悬停的操作按钮（由视图的 mouseMoveEvent 调用），变化时返回 True"""
+        hover = (-1, -1)
+        if index.isValid() and index.column() == COL_ACTIONS:
+            hover = (index.row(), self._action_at(index, rect, pos))
+        changed = hover != self._hover_action
+        self._hover_action = hover
+        return changed
+
+    def editorEvent(self, event, model, option, index):
+        col = index.column()
+        if event.type() == QEvent.Type.MouseButtonRelease and event.button() == Qt.MouseButton.LeftButton:
+            if col == COL_CHECK:
+                checked = index.data(Qt.ItemDataRole.CheckStateRole) == Qt.CheckState.Checked
+                model.setData(index, Qt.CheckState.Unchecked if checked else Qt.CheckState.Checked,
+                              Qt.ItemDataRole.CheckStateRole)
+                return True
+            if col == COL_ACTIONS:
+                i = self._action_at(index, option.rect, event.position().toPoint())
+                if i >= 0:
+                    link = index.data(LINK_ROLE)
+                    action = link_actions(link.status, TABLE_ESTABLISH_STATUSES)[i][0]
+                    self.action_triggered.emit(link.id, action)
+                    return True
+        return super().editorEvent(event, model, option, index)
+
+    def helpEvent(self, event, view, option, index):
+        if event and index.isValid() and index.column() == COL_ACTIONS:
+            i = self._action_at(index, option.rect, event.pos())
+            if i >= 0:
+                link = index.data(LINK_ROLE)
+                QToolTip.showText(event.globalPos(), link_actions(link.status, TABLE_ESTABLISH_STATUSES)[i][2], view)
+                return True
+        return super().helpEvent(event, view, option, index)
+
+
+class LinkCardDelegate(QStyledItemDelegate):
+    """FlatLinkView 委托：绘制单行卡片（图标 / 名称与分类 / 路径 / 空间 / 状态 / 操作）"""
+
+    action_triggered = Signal(str, str)  # (link_id, action)
+
+    CARD_HEIGHT = 72
+    PADDING_H = 16
+    ICON_SIZE = 32
+
+    def __init__(self, parent):
+        super().__init__(parent)
+        self.animator: Optional[LoadingAnimator] = None
+        self.name_font = getFont(14)
+        self.caption_font = getFont(12)
+        self.size_font = getFont(12)
+        self.size_font.setBold(True)
+        self.badge_font = getFont(13)
+        self._validator = PathValidator()
+        self._paths: Dict[str, Tuple[str, str]] = {}  # link_id -> (target_path, 标准化显示路径)
+        self._hover_action: Tuple[int, int] = (-1, -1)
+
+    def sizeHint(self, option, index):
+        return QSize(option.rect.width(), self.CARD_HEIGHT)
+
+    def initStyleOption(self, option: QStyleOptionViewItem, index):
+        super().initStyleOption(option, index)
+        option.features &= ~QStyleOptionViewItem.ViewItemFeature.HasCheckIndicator
+        option.text = ""
+
+    def display_path(self, link) -> str:
+        cached = self._paths.get(link.id)
+        if cached is None or cached[0] != link.target_path:
+            cached = (link.target_path, self._validator.normalize(link.target_path))
+            self._paths[link.id] = cached
+        return cached[1]
+
+    @staticmethod
+    def category_text(link) -> str:
+        # 优先使用全路径名称 (ViewModel 的 category_path 或 DataModel 的 category_path_name)
+        full_path = getattr(link, 'category_path', "") or getattr(link, 'category_path_name', "")
+        return full_path or get_category_text(link.category)
+
+    def _layout(self, rect: QRect, link) -> Dict[str, QRect]:
+        """计算卡片各区域（从右向左依次为操作按钮、状态、空间）"""
+        inner = rect.adjusted(self.PADDING_H, 8, -self.PADDING_H, -8)
+        actions = link_actions(link.status, FLAT_ESTABLISH_STATUSES)
+        buttons = action_rects(inner, len(actions), align_right=True)
+        right = buttons[0].left() - 12
+
+        badge_size = status_badge_size(link.status, self.badge_font)
+        status = QRect(right - badge_size.width(), inner.center().y() - badge_size.height() // 2,
+                       badge_size.width(), badge_size.height())
+        right = status.left() - 12
+
+        size = QRect(right - 80, inner.y(), 80, inner.height())
+        icon = QRect(inner.x(), inner.center().y() - self.ICON_SIZE // 2, self.ICON_SIZE, self.ICON_SIZE)
+        info = QRect(icon.right() + 13, inner.y(), max(size.left() - icon.right() - 25, 0), inner.height())
+        return {"buttons": buttons, "status": status, "size": size, "icon": icon, "info": info}
+
+    def paint(self, painter, option, index):
+        # 卡片背景 / 选中态由样式表 (#FlatLinkView::item) 绘制
+        super().paint(painter, option, index)
+
+        link = index.data(LINK_ROLE)
+        if link is None:
+            return
+        areas = self._layout(option.rect, link)
+        angle = self.animator.angle if self.animator else 0
+
+        painter.save()
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+
+        FluentIcon.APPLICATION.render(painter, QRectF(areas["icon"]))
+
+        # 第一行：名称 + 分类；第二行：路径
+        info = areas["info"]
+        primary, secondary = QColor(get_text_primary()), QColor(get_text_secondary())
+        half = info.height() // 2
+        name_rect = QRect(info.x(), info.y(), info.width(), half)
+        painter.setFont(self.name_font)
+        painter.setPen(primary)
+        name_metrics = QFontMetrics(self.name_font)
+        name = name_metrics.elidedText(link.name, Qt.TextElideMode.ElideRight, info.width())
+        painter.drawText(name_rect, Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignBottom, name)
+
+        cat_x = info.x() + name_metrics.horizontalAdvance(name) + 8
+        if cat_x < info.right():
+            category = QColor(secondary)
+            category.setAlphaF(0.7)
+            painter.setFont(self.caption_font)
+            painter.setPen(category)
+            cat_rect = QRect(cat_x, info.y(), info.right() - cat_x, half)
+            cat_text = QFontMetrics(self.caption_font).elidedText(
+                self.category_text(link), Qt.TextElideMode.ElideRight, cat_rect.width())
+            painter.drawText(cat_rect, Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignBottom, cat_text)
+
+        path_color = QColor(secondary)
+        path_color.setAlphaF(0.6)
+        painter.setFont(self.caption_font)
+        painter.setPen(path_color)
+        path_rect = QRect(info.x(), info.y() + half + 4, info.width(), info.height() - half - 4)
+        path = QFontMetrics(self.caption_font).elidedText(self.display_path(link), Qt.TextElideMode.ElideMiddle, info.width())
+        painter.drawText(path_rect, Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignTop, path)
+
+        # 空间占用（计算中显示进度环，未计算时不显示）
+        size_rect = areas["size"]
+        if index.data(SIZE_LOADING_ROLE):
+            paint_spinner(painter, QPoint(size_rect.right() - SPINNER_SIZE // 2, size_rect.center().y()), angle, 14)
+        else:
+            size_text = index.data(SIZE_TEXT_ROLE)
+            if size_text:
+                painter.setFont(self.size_font)
+                painter.setPen(themeColor())
+                painter.drawText(size_rect, Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter, size_text)
+
+        # 状态（探测中显示进度环）
+        status_rect = areas["status"]
+        if index.data(STATUS_LOADING_ROLE):
+            paint_spinner(painter, status_rect.center(), angle)
+        else:
+            paint_status_badge(painter, status_rect, link.status, self.badge_font)
+
+        actions = link_actions(link.status, FLAT_ESTABLISH_STATUSES)
+        hover_row, hover_i = self._hover_action
+        paint_actions(painter, areas["buttons"], actions, hover_i if hover_row == index.row() else -1)
+        painter.restore()
+
+    def _action_at(self, index, rect: QRect, pos: QPoint) -> int:
+        link = index.data(LINK_ROLE)
+        for i, r in enumerate(self._layout(rect, link)["buttons"]):
+            if r.contains(pos):
+                return i
+        return -1
+
+    def update_hover(self, index, rect: QRect, pos: QPoint) -> bool:
+        """记录鼠标悬停的操作按钮（由视图的 mouseMoveEvent 调用），变化时返回 True"""
+        hover = (index.row(), self._action_at(index, rect, pos)) if index.isValid() else (-1, -1)
+        changed = hover != self._hover_action
+        self._hover_action = hover
+        return changed
+
+    def editorEvent(self, event, model, option, index):
+        if event.type() == QEvent.Type.MouseButtonRelease and event.button() == Qt.MouseButton.LeftButton:
+            i = self._action_at(index, option.rect, event.position().toPoint())
+            if i >= 0:
+                link = index.data(LINK_ROLE)
+                self.action_triggered.emit(link.id, link_actions(link.status, FLAT_ESTABLISH_STATUSES)[i][0])
+                return True
+        return super().editorEvent(event, model, option, index)
+
+    def helpEvent(self, event, view, option, index):
+        if not event or not index.isValid():
+            return super().helpEvent(event, view, option, index)
+        link = index.data(LINK_ROLE)
+        areas = self._layout(option.rect, link)
+        pos = event.pos()
+        text = ""
+        for i, r in enumerate(areas["buttons"]):
+            if r.contains(pos):
+                text = link_actions(link.status, FLAT_ESTABLISH_STATUSES)[i][2]
+        if not text and areas["info"].contains(pos):
+            text = self.display_path(link) if pos.y() > areas["info"].center().y() else self.category_text(link)
+        if text:
+            QToolTip.showText(event.globalPos(), text, view)
+            return True
+        QToolTip.hideText()
+        return False
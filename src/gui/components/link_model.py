@@ -0,0 +1,300 @@
+"""
+连接数据模型
+LinkTable 与 FlatLinkView 共用的表格模型，替代逐行创建的单元格控件
+
+- 连接 ID → 行号索引，状态/大小更新直接定位，只对变化的单元格发出 dataChanged
+- 勾选、状态探测中、空间计算中等视图状态保存在模型中，由委托绘制
+- 视图只为可见行调用 data()/paint()，行数与控件数量无关
+"""
+from typing import Dict, Iterable, List, Optional, Set
+from PySide6.QtCore import Qt, Signal, QAbstractTableModel, QModelIndex
+from src.models.link import UserLink, LinkStatus
+from src.common.config import format_size
+from src.gui.i18n import get_category_text
+
+
+# 列定义
+COL_CHECK = 0
+COL_NAME = 1
+COL_CATEGORY = 2
+COL_STATUS = 3
+COL_SIZE = 4
+COL_ACTIONS = 5
+
+# 自定义数据角色
+LINK_ROLE = Qt.ItemDataRole.UserRole             # UserLink 对象
+ID_ROLE = Qt.ItemDataRole.UserRole + 1           # 连接 ID
+STATUS_LOADING_ROLE = Qt.ItemDataRole.UserRole + 2  # 状态探测中
+SIZE_LOADING_ROLE = Qt.ItemDataRole.UserRole + 3    # 空间计算中
+SIZE_TEXT_ROLE = Qt.ItemDataRole.UserRole + 4       # 已知的空间文本（未计算时为空）
+
+
+def status_value(status) -> str:
+    """LinkStatus 枚举或字符串统一为状态值"""
+    return status.value if hasattr(status, 'value') else str(status)
+
+
+class LinkTableModel(QAbstractTableModel):
+    """连接列表模型"""
+
+    HEADERS = ["", "软件信息", "分类", "状态", "占用空间", "操作"]
+
+    checked_changed = Signal(list)  # 勾选的连接 ID 列表
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._links: List[UserLink] = []
+        self._row_by_id: Dict[str, int] = {}
+        self._checked: Set[str] = set()
+        self._status_loading: Set[str] = set()
+        self._size_loading: Set[str] = set()  # 跨 set_links 保留，刷新列表时恢复加载动画
+        self._size_text: Dict[str, str] = {}
+
+    # ---------- Qt 模型接口 ----------
+
+    def rowCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._links)
+
+    def columnCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if orientation == Qt.Orientation.Horizontal and role == Qt.ItemDataRole.DisplayRole:
+            return self.HEADERS[section]
+        return None
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.ItemFlag.NoItemFlags
+        flags = Qt.ItemFlag.ItemIsEnabled | Qt.ItemFlag.ItemIsSelectable
+        if index.column() == COL_CHECK:
+            flags |= Qt.ItemFlag.ItemIsUserCheckable
+        return flags
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        link = self._links[index.row()]
+        col = index.column()
+
+        if role == LINK_ROLE:
+            return link
+        if role == ID_ROLE:
+            return link.id
+        if role == STATUS_LOADING_ROLE:
+            return link.id in self._status_loading
+        if role == SIZE_LOADING_ROLE:
+            return link.id in self._size_loading
+        if role == SIZE_TEXT_ROLE:
+            return self.size_text(link)
+
+        if role == Qt.ItemDataRole.DisplayRole:
+            if col == COL_NAME:
+                return link.name
+            if col == COL_CATEGORY:
+                return get_category_text(link.category)
+            if col == COL_SIZE:
+                return "" if link.id in self._size_loading else (self.size_text(link) or "未计算")
+            return None
+
+        if role == Qt.ItemDataRole.CheckStateRole and col == COL_CHECK:
+            return Qt.CheckState.Checked if link.id in self._checked else Qt.CheckState.Unchecked
+
+        if role == Qt.ItemDataRole.ToolTipRole:
+            if col == COL_NAME:
+                # 记录实测指向 (如果有)
+                if link.resolve_path:
+                    return f"期望指向: {link.source_path}\n物理实测: {link.resolve_path}"
+                return f"期望指向: {link.source_path}"
+            if col == COL_STATUS and link.status == LinkStatus.ERROR:
+                return "路径存在冲突：目标位置已被普通文件占用，无法建立链接。"
+            return None
+
+        if role == Qt.ItemDataRole.TextAlignmentRole:
+            if col == COL_NAME:
+                return Qt.AlignmentFlag.AlignVCenter | Qt.AlignmentFlag.AlignLeft
+            return Qt.AlignmentFlag.AlignCenter
+
+        return None
+
+    def setData(self, index, value, role=Qt.ItemDataRole.EditRole) -> bool:
+        if index.isValid() and index.column() == COL_CHECK and role == Qt.ItemDataRole.CheckStateRole:
+            checked = value in (Qt.CheckState.Checked, Qt.CheckState.Checked.value, True)
+            self.set_checked(self._links[index.row()].id, checked)
+            return True
+        return False
+
+    def sort(self, column: int, order=Qt.SortOrder.AscendingOrder):
+        """按列排序（保持选中行等持久索引）"""
+        keys = {
+            COL_NAME: lambda l: (l.name or "").lower(),
+            COL_CATEGORY: lambda l: get_category_text(l.category),
+            COL_STATUS: lambda l: status_value(l.status),
+            COL_SIZE: lambda l: l.last_known_size or 0,
+        }
+        key = keys.get(column)
+        if key is None:
+            return
+
+        self.layoutAboutToBeChanged.emit()
+        old_persistent = self.persistentIndexList()
+        old_ids = [self._links[i.row()].id for i in old_persistent]
+
+        self._links.sort(key=key, reverse=order == Qt.SortOrder.DescendingOrder)
+        self._rebuild_index()
+
+        new_persistent = [self.index(self._row_by_id[lid], i.column()) for lid, i in zip(old_ids, old_persistent)]
+        self.changePersistentIndexList(old_persistent, new_persistent)
+        self.layoutChanged.emit()
+
+    # ---------- 数据加载 ----------
+
+    def set_links(self, links: Iterable[UserLink]):
+        """整表替换（重置勾选与状态探测标记，保留空间计算中的标记）"""
+        self.beginResetModel()
+        self._links = list(links)
+        self._rebuild_index()
+        self._checked.clear()
+        self._status_loading.clear()
+        self._size_text.clear()
+        self.endResetModel()
+        self.checked_changed.emit([])
+
+    def _rebuild_index(self):
+        self._row_by_id = {link.id: row for row, link in enumerate(self._links)}
+
+    def link_at(self, row: int) -> Optional[UserLink]:
+        return self._links[row] if 0 <= row < len(self._links) else None
+
+    def row_of(self, link_id: str) -> int:
+        """连接所在行，不存在时返回 -1"""
+        return self._row_by_id.get(link_id, -1)
+
+    def link_ids(self) -> List[str]:
+        return [link.id for link in self._links]
+
+    def size_text(self, link: UserLink) -> str:
+        """已知的空间文本：本次统计结果优先，其次为上次记录的大小；均无时返回空串"""
+        text = self._size_text.get(link.id)
+        if text is not None:
+            return text
+        return format_size(link.last_known_size) if link.last_known_size > 0 else ""
+
+    def _emit_cells(self, row: int, first_col: int, last_col: int = None):
+        self.dataChanged.emit(self.index(row, first_col), self.index(row, last_col if last_col is not None else first_col))
+
+    def _emit_column(self, first_col: int, last_col: int = None):
+        if self._links:
+            last = last_col if last_col is not None else first_col
+            self.dataChanged.emit(self.index(0, first_col), self.index(len(self._links) - 1, last))
+
+    # ---------- 状态 / 空间 ----------
+
+    def set_status_loading(self, link_id: str, is_loading: bool):
+        row = self.row_of(link_id)
+        if row < 0 or (link_id in self._status_loading) == is_loading:
+            return
+        if is_loading:
+            self._status_loading.add(link_id)
+        else:
+            self._status_loading.discard(link_id)
+        self._emit_cells(row, COL_STATUS)
+
+    def set_all_status_loading(self):
+        self._status_loading.update(self._row_by_id)
+        self._emit_column(COL_STATUS)
+
+    def update_status(self, link_id: str, status):
+        """写入探测结果并结束该行的加载状态"""
+        self.apply_updates(statuses={link_id: status})
+
+    def set_size_loading(self, link_id: str, is_loading: bool):
+        if (link_id in self._size_loading) == is_loading:
+            return
+        if is_loading:
+            self._size_loading.add(link_id)
+        else:
+            self._size_loading.discard(link_id)
+        row = self.row_of(link_id)
+        if row >= 0:
+            self._emit_cells(row, COL_SIZE)
+
+    def set_all_sizes_loading(self):
+        self._size_loading.update(self._row_by_id)
+        self._emit_column(COL_SIZE)
+
+    def update_size(self, link_id: str, size_text: str):
+        """写入空间统计结果并结束该行的加载状态"""
+        self.apply_updates(sizes={link_id: size_text})
+
+    def apply_updates(self, statuses: Optional[Dict[str, object]] = None, sizes: Optional[Dict[str, str]] = None):
+        """
+        批量写入探测/统计结果（按连接 ID）
+
+        每类结果只发出一次覆盖受影响行范围的 dataChanged，
+        视图据此合并为一次重绘，而不是逐行通知
+        """
+        status_rows = []
+        for link_id, status in (statuses or {}).items():
+            row = self.row_of(link_id)
+            if row < 0:
+                continue
+            link = self._links[row]
+            self._status_loading.discard(link_id)
+            if status_value(link.status) != status_value(status):
+                link.status = status if isinstance(status, LinkStatus) else LinkStatus(status_value(status))
+            # 同一批视图模型对象可能被多个视图的模型共享（状态已由另一方写入），
+            # 因此总是通知该行的状态与操作按钮两列
+            status_rows.append(row)
+
+        size_rows = []
+        for link_id, size_text in (sizes or {}).items():
+            was_loading = link_id in self._size_loading
+            self._size_loading.discard(link_id)
+            row = self.row_of(link_id)
+            if row < 0:
+                continue
+            if was_loading or self._size_text.get(link_id) != size_text:
+                self._size_text[link_id] = size_text
+                size_rows.append(row)
+
+        if status_rows:
+            self.dataChanged.emit(self.index(min(status_rows), COL_STATUS), self.index(max(status_rows), COL_ACTIONS))
+        if size_rows:
+            self.dataChanged.emit(self.index(min(size_rows), COL_SIZE), self.index(max(size_rows), COL_SIZE))
+
+    @property
+    def size_loading_ids(self) -> Set[str]:
+        return self._size_loading
+
+    def has_loading(self) -> bool:
+        """是否有行处于加载状态（视图据此启停加载动画）"""
+        return bool(self._status_loading) or not self._size_loading.isdisjoint(self._row_by_id)
+
+    # ---------- 勾选 ----------
+
+    def checked_ids(self) -> List[str]:
+        """勾选的连接 ID（按当前行顺序）"""
+        return [link.id for link in self._links if link.id in self._checked]
+
+    def is_all_checked(self) -> bool:
+        return bool(self._links) and len(self._checked) == len(self._links)
+
+    def set_checked(self, link_id: str, checked: bool):
+        row = self.row_of(link_id)
+        if row < 0 or (link_id in self._checked) == checked:
+            return
+        if checked:
+            self._checked.add(link_id)
+        else:
+            self._checked.discard(link_id)
+        self._emit_cells(row, COL_CHECK)
+        self.checked_changed.emit(self.checked_ids())
+
+    def set_all_checked(self, checked: bool):
+        if checked:
+            self._checked = set(self._row_by_id)
+        else:
+            self._checked.clear()
+        self._emit_column(COL_CHECK)
+        self.checked_changed.emit(self.checked_ids())
@@ -179,12 +179,14 @@ class AddLinkDialog(MessageBoxBase):
             def on_finished(success: bool, error_msg: str):
                 progress_dialog.close()
                 # 3. 显示结果
-                result_dialog = MigrationResultDialog(success, error_msg, self)
+                result_dialog = MigrationResultDialog(success, error_msg, self, report=migration_service.last_report)
                 result_dialog.exec()
                 
                 if success:
-                    # 4. 迁移成功后强制添加链接
-                    final_success, _ = self.connection_service.validate_and_add_link(data, self.selected_template)
+                    # 4. 迁移成功后强制添加链接（目标端的数据即刚迁移的数据，不再视为冲突）
+                    final_success, _ = self.connection_service.validate_and_add_link(
+                        data, self.selected_template, migrated=True
+                    )
                     if final_success:
                         self._finalize_addition(data)
                         self.accept() # 关闭添加对话框
@@ -195,11 +197,11 @@ class AddLinkDialog(MessageBoxBase):
                 target=data["target"],  # 库路径（迁移目的地）
                 mode="copy", # 默认使用安全复制
                 on_progress=progress_dialog.update_progress,
-                on_finished=on_finished
+                on_eta=progress_dialog.update_eta,
+                on_finished=on_finished,
+                cleanup_source=True, # 显式开启成功后的清理逻辑
+                link={"data": data} # 链接记录在迁移成功后才写入：中断后续传时据此补建链接
             )
-            # 显式开启成功后的清理逻辑
-            if migration_service._worker:
-                migration_service._worker.cleanup_source = True
             
             # 关联取消按钮
             progress_dialog.cancel_requested.connect(migration_service.cancel_migration)
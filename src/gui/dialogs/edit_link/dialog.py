@@ -122,7 +122,7 @@ class EditLinkDialog(MessageBoxBase):
             def on_finished(success: bool, error_msg: str):
                 progress_dialog.close()
                 # 3. 显示结果
-                result_dialog = MigrationResultDialog(success, error_msg, self)
+                result_dialog = MigrationResultDialog(success, error_msg, self, report=migration_service.last_report)
                 result_dialog.exec()
                 
                 if success:
@@ -140,6 +140,7 @@ class EditLinkDialog(MessageBoxBase):
                 target=data["source"],
                 mode="copy", # 默认使用安全复制
                 on_progress=progress_dialog.update_progress,
+                on_eta=progress_dialog.update_eta,
                 on_finished=on_finished
             )
             
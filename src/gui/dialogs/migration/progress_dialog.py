@@ -5,7 +5,7 @@
 """
 from PySide6.QtCore import Qt, Signal
 from PySide6.QtWidgets import QVBoxLayout, QHBoxLayout
-from qfluentwidgets import MessageBoxBase, SubtitleLabel, BodyLabel, ProgressBar
+from qfluentwidgets import MessageBoxBase, SubtitleLabel, BodyLabel, CaptionLabel, ProgressBar
 from src.common.config import format_size
 
 class MigrationProgressDialog(MessageBoxBase):
@@ -32,15 +32,19 @@ class MigrationProgressDialog(MessageBoxBase):
         # 4. 详细进度文本 (已处理 / 总量)
         self.detailLabel = BodyLabel("0 MB / 0 MB (0%)", self)
         self.detailLabel.setStyleSheet("color: palette(highlight);")
+
+        # 5. 速度与预计剩余时间
+        self.etaLabel = CaptionLabel("", self)
         
-        # 5. 布局添加
+        # 6. 布局添加
         self.viewLayout.addWidget(self.titleLabel)
         self.viewLayout.addWidget(self.statusLabel)
         self.viewLayout.addSpacing(8)
         self.viewLayout.addWidget(self.progressBar)
         self.viewLayout.addWidget(self.detailLabel)
+        self.viewLayout.addWidget(self.etaLabel)
         
-        # 6. 按钮配置
+        # 7. 按钮配置
         self.yesButton.hide() # 不需要确定按钮，完成会自动关闭或显示结果
         self.cancelButton.setText("取消迁移")
         self.cancelButton.clicked.connect(self._on_cancel_clicked)
@@ -60,8 +64,20 @@ class MigrationProgressDialog(MessageBoxBase):
         detail = f"{format_size(current)} / {format_size(total)} ({percent}%)"
         self.detailLabel.setText(detail)
 
+    def update_eta(self, speed: float, eta: float):
+        """更新速度与预计剩余时间（eta < 0 表示未知）"""
+        if speed <= 0:
+            return
+        text = f"{format_size(int(speed))}/s"
+        if eta >= 0:
+            minutes, seconds = divmod(int(eta), 60)
+            hours, minutes = divmod(minutes, 60)
+            remaining = f"{hours}:{minutes:02d}:{seconds:02d}" if hours else f"{minutes:02d}:{seconds:02d}"
+            text += f"  ·  预计剩余 {remaining}"
+        self.etaLabel.setText(text)
+
     def _on_cancel_clicked(self):
         """处理取消点击"""
-        self.statusLabel.setText("正在取消并清理...")
+        self.statusLabel.setText("正在取消，已完成部分将保留以便续传...")
         self.cancelButton.setEnabled(False)
         self.cancel_requested.emit()
@@ -5,12 +5,16 @@
 """
 from PySide6.QtCore import Qt
 from PySide6.QtWidgets import QVBoxLayout, QHBoxLayout
-from qfluentwidgets import MessageBoxBase, SubtitleLabel, BodyLabel, IconWidget, FluentIcon
+from qfluentwidgets import MessageBoxBase, SubtitleLabel, BodyLabel, CaptionLabel, IconWidget, FluentIcon, PlainTextEdit
+from src.common.config import format_size
+
+# 清单预览最多展示的条目数（完整清单见清单文件）
+MANIFEST_PREVIEW_LIMIT = 200
 
 class MigrationResultDialog(MessageBoxBase):
     """迁移结果对话框"""
 
-    def __init__(self, success: bool, message: str = "", parent=None):
+    def __init__(self, success: bool, message: str = "", parent=None, report=None):
         """
         初始化结果对话框
         
@@ -18,10 +22,12 @@ class MigrationResultDialog(MessageBoxBase):
             success: 是否成功
             message: 错误信息 (如果失败)
             parent: 父窗口
+            report: 校验迁移的结果清单 (VerifyReport，可选)
         """
         super().__init__(parent)
         self.success = success
         self.message = message
+        self.report = report
         self._init_ui()
 
     def _init_ui(self):
@@ -59,6 +65,8 @@ class MigrationResultDialog(MessageBoxBase):
         self.viewLayout.addSpacing(16)
         self.viewLayout.addWidget(self.titleLabel)
         self.viewLayout.addWidget(self.contentLabel)
+        if self.success and self.report:
+            self._init_manifest()
         self.viewLayout.addSpacing(16)
         
         # 5. 按钮配置
@@ -66,3 +74,31 @@ class MigrationResultDialog(MessageBoxBase):
         self.yesButton.setText("确定")
         
         self.widget.setMinimumWidth(450)
+
+    def _init_manifest(self):
+        """展示校验清单摘要与预览"""
+        report = self.report
+        summary = f"已校验 {len(report.entries)} 个文件（{format_size(report.total_size)}），" \
+                  f"算法 {report.algorithm.upper()}"
+        if report.reread_count:
+            summary += f"，其中 {report.reread_count} 个大文件已回读目标端比对"
+        self.verifyLabel = BodyLabel(summary, self)
+        self.verifyLabel.setWordWrap(True)
+
+        self.manifestView = PlainTextEdit(self)
+        self.manifestView.setReadOnly(True)
+        self.manifestView.setFixedHeight(160)
+        lines = [f"{digest[:16]}  {format_size(size):>10}  {rel_path}"
+                 for rel_path, size, digest in report.entries[:MANIFEST_PREVIEW_LIMIT]]
+        if len(report.entries) > MANIFEST_PREVIEW_LIMIT:
+            lines.append(f"... 共 {len(report.entries)} 项")
+        self.manifestView.setPlainText("\n".join(lines))
+
+        self.viewLayout.addSpacing(8)
+        self.viewLayout.addWidget(self.verifyLabel)
+        self.viewLayout.addWidget(self.manifestView)
+        if report.manifest_file:
+            self.manifestLabel = CaptionLabel(f"完整清单: {report.manifest_file}", self)
+            self.manifestLabel.setWordWrap(True)
+            self.manifestLabel.setTextInteractionFlags(Qt.TextSelectableByMouse)
+            self.viewLayout.addWidget(self.manifestLabel)
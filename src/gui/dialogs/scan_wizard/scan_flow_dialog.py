@@ -2,12 +2,13 @@
 全流程序扫描对话框
 集成扫描进度展示与结果列表预览
 """
+import logging
 from typing import List, Optional
 from PySide6.QtWidgets import QVBoxLayout, QWidget, QStackedWidget
 from PySide6.QtCore import Qt, Signal, QThread
 from qfluentwidgets import (
     MessageBoxBase, SubtitleLabel, BodyLabel,
-    IndeterminateProgressBar, ScrollArea, FluentIcon
+    IndeterminateProgressBar, ProgressBar, ScrollArea, FluentIcon
 )
 
 from src.gui.views.wizard.widgets.scan_result_card import ScanResultCard
@@ -17,22 +18,49 @@ from src.common.service_bus import service_bus
 from src.gui.i18n import t, get_category_text
 from src.gui.styles import apply_font_style
 
+logger = logging.getLogger(__name__)
+
+# 已脱离对话框、仍在退出中的扫描线程（保持引用直到线程结束，避免运行中被回收）
+_detached_workers = set()
+
 
 class ScanWorker(QThread):
-    """扫描工作线程"""
-    finished = Signal(list)  # discovered templates
-    progress = Signal(str)    # current scanning path
+    """扫描工作线程（流式：每发现一个模板立即通知）"""
+    finished = Signal(list)     # discovered templates
+    progress = Signal(str)      # current scanning path
+    found = Signal(object)      # 单个发现的模板
+    stage = Signal(str, int)    # 阶段状态文本, 总进度百分比
+    cancelled = Signal()
 
     def __init__(self, scanner: SmartScanner):
         super().__init__()
         self.scanner = scanner
+        self.error: Optional[str] = None
         # 绑定扫描器的进度回调到我们的信号
         self.scanner.set_progress_callback(self.progress.emit)
 
     def run(self):
-        """执行扫描"""
-        discovered = self.scanner.scan()
-        self.finished.emit(discovered)
+        """执行扫描（出错时以阶段消息报告，finished 总会发出）"""
+        discovered = []
+        try:
+            for event in self.scanner.iter_scan():
+                if event.kind == "found":
+                    discovered.append(event.template)
+                    self.found.emit(event.template)
+                elif event.kind == "done" and event.cancelled:
+                    self.cancelled.emit()
+                else:
+                    self.stage.emit(event.message, event.percent)
+        except Exception as e:
+            logger.exception("扫描线程异常")
+            self.error = t("wizard.scan_error", error=e)
+            self.stage.emit(self.error, 100)
+        finally:
+            self.finished.emit(discovered)
+
+    def cancel(self):
+        """请求停止扫描（扫描线程在下一个检查点退出）"""
+        self.scanner.cancel()
 
 
 class ImportWorker(QThread):
@@ -53,6 +81,7 @@ class ScanFlowDialog(MessageBoxBase):
     """全流程扫描对话框 - 统一标准版本"""
 
     scan_completed = Signal(int)  # 成功导入的数量
+    scan_progress_changed = Signal(str, int, int)  # 状态文本, 百分比, 已发现数量
 
     def __init__(self, category_manager=None, parent=None):
         super().__init__(parent)
@@ -68,6 +97,7 @@ class ScanFlowDialog(MessageBoxBase):
 
         self.discovered = []
         self.result_cards = {}
+        self.scanWorker = None
 
         self.setWindowTitle("智能扫描")
         self._init_ui()
@@ -123,6 +153,10 @@ class ScanFlowDialog(MessageBoxBase):
         self.result_subtitle = BodyLabel("")
         apply_font_style(self.result_subtitle, size="sm", color="secondary")
 
+        # 结果页的扫描进度（慢速的全盘链接探测在后台继续，期间可先勾选已有结果）
+        self.result_progress = ProgressBar()
+        self.result_progress.setRange(0, 100)
+
         self.scroll_area = ScrollArea()
         self.scroll_area.setWidgetResizable(True)
         self.scroll_area.setFrameShape(ScrollArea.NoFrame)
@@ -141,6 +175,7 @@ class ScanFlowDialog(MessageBoxBase):
 
         result_layout.addLayout(title_row)
         result_layout.addWidget(self.result_subtitle)
+        result_layout.addWidget(self.result_progress)
         result_layout.addWidget(self.scroll_area)
 
         # --- 阶段 3：导入中 UI ---
@@ -178,42 +213,94 @@ class ScanFlowDialog(MessageBoxBase):
         self.widget.setMinimumHeight(600)
 
     def _start_scan(self):
-        """开始执行异步扫描"""
+        """开始执行异步扫描（结果流式追加到列表）"""
         if self.scanner is None:
             return
 
         self.stack.setCurrentIndex(0)
         
         self.scanWorker = ScanWorker(self.scanner)
+        self.scanWorker.found.connect(self._on_template_found)
+        self.scanWorker.stage.connect(self._on_scan_stage)
         self.scanWorker.finished.connect(self._on_scan_finished)
         self.scanWorker.progress.connect(self.statusLabel.setText)
         self.scanWorker.start()
 
+    def _stop_scan(self) -> bool:
+        """请求取消仍在进行的扫描（不阻塞界面），返回扫描线程是否仍在退出中"""
+        if self.scanWorker and self.scanWorker.isRunning():
+            self.scanWorker.cancel()
+            return True
+        return False
+
+    def _detach_scan(self):
+        """断开仍在退出中的扫描线程，由它在后台结束后自行释放"""
+        worker = self.scanWorker
+        if not self._stop_scan():
+            return
+        for signal in (worker.found, worker.stage, worker.finished, worker.progress):
+            signal.disconnect()
+        _detached_workers.add(worker)
+        # finished 在 run() 返回前发出，此时 wait() 只会等待片刻
+        worker.finished.connect(lambda _: (worker.wait(), _detached_workers.discard(worker)))
+        self.scanWorker = None
+
+    def _on_scan_stage(self, message: str, percent: int):
+        """阶段/进度更新"""
+        if message:
+            self.statusLabel.setText(message)
+        self.result_progress.setValue(percent)
+        if self.stack.currentIndex() == 1:
+            self.result_subtitle.setText(
+                t("wizard.scan_streaming", count=len(self.discovered), percent=percent)
+            )
+        self.scan_progress_changed.emit(message, percent, len(self.discovered))
+
+    def _on_template_found(self, template):
+        """发现一个模板：立即追加卡片，首个结果出现时切换到结果页"""
+        if self.stack.currentIndex() == 0:
+            self.stack.setCurrentIndex(1)
+            self.result_title.setText(t("wizard.scan_progress"))
+        self.discovered.append(template)
+
+        # 直接读取模板中的分类全路径名称
+        display_cat_name = template.category_path_name or "未分类"
+
+        card = ScanResultCard(
+            template,
+            category_name=display_cat_name,
+            category_manager=self.category_manager,
+        )
+        card.selected_changed.connect(self._update_selection_count)
+
+        self.list_layout.insertWidget(self.list_layout.count() - 1, card)
+        self.result_cards[template.id] = card
+
+        self.result_subtitle.setText(
+            t("wizard.scan_streaming", count=len(self.discovered), percent=self.result_progress.value())
+        )
+        self._update_selection_count()
+
     def _on_scan_finished(self, discovered):
-        """扫描完成，转换 UI 阶段"""
+        """扫描结束（完成或取消），转换 UI 阶段"""
         self.discovered = discovered
+        # 导入中途停止的扫描不再切回结果页
+        if self.stack.currentIndex() == 2:
+            return
         self.stack.setCurrentIndex(1)
+        self.result_progress.setVisible(False)
 
         # 更新标题
         self.result_title.setText(t("wizard.scan_complete"))
-        self.result_subtitle.setText(t("wizard.scan_complete_detail", count=len(discovered)))
+        if self.scanWorker and self.scanWorker.error:
+            self.result_subtitle.setText(self.scanWorker.error)
+        elif self.scanner.is_cancelled():
+            self.result_subtitle.setText(t("wizard.scan_cancelled", count=len(discovered)))
+        else:
+            self.result_subtitle.setText(t("wizard.scan_complete_detail", count=len(discovered)))
+        self.scan_progress_changed.emit(self.result_subtitle.text(), 100, len(discovered))
 
         if discovered:
-            # 加载卡片
-            for template in discovered:
-                # 直接读取模板中的分类全路径名称
-                display_cat_name = template.category_path_name or "未分类"
-
-                card = ScanResultCard(
-                    template,
-                    category_name=display_cat_name,
-                    category_manager=self.category_manager,
-                )
-                card.selected_changed.connect(self._update_selection_count)
-
-                self.list_layout.insertWidget(self.list_layout.count() - 1, card)
-                self.result_cards[template.id] = card
-
             self._update_selection_count()
         else:
             no_result = BodyLabel("未发现可管理的软件")
@@ -262,13 +349,25 @@ class ScanFlowDialog(MessageBoxBase):
         self.yesButton.setEnabled(False)
         self.cancelButton.setEnabled(False)
 
-        # 开启导入工作线程
+        # 扫描尚未结束时先停止扫描，待其退出后再导入已勾选的结果
+        if self._stop_scan():
+            self.scanWorker.finished.connect(lambda _: self._start_import(selected))
+        else:
+            self._start_import(selected)
+
+        # 返回 False 阻止 MessageBox 立即自动关闭
+        return False
+
+    def _start_import(self, selected: List):
+        """开启导入工作线程"""
         self.import_worker = ImportWorker(self.scanner, selected)
         self.import_worker.finished.connect(self._on_import_finished)
         self.import_worker.start()
 
-        # 返回 False 阻止 MessageBox 立即自动关闭
-        return False
+    def reject(self):
+        """关闭对话框时停止后台扫描（不等待线程退出）"""
+        self._detach_scan()
+        super().reject()
 
     def _on_import_finished(self, count: int):
         """导入完成回调"""
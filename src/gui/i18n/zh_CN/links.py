@@ -10,7 +10,8 @@ LINKS_TEXTS = {
     "batch_establish": "批量建立链接",
     "batch_disconnect": "批量断开链接",
     "batch_remove": "批量移除",
-    "refresh_status": "刷新链接状态",
+    "refresh_status": "刷新链接状态（右键可完整重新统计空间）",
+    "full_recount": "完整重新统计空间",
     "clear_selection": "清除选择",
     "selected_count": "已选择 {count} 项",
 
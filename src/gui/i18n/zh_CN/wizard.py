@@ -22,6 +22,8 @@ WIZARD_TEXTS = {
     "scan_progress": "正在扫描...",
     "scan_progress_detail": "正在扫描本机，请稍候...",
     "scan_progress_count": "正在扫描: {current}/{total}",
+    "scan_streaming": "已发现 {count} 个，继续扫描中 ({percent}%)...",
+    "scan_cancelled": "扫描已取消，已保留 {count} 个结果",
     "scan_complete": "扫描完成",
     "scan_complete_detail": "扫描完成！发现 {count} 个可管理的软件",
     "scan_error": "扫描失败: {error}",
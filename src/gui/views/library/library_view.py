@@ -1,9 +1,9 @@
 import os
 from typing import List, Optional, Set
-from PySide6.QtCore import Qt, Signal, QPoint
+from PySide6.QtCore import Qt, Signal, QPoint, QTimer
 from PySide6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QStackedWidget,
-    QLabel, QFrame, QFileDialog
+    QLabel, QFrame
 )
 from qfluentwidgets import (
     SearchLineEdit, TransparentToolButton, FluentIcon as FIF,
@@ -13,6 +13,7 @@ from src.gui.i18n import t
 # TODO: 通过 app 实例访问 Service
 from src.common.service_bus import service_bus
 from src.common.signals import signal_bus
+from src.common.config import SEARCH_DEBOUNCE_MS
 from src.models import Template, CategoryNode  # 新架构
 from src.gui.components import BasePageView, CategoryTreeWidget, BatchToolbar
 from src.gui.views.library.widgets import TemplateTableWidget
@@ -39,6 +40,12 @@ class LibraryView(BasePageView):
 
         self.current_category_id: Optional[str] = None
 
+        # 搜索防抖：连续输入只在停顿后查询一次
+        self._search_timer = QTimer(self)
+        self._search_timer.setSingleShot(True)
+        self._search_timer.setInterval(SEARCH_DEBOUNCE_MS)
+        self._search_timer.timeout.connect(self._filter_templates)
+
         # 设置页面内容
         self._setup_content()
         self._connect_signals()
@@ -156,15 +163,17 @@ class LibraryView(BasePageView):
         self._filter_templates()
 
     def _on_search_changed(self, text: str):
-        """搜索内容改变回调"""
-        self._filter_templates()
+        """搜索内容改变回调（防抖）"""
+        self._search_timer.start()
 
     def _filter_templates(self):
-        """调用 Service 层执行统一过滤"""
-        search_text = self.search_edit.text()
+        """调用 Service 层执行统一过滤（一次索引查询同时得到模板与命中分类）"""
+        self._search_timer.stop()
+        search_text = self.search_edit.text().strip()
         category_id = self.current_category_id or "all"
 
-        view_models = self.template_service.get_filtered_templates(category_id, search_text)
+        result = self.template_service.search_templates(category_id, search_text)
+        view_models = result.templates
 
         is_leaf = self.category_manager.is_leaf(category_id) if category_id != "all" else False
         allow_ops = (category_id == "all") or is_leaf
@@ -172,13 +181,7 @@ class LibraryView(BasePageView):
         self.template_table.set_templates(view_models, category_id, allow_operations=allow_ops)
 
         if search_text:
-            all_templates = self.template_manager.get_all_templates()
-            matched_categories = set()
-            for tpl in all_templates:
-                if (search_text in tpl.name.lower() or
-                    (tpl.description and search_text in tpl.description.lower())):
-                    matched_categories.add(tpl.category_id)
-            self.category_tree.highlight_categories(matched_categories)
+            self.category_tree.highlight_categories(result.category_ids)
             self.count_label.setText(t("library.stats_search", count=len(view_models)))
         else:
             self.category_tree.clear_highlights()
@@ -361,31 +364,16 @@ class LibraryView(BasePageView):
 
     def _on_export_requested(self):
         """导出请求"""
-        # 选择导出文件夹
-        folder_path = QFileDialog.getExistingDirectory(
-            self,
-            "选择导出文件夹",
-            ""
-        )
-
-        if folder_path:
-            # 自动生成压缩包文件名
-            from datetime import datetime
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            file_name = f"template_export_{timestamp}.zip"
-            file_path = f"{folder_path}/{file_name}"
-
-            # 默认导出所有内容
-            options = {
-                'include_categories': True,
-                'include_templates': True
-            }
-
-            success, msg = self.template_service.export_to_file(file_path, options)
-            if success:
-                InfoBar.success("成功", msg, duration=2000, position='TopCenter', parent=self)
-            else:
-                InfoBar.error("失败", msg, duration=3000, position='TopCenter', parent=self)
+        from src.gui.dialogs import ExportDialog
+        dialog = ExportDialog(self.template_manager, self.category_manager, self)
+        if dialog.exec() and dialog.validate():
+            options = dialog.get_export_options()
+            path = options.pop('file_path', None)
+            if path:
+                success, msg = self.template_service.export_to_file(path, **options)
+                if success:
+                    InfoBar.success("成功", msg, duration=2000, position='TopCenter', parent=self)
+                else: InfoBar.error("失败", msg, duration=3000, position='TopCenter', parent=self)
 
     def _on_import_clicked(self):
         """导入请求"""
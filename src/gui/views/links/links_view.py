@@ -6,14 +6,16 @@ import os
 import typing
 from typing import List, Optional
 from PySide6.QtWidgets import QSplitter, QWidget, QStackedWidget, QVBoxLayout
-from PySide6.QtCore import Qt
+from PySide6.QtCore import Qt, QPoint
 from PySide6 import QtCore
 from qfluentwidgets import (
     PushButton, ToolButton, FluentIcon as FIF, MessageBox,
     InfoBar, Pivot, SearchLineEdit, PrimaryPushButton,
-    TransparentPushButton, StateToolTip, IndeterminateProgressRing
+    TransparentPushButton, StateToolTip, IndeterminateProgressRing,
+    RoundMenu, Action
 )
 from src.gui.common import operation_runner
+from src.gui.common.update_pump import UpdatePump
 from src.gui.i18n import t
 from src.common.service_bus import service_bus
 # TODO: 通过 app 实例访问 Service
@@ -50,7 +52,7 @@ class LinksView(BasePageView):
         self._setup_toolbar()
         self._setup_content()
         self._connect_signals()
-        self._init_throttling()
+        self._init_update_pump()
 
         # 初始化视图状态
         default_view = self.config_service.get_config("default_link_view", "list")
@@ -84,6 +86,9 @@ class LinksView(BasePageView):
         self.refresh_btn = ToolButton(FIF.SYNC)
         self.refresh_btn.setToolTip(t("links.refresh_status"))
         self.refresh_btn.clicked.connect(lambda: self._load_data(refresh_size=True))
+        # 右键菜单：忽略目录指纹全量重算（文件原地增长不会改变目录 mtime）
+        self.refresh_btn.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
+        self.refresh_btn.customContextMenuRequested.connect(self._on_show_refresh_menu)
 
         self.help_btn = ToolButton(FIF.HELP)
         self.help_btn.setToolTip(t("links.status_help_title"))
@@ -95,6 +100,13 @@ class LinksView(BasePageView):
         toolbar.addWidget(self.refresh_btn)
         toolbar.addWidget(self.help_btn)
 
+    def _on_show_refresh_menu(self, pos):
+        """刷新按钮右键菜单"""
+        menu = RoundMenu(parent=self)
+        menu.addAction(Action(FIF.SYNC, t("links.full_recount"), self,
+                              triggered=lambda: self._load_data(refresh_size=True, full_recount=True)))
+        menu.exec(self.refresh_btn.mapToGlobal(QPoint(0, self.refresh_btn.height())), ani=True)
+
     def _setup_content(self):
         """设置主内容区"""
         content_layout = self.get_content_layout()
@@ -106,7 +118,7 @@ class LinksView(BasePageView):
             self.category_manager,
             service_bus.user_manager,
             show_count=True,
-            count_provider=lambda cid: len(self.user_manager.get_links_by_category(cid)) if cid != "all" else len(self.user_manager.get_all_links())
+            count_provider=service_bus.category_stats_service.count
         )
         self.category_tree.setFixedWidth(240)
 
@@ -156,13 +168,20 @@ class LinksView(BasePageView):
         # 全局信号
         signal_bus.data_refreshed.connect(self._load_data)
         signal_bus.config_changed.connect(self._on_config_changed)
+        signal_bus.link_status_changed.connect(self._on_link_status_changed)
 
 
-    def _load_data(self, refresh_size: bool = False):
-        """加载数据"""
-        view_models = self.connection_service.get_all_links(self.current_category_id)
+    def _load_data(self, refresh_size: bool = False, full_recount: bool = False):
+        """加载数据（full_recount: 空间统计不复用目录缓存）"""
+        if self.current_category_id == "all":
+            view_models = self.connection_service.get_all_links()
+        else:
+            # 选中父分类时显示整棵子树下的链接（与分类树上的子树总数一致）
+            category_ids = service_bus.category_service.get_descendant_ids(self.current_category_id)
+            view_models = self.connection_service.get_links_in_categories(category_ids)
         self.category_link_table.load_links(view_models)
         self.list_view.load_links(view_models)
+        self.category_tree.refresh_counts()
 
         # 如果需要彻底刷新（点击同步按钮时）
         if refresh_size and view_models:
@@ -186,61 +205,48 @@ class LinksView(BasePageView):
             self.connection_service.calculate_sizes_async(
                 ids, 
                 self._on_single_size_calculated,
-                self._on_all_sizes_finished
+                self._on_all_sizes_finished,
+                use_cache=not full_recount
             )
 
-    # --- 专题优化：UI 节流更新逻辑 ---
-    def _init_throttling(self):
-        """初始化 UI 刷新节流器"""
-        self._update_queue = [] # [(type, id, data)]
-        self._throttle_timer = QtCore.QTimer(self)
-        self._throttle_timer.setInterval(50) # 缩短至 50ms，提升感知度
-        self._throttle_timer.timeout.connect(self._process_update_batch)
-        self._throttle_timer.start()
-
-    def _process_update_batch(self):
-        """原子化批量处理 UI 信号"""
-        if not self._update_queue: return
-        
-        # 原子交换队列，防止处理期间 append 冲突
-        batch = self._update_queue
-        self._update_queue = []
-        
-        status_updates = {}
+    # --- 专题优化：事件驱动的 UI 批量刷新 ---
+    def _init_update_pump(self):
+        """初始化 UI 更新泵：结果到达时才启动合并窗口，队列清空即停止"""
+        self._update_pump = UpdatePump(self._apply_update_batch, name="LinksView", parent=self)
+
+    def _apply_update_batch(self, batch: dict):
+        """将一批结果（按连接 ID 合并）一次性写入两个视图的模型"""
+        status_updates = batch.get('status', {})
         size_updates = {}
-        
-        for u_type, lid, data in batch:
-            if u_type == 'status': status_updates[lid] = data
-            elif u_type == 'size': size_updates[lid] = data
 
-        # 执行批量 UI 刷新
         from src.common.config import format_size
-        for lid, status in status_updates.items():
-            self.category_link_table.update_row_status(lid, status)
-            if hasattr(self.list_view, 'update_row_status'):
-                self.list_view.update_row_status(lid, status)
-        
-        for lid, size in size_updates.items():
+        for lid, size in batch.get('size', {}).items():
             try:
                 size_val = int(size) if size is not None else 0
                 # 即使是 0 字节也应该格式化显示（如 0 B），而不是显示“未计算”
-                size_text = format_size(size_val)
-                
-                self.category_link_table.update_row_size(lid, size_text)
-                if hasattr(self.list_view, 'update_row_size'):
-                    self.list_view.update_row_size(lid, size_text)
+                size_updates[lid] = format_size(size_val)
             except Exception as e:
                 print(f"渲染组件更新失败 [{lid}]: {e}")
 
+        self.category_link_table.apply_updates(status_updates, size_updates)
+        self.list_view.apply_updates(status_updates, size_updates)
+
     @QtCore.Slot(str, object)
     def _on_single_status_refreshed(self, link_id: str, status: object):
-        """单条状态刷新完成 - 入队节流"""
-        self._update_queue.append(('status', link_id, status))
+        """单条状态刷新完成 - 投递到更新泵"""
+        self._update_pump.post('status', link_id, status)
+
+    @QtCore.Slot(str)
+    def _on_link_status_changed(self, link_id: str):
+        """监听服务检测到状态变化 - 投递到更新泵"""
+        link = self.connection_service.get_link_by_id(link_id)
+        if link:
+            self._update_pump.post('status', link_id, link.status)
 
     @QtCore.Slot(str, object)
     def _on_single_size_calculated(self, link_id: str, size: object):
-        """单行统计完成 - 入队节流"""
-        self._update_queue.append(('size', link_id, size))
+        """单行统计完成 - 投递到更新泵"""
+        self._update_pump.post('size', link_id, size)
 
     @QtCore.Slot(dict)
     def _on_all_sizes_finished(self, results: dict):
@@ -563,7 +569,7 @@ class LinksView(BasePageView):
         def _on_migration_done(success: bool, error_msg: str):
             progress_dialog.close()
             # 弹出结果对话框
-            result_dialog = MigrationResultDialog(success, error_msg, self)
+            result_dialog = MigrationResultDialog(success, error_msg, self, report=migration_service.last_report)
             result_dialog.exec()
             
             if success:
@@ -589,11 +595,11 @@ class LinksView(BasePageView):
             source=source_real,  # 软件路径（现有数据位置）
             target=target_real,  # 库路径（迁移目的地）
             mode="copy",
-            on_progress=progress_dialog.update_progress
+            on_progress=progress_dialog.update_progress,
+            on_eta=progress_dialog.update_eta,
+            cleanup_source=True,  # 开启迁移后的物理清理
+            link={"id": link_id}  # 中断后续传完成时据此建立连接
         )
-        # 开启迁移后的物理清理
-        if migration_service._worker:
-            migration_service._worker.cleanup_source = True
         
         progress_dialog.cancel_requested.connect(migration_service.cancel_migration)
         progress_dialog.exec()
@@ -634,7 +640,7 @@ class LinksView(BasePageView):
             
             progress_dialog.close()
             # 弹出结果对话框
-            result_dialog = MigrationResultDialog(success, error_msg, self)
+            result_dialog = MigrationResultDialog(success, error_msg, self, report=migration_service.last_report)
             result_dialog.exec()
             
             if success:
@@ -694,7 +700,8 @@ class LinksView(BasePageView):
             source=target_real,  # 库路径（现有数据位置）
             target=source_real,  # 软件路径（迁移目的地）
             mode="copy",
-            on_progress=progress_dialog.update_progress
+            on_progress=progress_dialog.update_progress,
+            on_eta=progress_dialog.update_eta
         )
         # 不需要清理源路径（库路径保留数据）
         
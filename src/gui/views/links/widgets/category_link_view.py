@@ -7,6 +7,7 @@ from PySide6.QtCore import Qt, Signal
 from src.gui.components import CategoryTreeWidget
 from src.gui.components.link_table import LinkTable
 from src.common.managers import UserManager
+from src.common.service_bus import service_bus
 from src.common.managers import CategoryManager  # TODO: 迁移到 CategoryService
 
 
@@ -41,7 +42,7 @@ class CategoryLinkView(QWidget):
             self.category_manager,
             self.user_manager,
             show_count=True,
-            count_provider=lambda cid: len(self.user_manager.get_links_by_category(cid)) if cid != "all" else len(self.user_manager.get_all_links())
+            count_provider=service_bus.category_stats_service.count
         )
         splitter.addWidget(self.category_tree)
 
@@ -1,21 +1,16 @@
 """
 列表视图组件 (View A)
-极简风格显示全量连接，支持自定义 Delegate
+极简风格显示全量连接，LinkTableModel + LinkCardDelegate 绘制卡片，不创建逐行控件
 """
-from PySide6.QtWidgets import (
-    QWidget, QVBoxLayout, QHBoxLayout, QListWidget,
-    QListWidgetItem, QStyledItemDelegate, QGraphicsOpacityEffect
-)
-from PySide6.QtCore import Qt, QSize, Signal
-from PySide6.QtGui import QPainter, QIcon
-from qfluentwidgets import BodyLabel, CaptionLabel, TransparentToolButton, FluentIcon, IndeterminateProgressRing
-from src.models import UserLink, LinkStatus  # 新架构
+from PySide6.QtWidgets import QListView, QAbstractItemView
+from PySide6.QtCore import QModelIndex, QRect, QPoint, Signal
+from src.models import LinkStatus  # 新架构
 from src.common.managers import UserManager
-from src.gui.i18n import t, get_category_text
-from src.gui.components.status_badge import StatusBadge
-from src.common.validators import PathValidator
+from src.gui.components.link_model import LinkTableModel, ID_ROLE
+from src.gui.components.link_delegates import LinkCardDelegate, LoadingAnimator
 
-class FlatLinkView(QListWidget):
+
+class FlatLinkView(QListView):
     """智能列表视图 - 极简/宽屏模式"""
 
     link_selected = Signal(list)
@@ -24,22 +19,31 @@ class FlatLinkView(QListWidget):
     def __init__(self, parent=None):
         super().__init__(parent)
         self.user_manager = UserManager()
-        self.loading_ids = set() # 正在计算大小的 ID 集合
+        self.link_model = LinkTableModel(self)
+        self.link_delegate = LinkCardDelegate(self)
+        self.link_delegate.animator = LoadingAnimator(self, self.link_model)
         self._init_ui()
 
+    @property
+    def loading_ids(self) -> set:
+        """正在计算大小的 ID 集合"""
+        return self.link_model.size_loading_ids
+
     def show_loading(self, link_id: str, is_loading: bool):
         """[统一 API] 设置指定 ID 的加载状态"""
-        for i in range(self.count()):
-            item = self.item(i)
-            widget = self.itemWidget(item)
-            if isinstance(widget, LinkItemWidget) and widget.link.id == link_id:
-                widget.set_status_loading(is_loading)
-                break
+        self.link_model.set_status_loading(link_id, is_loading)
 
     def _init_ui(self):
         """初始化 UI"""
         self.setObjectName("FlatLinkView")
+        self.setModel(self.link_model)
+        self.setItemDelegate(self.link_delegate)
+        # 固定行高 72px：视图无需逐行测量
+        self.setUniformItemSizes(True)
         self.setSpacing(8)
+        self.setMouseTracking(True)
+        self.setSelectionMode(QAbstractItemView.SelectionMode.SingleSelection)
+        self.setVerticalScrollMode(QAbstractItemView.ScrollMode.ScrollPerPixel)
         self.setViewportMargins(0, 0, 0, 0)
         self.setStyleSheet("""
             #FlatLinkView {
@@ -59,272 +63,62 @@ class FlatLinkView(QListWidget):
             }
         """)
 
-        # 连接选择变化信号
-        self.itemSelectionChanged.connect(self._on_selection_changed)
+        # 连接信号
+        self.link_delegate.action_triggered.connect(self.action_clicked)
+        self.link_model.dataChanged.connect(self._on_data_changed)
+        self.selectionModel().selectionChanged.connect(self._on_selection_changed)
 
     def load_links(self, links: list):
-        """加载连接列表"""
-        self.clear()
-        for link in links:
-            item = QListWidgetItem(self)
-            item.setSizeHint(QSize(0, 72))  # 固定行高 72px
-            self.addItem(item)
-
-            # 创建自定义小部件
-            widget = LinkItemWidget(link, self)
-            widget.action_clicked.connect(self.action_clicked.emit)
-            self.setItemWidget(item, widget)
-            
-            # 恢复加载状态
-            if link.id in self.loading_ids:
-                widget.set_size_loading(True)
+        """加载连接列表（整表替换模型数据）"""
+        self.link_model.set_links(links)
 
     def set_all_sizes_loading(self):
         """全量设置空间大小加载状态"""
-        for i in range(self.count()):
-            item = self.item(i)
-            widget = self.itemWidget(item)
-            if isinstance(widget, LinkItemWidget):
-                self.loading_ids.add(widget.link.id) # 这里 loading_ids 语义保持计算大小
-                widget.set_size_loading(True)
+        self.link_model.set_all_sizes_loading()
 
     def set_all_status_loading(self):
         """全量设置状态探测加载状态"""
-        for i in range(self.count()):
-            item = self.item(i)
-            widget = self.itemWidget(item)
-            if isinstance(widget, LinkItemWidget):
-                widget.set_status_loading(True)
+        self.link_model.set_all_status_loading()
 
     def update_row_status(self, link_id: str, status: LinkStatus):
         """同步更新探测状态"""
-        for i in range(self.count()):
-            item = self.item(i)
-            widget = self.itemWidget(item)
-            if isinstance(widget, LinkItemWidget) and widget.link.id == link_id:
-                widget.set_status_loading(False)  # 【关键】先停止加载动画
-                widget.update_status(status)
-                break
+        self.link_model.update_status(link_id, status)
 
     def update_row_size(self, link_id: str, size_text: str):
         """更新单行大小"""
-        if link_id in self.loading_ids:
-            self.loading_ids.remove(link_id)
-        
-        for i in range(self.count()):
-            item = self.item(i)
-            widget = self.itemWidget(item)
-            if isinstance(widget, LinkItemWidget):
-                if widget.link.id == link_id:
-                    widget.set_size_loading(False)
-                    widget.update_size_info(size_text)
-                    break
+        self.link_model.update_size(link_id, size_text)
+
+    def apply_updates(self, statuses: dict, sizes: dict):
+        """批量更新状态与空间（一次模型通知，一次重绘）"""
+        self.link_model.apply_updates(statuses, sizes)
+
+    def _on_data_changed(self, top_left, bottom_right, roles=None):
+        """列表只显示第 0 列，其他列的变化映射为对应卡片（整行）的重绘"""
+        if top_left.row() == bottom_right.row():
+            self.update(self.link_model.index(top_left.row(), 0))
+        else:
+            self.viewport().update()
 
     def clear_selection(self):
         """清除选择"""
         self.clearSelection()
 
-    def _on_selection_changed(self):
+    def _on_selection_changed(self, *args):
         """处理选择变化并发出业务信号"""
-        selected_ids = []
-        for item in self.selectedItems():
-            widget = self.itemWidget(item)
-            if isinstance(widget, LinkItemWidget):
-                selected_ids.append(widget.link.id)
-        self.link_selected.emit(selected_ids)
+        self.link_selected.emit(self.get_selected_links())
 
     def get_selected_links(self) -> list:
         """获取当前选中的连接 ID 列表"""
-        selected_ids = []
-        for item in self.selectedItems():
-            widget = self.itemWidget(item)
-            if isinstance(widget, LinkItemWidget):
-                selected_ids.append(widget.link.id)
-        return selected_ids
-
-class LinkItemWidget(QWidget):
-    """列表项小部件"""
-    action_clicked = Signal(str, str)
-
-    def __init__(self, link: UserLink, parent=None):
-        super().__init__(parent)
-        self.link = link
-        # 实时标准化路径显示
-        self.display_path = PathValidator().normalize(self.link.target_path)
-        self._init_ui()
-
-    def _init_ui(self):
-        layout = QHBoxLayout(self)
-        layout.setContentsMargins(16, 8, 16, 8)
-        layout.setSpacing(12)
-
-        # 图标
-        icon_btn = TransparentToolButton(FluentIcon.APPLICATION, self)
-        icon_btn.setIconSize(QSize(32, 32))
-        layout.addWidget(icon_btn)
-
-        # 信息区
-        info_layout = QVBoxLayout()
-        info_layout.setSpacing(4)
-
-        # 第一行：名称 + 分类
-        title_layout = QHBoxLayout()
-        self.name_label = BodyLabel(self.link.name, self)
-
-        # 优先使用全路径名称 (尝试引用 ViewModel 的 category_path 或 DataModel 的 category_path_name)
-        full_path = getattr(self.link, 'category_path', "") or getattr(self.link, 'category_path_name', "")
-        cat_name = full_path or get_category_text(self.link.category)
-        self.category_label = CaptionLabel(cat_name, self)
-
-        # 设置分类全路径 Tooltip
-        if full_path:
-            self.category_label.setToolTip(full_path)
-        else:
-            self.category_label.setToolTip(get_category_text(self.link.category))
-
-        # 使用 QGraphicsOpacityEffect 实现透明度
-        op = QGraphicsOpacityEffect(self.category_label)
-        op.setOpacity(0.7)
-        self.category_label.setGraphicsEffect(op)
-
-        title_layout.addWidget(self.name_label)
-        title_layout.addSpacing(4)
-        title_layout.addWidget(self.category_label)
-        title_layout.addStretch()
-
-        # 第二行：路径
-        self.path_label = CaptionLabel(self.display_path, self)
-        self.path_label.setToolTip(self.display_path)
-
-        path_op = QGraphicsOpacityEffect(self.path_label)
-        path_op.setOpacity(0.6)
-        self.path_label.setGraphicsEffect(path_op)
-
-        info_layout.addLayout(title_layout)
-        info_layout.addWidget(self.path_label)
-        layout.addLayout(info_layout)
-
-        layout.addStretch(1)
-
-        # 🆕 空间占用显示区 (调整至状态左侧)
-        self.size_container = QWidget(self)
-        size_layout = QHBoxLayout(self.size_container)
-        size_layout.setContentsMargins(0, 0, 0, 0)
-        size_layout.setSpacing(4)
-
-        self.size_label = CaptionLabel("", self.size_container)
-        self.size_label.setStyleSheet("color: palette(highlight); font-weight: bold;")
-        
-        self.size_loading_ring = IndeterminateProgressRing(self.size_container)
-        self.size_loading_ring.setFixedSize(14, 14)
-        self.size_loading_ring.setStrokeWidth(2)
-        self.size_loading_ring.stop()  # 【关键】初始化时停止动画
-        
-        size_layout.addWidget(self.size_label)
-        size_layout.addWidget(self.size_loading_ring)
-        layout.addWidget(self.size_container)
-
-        self.size_label.setVisible(False)
-        self.size_loading_ring.setVisible(False)
-        self.size_container.setVisible(False)
-
-        # 状态徽章 (标准可视化组件)
-        self.status_badge = StatusBadge(self.link.status, self)
-        layout.addWidget(self.status_badge)
-
-        # 🆕 状态加载环 (放在徽章位置)
-        self.status_loading_ring = IndeterminateProgressRing(self)
-        self.status_loading_ring.setFixedSize(16, 16)
-        self.status_loading_ring.setStrokeWidth(2)
-        self.status_loading_ring.stop()  # 【关键】初始化时停止动画
-        self.status_loading_ring.setVisible(False)
-        layout.addWidget(self.status_loading_ring)
-
-        # 操作按钮组
-        self.setup_actions(layout)
-
-        # 🆕 [核心修复] 初始化时自动回填已有的空间数据
-        if self.link.last_known_size > 0:
-            from src.common.config import format_size
-            self.update_size_info(format_size(self.link.last_known_size))
-
-    def set_size_loading(self, is_loading: bool):
-        """切换空间计算加载状态"""
-        if is_loading:
-            self.size_container.setVisible(True)
-            self.size_label.setVisible(False)  # 加载时隐藏数值
-            self.size_loading_ring.start()  # 【关键】启动动画
-            self.size_loading_ring.setVisible(True)
-        else:
-            # 停止加载时只停止圆圈，不要隐藏 label（由 update_size_info 控制）
-            self.size_loading_ring.stop()  # 【关键】停止动画
-            self.size_loading_ring.setVisible(False)
-
-    def set_status_loading(self, is_loading: bool):
-        """切换状态探测加载状态"""
-        if is_loading:
-            self.status_loading_ring.start()  # 【关键】启动动画
-            self.status_loading_ring.setVisible(True)
-            self.status_badge.setVisible(False)  # 加载时隐藏徽章
-        else:
-            # 停止加载时只停止圆圈，不要显示 badge（由 update_status 控制）
-            self.status_loading_ring.stop()  # 【关键】停止动画
-            self.status_loading_ring.setVisible(False)
-
-    def update_status(self, status: LinkStatus):
-        """更新并显示状态"""
-        print(f"[DEBUG] update_status called for {self.link.name}, status={status}")
-        print(f"[DEBUG] Before stop: status_ring visible={self.status_loading_ring.isVisible()}")
-        
-        # 【强制修复】彻底停止并隐藏加载圆圈
-        self.status_loading_ring.stop()
-        self.status_loading_ring.setVisible(False)
-        self.status_loading_ring.hide()  # 额外调用 hide()
-        
-        # 更新并显示状态徽章
-        self.status_badge.update_status(status)
-        self.status_badge.setVisible(True)
-        self.status_badge.show()  # 额外调用 show()
-
-    def update_size_info(self, size_text: str):
-        """彽底停止动画并显示数值"""
-        
-        # 1. 【关键】停止动画
-        self.size_loading_ring.stop()
-        self.size_loading_ring.setVisible(False)
-        
-        # 2. 设置并显示数值
-        self.size_label.setText(size_text)
-        self.size_label.setVisible(True)
-        
-        # 4. 最后重新显示容器（此时只有数值可见）
-        self.size_container.setVisible(True)
-        
-
-    def setup_actions(self, layout):
-        """根据状态设置操作按钮"""
-        # 建立连接：适用于“未连接”、“就绪”、“失效/异常”状态
-        if self.link.status in [LinkStatus.DISCONNECTED, LinkStatus.READY, LinkStatus.INVALID]:
-            btn = TransparentToolButton(FluentIcon.PLAY_SOLID, self)
-            btn.setToolTip("建立连接")
-            btn.clicked.connect(lambda: self.action_clicked.emit(self.link.id, "establish"))
-            layout.addWidget(btn)
-
-        # 断开连接：仅适用于“已连接”状态
-        elif self.link.status == LinkStatus.CONNECTED:
-            btn = TransparentToolButton(FluentIcon.CLOSE, self)
-            btn.setToolTip("断开连接")
-            btn.clicked.connect(lambda: self.action_clicked.emit(self.link.id, "disconnect"))
-            layout.addWidget(btn)
-
-        # 编辑按钮
-        edit_btn = TransparentToolButton(FluentIcon.EDIT, self)
-        edit_btn.setToolTip("编辑记录")
-        edit_btn.clicked.connect(lambda: self.action_clicked.emit(self.link.id, "edit"))
-        layout.addWidget(edit_btn)
-
-        # 更多/删除按钮
-        del_btn = TransparentToolButton(FluentIcon.DELETE, self)
-        del_btn.setToolTip("移除记录")
-        del_btn.clicked.connect(lambda: self.action_clicked.emit(self.link.id, "delete"))
-        layout.addWidget(del_btn)
+        return [index.data(ID_ROLE) for index in self.selectionModel().selectedIndexes()]
+
+    def mouseMoveEvent(self, e):
+        super().mouseMoveEvent(e)
+        pos = e.position().toPoint()
+        index = self.indexAt(pos)
+        if self.link_delegate.update_hover(index, self.visualRect(index), pos):
+            self.viewport().update()
+
+    def leaveEvent(self, e):
+        super().leaveEvent(e)
+        if self.link_delegate.update_hover(QModelIndex(), QRect(), QPoint()):
+            self.viewport().update()
@@ -19,6 +19,7 @@ from src.gui.views.settings.widgets.startup_card import StartupCard
 from src.gui.views.settings.widgets.link_view_card import LinkViewCard
 from src.gui.views.settings.widgets.target_root_card import TargetRootCard
 from src.gui.views.settings.widgets.log_folder_card import LogFolderCard
+from src.gui.views.settings.widgets.migration_verify_card import MigrationVerifyCard
 from src.gui.views.settings.widgets.restore_config_cards import (
     RestoreConfigCard, RestoreCategoriesCard, RestoreTemplatesCard
 )
@@ -69,6 +70,10 @@ class SettingView(BasePageView):
         self.targetRootCard = TargetRootCard(self.config_service, self.dirGroup)
         self.dirGroup.addSettingCard(self.targetRootCard)
 
+        # 迁移校验
+        self.migrationVerifyCard = MigrationVerifyCard(self.config_service, self.dirGroup)
+        self.dirGroup.addSettingCard(self.migrationVerifyCard)
+
         # 打开日志文件夹
         self.logFolderCard = LogFolderCard(self.dirGroup)
         self.dirGroup.addSettingCard(self.logFolderCard)
@@ -0,0 +1,25 @@
+# coding:utf-8
+from qfluentwidgets import SwitchSettingCard, FluentIcon, ConfigItem, BoolValidator
+
+class MigrationVerifyCard(SwitchSettingCard):
+    """ 迁移校验设置卡片 """
+
+    def __init__(self, config_service, parent=None):
+        self.config_service = config_service
+
+        # 创建一个虚拟的 ConfigItem 用于绑定
+        config_item = ConfigItem("Migration", "Verify", False, BoolValidator())
+
+        super().__init__(
+            icon=FluentIcon.CERTIFICATE,
+            title="迁移时校验数据",
+            content="复制的同时计算 SHA256 摘要，大文件回读目标端比对，并生成校验清单",
+            configItem=config_item,
+            parent=parent
+        )
+
+        # 初始化值
+        self.setChecked(self.config_service.get_migration_verify())
+
+        # 连接信号
+        self.checkedChanged.connect(self.config_service.set_migration_verify)
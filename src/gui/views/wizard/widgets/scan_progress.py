@@ -177,6 +177,24 @@ class ScanProgressCard(CardWidget):
                 t("wizard.scan_progress_count", current=current, total=total)
             )
 
+    def update_stage(self, message: str, percent: int, discovered_count: int):
+        """
+        流式扫描进度
+
+        Args:
+            message: 当前阶段状态文本
+            percent: 总进度百分比
+            discovered_count: 目前已发现的软件数量
+        """
+        self.discovered_count = discovered_count
+        self.progress_bar.setRange(0, 100)
+        self.progress_bar.setValue(percent)
+        self.progress_label.setText(
+            t("wizard.scan_streaming", count=discovered_count, percent=percent)
+        )
+        if message:
+            self.status_label.setText(f"🔵 {message}")
+
     def scan_finished(self, discovered_count: int, selected_count: int):
         """
         扫描完成
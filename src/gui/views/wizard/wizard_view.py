@@ -80,6 +80,9 @@ class WizardView(BasePageView):
         """开始扫描"""
         from src.gui.dialogs import ScanFlowDialog
         dialog = ScanFlowDialog(self.category_manager, self)
+        # 扫描结果在对话框中流式出现，进度卡片同步显示阶段与已发现数量
+        self.scan_progress.start_scanning()
+        dialog.scan_progress_changed.connect(self.scan_progress.update_stage)
         if dialog.exec():
             # 通知链接列表刷新
             signal_bus.data_refreshed.emit()
@@ -4,5 +4,7 @@ from .template_service import TemplateService
 from .link_service import LinkService
 from .category_service import CategoryService
 from .config_service import ConfigService
+from .watch_service import LinkWatchService
+from .category_stats_service import CategoryStatsService
 
-__all__ = ['TemplateService', 'LinkService', 'CategoryService', 'ConfigService']
+__all__ = ['TemplateService', 'LinkService', 'CategoryService', 'ConfigService', 'LinkWatchService', 'CategoryStatsService']
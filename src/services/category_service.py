@@ -1,38 +1,177 @@
 # coding: utf-8
 """分类服务层"""
-from typing import List, Optional
+import copy
+import os
+import threading
+from typing import Dict, Iterable, List, Optional, Set
 from src.models.category import CategoryNode
 from src.dao.category_dao import CategoryDAO
 
 
+# 经任一 CategoryService 实例写入的次数：写入后各实例的层级索引随之失效
+# （SQLite 后端没有可比对的文件 mtime，靠它感知其他实例的写入）
+_write_generation = 0
+
+
+def _bump_generation():
+    global _write_generation
+    _write_generation += 1
+
+
+class CategoryHierarchy:
+    """
+    分类层级索引（构建后只读）
+
+    - parent -> children 邻接表（子节点已按 order 排序）
+    - 每个节点的深度（根为 0）
+    - 先序遍历区间 [enter, exit)：Y 的子孙（含自身）恰为 enter 落在 Y 区间内的节点，
+      "X 是否为 Y 的后代" 只需一次整数比较
+    """
+
+    def __init__(self, categories: Iterable[CategoryNode]):
+        self.nodes: Dict[str, CategoryNode] = {c.id: c for c in categories}
+        self.children: Dict[Optional[str], List[CategoryNode]] = {}
+        for c in self.nodes.values():
+            # 父节点缺失的分类视为根节点
+            parent_id = c.parent_id if c.parent_id in self.nodes else None
+            self.children.setdefault(parent_id, []).append(c)
+        for siblings in self.children.values():
+            siblings.sort(key=lambda c: c.order)
+
+        self.depth: Dict[str, int] = {}
+        self._enter: Dict[str, int] = {}
+        self._exit: Dict[str, int] = {}
+        self.preorder: List[str] = []  # 先序遍历的分类 ID
+        self._build_intervals()
+
+    def _build_intervals(self):
+        # 迭代先序遍历：出栈时记录 enter，子树全部出栈后回填 exit
+        stack = [(c, 0, False) for c in reversed(self.children.get(None, []))]
+        while stack:
+            node, depth, done = stack.pop()
+            if done:
+                self._exit[node.id] = len(self.preorder)
+                continue
+            if node.id in self._enter:  # 数据异常（父子成环）时避免重复访问
+                continue
+            self._enter[node.id] = len(self.preorder)
+            self.preorder.append(node.id)
+            self.depth[node.id] = depth
+            stack.append((node, depth, True))
+            stack.extend((child, depth + 1, False) for child in reversed(self.children.get(node.id, [])))
+
+    def roots(self) -> List[CategoryNode]:
+        return self.children.get(None, [])
+
+    def get_children(self, parent_id: Optional[str]) -> List[CategoryNode]:
+        return self.children.get(parent_id, [])
+
+    def is_leaf(self, category_id: str) -> bool:
+        return not self.children.get(category_id)
+
+    def is_descendant(self, category_id: str, ancestor_id: str, include_self: bool = True) -> bool:
+        """category_id 是否位于 ancestor_id 的子树中"""
+        enter = self._enter.get(category_id)
+        start = self._enter.get(ancestor_id)
+        if enter is None or start is None:
+            return include_self and category_id == ancestor_id
+        if not include_self and enter == start:
+            return False
+        return start <= enter < self._exit[ancestor_id]
+
+    def descendant_ids(self, category_id: str, include_self: bool = True) -> Set[str]:
+        """子树内全部分类 ID（先序区间切片，O(子树大小)）"""
+        start = self._enter.get(category_id)
+        if start is None:
+            return {category_id} if include_self else set()
+        ids = set(self.preorder[start:self._exit[category_id]])
+        if not include_self:
+            ids.discard(category_id)
+        return ids
+
+
 class CategoryService:
     def __init__(self, dao: CategoryDAO):
         self.dao = dao
+        self._lock = threading.RLock()
+        self._hierarchy: Optional[CategoryHierarchy] = None
+        self._hierarchy_sig = None
+
+    # ---------- 层级索引 ----------
+
+    def _source_sig(self):
+        """索引有效性签名：分类文件 (mtime_ns, size) + 进程内写入代数"""
+        config_file = getattr(self.dao, 'config_file', None)
+        file_sig = None
+        if config_file:
+            try:
+                st = os.stat(config_file)
+                file_sig = (st.st_mtime_ns, st.st_size)
+            except OSError:
+                pass
+        return file_sig, _write_generation
+
+    def get_hierarchy(self) -> CategoryHierarchy:
+        """当前分类层级索引（文件被外部修改或经服务写入后自动重建）"""
+        with self._lock:
+            sig = self._source_sig()
+            if self._hierarchy is None or sig != self._hierarchy_sig:
+                self._hierarchy = CategoryHierarchy(self.dao.get_all())
+                self._hierarchy_sig = sig
+            return self._hierarchy
+
+    def invalidate(self):
+        with self._lock:
+            self._hierarchy = None
+
+    # ---------- 查询（返回副本，调用方可自由修改后再经 update_category 写回） ----------
 
     def get_all_categories(self) -> List[CategoryNode]:
-        return self.dao.get_all()
+        return [copy.copy(c) for c in self.get_hierarchy().nodes.values()]
 
     def get_category_by_id(self, category_id: str) -> Optional[CategoryNode]:
-        return self.dao.get_by_id(category_id)
+        node = self.get_hierarchy().nodes.get(category_id)
+        return copy.copy(node) if node is not None else None
 
     def get_category_tree(self) -> List[CategoryNode]:
-        all_cats = self.dao.get_all()
-        roots = [c for c in all_cats if c.parent_id is None]
-        return roots
+        hierarchy = self.get_hierarchy()
+        return [copy.copy(c) for c in hierarchy.nodes.values() if c.parent_id is None]
 
     def get_children(self, parent_id: Optional[str]) -> List[CategoryNode]:
-        all_cats = self.dao.get_all()
-        return [c for c in all_cats if c.parent_id == parent_id]
+        if parent_id is None:
+            return self.get_category_tree()
+        return [copy.copy(c) for c in self.get_hierarchy().get_children(parent_id)]
 
     def is_leaf(self, category_id: str) -> bool:
-        children = self.get_children(category_id)
-        return len(children) == 0
+        return self.get_hierarchy().is_leaf(category_id)
+
+    def get_descendant_ids(self, category_id: str, include_self: bool = True) -> Set[str]:
+        """分类子树内的全部分类 ID，供递归过滤做集合成员判断"""
+        return self.get_hierarchy().descendant_ids(category_id, include_self)
+
+    def is_descendant(self, category_id: str, ancestor_id: str, include_self: bool = True) -> bool:
+        return self.get_hierarchy().is_descendant(category_id, ancestor_id, include_self)
+
+    def get_depth(self, category_id: str) -> int:
+        """分类深度（根为 0，未知分类返回 -1）"""
+        return self.get_hierarchy().depth.get(category_id, -1)
+
+    # ---------- 写入（写入后索引失效） ----------
 
     def add_category(self, category: CategoryNode) -> bool:
-        return self.dao.add(category)
+        try:
+            return self.dao.add(category)
+        finally:
+            _bump_generation()
 
     def update_category(self, category: CategoryNode) -> bool:
-        return self.dao.update(category)
+        try:
+            return self.dao.update(category)
+        finally:
+            _bump_generation()
 
     def delete_category(self, category_id: str) -> bool:
-        return self.dao.delete(category_id)
+        try:
+            return self.dao.delete(category_id)
+        finally:
+            _bump_generation()
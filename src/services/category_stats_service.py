@@ -0,0 +1,152 @@
+# coding: utf-8
+"""
+分类统计服务
+
+分类结构取自 CategoryService 的层级索引（邻接表 + 先序区间），一次遍历链接统计各分类的
+直属链接数，再自底向上累加出子树总数。链接增删与换分类时按差量更新计数（只沿祖先链修正），
+分类树组件据此取结构与数量，不再逐节点读取 categories.json / links.json。
+"""
+import threading
+from typing import Dict, Iterable, List, Optional
+from src.models.category import CategoryNode
+from src.models.link import UserLink
+from src.services.category_service import CategoryService, CategoryHierarchy
+from src.services.link_service import LinkService, add_link_change_listener
+
+
+_MISSING = object()  # 区分“未记录”与分类为 None 的链接
+
+
+class CategoryStatsService:
+    """分类结构与链接数量统计"""
+
+    def __init__(self, category_service: CategoryService, link_service: LinkService):
+        self.category_service = category_service
+        self.link_service = link_service
+        self._lock = threading.RLock()
+
+        # 分类结构取自 CategoryService 的层级索引；索引重建后子树总数随之重算
+        self._hierarchy: Optional[CategoryHierarchy] = None
+
+        # 链接计数（懒加载）
+        self._counts_ready = False
+        self._link_category: Dict[str, Optional[str]] = {}  # link_id -> category
+        self._direct: Dict[Optional[str], int] = {}
+        self._subtree: Dict[str, int] = {}
+
+        add_link_change_listener(self._on_links_changed)
+
+    # ---------- 失效 ----------
+
+    def invalidate(self):
+        """分类与链接数据整体变化（恢复配置、切换存储后端等）：下次访问时重建"""
+        with self._lock:
+            self.category_service.invalidate()
+            self._counts_ready = False
+
+    def invalidate_categories(self):
+        """分类结构变化：重建层级索引，子树总数随之重算（直属计数保持不变）"""
+        with self._lock:
+            self.category_service.invalidate()
+
+    # ---------- 构建 ----------
+
+    def _ensure_tree(self) -> CategoryHierarchy:
+        hierarchy = self.category_service.get_hierarchy()
+        if hierarchy is not self._hierarchy:
+            self._hierarchy = hierarchy
+            if self._counts_ready:
+                self._rebuild_subtree()
+        return hierarchy
+
+    def _ensure_counts(self):
+        self._ensure_tree()
+        if self._counts_ready:
+            return
+        self._link_category = {}
+        self._direct = {}
+        for link in self.link_service.get_all_links():
+            self._link_category[link.id] = link.category
+            self._direct[link.category] = self._direct.get(link.category, 0) + 1
+        self._rebuild_subtree()
+        self._counts_ready = True
+
+    def _rebuild_subtree(self):
+        """逆先序遍历（子节点总在父节点之后）一次累加出子树总数"""
+        hierarchy = self._hierarchy
+        subtree: Dict[str, int] = {}
+        for cid in reversed(hierarchy.preorder):
+            subtree[cid] = self._direct.get(cid, 0) + sum(
+                subtree[child.id] for child in hierarchy.get_children(cid)
+            )
+        self._subtree = subtree
+
+    # ---------- 结构查询 ----------
+
+    def get_roots(self) -> List[CategoryNode]:
+        with self._lock:
+            return list(self._ensure_tree().roots())
+
+    def get_children(self, category_id: Optional[str]) -> List[CategoryNode]:
+        with self._lock:
+            return list(self._ensure_tree().get_children(category_id))
+
+    def is_leaf(self, category_id: str) -> bool:
+        with self._lock:
+            return self._ensure_tree().is_leaf(category_id)
+
+    # ---------- 数量查询 ----------
+
+    def direct_count(self, category_id: Optional[str]) -> int:
+        """直属于该分类的链接数"""
+        with self._lock:
+            self._ensure_counts()
+            return self._direct.get(category_id, 0)
+
+    def subtree_count(self, category_id: str) -> int:
+        """该分类及其所有子孙分类下的链接数"""
+        with self._lock:
+            self._ensure_counts()
+            return self._subtree.get(category_id, self._direct.get(category_id, 0))
+
+    def total_count(self) -> int:
+        with self._lock:
+            self._ensure_counts()
+            return len(self._link_category)
+
+    def count(self, category_id: str) -> int:
+        """分类树显示用数量："all" 为全部链接，其余为子树总数"""
+        return self.total_count() if category_id == "all" else self.subtree_count(category_id)
+
+    # ---------- 差量更新 ----------
+
+    def _on_links_changed(self, upserted: Iterable[UserLink], removed_ids: Iterable[str]):
+        """链接新增/更新/删除回调（由 LinkService 触发）"""
+        with self._lock:
+            if not self._counts_ready:
+                return
+            for link in upserted:
+                old = self._link_category.get(link.id, _MISSING)
+                if old is not _MISSING and old == link.category:
+                    continue
+                if old is not _MISSING:
+                    self._adjust(old, -1)
+                self._link_category[link.id] = link.category
+                self._adjust(link.category, 1)
+            for lid in removed_ids:
+                old = self._link_category.pop(lid, _MISSING)
+                if old is not _MISSING:
+                    self._adjust(old, -1)
+
+    def _adjust(self, category_id: Optional[str], delta: int):
+        """修正直属计数，并沿祖先链修正子树总数"""
+        self._direct[category_id] = self._direct.get(category_id, 0) + delta
+        nodes = self._hierarchy.nodes
+        node = nodes.get(category_id)
+        seen = set()
+        while node is not None and node.id not in seen:
+            seen.add(node.id)
+            if node.id in self._subtree:
+                self._subtree[node.id] += delta
+            node = nodes.get(node.parent_id)
+
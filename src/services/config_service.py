@@ -11,7 +11,9 @@ from src.common.config import (
     DEFAULT_THEME_COLOR,
     DEFAULT_STARTUP_PAGE,
     DEFAULT_LINK_VIEW,
-    DEFAULT_TARGET_ROOT
+    DEFAULT_TARGET_ROOT,
+    DEFAULT_STORAGE_BACKEND,
+    DEFAULT_MIGRATION_VERIFY
 )
 
 
@@ -102,3 +104,19 @@ class ConfigService:
     def set_transparency(self, enabled: bool) -> bool:
         """设置窗口透明度"""
         return self.set_config("transparency", enabled)
+
+    def get_storage_backend(self) -> str:
+        """获取存储后端（json / sqlite），重启后生效"""
+        return self.get_config("storage_backend", DEFAULT_STORAGE_BACKEND)
+
+    def set_storage_backend(self, backend: str) -> bool:
+        """设置存储后端"""
+        return self.set_config("storage_backend", backend)
+
+    def get_migration_verify(self) -> bool:
+        """获取迁移校验模式（边复制边计算摘要）"""
+        return self.get_config("migration_verify", DEFAULT_MIGRATION_VERIFY)
+
+    def set_migration_verify(self, enabled: bool) -> bool:
+        """设置迁移校验模式"""
+        return self.set_config("migration_verify", enabled)
@@ -8,10 +8,31 @@ import sys
 import time
 import subprocess
 import concurrent.futures
-from typing import List, Optional, Callable
+from typing import List, Optional, Callable, Set
 from PySide6.QtCore import QThread, Signal, QObject
 from src.models.link import UserLink, LinkStatus
 from src.dao.link_dao import LinkDAO
+from src.drivers.fs import probe_path
+
+# 后台刷新结果分块写回的条数：既避免逐条落盘，也避免长任务中途丢失全部结果
+WRITE_BACK_CHUNK = 200
+
+# 链接增删改监听者（进程内所有 LinkService 实例共享）：callback(upserted_links, removed_ids)
+_change_listeners: List[Callable] = []
+
+
+def add_link_change_listener(callback: Callable):
+    """订阅链接的新增/更新/删除（仅在写入成功后通知，用于维护派生统计）"""
+    if callback not in _change_listeners:
+        _change_listeners.append(callback)
+
+
+def _notify_links_changed(upserted: List[UserLink] = (), removed_ids: List[str] = ()):
+    for callback in list(_change_listeners):
+        try:
+            callback(upserted, removed_ids)
+        except Exception as e:
+            print(f"[Error] 链接变更通知失败: {e}")
 
 class ServiceWorker(QObject):
     """通用服务 Worker - 增强型：支持中断与实时日志"""
@@ -22,74 +43,59 @@ class ServiceWorker(QObject):
         super().__init__(parent)
         self.is_aborted = False # 取消标志位
 
-    def calculate_sizes(self, link_ids: List[str], dao: LinkDAO):
-        """[专题重组] 极速并发空间统计"""
+    def calculate_sizes(self, link_ids: List[str], dao: LinkDAO, use_cache: bool = True):
+        """[专题重组] 极速并发空间统计（use_cache=False 时忽略目录指纹全量重算，可发现文件原地增长）"""
         results = {}
         all_links = dao.get_all()
         link_map = {l.id: l for l in all_links}
         total_tasks = len(link_ids)
         state = {'completed': 0}
+        pending = {}  # link_id -> {'last_known_size': size}，累积后批量写回
         
         print(f"\n>>>> [Space Audit] 启动, 共 {total_tasks} 任务 <<<<")
         sys.stdout.flush()
 
-        def _get_folder_size(path):
-            if self.is_aborted: return 0
-            total = 0
-            try:
-                with os.scandir(path) as it:
-                    for entry in it:
-                        if self.is_aborted: break
-                        try:
-                            if entry.is_file(follow_symlinks=False):
-                                total += entry.stat(follow_symlinks=False).st_size
-                            elif entry.is_dir(follow_symlinks=False):
-                                total += _get_folder_size(entry.path)
-                        except: continue
-            except: pass
-            return total
-
-        def _get_size(lid):
-            if self.is_aborted: return lid, 0
+        from src.drivers.size_cache import get_size_cache
+        from src.common.config import format_size
+        size_cache = get_size_cache()
+
+        def _on_size(lid, size):
+            state['completed'] += 1
+            results[lid] = size
+
+            if lid in link_map:
+                pending[lid] = {'last_known_size': size}
+                if len(pending) >= WRITE_BACK_CHUNK:
+                    self._write_back(dao, pending)
+
+            self.item_finished.emit(lid, size)
+
+            progress = (state['completed'] / total_tasks) * 100
+            name = link_map.get(lid).name if lid in link_map else "Unknown"
+            sys.stdout.write(f"\r[Audit] {progress:3.0f}% | 处理中: {name[:20]:<20} | {format_size(size):>10}")
+            sys.stdout.flush()
+
+        # 按源路径归并任务；无效链接直接记 0
+        path_to_ids = {}
+        for lid in link_ids:
             link = link_map.get(lid)
-            if not link: return lid, 0
-            
-            total = 0
-            try:
-                path = link.source_path
-                if os.path.exists(path):
-                    if os.path.isfile(path):
-                        total = os.path.getsize(path)
-                    else:
-                        total = _get_folder_size(path)
-            except: pass
-            return lid, total
-
-        with concurrent.futures.ThreadPoolExecutor(max_workers=min(len(link_ids), 8)) as executor:
-            future_to_id = {executor.submit(_get_size, lid): lid for lid in link_ids}
-            for future in concurrent.futures.as_completed(future_to_id):
+            if link and link.source_path:
+                path_to_ids.setdefault(link.source_path, []).append(lid)
+            else:
+                _on_size(lid, 0)
+
+        # 所有链接的子目录进入同一个共享遍历队列：单个巨型链接同样按线程池并行展开，
+        # 目录指纹未变的子树直接复用持久化缓存，不再枚举文件
+        try:
+            for path, size, _ in size_cache.iter_stats(path_to_ids, is_aborted=lambda: self.is_aborted,
+                                                       use_cache=use_cache):
                 if self.is_aborted: break
-                
-                state['completed'] += 1
-                try:
-                    lid, size = future.result()
-                    results[lid] = size
-                    
-                    if lid in link_map:
-                        link = link_map[lid]
-                        link.last_known_size = size
-                        try: dao.update(link)
-                        except: pass
-                    
-                    self.item_finished.emit(lid, size)
-                    
-                    from src.common.config import format_size
-                    progress = (state['completed'] / total_tasks) * 100
-                    name = link_map.get(lid).name if lid in link_map else "Unknown"
-                    sys.stdout.write(f"\r[Audit] {progress:3.0f}% | 处理中: {name[:20]:<20} | {format_size(size):>10}")
-                    sys.stdout.flush()
-                except Exception as e:
-                    print(f"\n[Error] 计算项目失败: {e}")
+                for lid in path_to_ids[path]:
+                    _on_size(lid, size)
+        except Exception as e:
+            print(f"\n[Error] 计算项目失败: {e}")
+
+        self._write_back(dao, pending, flush=True)
 
         status_msg = "已取消" if self.is_aborted else "已完成"
         print(f"\n>>>> [Space Audit] {status_msg} <<<<\n")
@@ -102,6 +108,7 @@ class ServiceWorker(QObject):
         all_links = dao.get_all()
         link_map = {l.id: l for l in all_links}
         aborted = self.is_aborted  # 缓存到本地变量，避免线程中访问 self
+        pending = {}  # link_id -> {'status': status}，仅记录发生变化的链接
 
         def _get_status(lid):
             if aborted: return lid, LinkStatus.DISCONNECTED
@@ -120,13 +127,27 @@ class ServiceWorker(QObject):
                     
                     link = link_map.get(lid)
                     if link and status != link.status:
-                        link.status = status
-                        dao.update(link)
+                        pending[lid] = {'status': status}
+                        if len(pending) >= WRITE_BACK_CHUNK:
+                            self._write_back(dao, pending)
                     self.item_finished.emit(lid, status)
                 except Exception:
                     pass  # 静默处理异常
+        self._write_back(dao, pending, flush=True)
         self.all_finished.emit(results)
 
+    @staticmethod
+    def _write_back(dao: LinkDAO, pending: dict, flush: bool = False):
+        """将累积的字段更新一次性提交，并清空缓冲区"""
+        try:
+            if pending:
+                dao.update_fields(pending)
+                pending.clear()
+            if flush:
+                dao.flush()
+        except Exception as e:
+            print(f"[Error] 批量写回失败: {e}")
+
     @staticmethod
     def _full_path(path: str) -> str:
         """解析环境变量并标准化路径"""
@@ -142,65 +163,41 @@ class ServiceWorker(QObject):
 
     @staticmethod
     def _check_single_link(link: UserLink) -> LinkStatus:
-        """检测单个链接的状态"""
+        """检测单个链接的状态（仅依据两端的 probe_path 探测结果分类）"""
         # 正确的语义：
         # source_path = 软件路径（链接位置）
         # target_path = 库路径（数据位置）
-        link_path = ServiceWorker._full_path(link.source_path)  # 链接位置
-        data_path = ServiceWorker._full_path(link.target_path)  # 数据位置
-        
-        from src.drivers.fs import get_real_path
-        
-        def get_attrs(p):
-            if os.name != 'nt': return 0
-            try:
-                import ctypes
-                return ctypes.windll.kernel32.GetFileAttributesW(p)
-            except: return -1
+        link_probe = probe_path(ServiceWorker._full_path(link.source_path))  # 链接位置
+        data_probe = probe_path(ServiceWorker._full_path(link.target_path))  # 数据位置
 
-        FILE_ATTRIBUTE_REPARSE_POINT = 0x400
-        
-        # 1. 检查链接位置的状态
-        link_attrs = get_attrs(link_path)
-        
-        if os.path.exists(link_path):
-            # 如果链接位置是一个联接点/符号链接
-            if link_attrs != -1 and (link_attrs & FILE_ATTRIBUTE_REPARSE_POINT):
-                real_target = get_real_path(link_path)
-                if not real_target:
-                    return LinkStatus.INVALID
-                
-                # 物理指纹对比
-                try:
-                    if os.path.exists(real_target) and os.path.exists(data_path):
-                        if os.path.samefile(real_target, data_path):
-                            return LinkStatus.CONNECTED
-                except Exception as e:
-                    print(f"[DEBUG] samefile 对比失败: {e}")
-
-                # 降级：字符串匹配
-                if real_target.lower() == data_path.lower():
-                    return LinkStatus.CONNECTED
-                
-                print(f"[DEBUG] 链接解析差异: \n  Real: {real_target.lower()}\n  Data: {data_path.lower()}")
-                # 虽然是链接，但指向不对，视为失效
+        # 1. 链接位置是可解析的联接点/符号链接
+        if link_probe.is_link:
+            if not data_probe.exists:
                 return LinkStatus.INVALID
-            
-            # 如果链接位置存在但不是链接，需要区分场景
-            if os.path.exists(data_path):
-                # 两端均有真实数据，属于路径冲突
-                return LinkStatus.ERROR
-            else:
-                # 数据仅在源头（未迁移到库路径），属于未连接
-                return LinkStatus.DISCONNECTED
-            
-        # 2. 如果链接位置不存在，检查数据路径是否存在
-        if not os.path.exists(data_path):
-            # 数据都没了，链接必然失效
+            # 路径一致（大小写按平台规则）即视为已连接
+            if os.path.normcase(link_probe.target) == os.path.normcase(data_probe.path):
+                return LinkStatus.CONNECTED
+            # 降级：物理指纹对比（目标经由其他链接/别名指向数据位置，两端都需跟随链接）
+            try:
+                if os.path.samestat(os.stat(link_probe.target), os.stat(data_probe.path)):
+                    return LinkStatus.CONNECTED
+            except (OSError, ValueError):
+                pass
+            # 虽然是链接，但指向不对，视为失效
             return LinkStatus.INVALID
-            
-        # 3. 链接位置不存在且数据存在，属于"就绪"状态，可以建立链接
-        return LinkStatus.READY
+
+        # 2. 链接位置存在但不是链接，需要区分场景
+        if link_probe.exists:
+            # 两端均有真实数据属于路径冲突；数据仅在源头（未迁移到库路径）属于未连接
+            return LinkStatus.ERROR if data_probe.exists else LinkStatus.DISCONNECTED
+
+        # 3. 链接位置不存在：数据存在则"就绪"，可以建立链接；数据都没了则链接必然失效
+        return LinkStatus.READY if data_probe.exists else LinkStatus.INVALID
+
+    # 供 LinkWatchService 等其他服务调用的公开名称
+    write_back = _write_back
+    full_path = _full_path
+    check_single_link = _check_single_link
 
 class LinkService:
     def __init__(self, dao: LinkDAO):
@@ -214,19 +211,41 @@ class LinkService:
     def get_link_by_id(self, link_id: str) -> Optional[UserLink]:
         return self.dao.get_by_id(link_id)
 
+    def get_link_by_source_path(self, source_path: str) -> Optional[UserLink]:
+        """按源路径（软件路径）查找链接"""
+        return self.dao.get_by_source_path(source_path)
+
     def get_links_by_category(self, category_id: str) -> List[UserLink]:
-        return [l for l in self.dao.get_all() if l.category == category_id]
+        return self.dao.get_by_category(category_id)
+
+    def get_links_in_categories(self, category_ids: Set[str]) -> List[UserLink]:
+        """获取属于给定分类集合（通常为某分类的整棵子树）的链接，逐个分类走分类索引"""
+        return [link for category_id in category_ids for link in self.dao.get_by_category(category_id)]
+
+    def add_link(self, link: UserLink) -> bool:
+        success = self.dao.add(link)
+        if success: _notify_links_changed(upserted=[link])
+        return success
+
+    def update_link(self, link: UserLink) -> bool:
+        success = self.dao.update(link)
+        if success: _notify_links_changed(upserted=[link])
+        return success
 
-    def add_link(self, link: UserLink) -> bool: return self.dao.add(link)
-    def update_link(self, link: UserLink) -> bool: return self.dao.update(link)
-    def delete_link(self, link_id: str) -> bool: return self.dao.delete(link_id)
+    def delete_link(self, link_id: str) -> bool:
+        success = self.dao.delete(link_id)
+        if success: _notify_links_changed(removed_ids=[link_id])
+        return success
 
     def delete_links(self, link_ids: List[str]) -> bool:
         """批量删除链接"""
-        return self.dao.delete_batch(link_ids)
+        success = self.dao.delete_batch(link_ids)
+        if success: _notify_links_changed(removed_ids=list(link_ids))
+        return success
 
-    def calculate_sizes_async(self, link_ids: List[str], item_cb: Callable, finished_cb: Callable):
-        self._start_worker(lambda w: w.calculate_sizes(link_ids, self.dao), item_cb, finished_cb)
+    def calculate_sizes_async(self, link_ids: List[str], item_cb: Callable, finished_cb: Callable,
+                              use_cache: bool = True):
+        self._start_worker(lambda w: w.calculate_sizes(link_ids, self.dao, use_cache), item_cb, finished_cb)
 
     def refresh_status_async(self, link_ids: List[str], item_cb: Callable, finished_cb: Callable):
         self._start_worker(lambda w: w.detect_status(link_ids, self.dao), item_cb, finished_cb)
@@ -308,8 +327,8 @@ class LinkService:
         self.disconnect_connection(link_id)
         return self.establish_connection_by_id(link_id)
 
-    def validate_and_add_link(self, data: dict, template=None) -> tuple[bool, str]:
-        """验证并添加链接"""
+    def validate_and_add_link(self, data: dict, template=None, migrated: bool = False) -> tuple[bool, str]:
+        """验证并添加链接（migrated: 数据已迁移到目标路径，目标端已有数据不视为冲突）"""
         from src.common.validators import PathValidator, NameValidator
         import uuid
         
@@ -351,7 +370,7 @@ class LinkService:
             except OSError:
                 return False
 
-        target_has_data = target_path_exists and _dir_has_data(target_path)
+        target_has_data = target_path_exists and _dir_has_data(target_path) and not migrated
 
         if target_has_data:
             # 目标路径存在真实数据，触发 TARGET_EXISTS 迁移流
@@ -377,10 +396,9 @@ class LinkService:
             return False, "TARGET_EXISTS"
 
         # 7. 业务逻辑验证：检查是否已存在相同的链接
-        existing_links = self.dao.get_all()
-        for link in existing_links:
-            if link.source_path.lower() == source_path.lower():
-                return False, f"源路径已存在于链接 '{link.name}' 中"
+        existing_link = self.dao.get_by_source_path(source_path)
+        if existing_link:
+            return False, f"源路径已存在于链接 '{existing_link.name}' 中"
         
         # 8. 创建链接对象
         link = UserLink(
@@ -396,6 +414,7 @@ class LinkService:
         success = self.dao.add(link)
         if not success:
             return False, "保存链接失败"
+        _notify_links_changed(upserted=[link])
         
         # 返回成功，附带自动创建目标路径（库路径）的标记
         return True, "AUTO_CREATED_TARGET" if auto_created_target else ""
@@ -443,10 +462,9 @@ class LinkService:
         
         # 8. 业务逻辑验证：如果修改了源路径，检查是否与其他链接冲突
         if original_source_path != source_path:
-            existing_links = self.dao.get_all()
-            for existing_link in existing_links:
-                if existing_link.id != link_id and existing_link.source_path.lower() == source_path.lower():
-                    return False, f"源路径已存在于链接 '{existing_link.name}' 中"
+            existing_link = self.dao.get_by_source_path(source_path)
+            if existing_link and existing_link.id != link_id:
+                return False, f"源路径已存在于链接 '{existing_link.name}' 中"
         
         # 9. 更新链接对象
         link.name = name_validator.normalize(data.get("name", ""))
@@ -463,6 +481,7 @@ class LinkService:
         success = self.dao.update(link)
         if not success:
             return False, "更新链接失败"
+        _notify_links_changed(upserted=[link])
         
         return True, ""
 
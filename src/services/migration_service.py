@@ -4,19 +4,56 @@
 支持异步执行、进度反馈、取消操作以及基本的回滚能力
 """
 import os
+import json
 import shutil
 import time
 import logging
-from typing import Callable, Optional
+from dataclasses import dataclass, field
+from functools import partial
+from typing import Callable, List, Optional, Tuple
 from PySide6.QtCore import QObject, Signal, QThread
+from src.common.config import MIGRATION_MANIFEST_DIR, format_size
+from src.drivers.copy_engine import (
+    CopyAborted, CopyEngine, CopyError, CopyItem, VerifyError,
+    DEFAULT_REREAD_THRESHOLD, VERIFY_ALGORITHM, copy_file_verified
+)
+from src.drivers.copy_plan import (
+    CopyPlan, InsufficientSpaceError, ThroughputMeter,
+    build_plan, check_free_space, estimate_disk_usage, interleave_by_size
+)
+from src.drivers.fs import is_same_volume
+from src.drivers.transaction import MigrationJournal
 
 # 设置日志
 logger = logging.getLogger(__name__)
 
+
+@dataclass
+class VerifyReport:
+    """校验迁移的结果清单"""
+    algorithm: str
+    reread_threshold: Optional[int]
+    entries: List[Tuple[str, int, str]] = field(default_factory=list)  # (相对路径, 大小, 摘要)
+    manifest_file: str = ""
+
+    @property
+    def total_size(self) -> int:
+        return sum(size for _, size, _ in self.entries)
+
+    @property
+    def reread_count(self) -> int:
+        """复制后回读目标端比对过的文件数"""
+        if self.reread_threshold is None:
+            return 0
+        return sum(1 for _, size, _ in self.entries if size >= self.reread_threshold)
+
+
 class MigrationWorker(QObject):
     """迁移工作执行器 - 运行在子线程中"""
     # 进度信号: (已迁移字节, 总字节, 当前文件名)
     progress_updated = Signal(int, int, str)
+    # 速度信号: (字节/秒, 预计剩余秒数，未知时为 -1)
+    eta_updated = Signal(float, float)
     # 完成信号: (是否成功, 错误信息)
     finished = Signal(bool, str)
     
@@ -29,30 +66,18 @@ class MigrationWorker(QObject):
         self.is_aborted = False
         self.total_size = 0
         self.processed_size = 0
-        self.copied_paths = [] # 用于简单回滚
+        self.copied_paths = [] # 用于简单回滚（未启用续传时）
+        self.resumable = True # 中断时保留已复制数据与迁移日志，下次同一迁移可续传
+        self.journal: Optional[MigrationJournal] = None
+        self.link: Optional[dict] = None # 关联链接，写入迁移日志供中断后续传时建立连接
+        self.verify = False # 边复制边计算摘要并生成校验清单
+        self.reread_threshold: Optional[int] = DEFAULT_REREAD_THRESHOLD
+        self.report: Optional[VerifyReport] = None
 
     def abort(self):
         """中止迁移"""
         self.is_aborted = True
 
-    def calculate_total_size(self, path: str) -> int:
-        """递归计算文件/文件夹大小"""
-        if os.path.isfile(path):
-            return os.path.getsize(path)
-        
-        total = 0
-        try:
-            with os.scandir(path) as it:
-                for entry in it:
-                    if self.is_aborted: break
-                    if entry.is_file(follow_symlinks=False):
-                        total += entry.stat(follow_symlinks=False).st_size
-                    elif entry.is_dir(follow_symlinks=False):
-                        total += self.calculate_total_size(entry.path)
-        except Exception as e:
-            logger.error(f"计算大小出错: {path}, {e}")
-        return total
-
     def run(self):
         """执行迁移主逻辑"""
         try:
@@ -61,23 +86,48 @@ class MigrationWorker(QObject):
                 self.finished.emit(False, f"源路径不存在: {self.source}")
                 return
 
-            # 2. 计算总大小
-            self.total_size = self.calculate_total_size(self.source)
+            # 2. 同卷移动：直接重命名，无需逐字节复制
+            if (self.mode == "move" or self.cleanup_source) and self._try_rename():
+                self.finished.emit(True, "")
+                return
+
+            # 3. 规划：一次遍历生成清单，总字节数由清单得出
+            plan = build_plan(self.source, self.target, is_aborted=lambda: self.is_aborted)
+            self.total_size = plan.total_size
             if self.is_aborted:
                 self.finished.emit(False, "操作已取消")
                 return
+            if plan.unreadable:
+                skipped = "\n".join(os.path.join(self.source, rel_dir) for rel_dir in plan.unreadable[:10])
+                if self.mode == "move" or self.cleanup_source:
+                    # 跳过的目录无法复制，清理源路径会丢失其中的数据
+                    self.finished.emit(False, f"以下目录无法读取，为避免数据丢失已中止迁移：\n{skipped}")
+                    return
+                logger.warning(f"以下目录无法读取，已跳过: {skipped}")
 
-            # 3. 开始执行
-            success = False
-            if os.path.isfile(self.source):
-                success = self._migrate_file(self.source, self.target)
-            else:
-                success = self._migrate_folder(self.source, self.target)
+            # 4. 续传：存在同一迁移的未完成日志时跳过目标端已校验的文件
+            if self.resumable:
+                self.journal = MigrationJournal.begin(
+                    self.mode, self.source, self.target, self.mode == "move" or self.cleanup_source,
+                    link=self.link
+                )
+            if self.verify:
+                self.report = VerifyReport(VERIFY_ALGORITHM, self.reread_threshold)
+            pending = [item for item in plan.items() if not self._is_completed(item)]
+
+            # 5. 预检剩余空间，在写入任何字节之前失败
+            check_free_space(self.target, estimate_disk_usage(item.size for item in pending))
+
+            # 6. 按大小交替的顺序执行
+            self._create_dirs(plan)
+            success = self._copy_items(interleave_by_size(pending))
 
             if self.is_aborted:
-                self._rollback()
-                self.finished.emit(False, "操作已取消")
+                self._interrupt()
+                self.finished.emit(False, self._with_resume_hint("操作已取消"))
             elif success:
+                if self.report:
+                    self._write_manifest()
                 # 核心修正：如果模式是 move，或者显式要求清理
                 if self.mode == "move" or self.cleanup_source:
                     try:
@@ -89,70 +139,163 @@ class MigrationWorker(QObject):
                     except Exception as e:
                         # 清理失败不代表迁移失败，记录警告
                         logger.warning(f"迁移成功但清理原始路径失败（可能被锁定）: {e}")
-                
+
+                if self.journal:
+                    self.journal.finish()
                 self.finished.emit(True, "")
             else:
-                self._rollback()
-                self.finished.emit(False, "迁移过程中发生未知错误")
+                self._interrupt()
+                self.finished.emit(False, self._with_resume_hint("迁移过程中发生未知错误"))
 
+        except InsufficientSpaceError as e:
+            self._interrupt()
+            self.finished.emit(False, f"目标磁盘空间不足：需要 {format_size(e.required)}，"
+                                      f"可用 {format_size(e.free)}\n\n请清理目标磁盘后重试。")
         except Exception as e:
             logger.exception("迁移执行异常")
-            self._rollback()
-            self.finished.emit(False, str(e))
+            self._interrupt()
+            self.finished.emit(False, self._with_resume_hint(str(e)))
 
-    def _migrate_file(self, src: str, dst: str) -> bool:
-        """迁移单个文件"""
-        if self.is_aborted: return False
-        
-        try:
-            # 确保目标目录存在
-            os.makedirs(os.path.dirname(dst), exist_ok=True)
-            
-            # 使用 shutil.copy2 保留元数据
-            filename = os.path.basename(src)
-            self.progress_updated.emit(self.processed_size, self.total_size, filename)
-            
-            shutil.copy2(src, dst)
-            self.processed_size += os.path.getsize(src)
-            self.copied_paths.append(dst)
-            
-            self.progress_updated.emit(self.processed_size, self.total_size, filename)
+    def _interrupt(self):
+        """迁移未完成：已有完成文件时保留数据与日志以便续传，否则回滚并删除日志"""
+        if self.journal and self.journal.record.completed:
+            if self.is_aborted:
+                self.journal.mark_cancelled()
+            self.journal.close()
+            return
+        if self.journal:
+            self.journal.finish()
+        self._rollback()
+
+    def _with_resume_hint(self, msg: str) -> str:
+        if self.journal and self.journal.record.completed:
+            return f"{msg}\n\n已完成的部分已保留，再次执行该迁移时将自动续传。"
+        return msg
+
+    def _rel_path(self, path: str) -> str:
+        """相对源路径的日志键（单文件迁移为 "."）"""
+        return os.path.relpath(path, self.source)
+
+    def _is_completed(self, item: CopyItem) -> bool:
+        """续传：源文件未变化且目标端已校验的文件直接跳过（校验模式沿用日志中的摘要）"""
+        rel_path = self._rel_path(item.src)
+        if self.journal and self.journal.is_completed(rel_path, item.size, item.mtime_ns, item.dst,
+                                                      require_digest=self.verify):
+            self.processed_size += item.size
+            if self.report:
+                self.report.entries.append((rel_path, item.size, self.journal.record.digests[rel_path]))
             return True
-        except PermissionError as e:
-            # 文件被占用的情况
-            logger.error(f"文件被占用，无法复制 {src} -> {dst}: {e}")
-            # 检查是否是 WinError 32
-            if "WinError 32" in str(e) or "另一个程序正在使用此文件" in str(e):
-                raise Exception(f"文件被占用：{filename}\n\n请关闭正在使用该文件的程序后重试。")
-            raise
-        except Exception as e:
-            logger.error(f"复制文件失败 {src} -> {dst}: {e}")
+        return False
+
+    def _write_manifest(self):
+        """将校验清单写入 MIGRATION_MANIFEST_DIR（写入失败不影响迁移结果）"""
+        name = os.path.basename(os.path.normpath(self.source)) or "root"
+        manifest_file = MIGRATION_MANIFEST_DIR / f"{time.strftime('%Y%m%d_%H%M%S')}_{name}.json"
+        data = {
+            "source": self.source,
+            "target": self.target,
+            "algorithm": self.report.algorithm,
+            "created_at": time.time(),
+            "files": [
+                {"path": rel_path, "size": size, "digest": digest}
+                for rel_path, size, digest in sorted(self.report.entries)
+            ],
+        }
+        try:
+            MIGRATION_MANIFEST_DIR.mkdir(parents=True, exist_ok=True)
+            with open(manifest_file, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, indent=2)
+            self.report.manifest_file = str(manifest_file)
+        except OSError as e:
+            logger.warning(f"写入校验清单失败: {e}")
+
+    def _try_rename(self) -> bool:
+        """
+        源与目标位于同一卷时以一次 rename 原子完成迁移，进度按单步上报
+
+        目标已存在且非空、跨卷或重命名失败（如句柄被占用）时返回 False，由调用方走复制路径。
+        """
+        if not is_same_volume(self.source, self.target):
             return False
+        removed_empty_target = False
+        try:
+            if os.path.isdir(self.target) and not os.path.islink(self.target):
+                if os.listdir(self.target):
+                    return False
+                # Windows 下 rename 不能覆盖已存在的目录，先移除空目标（失败时恢复）
+                os.rmdir(self.target)
+                removed_empty_target = True
+            elif os.path.lexists(self.target):
+                return False
+            os.makedirs(os.path.dirname(os.path.abspath(self.target)), exist_ok=True)
+            os.rename(self.source, self.target)
+        except OSError as e:
+            logger.info(f"同卷重命名失败，改用复制迁移: {e}")
+            if removed_empty_target and not os.path.lexists(self.target):
+                try:
+                    os.makedirs(self.target)
+                except OSError as restore_error:
+                    logger.warning(f"恢复空目标目录失败: {self.target}, {restore_error}")
+            return False
+
+        logger.info(f"同卷迁移，已直接重命名: {self.source} -> {self.target}")
+        self.total_size = self.processed_size = 1
+        self.progress_updated.emit(1, 1, os.path.basename(self.target))
+        return True
+
+    def _create_dirs(self, plan: CopyPlan):
+        """按清单建立目标目录结构（只有新建的目录会被记录用于回滚）"""
+        if plan.dirs:
+            paths = [os.path.join(plan.target, rel_dir) if rel_dir else plan.target for rel_dir in plan.dirs]
+        else:  # 单文件迁移
+            paths = [os.path.dirname(os.path.abspath(plan.target))]
+        for path in paths:
+            if not os.path.isdir(path):
+                os.makedirs(path, exist_ok=True)
+                self.copied_paths.append(path)
+
+    def _copy_items(self, items: List[CopyItem]) -> bool:
+        """并发复制文件列表，节流上报字节级进度与预计剩余时间"""
+        base = self.processed_size
+        meter = ThroughputMeter(self.total_size, base)
 
-    def _migrate_folder(self, src: str, dst: str) -> bool:
-        """递归迁移文件夹"""
-        if self.is_aborted: return False
+        def _on_progress(done: int, filename: str):
+            self.processed_size = base + done
+            self.progress_updated.emit(self.processed_size, self.total_size, filename)
+            self.eta_updated.emit(*meter.update(self.processed_size))
 
+        engine = CopyEngine(
+            is_aborted=lambda: self.is_aborted,
+            progress_callback=_on_progress,
+            on_file_done=self._on_file_done,
+            copy_func=partial(copy_file_verified, reread_threshold=self.reread_threshold) if self.verify else None,
+        )
         try:
-            os.makedirs(dst, exist_ok=True)
-            self.copied_paths.append(dst)
-
-            with os.scandir(src) as it:
-                for entry in it:
-                    if self.is_aborted: return False
-                    
-                    target_path = os.path.join(dst, entry.name)
-                    if entry.is_file(follow_symlinks=False):
-                        if not self._migrate_file(entry.path, target_path):
-                            return False
-                    elif entry.is_dir(follow_symlinks=False):
-                        if not self._migrate_folder(entry.path, target_path):
-                            return False
+            engine.run(items)
             return True
-        except Exception as e:
-            logger.error(f"复制文件夹失败 {src} -> {dst}: {e}")
+        except CopyAborted:
+            return False
+        except CopyError as e:
+            filename = os.path.basename(e.item.src)
+            # 文件被占用的情况（WinError 32）
+            if isinstance(e.error, PermissionError):
+                logger.error(f"文件被占用，无法复制 {e.item.src} -> {e.item.dst}: {e.error}")
+                if "WinError 32" in str(e.error) or "另一个程序正在使用此文件" in str(e.error):
+                    raise Exception(f"文件被占用：{filename}\n\n请关闭正在使用该文件的程序后重试。")
+                raise e.error
+            if isinstance(e.error, VerifyError):
+                raise Exception(f"文件校验失败：{filename}\n\n目标端数据与源文件不一致，源文件未被删除。")
+            logger.error(f"复制文件失败 {e.item.src} -> {e.item.dst}: {e.error}")
             return False
 
+    def _on_file_done(self, item: CopyItem):
+        self.copied_paths.append(item.dst)
+        rel_path = self._rel_path(item.src)
+        if self.report:
+            self.report.entries.append((rel_path, item.size, item.digest))
+        if self.journal:
+            self.journal.record_file(rel_path, item.size, item.mtime_ns, item.digest)
+
     def _rollback(self):
         """简单回滚：删除已创建的目标路径"""
         logger.info("正在回滚：删除已迁移的部分数据...")
@@ -184,6 +327,7 @@ class MigrationService(QObject):
         super().__init__()
         self._thread: Optional[QThread] = None
         self._worker: Optional[MigrationWorker] = None
+        self.last_report: Optional[VerifyReport] = None # 最近一次校验迁移的清单
 
     def migrate_async(
         self, 
@@ -191,7 +335,11 @@ class MigrationService(QObject):
         target: str, 
         mode: str = "copy",
         on_progress: Callable = None,
-        on_finished: Callable = None
+        on_finished: Callable = None,
+        cleanup_source: bool = False,
+        verify: Optional[bool] = None,
+        on_eta: Callable = None,
+        link: Optional[dict] = None
     ):
         """
         开始异步迁移任务
@@ -202,12 +350,23 @@ class MigrationService(QObject):
             mode: "copy" (默认) 或 "move"
             on_progress: 进度回调函数 (current, total, filename)
             on_finished: 完成回调函数 (success, error_msg)
+            cleanup_source: 成功后是否清理源路径（等价于移动，同卷时走重命名快速路径）
+            verify: 是否边复制边校验并生成清单（None 时读取设置中的迁移校验开关）
+            on_eta: 速度回调函数 (bytes_per_sec, eta_seconds)
+            link: 关联链接（{"id": 链接 ID} 或新增链接的 {"data": 表单数据}），中断后续传完成时据此建立连接
         """
         # 如果已有任务在运行，先停止（原则上 UI 应保证同一时间只有一个迁移）
         self.cancel_migration()
 
         self._thread = QThread()
         self._worker = MigrationWorker(source, target, mode)
+        self._worker.cleanup_source = cleanup_source
+        self._worker.link = link
+        if verify is None:
+            from src.common.service_bus import service_bus
+            verify = service_bus.config_service.get_migration_verify()
+        self._worker.verify = verify
+        self.last_report = None
         self._worker.moveToThread(self._thread)
 
         # 信号连接
@@ -219,6 +378,8 @@ class MigrationService(QObject):
         
         if on_progress:
             self._worker.progress_updated.connect(on_progress)
+        if on_eta:
+            self._worker.eta_updated.connect(on_eta)
         
         # 内部包装完成回调以清理引用
         self._on_finished_cb = on_finished
@@ -227,6 +388,8 @@ class MigrationService(QObject):
 
     def _on_worker_finished(self, success: bool, msg: str):
         """Worker 完成时的清理工作"""
+        if self._worker:
+            self.last_report = self._worker.report
         # 发射信号 (Qt 会自动处理跨线程调度)
         self.task_finished.emit(success, msg)
         
@@ -3,34 +3,127 @@
 import os
 import re
 import uuid
-from typing import List, Callable, Optional, Set
+import queue
+import threading
+import concurrent.futures
+from dataclasses import dataclass
+from typing import Collection, Dict, Iterable, Iterator, List, Callable, Optional, Set
 from src.models.template import Template
 from src.drivers.fs import get_real_path, is_junction
+from src.drivers.registry import InstallInventory, RegistryInventoryCache
 from src.drivers.usn_journal import is_usn_available, scan_reparse_points
+from src.drivers.windows import get_physical_disk_number
+from src.services.template_matcher import TemplateMatcher
+
+
+class _PathSet:
+    """线程安全的路径去重集合（按标准化的小写路径比较）"""
+
+    def __init__(self, initial: Iterable[str] = ()):
+        self._paths = {self._key(path) for path in initial}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(path: str) -> str:
+        return os.path.normpath(path).lower()
+
+    def __contains__(self, path: str) -> bool:
+        key = self._key(path)
+        with self._lock:
+            return key in self._paths
+
+    def add(self, path: str) -> bool:
+        """登记路径，首次登记返回 True（仅大小写或写法不同的路径视为重复）"""
+        key = self._key(path)
+        with self._lock:
+            if key in self._paths:
+                return False
+            self._paths.add(key)
+            return True
+
+
+# 扫描阶段
+STAGE_TEMPLATES = "templates"  # 模板匹配（默认路径 / 注册表 / 深度探测）
+STAGE_JUNCTIONS = "junctions"  # 全盘 Junction/Symlink 探测
+
+# 模板匹配阶段在总进度中所占的百分比，其余属于全盘链接探测
+_TEMPLATE_STAGE_PERCENT = 30
+
+
+@dataclass
+class ScanEvent:
+    """
+    流式扫描事件
+
+    kind:
+        "stage" - 进入新阶段或阶段内进度变化（message 为状态文本）
+        "found" - 发现一个模板（template 非空）
+        "done"  - 扫描结束（cancelled 表示是否被取消）
+    """
+    kind: str
+    stage: str
+    percent: int
+    template: Optional[Template] = None
+    message: str = ""
+    cancelled: bool = False
+
+
+class ScanCancelled(Exception):
+    """扫描被取消（仅在扫描器内部用于中止工作线程）"""
+
 
 class SmartScanner:
     """智能扫描引擎"""
     
-    def __init__(self, templates: List[Template], link_service=None):
+    def __init__(self, templates: List[Template], link_service=None,
+                 registry: RegistryInventoryCache = None):
         self.templates = templates
         self.link_service = link_service
+        self.registry = registry or RegistryInventoryCache()
         self.progress_callback: Optional[Callable[[str], None]] = None
+        self._cancel_event = threading.Event()
 
     def set_progress_callback(self, callback: Callable[[str], None]):
         """设置扫描进度回调"""
         self.progress_callback = callback
 
+    def cancel(self):
+        """请求取消正在进行的扫描（任意线程调用；扫描在下一个检查点停止）"""
+        self._cancel_event.set()
+
+    def is_cancelled(self) -> bool:
+        return self._cancel_event.is_set()
+
+    def _check_cancelled(self):
+        if self._cancel_event.is_set():
+            raise ScanCancelled()
+
     def scan(self) -> List[Template]:
         """
-        全量扫描本机应用
+        全量扫描本机应用，返回全部发现的模板（iter_scan 的阻塞版本）
+        """
+        return [event.template for event in self.iter_scan() if event.kind == "found"]
+
+    def iter_scan(self) -> Iterator[ScanEvent]:
+        """
+        流式扫描本机应用，每发现一个模板立即产出 "found" 事件
         使用四级探测机制：
         1. 默认路径检查
         2. 注册表安装信息探测
         3. 磁盘关键词深度匹配
-        4. 全盘 Junction/Symlink 探测
+        4. 全盘 Junction/Symlink 探测（各磁盘并行，结果按发现顺序产出）
+
+        调用 cancel() 后扫描在下一个检查点停止，并以 cancelled=True 的 "done" 事件结束。
         """
+        self._cancel_event.clear()
+        try:
+            yield from self._iter_scan()
+        except ScanCancelled:
+            yield ScanEvent("done", STAGE_JUNCTIONS, 100, message="扫描已取消", cancelled=True)
+
+    def _iter_scan(self) -> Iterator[ScanEvent]:
         discovered = []
-        
+
         # 0. 预加载已导入的链接，用于扫描去重
         existing_srcs = set()
         if self.link_service:
@@ -39,82 +132,43 @@ class SmartScanner:
                 norm_src = os.path.normpath(os.path.expandvars(l.source_path)).lower()
                 existing_srcs.add(norm_src)
         
-        import winreg # 仅在 Windows 下执行
-        
-        # 1. 预解析环境变量后的模板
-        template_tasks = []
-        for t in self.templates:
-            expanded = os.path.expandvars(t.default_src)
-            template_tasks.append({'tpl': t, 'path': expanded, 'found': False})
-
-        # 2. 获取注册表中的安装信息（用于辅助定位）
-        # 格式: { "DisplayName": "InstallLocation" }
-        registry_paths = self._get_registry_installations()
-
-        # 3. 扫描逻辑
-        for task in template_tasks:
-            tpl = task['tpl']
-            path = task['path']
-
+        # 1. 获取注册表中的安装信息（用于辅助定位）并建立匹配索引
+        # 同名程序全部保留，各自的 InstallLocation 都参与匹配
+        inventory = self._get_registry_installations()
+        # 仅扫描本地固定磁盘；候选根目录由匹配引擎按需列举且只列举一次
+        matcher = TemplateMatcher(inventory.locations(), self._get_local_fixed_drives(), existing_srcs)
+
+        # 2. 逐模板在内存索引上解析（默认路径 → 注册表 → 深度探测）
+        total = max(len(self.templates), 1)
+        for i, tpl in enumerate(self.templates):
+            self._check_cancelled()
+            message = f"正在分析: {tpl.name}"
             if self.progress_callback:
-                self.progress_callback(f"正在分析: {tpl.name}")
+                self.progress_callback(message)
+            yield ScanEvent("stage", STAGE_TEMPLATES, i * _TEMPLATE_STAGE_PERCENT // total, message=message)
 
-            # A. 检查默认路径
-            norm_path = os.path.normpath(path).lower()
-            if os.path.exists(path) and norm_path not in existing_srcs:
-                discovered.append(tpl)
-                task['found'] = True
+            found_path = matcher.match(tpl)
+            if not found_path:
                 continue
+            # 默认路径命中时保留模板原值（可能含环境变量）
+            if found_path != os.path.expandvars(tpl.default_src):
+                tpl.default_src = found_path
+            discovered.append(tpl)
+            yield ScanEvent("found", STAGE_TEMPLATES, i * _TEMPLATE_STAGE_PERCENT // total, template=tpl)
 
-            # B. 注册表匹配 (模糊匹配名称)
-            for reg_name, reg_loc in registry_paths.items():
-                if tpl.name.lower() in reg_name.lower() and reg_loc and os.path.exists(reg_loc):
-                    # 尝试拼接
-                    target_path = reg_loc
-                    if tpl.id == "steam":
-                        target_path = os.path.join(reg_loc, "steamapps")
-                    
-                    norm_reg_path = os.path.normpath(target_path).lower()
-                    if os.path.exists(target_path) and norm_reg_path not in existing_srcs:
-                        tpl.default_src = target_path
-                        discovered.append(tpl)
-                        task['found'] = True
-                        break
-
-            if task['found']: continue
-
-            # C. 深度探测逻辑
-            path_parts = path.replace("\\", "/").rstrip("/").split("/")
-            if len(path_parts) >= 2:
-                feature = os.path.join(path_parts[-2], path_parts[-1])
-                # 仅扫描本地固定磁盘
-                drives = self._get_local_fixed_drives()
-                
-                # 常见软件安装根目录
-                common_roots = ["", "Games", "Software", "Program Files", "Program Files (x86)"]
-                
-                for drive in drives:
-                    for sub in common_roots:
-                        test_path = os.path.join(drive, sub, feature)
-                        norm_test_path = os.path.normpath(test_path).lower()
-                        if os.path.exists(test_path) and norm_test_path not in existing_srcs:
-                            tpl.default_src = test_path
-                            discovered.append(tpl)
-                            task['found'] = True
-                            break
-                    if task['found']: break
-
-        # 4. 全盘 Junction/Symlink 探测（发现非模板的已有链接）
+        # 3. 全盘 Junction/Symlink 探测（发现非模板的已有链接）
         # 收集模板阶段已发现的路径，用于去重
         discovered_srcs = set()
         for tpl in discovered:
             norm = os.path.normpath(os.path.expandvars(tpl.default_src)).lower()
             discovered_srcs.add(norm)
 
-        junction_templates = self._scan_disk_junctions(existing_srcs | discovered_srcs)
-        discovered.extend(junction_templates)
+        for event in self._iter_disk_junctions(existing_srcs | discovered_srcs):
+            if event.kind == "found":
+                discovered.append(event.template)
+            yield event
 
-        return discovered
+        yield ScanEvent("done", STAGE_JUNCTIONS, 100, message=f"扫描完成，发现 {len(discovered)} 个应用")
 
     @staticmethod
     def _get_local_fixed_drives() -> List[str]:
@@ -131,10 +185,25 @@ class SmartScanner:
                 drives.append(root)
         return drives
 
-    def _scan_disk_junctions(self, exclude_srcs: Set[str]) -> List[Template]:
+    @staticmethod
+    def _group_drives_by_disk(drives: List[str]) -> List[List[str]]:
+        """按物理磁盘分组：同一磁盘上的分区串行扫描，不同磁盘之间并行"""
+        groups: Dict[object, List[str]] = {}
+        for drive in drives:
+            try:
+                disk = get_physical_disk_number(drive)
+            except Exception:
+                disk = None
+            # 无法确定物理磁盘的卷单独成组
+            groups.setdefault(disk if disk is not None else drive, []).append(drive)
+        return list(groups.values())
+
+    def _iter_disk_junctions(self, exclude_srcs: Set[str]) -> Iterator[ScanEvent]:
         """
         全盘 Junction/Symlink 探测
         优先使用 USN Journal（极速，无深度限制），权限不足时降级到目录遍历
+        每块物理磁盘一个工作线程并行扫描，结果经线程安全的去重集合合并；
+        工作线程把发现的模板与进度投递到队列，由调用线程逐个产出
         """
         # 系统保护路径（小写），跳过不纳入结果
         protected_prefixes = {
@@ -144,43 +213,94 @@ class SmartScanner:
         }
 
         drives = self._get_local_fixed_drives()
+        if not drives:
+            return
 
         # 取第一个盘检测权限
-        first_letter = drives[0][0] if drives else 'C'
+        first_letter = drives[0][0]
         usn_ok = is_usn_available(first_letter)
 
+        message = f"USN Journal {'可用' if usn_ok else '不可用'}，磁盘: {[d[0]+':' for d in drives]}"
         if self.progress_callback:
-            self.progress_callback(f"USN Journal {'可用' if usn_ok else '不可用'}，磁盘: {[d[0]+':' for d in drives]}")
-
+            self.progress_callback(message)
+        yield ScanEvent("stage", STAGE_JUNCTIONS, _TEMPLATE_STAGE_PERCENT, message=message)
+
+        seen = _PathSet(exclude_srcs)
+        groups = self._group_drives_by_disk(drives)
+        events: "queue.Queue[ScanEvent]" = queue.Queue()
+        done_drives = [0]
+        done_lock = threading.Lock()
+
+        def _percent() -> int:
+            return _TEMPLATE_STAGE_PERCENT + (100 - _TEMPLATE_STAGE_PERCENT) * done_drives[0] // len(drives)
+
+        def _on_found(tpl: Template):
+            events.put(ScanEvent("found", STAGE_JUNCTIONS, _percent(), template=tpl))
+
+        def _scan_group(group: List[str]):
+            for drive in group:
+                found = self._scan_drive(drive, usn_ok, seen, protected_prefixes, _on_found)
+                with done_lock:
+                    done_drives[0] += 1
+                events.put(ScanEvent("stage", STAGE_JUNCTIONS, _percent(),
+                                     message=f"{drive[0]}: 扫描完成，发现 {len(found)} 个链接"))
+
+        executor = concurrent.futures.ThreadPoolExecutor(max_workers=len(groups))
+        futures = []
+        try:
+            futures = [executor.submit(_scan_group, group) for group in groups]
+            pending = set(futures)
+            while pending or not events.empty():
+                try:
+                    yield events.get(timeout=0.1)
+                except queue.Empty:
+                    pass
+                pending = {f for f in pending if not f.done()}
+                self._check_cancelled()
+            for future in futures:
+                future.result()  # 传播工作线程中的取消/异常
+        finally:
+            # 调用方提前关闭生成器时也让工作线程尽快停止
+            if not all(f.done() for f in futures):
+                self._cancel_event.set()
+            executor.shutdown(wait=True)
+
+    def _scan_drive(self, drive: str, usn_ok: bool, seen: "_PathSet", protected_prefixes: set,
+                    on_found: Callable[[Template], None] = None) -> List[Template]:
+        """扫描单个卷（USN 异常时仅该卷降级到目录遍历）"""
+        found = None
         if usn_ok:
             try:
-                return self._scan_via_usn(drives, exclude_srcs, protected_prefixes)
+                found = self._scan_drive_via_usn(drive, seen, protected_prefixes, on_found)
+            except ScanCancelled:
+                raise
             except Exception as e:
                 if self.progress_callback:
-                    self.progress_callback(f"USN 异常: {e}，降级到目录遍历")
-                return self._scan_via_walk(drives, exclude_srcs, protected_prefixes)
-        else:
-            return self._scan_via_walk(drives, exclude_srcs, protected_prefixes)
+                    self.progress_callback(f"{drive[0]}: USN 异常: {e}，降级到目录遍历")
+        if found is None:
+            found = self._scan_drive_via_walk(drive, seen, protected_prefixes, on_found)
 
-    def _scan_via_usn(self, drives: List[str], exclude_srcs: Set[str], protected_prefixes: set) -> List[Template]:
-        """通过 USN Journal 快速扫描全盘链接（无深度限制）"""
+        if self.progress_callback:
+            self.progress_callback(f"{drive[0]}: 扫描完成，发现 {len(found)} 个链接")
+        return found
+
+    def _scan_drive_via_usn(self, drive: str, seen: "_PathSet", protected_prefixes: set,
+                            on_found: Callable[[Template], None] = None) -> List[Template]:
+        """通过 USN Journal 快速扫描单个卷上的链接（无深度限制）"""
         found = []
-        for drive in drives:
-            letter = drive[0]
-            if self.progress_callback:
-                self.progress_callback(f"正在通过 USN Journal 扫描: {letter}:")
+        letter = drive[0]
+        if self.progress_callback:
+            self.progress_callback(f"正在通过 USN Journal 扫描: {letter}:")
 
-            reparse_items = scan_reparse_points(letter)
-            for item in reparse_items:
-                path = item["path"]
+        reparse_items = scan_reparse_points(letter)
+        for item in reparse_items:
+            self._check_cancelled()
+            path = item["path"]
 
-                if self._is_system_junction(path, protected_prefixes):
-                    continue
+            if self._is_system_junction(path, protected_prefixes):
+                continue
 
-                tpl = self._junction_to_template(path, exclude_srcs)
-                if tpl:
-                    found.append(tpl)
-                    exclude_srcs.add(os.path.normpath(path).lower())
+            self._collect_junction(path, seen, found, on_found)
 
         return found
 
@@ -217,51 +337,55 @@ class SmartScanner:
 
         return False
 
-    def _scan_via_walk(self, drives: List[str], exclude_srcs: Set[str], protected_prefixes: set) -> List[Template]:
+    def _scan_drive_via_walk(self, drive: str, seen: "_PathSet", protected_prefixes: set,
+                             on_found: Callable[[Template], None] = None) -> List[Template]:
         """目录遍历降级方案（最大 2 级深度）"""
         found = []
-        for drive in drives:
-            if self.progress_callback:
-                self.progress_callback(f"正在扫描磁盘链接: {drive}")
+        if self.progress_callback:
+            self.progress_callback(f"正在扫描磁盘链接: {drive}")
 
-            try:
-                entries = os.listdir(drive)
-            except PermissionError:
+        try:
+            entries = os.listdir(drive)
+        except PermissionError:
+            return found
+
+        for entry in entries:
+            self._check_cancelled()
+            if entry.lower() in protected_prefixes:
                 continue
 
-            for entry in entries:
-                if entry.lower() in protected_prefixes:
-                    continue
+            full_path = os.path.join(drive, entry)
 
-                full_path = os.path.join(drive, entry)
+            # 一级目录：直接检测 Junction
+            if is_junction(full_path):
+                self._collect_junction(full_path, seen, found, on_found)
+                continue
 
-                # 一级目录：直接检测 Junction
-                if is_junction(full_path):
-                    tpl = self._junction_to_template(full_path, exclude_srcs)
-                    if tpl:
-                        found.append(tpl)
-                        exclude_srcs.add(os.path.normpath(full_path).lower())
-                    continue
+            # 二级目录：仅对目录递归一层
+            if not os.path.isdir(full_path):
+                continue
+            try:
+                sub_entries = os.listdir(full_path)
+            except PermissionError:
+                continue
 
-                # 二级目录：仅对目录递归一层
-                if not os.path.isdir(full_path):
-                    continue
-                try:
-                    sub_entries = os.listdir(full_path)
-                except PermissionError:
-                    continue
-
-                for sub_entry in sub_entries:
-                    sub_path = os.path.join(full_path, sub_entry)
-                    if is_junction(sub_path):
-                        tpl = self._junction_to_template(sub_path, exclude_srcs)
-                        if tpl:
-                            found.append(tpl)
-                            exclude_srcs.add(os.path.normpath(sub_path).lower())
+            for sub_entry in sub_entries:
+                sub_path = os.path.join(full_path, sub_entry)
+                if is_junction(sub_path):
+                    self._collect_junction(sub_path, seen, found, on_found)
 
         return found
 
-    def _junction_to_template(self, junction_path: str, exclude_srcs: Set[str]) -> Optional[Template]:
+    def _collect_junction(self, path: str, seen: "_PathSet", found: List[Template],
+                          on_found: Callable[[Template], None] = None):
+        """转换为模板并登记去重；并发发现同一路径时只保留先登记者"""
+        tpl = self._junction_to_template(path, seen)
+        if tpl and seen.add(path):
+            found.append(tpl)
+            if on_found:
+                on_found(tpl)
+
+    def _junction_to_template(self, junction_path: str, exclude_srcs: Collection[str]) -> Optional[Template]:
         """将发现的 Junction 路径转换为伪 Template 对象"""
         norm_path = os.path.normpath(junction_path).lower()
         if norm_path in exclude_srcs:
@@ -289,30 +413,9 @@ class SmartScanner:
         )
         return tpl
 
-    def _get_registry_installations(self) -> dict:
-        """从注册表获取已安装程序的列表"""
-        results = {}
-        import winreg
-        keys = [
-            (winreg.HKEY_LOCAL_MACHINE, r"SOFTWARE\Microsoft\Windows\CurrentVersion\Uninstall"),
-            (winreg.HKEY_LOCAL_MACHINE, r"SOFTWARE\WOW6432Node\Microsoft\Windows\CurrentVersion\Uninstall"),
-            (winreg.HKEY_CURRENT_USER, r"Software\Microsoft\Windows\CurrentVersion\Uninstall")
-        ]
-        
-        for root_key, sub_key in keys:
-            try:
-                with winreg.OpenKey(root_key, sub_key) as key:
-                    for i in range(winreg.QueryInfoKey(key)[0]):
-                        try:
-                            name = winreg.EnumKey(key, i)
-                            with winreg.OpenKey(key, name) as sub:
-                                display_name = winreg.QueryValueEx(sub, "DisplayName")[0]
-                                install_loc = winreg.QueryValueEx(sub, "InstallLocation")[0]
-                                if display_name and install_loc:
-                                    results[display_name] = install_loc
-                        except: continue
-            except: continue
-        return results
+    def _get_registry_installations(self) -> InstallInventory:
+        """从注册表获取已安装程序的清单（未变化的 Uninstall 键直接复用缓存）"""
+        return self.registry.load()
 
     def _get_real_link_target(self, path: str) -> Optional[str]:
         """[底层核心] 探测路径是否为链接，并返回其实际物理指向"""
@@ -0,0 +1,129 @@
+# coding: utf-8
+"""
+模板匹配引擎 - 用内存索引一次性解析全部模板，替代逐模板的线性探测
+
+- 注册表 DisplayName 建立三元组（trigram）子串索引：候选集取交集后再做一次精确子串校验，
+  结果与逐条 `name in display_name` 完全一致
+- 深度探测的候选根目录（各盘 × 常见安装根）每个目录只列举一次并缓存名称表，
+  之后的存在性判断都在内存中完成
+"""
+import os
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+from src.models.template import Template
+
+
+# 深度探测时的常见软件安装根目录
+COMMON_ROOTS = ("", "Games", "Software", "Program Files", "Program Files (x86)")
+
+# 子串索引的 n-gram 长度（更短的关键字退化为全表校验）
+NGRAM_SIZE = 3
+
+
+class SubstringIndex:
+    """(名称, 值) 条目的大小写不敏感子串索引，查询结果保持条目原始顺序"""
+
+    def __init__(self, entries: Iterable[Tuple[str, str]]):
+        self.entries: List[Tuple[str, str]] = list(entries)
+        self._lowered = [(name or "").lower() for name, _ in self.entries]
+        self._grams: Dict[str, List[int]] = {}
+        for i, name in enumerate(self._lowered):
+            for gram in {name[j:j + NGRAM_SIZE] for j in range(len(name) - NGRAM_SIZE + 1)}:
+                self._grams.setdefault(gram, []).append(i)
+
+    def search(self, needle: str) -> List[Tuple[str, str]]:
+        needle = needle.lower()
+        if len(needle) < NGRAM_SIZE:
+            candidates: Iterable[int] = range(len(self.entries))
+        else:
+            postings = []
+            for gram in {needle[j:j + NGRAM_SIZE] for j in range(len(needle) - NGRAM_SIZE + 1)}:
+                posting = self._grams.get(gram)
+                if not posting:
+                    return []
+                postings.append(posting)
+            postings.sort(key=len)
+            common = set(postings[0])
+            for posting in postings[1:]:
+                common.intersection_update(posting)
+                if not common:
+                    return []
+            candidates = sorted(common)
+        return [self.entries[i] for i in candidates if needle in self._lowered[i]]
+
+
+class DirectoryIndex:
+    """按需列举目录并缓存名称表（小写名称 → 实际名称），每个目录只列举一次"""
+
+    def __init__(self):
+        self._listings: Dict[str, Dict[str, str]] = {}
+
+    def names(self, path: str) -> Dict[str, str]:
+        key = os.path.normcase(os.path.normpath(path))
+        listing = self._listings.get(key)
+        if listing is None:
+            try:
+                with os.scandir(path) as it:
+                    listing = {entry.name.lower(): entry.name for entry in it}
+            except OSError:
+                listing = {}
+            self._listings[key] = listing
+        return listing
+
+    def exists(self, root: str, *parts: str) -> bool:
+        """root 下的相对路径 parts 是否存在（大小写不敏感，逐级查询缓存的目录列表）"""
+        current = root
+        for part in parts:
+            actual = self.names(current).get(part.lower())
+            if actual is None:
+                return False
+            current = os.path.join(current, actual)
+        return True
+
+
+class TemplateMatcher:
+    """
+    模板发现引擎
+
+    对每个模板依次尝试：默认路径 → 注册表安装位置（名称子串匹配）→ 各盘常见根目录下的特征路径，
+    命中且不在已导入集合中时返回发现的源路径。
+    """
+
+    def __init__(self, registry_entries: Iterable[Tuple[str, str]], drives: Sequence[str],
+                 existing_srcs: Set[str], roots: Sequence[str] = COMMON_ROOTS):
+        self.registry = SubstringIndex(registry_entries)
+        self.drives = list(drives)
+        self.roots = list(roots)
+        self.existing_srcs = existing_srcs
+        self.dirs = DirectoryIndex()
+
+    def _is_new(self, path: str) -> bool:
+        return os.path.normpath(path).lower() not in self.existing_srcs
+
+    def match(self, tpl: Template) -> Optional[str]:
+        """返回模板在本机的源路径，未发现时返回 None"""
+        path = os.path.expandvars(tpl.default_src)
+
+        # A. 检查默认路径
+        if os.path.exists(path) and self._is_new(path):
+            return path
+
+        # B. 注册表匹配 (模糊匹配名称)
+        for _, reg_loc in self.registry.search(tpl.name):
+            if not reg_loc or not os.path.exists(reg_loc):
+                continue
+            target_path = os.path.join(reg_loc, "steamapps") if tpl.id == "steam" else reg_loc
+            if os.path.exists(target_path) and self._is_new(target_path):
+                return target_path
+
+        # C. 深度探测：特征路径（最后两级）出现在各盘常见根目录下
+        path_parts = path.replace("\\", "/").rstrip("/").split("/")
+        if len(path_parts) >= 2:
+            feature = path_parts[-2:]
+            for drive in self.drives:
+                for sub in self.roots:
+                    root = os.path.join(drive, sub)
+                    if self.dirs.exists(root, *feature):
+                        test_path = os.path.join(root, *feature)
+                        if self._is_new(test_path):
+                            return test_path
+        return None
@@ -0,0 +1,203 @@
+# coding: utf-8
+"""
+模板全文搜索索引 - 替代每次按键对全部模板逐条 lower() + 子串比较
+
+- 每个模板的检索文本：名称、描述、default_src 的路径段（环境变量去掉 %），
+  以及中文名称的全拼与首字母（可选依赖 pypinyin 未安装时拼音匹配关闭），各字段间以 \\x00 分隔，匹配不会跨字段
+- 单字与三元组（trigram）倒排表：关键字先取倒排表交集得到候选，再做一次精确子串校验，
+  结果与"关键字是检索文本的子串"完全一致；两个字的关键字用单字倒排表求交
+- 一次查询同时得出命中的模板与它们所属的分类（供分类树高亮）
+- 增删改按差量维护：倒排表只追加，失效的条目由子串校验过滤，失效过多时整体重建
+"""
+import re
+from array import array
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Set
+from src.models.template import Template
+from src.services.template_matcher import NGRAM_SIZE
+
+try:
+    from pypinyin import lazy_pinyin, Style
+except ImportError:  # pypinyin 为可选依赖：缺失时不建立拼音字段
+    lazy_pinyin = None
+
+
+FIELD_SEP = "\x00"
+
+# 失效倒排条目占比超过该值时整体重建
+COMPACT_RATIO = 0.5
+
+_PATH_SPLIT = re.compile(r"[\\/]+")
+_CJK = re.compile(r"[一-鿿]")
+
+
+def _path_segments(path: Optional[str]) -> List[str]:
+    """default_src 的路径段：%LOCALAPPDATA%\\Google\\Chrome -> ['localappdata', 'google', 'chrome']"""
+    if not path:
+        return []
+    return [seg.strip("%") for seg in _PATH_SPLIT.split(path) if seg.strip("%")]
+
+
+def _pinyin_fields(name: str) -> List[str]:
+    """中文名称的全拼与首字母（如 网易云音乐 -> wangyiyunyinyue / wyyyy）"""
+    if lazy_pinyin is None or not name or not _CJK.search(name):
+        return []
+    full = "".join(lazy_pinyin(name))
+    initials = "".join(lazy_pinyin(name, style=Style.FIRST_LETTER))
+    return [full, initials]
+
+
+def search_text(template: Template) -> str:
+    """模板的检索文本（小写）"""
+    fields = [template.name or "", template.description or ""]
+    fields.extend(_path_segments(template.default_src))
+    fields.extend(_pinyin_fields(template.name))
+    return FIELD_SEP.join(fields).lower()
+
+
+def _grams(text: str) -> Set[str]:
+    """单字 + 三元组"""
+    grams = set(text)
+    grams.update(text[j:j + NGRAM_SIZE] for j in range(len(text) - NGRAM_SIZE + 1))
+    grams.discard(FIELD_SEP)
+    return grams
+
+
+@dataclass
+class SearchResult:
+    """一次查询的结果"""
+    templates: List[Template] = field(default_factory=list)  # 命中且属于所选分类的模板（保持模板原始顺序）
+    category_ids: Set[str] = field(default_factory=set)  # 命中模板（不限所选分类）所属的分类
+
+    @property
+    def template_ids(self) -> List[str]:
+        return [t.id for t in self.templates]
+
+
+class TemplateSearchIndex:
+    """模板倒排索引（文档号即模板的先后顺序，查询结果按文档号排序）"""
+
+    def __init__(self, templates: Iterable[Template] = ()):
+        self._rebuild(templates)
+
+    def _rebuild(self, templates: Iterable[Template]):
+        self._docs: List[Optional[Template]] = []  # 文档号 -> 模板（已删除为 None）
+        self._texts: List[str] = []
+        self._doc_of: Dict[str, int] = {}  # 模板 ID -> 文档号
+        self._postings: Dict[str, array] = {}
+        self._stale = 0  # 失效的倒排条目数（删除/修改遗留）
+        self._total = 0
+        for template in templates:
+            self.add(template)
+
+    # ---------- 维护 ----------
+
+    def _post(self, doc: int, grams: Iterable[str]):
+        postings = self._postings
+        for gram in grams:
+            posting = postings.get(gram)
+            if posting is None:
+                posting = postings[gram] = array('I')
+            posting.append(doc)
+            self._total += 1
+
+    def add(self, template: Template):
+        if template.id in self._doc_of:
+            self.update(template)
+            return
+        doc = len(self._docs)
+        text = search_text(template)
+        self._docs.append(template)
+        self._texts.append(text)
+        self._doc_of[template.id] = doc
+        self._post(doc, _grams(text))
+
+    def update(self, template: Template):
+        """原位更新（保持顺序）：只为新增的 gram 追加倒排条目"""
+        doc = self._doc_of.get(template.id)
+        if doc is None:
+            self.add(template)
+            return
+        old_grams = _grams(self._texts[doc])
+        text = search_text(template)
+        new_grams = _grams(text)
+        self._docs[doc] = template
+        self._texts[doc] = text
+        self._post(doc, new_grams - old_grams)
+        self._stale += len(old_grams - new_grams)
+        self._maybe_compact()
+
+    def remove(self, template_id: str):
+        doc = self._doc_of.pop(template_id, None)
+        if doc is None:
+            return
+        self._stale += len(_grams(self._texts[doc]))
+        self._docs[doc] = None
+        self._texts[doc] = ""
+        self._maybe_compact()
+
+    def _maybe_compact(self):
+        if self._total and self._stale > self._total * COMPACT_RATIO:
+            self._rebuild(self.templates())
+
+    # ---------- 查询 ----------
+
+    def __len__(self) -> int:
+        return len(self._doc_of)
+
+    def get(self, template_id: str) -> Optional[Template]:
+        doc = self._doc_of.get(template_id)
+        return self._docs[doc] if doc is not None else None
+
+    def templates(self) -> List[Template]:
+        return [t for t in self._docs if t is not None]
+
+    def _candidates(self, term: str) -> Set[int]:
+        """关键字各 gram 倒排表的交集（候选文档，尚需子串校验）"""
+        if len(term) >= NGRAM_SIZE:
+            grams = {term[j:j + NGRAM_SIZE] for j in range(len(term) - NGRAM_SIZE + 1)}
+        else:
+            grams = set(term)
+        postings = []
+        for gram in grams:
+            posting = self._postings.get(gram)
+            if not posting:
+                return set()
+            postings.append(posting)
+        postings.sort(key=len)
+        common = set(postings[0])
+        for posting in postings[1:]:
+            common.intersection_update(posting)
+            if not common:
+                break
+        return common
+
+    def match(self, text: str) -> List[int]:
+        """命中的文档号（按顺序）。空白分隔的多个关键字需全部命中"""
+        terms = [term for term in text.lower().split() if term]
+        if not terms:
+            return [doc for doc, t in enumerate(self._docs) if t is not None]
+
+        docs: Optional[Set[int]] = None
+        for term in sorted(terms, key=len, reverse=True):  # 长关键字更有区分度，先求交
+            candidates = self._candidates(term)
+            if docs is not None:
+                candidates &= docs
+            texts = self._texts
+            docs = {doc for doc in candidates if term in texts[doc]}
+            if not docs:
+                return []
+        return sorted(docs)
+
+    def search(self, text: str = "", category_id: str = "all") -> SearchResult:
+        """按关键字与分类（"all" 或直属分类 ID）查询"""
+        result = SearchResult()
+        for doc in self.match(text):
+            template = self._docs[doc]
+            if template is None:
+                continue
+            if template.category_id:
+                result.category_ids.add(template.category_id)
+            if category_id == "all" or template.category_id == category_id:
+                result.templates.append(template)
+        return result
@@ -1,11 +1,68 @@
 # Pure ASCII version to avoid ghost characters
-from typing import List, Optional
+import os
+import json
+import threading
+from typing import List, Optional, Tuple
 from src.models.template import Template
 from src.dao.template_dao import TemplateDAO
+from src.services.template_search import TemplateSearchIndex, SearchResult
+
+# Write count across all TemplateService instances: a write through one instance
+# invalidates the search index of the others (SQLite has no file mtime to compare)
+_write_generation = 0
+
+
+def _bump_generation():
+    global _write_generation
+    _write_generation += 1
+
 
 class TemplateService:
-    def __init__(self, dao: TemplateDAO):
+    def __init__(self, dao: TemplateDAO, category_dao=None):
         self.dao = dao
+        self.category_dao = category_dao
+        self._lock = threading.RLock()
+        self._index: Optional[TemplateSearchIndex] = None
+        self._index_sig = None
+
+    # ---------- search index ----------
+
+    def _source_sig(self):
+        """(mtime_ns, size) of the templates file + in-process write generation"""
+        config_file = getattr(self.dao, 'config_file', None)
+        file_sig = None
+        if config_file:
+            try:
+                st = os.stat(config_file)
+                file_sig = (st.st_mtime_ns, st.st_size)
+            except OSError:
+                pass
+        return file_sig, _write_generation
+
+    def get_search_index(self) -> TemplateSearchIndex:
+        """Search index over all templates; rebuilt when the file changes on disk or another instance writes"""
+        with self._lock:
+            sig = self._source_sig()
+            if self._index is None or sig != self._index_sig:
+                self._index = TemplateSearchIndex(self.dao.get_all())
+                self._index_sig = sig
+            return self._index
+
+    def _write(self, do_write, apply) -> bool:
+        """Run a DAO write; on success apply it to our index incrementally instead of rebuilding"""
+        with self._lock:
+            fresh = self._index is not None and self._source_sig() == self._index_sig
+            success = do_write()
+            if success:
+                _bump_generation()
+                if fresh:
+                    apply(self._index)
+                    self._index_sig = self._source_sig()
+                else:
+                    self._index = None
+            return success
+
+    # ---------- queries ----------
 
     def get_all_templates(self) -> List[Template]:
         return self.dao.get_all()
@@ -17,26 +74,51 @@ class TemplateService:
         all_templates = self.dao.get_all()
         return [t for t in all_templates if t.category_id == category_id]
 
-    def add_template(self, template: Template) -> bool:
-        return self.dao.add(template)
-
-    def update_template(self, template: Template) -> bool:
-        return self.dao.update(template)
+    def search_templates(self, category_id: str = "all", search_text: str = "") -> SearchResult:
+        """Matching templates in the category plus the categories of all matches, in one index query"""
+        return self.get_search_index().search(search_text, category_id)
 
     def get_filtered_templates(self, category_id: str, search_text: str = "") -> List[Template]:
         """获取过滤后的模板"""
-        if category_id == "all":
-            templates = self.dao.get_all()
-        else:
-            templates = [t for t in self.dao.get_all() if t.category_id == category_id]
-        
-        if search_text:
-            search_text = search_text.lower()
-            templates = [
-                t for t in templates 
-                if search_text in t.name.lower() or (t.description and search_text in t.description.lower())
-            ]
-        return templates
+        return self.search_templates(category_id, search_text).templates
+
+    # ---------- export ----------
+
+    def _export_records(self, include_categories: bool, include_templates: bool) -> dict:
+        """Records in the JSON DAO format; the SQLite backend exports straight from its tables"""
+        db = getattr(self.dao, 'db', None)
+        if db is not None and hasattr(db, 'export_json'):
+            return db.export_json(include_categories, include_templates, include_links=False)
+
+        data = {}
+        if include_categories:
+            if self.category_dao is None:
+                from src.dao.category_dao import CategoryDAO
+                self.category_dao = CategoryDAO()
+            data['categories'] = [c.to_dict() for c in self.category_dao.get_all()]
+        if include_templates:
+            data['templates'] = [t.to_dict() for t in self.dao.get_all()]
+        return data
+
+    def export_to_file(self, file_path: str, include_categories: bool = True,
+                       include_templates: bool = True) -> Tuple[bool, str]:
+        """导出分类/模板为单个 JSON 文件"""
+        try:
+            data = self._export_records(include_categories, include_templates)
+            os.makedirs(os.path.dirname(os.path.abspath(file_path)), exist_ok=True)
+            with open(file_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, indent=2)
+        except Exception as e:
+            return False, f"导出失败: {e}"
+        return True, f"已导出到 {file_path}"
+
+    # ---------- writes ----------
+
+    def add_template(self, template: Template) -> bool:
+        return self._write(lambda: self.dao.add(template), lambda index: index.add(template))
+
+    def update_template(self, template: Template) -> bool:
+        return self._write(lambda: self.dao.update(template), lambda index: index.update(template))
 
     def delete_template(self, template_id: str) -> bool:
-        return self.dao.delete(template_id)
+        return self._write(lambda: self.dao.delete(template_id), lambda index: index.remove(template_id))
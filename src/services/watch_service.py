@@ -0,0 +1,174 @@
+# coding: utf-8
+"""
+链接监听服务 - 基于目录变更通知的增量状态维护
+
+监听所有受管链接 source_path / target_path 的父目录（父目录不存在时监听最近的已存在祖先），
+收到变更后只重新探测受影响的链接，状态变化时写回并发出 signal_bus.link_status_changed，
+并只重算这些链接的监听点（整体重建仅在链接集合刷新或监听溢出时进行）。
+"""
+import os
+import threading
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from src.common.signals import signal_bus
+from src.drivers.fs import nearest_existing_path
+from src.drivers.fs_watcher import DirWatcher, create_dir_watcher
+from src.services.link_service import LinkService, ServiceWorker
+
+
+# 事件合并窗口（秒）：软件更新器往往在短时间内产生大量变更
+WATCH_DEBOUNCE = 0.3
+
+
+class LinkWatchService:
+    """链接状态监听服务"""
+
+    def __init__(self, link_service: LinkService, watcher: DirWatcher = None):
+        self.link_service = link_service
+        self.watcher = watcher or create_dir_watcher(self._on_change)
+        if watcher is not None:
+            watcher.callback = self._on_change
+
+        self._lock = threading.Lock()
+        # 被监听目录 -> 直属条目名 -> 受影响的链接 ID（名称按平台规则规范化大小写）
+        self._index: Dict[str, Dict[str, Set[str]]] = {}
+        self._points: Dict[str, Set[Tuple[str, str]]] = {}  # 链接 ID -> 监听点，用于按链接增量调整
+        self._dirty: Set[str] = set()
+        self._recheck_all = False
+        self._timer: Optional[threading.Timer] = None
+        self._started = False
+
+    # ---------- 生命周期 ----------
+
+    def start(self):
+        """建立监听并开始接收变更"""
+        if self._started:
+            return
+        self._started = True
+        self.sync()
+        self.watcher.start()
+        signal_bus.data_refreshed.connect(self.sync)
+
+    def stop(self):
+        if not self._started:
+            return
+        self._started = False
+        self.watcher.stop()
+        with self._lock:
+            if self._timer:
+                self._timer.cancel()
+                self._timer = None
+
+    # ---------- 监听集合 ----------
+
+    @staticmethod
+    def _watch_point(path: str) -> Optional[Tuple[str, str]]:
+        """链接端点对应的 (被监听目录, 直属条目名)"""
+        full = ServiceWorker.full_path(path)
+        parent = os.path.dirname(full)
+        if not parent or parent == full:
+            return None
+        anchor = nearest_existing_path(parent)
+        if not anchor:
+            return None
+        name = os.path.relpath(full, anchor).split(os.sep, 1)[0]
+        return os.path.normpath(anchor), os.path.normcase(name)
+
+    def _link_points(self, link) -> Set[Tuple[str, str]]:
+        points = set()
+        for path in (link.source_path, link.target_path):
+            point = self._watch_point(path) if path else None
+            if point:
+                points.add(point)
+        return points
+
+    def sync(self):
+        """按当前链接集合重建索引并增删监听目录"""
+        index: Dict[str, Dict[str, Set[str]]] = {}
+        points: Dict[str, Set[Tuple[str, str]]] = {}
+        for link in self.link_service.get_all_links():
+            points[link.id] = self._link_points(link)
+            for directory, name in points[link.id]:
+                index.setdefault(directory, {}).setdefault(name, set()).add(link.id)
+        with self._lock:
+            self._index = index
+            self._points = points
+        self.watcher.set_dirs(index)
+
+    def _resync_links(self, link_ids: Iterable[str]):
+        """只重算给定链接的监听点（端点父目录被创建/删除后监听点随之移动）"""
+        new_points = {}
+        for link_id in link_ids:
+            link = self.link_service.get_link_by_id(link_id)
+            new_points[link_id] = self._link_points(link) if link else None
+
+        with self._lock:
+            before = set(self._index)
+            for link_id, points in new_points.items():
+                for directory, name in self._points.pop(link_id, ()):
+                    entries = self._index.get(directory, {})
+                    ids = entries.get(name)
+                    if ids is not None:
+                        ids.discard(link_id)
+                        if not ids:
+                            del entries[name]
+                    if not entries:
+                        self._index.pop(directory, None)
+                if points is None:  # 链接已被删除
+                    continue
+                self._points[link_id] = points
+                for directory, name in points:
+                    self._index.setdefault(directory, {}).setdefault(name, set()).add(link_id)
+            dirs: List[str] = list(self._index)
+        if set(dirs) != before:
+            self.watcher.set_dirs(dirs)
+
+    # ---------- 事件处理 ----------
+
+    def _affected(self, directory: Optional[str], name: Optional[str]) -> Iterable[str]:
+        with self._lock:
+            entries = self._index.get(os.path.normpath(directory)) if directory else None
+            if not entries:
+                return ()
+            if name is None:
+                return {lid for ids in entries.values() for lid in ids}
+            return set(entries.get(os.path.normcase(name), ()))
+
+    def _on_change(self, directory: Optional[str], name: Optional[str]):
+        """监听线程回调：记录受影响的链接并推迟处理"""
+        ids = self._affected(directory, name)
+        with self._lock:
+            if directory is None:
+                self._recheck_all = True
+            elif not ids:
+                return
+            self._dirty.update(ids)
+            if self._timer is None and self._started:
+                self._timer = threading.Timer(WATCH_DEBOUNCE, self._process)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def _process(self):
+        """重新探测受影响的链接，写回变化的状态并通知界面"""
+        with self._lock:
+            self._timer = None
+            ids, self._dirty = self._dirty, set()
+            recheck_all, self._recheck_all = self._recheck_all, False
+
+        links = self.link_service.get_all_links() if recheck_all else \
+            [link for link in map(self.link_service.get_link_by_id, ids) if link]
+        changed = {}
+        for link in links:
+            status = ServiceWorker.check_single_link(link)
+            if status != link.status:
+                changed[link.id] = {'status': status}
+
+        if changed:
+            ServiceWorker.write_back(self.link_service.dao, changed, flush=True)
+            for link_id in changed:
+                signal_bus.link_status_changed.emit(link_id)
+
+        # 链接端点的父目录可能被创建/删除，监听点需要随之调整
+        if recheck_all:
+            self.sync()
+        else:
+            self._resync_links(ids)
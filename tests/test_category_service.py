@@ -0,0 +1,90 @@
+# coding: utf-8
+"""测试分类层级索引（邻接表、深度、先序区间与失效）"""
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.models.category import CategoryNode
+from src.dao.category_dao import CategoryDAO
+from src.services.category_service import CategoryService
+
+
+CATEGORIES = [
+    {"id": "games", "name": "游戏", "parent_id": None, "order": 1},
+    {"id": "dev", "name": "开发", "parent_id": None, "order": 0},
+    {"id": "dev.ide", "name": "IDE", "parent_id": "dev", "order": 1},
+    {"id": "dev.editors", "name": "编辑器", "parent_id": "dev", "order": 0},
+    {"id": "dev.editors.vim", "name": "Vim", "parent_id": "dev.editors", "order": 0},
+]
+
+
+class TestCategoryService(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.config_file = os.path.join(self.tmp, "categories.json")
+        self._write(CATEGORIES)
+        dao = CategoryDAO.__new__(CategoryDAO)
+        dao.config_file = self.config_file
+        self.dao = dao
+        self.service = CategoryService(dao)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def _write(self, data):
+        with open(self.config_file, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+
+    def test_structure_and_depth(self):
+        hierarchy = self.service.get_hierarchy()
+        self.assertEqual([c.id for c in hierarchy.roots()], ["dev", "games"])
+        self.assertEqual([c.id for c in self.service.get_children("dev")], ["dev.editors", "dev.ide"])
+        self.assertTrue(self.service.is_leaf("dev.ide"))
+        self.assertFalse(self.service.is_leaf("dev.editors"))
+        self.assertEqual(self.service.get_depth("dev"), 0)
+        self.assertEqual(self.service.get_depth("dev.editors.vim"), 2)
+        self.assertEqual(self.service.get_depth("missing"), -1)
+
+    def test_descendants(self):
+        self.assertEqual(self.service.get_descendant_ids("dev"), {"dev", "dev.ide", "dev.editors", "dev.editors.vim"})
+        self.assertEqual(self.service.get_descendant_ids("dev.editors", include_self=False), {"dev.editors.vim"})
+        self.assertEqual(self.service.get_descendant_ids("games"), {"games"})
+        self.assertTrue(self.service.is_descendant("dev.editors.vim", "dev"))
+        self.assertTrue(self.service.is_descendant("dev", "dev"))
+        self.assertFalse(self.service.is_descendant("dev", "dev", include_self=False))
+        self.assertFalse(self.service.is_descendant("games", "dev"))
+        self.assertFalse(self.service.is_descendant("dev", "dev.editors"))
+
+    def test_index_is_reused(self):
+        first = self.service.get_hierarchy()
+        self.service.get_children("dev")
+        self.service.is_leaf("dev")
+        self.assertIs(self.service.get_hierarchy(), first)
+
+    def test_returned_nodes_are_copies(self):
+        node = self.service.get_category_by_id("dev.ide")
+        node.parent_id = "games"
+        self.assertEqual([c.id for c in self.service.get_children("games")], [])
+
+    def test_invalidated_by_write_through_service(self):
+        other = CategoryService(self.dao)
+        other.get_hierarchy()
+        self.service.add_category(CategoryNode(id="games.steam", name="Steam", parent_id="games"))
+        self.assertEqual([c.id for c in other.get_children("games")], ["games.steam"])
+
+    def test_invalidated_by_file_change(self):
+        self.service.get_hierarchy()
+        time.sleep(0.01)
+        self._write(CATEGORIES + [{"id": "games.steam", "name": "Steam", "parent_id": "games", "order": 0}])
+        os.utime(self.config_file, ns=(time.time_ns() + 10_000_000, time.time_ns() + 10_000_000))
+        self.assertTrue(self.service.is_descendant("games.steam", "games"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,145 @@
+# coding: utf-8
+"""测试分类统计服务（邻接表、子树总数与差量更新）"""
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.models.category import CategoryNode
+from src.models.link import UserLink
+
+try:
+    from src.services.link_service import LinkService
+    from src.services.category_service import CategoryService
+    from src.services.category_stats_service import CategoryStatsService
+except ImportError:  # services 包依赖 PySide6
+    CategoryStatsService = None
+
+
+class FakeCategoryDAO:
+    def __init__(self, categories):
+        self.categories = categories
+        self.calls = 0
+
+    def get_all(self):
+        self.calls += 1
+        return list(self.categories)
+
+
+class FakeLinkDAO:
+    def __init__(self, links):
+        self.links = {l.id: l for l in links}
+        self.get_all_calls = 0
+
+    def get_all(self):
+        self.get_all_calls += 1
+        return list(self.links.values())
+
+    def get_by_category(self, category_id):
+        return [l for l in self.links.values() if l.category == category_id]
+
+    def add(self, link):
+        self.links[link.id] = link
+        return True
+
+    def update(self, link):
+        if link.id not in self.links:
+            return False
+        self.links[link.id] = link
+        return True
+
+    def delete(self, lid):
+        return self.links.pop(lid, None) is not None
+
+    def delete_batch(self, lids):
+        return any([self.links.pop(lid, None) is not None for lid in lids])
+
+
+def _link(lid, category):
+    return UserLink(id=lid, name=lid, source_path=f"C:\\{lid}", target_path=f"D:\\{lid}", category=category)
+
+
+@unittest.skipIf(CategoryStatsService is None, "缺少依赖")
+class TestCategoryStats(unittest.TestCase):
+    def setUp(self):
+        # dev
+        # ├── dev.editors
+        # │   └── dev.editors.vim
+        # └── dev.ide
+        # games
+        self.categories = FakeCategoryDAO([
+            CategoryNode(id="dev.ide", name="IDE", parent_id="dev", order=1),
+            CategoryNode(id="dev", name="开发", order=0),
+            CategoryNode(id="dev.editors", name="编辑器", parent_id="dev", order=0),
+            CategoryNode(id="dev.editors.vim", name="Vim", parent_id="dev.editors"),
+            CategoryNode(id="games", name="游戏", order=1),
+        ])
+        self.dao = FakeLinkDAO([
+            _link("a", "dev.editors.vim"),
+            _link("b", "dev.editors"),
+            _link("c", "dev.ide"),
+            _link("d", "games"),
+            _link("e", None),
+        ])
+        self.links = LinkService(self.dao)
+        self.stats = CategoryStatsService(CategoryService(self.categories), self.links)
+
+    def test_structure(self):
+        self.assertEqual([c.id for c in self.stats.get_roots()], ["dev", "games"])
+        self.assertEqual([c.id for c in self.stats.get_children("dev")], ["dev.editors", "dev.ide"])
+        self.assertTrue(self.stats.is_leaf("dev.ide"))
+        self.assertFalse(self.stats.is_leaf("dev"))
+        self.assertEqual(self.categories.calls, 1)
+
+    def test_counts_in_one_pass(self):
+        self.assertEqual(self.stats.direct_count("dev.editors"), 1)
+        self.assertEqual(self.stats.subtree_count("dev.editors"), 2)
+        self.assertEqual(self.stats.subtree_count("dev"), 3)
+        self.assertEqual(self.stats.count("games"), 1)
+        self.assertEqual(self.stats.count("all"), 5)
+        self.assertEqual(self.dao.get_all_calls, 1)
+
+    def test_tree_counts_match_subtree_membership(self):
+        # 选中父分类时列表显示整棵子树下的链接，与分类树上的子树总数一致
+        categories = CategoryService(self.categories)
+        for cid in ("dev", "dev.editors", "dev.editors.vim", "dev.ide", "games"):
+            members = self.links.get_links_in_categories(categories.get_descendant_ids(cid))
+            self.assertEqual(len(members), self.stats.count(cid))
+        self.assertEqual({l.id for l in self.links.get_links_in_categories(categories.get_descendant_ids("dev"))},
+                         {"a", "b", "c"})
+        self.assertEqual(self.dao.get_all_calls, 1)
+
+    def test_incremental_updates(self):
+        self.stats.count("all")
+
+        self.links.add_link(_link("f", "dev.ide"))
+        self.assertEqual(self.stats.subtree_count("dev"), 4)
+        self.assertEqual(self.stats.count("all"), 6)
+
+        moved = _link("a", "games")  # dev.editors.vim -> games
+        self.links.update_link(moved)
+        self.assertEqual(self.stats.subtree_count("dev.editors"), 1)
+        self.assertEqual(self.stats.subtree_count("dev"), 3)
+        self.assertEqual(self.stats.subtree_count("games"), 2)
+
+        self.links.delete_links(["b", "d"])
+        self.assertEqual(self.stats.subtree_count("dev"), 2)
+        self.assertEqual(self.stats.subtree_count("games"), 1)
+        self.assertEqual(self.stats.count("all"), 4)
+        self.assertEqual(self.dao.get_all_calls, 1)
+
+    def test_invalidate_categories_keeps_link_counts(self):
+        self.stats.count("all")
+        self.categories.categories.append(CategoryNode(id="games.steam", name="Steam", parent_id="games"))
+        self.dao.links["d"] = _link("d", "games.steam")  # 外部写入不经过 LinkService，整体失效后才可见
+        self.stats.invalidate_categories()
+        self.assertEqual([c.id for c in self.stats.get_children("games")], ["games.steam"])
+        self.assertEqual(self.stats.subtree_count("games"), 1)
+        self.stats.invalidate()
+        self.assertEqual(self.stats.direct_count("games.steam"), 1)
+        self.assertEqual(self.dao.get_all_calls, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
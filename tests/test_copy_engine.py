@@ -0,0 +1,138 @@
+# coding: utf-8
+"""测试并发复制引擎"""
+import os
+import sys
+import shutil
+import tempfile
+import hashlib
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.drivers import copy_engine
+from src.drivers.copy_engine import (
+    CopyAborted, CopyEngine, CopyError, CopyItem, VerifyError, copy_file, copy_file_verified
+)
+
+try:
+    from src.services.migration_service import MigrationWorker
+except ImportError:  # services 包依赖 PySide6
+    MigrationWorker = None
+
+
+class TestCopyEngine(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.src = os.path.join(self.test_dir, "src")
+        self.dst = os.path.join(self.test_dir, "dst")
+        os.makedirs(self.src)
+        os.makedirs(self.dst)
+        self.items = []
+        for i in range(30):
+            path = os.path.join(self.src, f"f{i}.bin")
+            with open(path, "wb") as f:
+                f.write(os.urandom(i * 1000 + 1))
+            os.utime(path, ns=(1_000_000_000, 1_500_000_000 + i))
+            self.items.append(CopyItem(path, os.path.join(self.dst, f"f{i}.bin"), i * 1000 + 1))
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def _read(self, path):
+        with open(path, "rb") as f:
+            return f.read()
+
+    def test_copy_all_preserves_content_and_mtime(self):
+        done, progress = [], []
+        engine = CopyEngine(max_workers=4, chunk_size=4096,
+                            progress_callback=lambda b, name: progress.append(b),
+                            on_file_done=done.append)
+        total = engine.run(self.items)
+
+        self.assertEqual(total, sum(item.size for item in self.items))
+        self.assertEqual(len(done), 30)
+        self.assertEqual(progress[-1], total)
+        for item in self.items:
+            self.assertEqual(self._read(item.src), self._read(item.dst))
+            self.assertEqual(os.stat(item.dst).st_mtime_ns, os.stat(item.src).st_mtime_ns)
+
+    def test_buffered_path_with_hasher(self):
+        item = self.items[-1]
+        hasher = hashlib.sha256()
+        copy_file(item.src, item.dst, chunk_size=1024, hasher=hasher)
+        self.assertEqual(hasher.hexdigest(), hashlib.sha256(self._read(item.src)).hexdigest())
+        self.assertEqual(self._read(item.src), self._read(item.dst))
+
+    def test_stale_plan_size_does_not_pad_target(self):
+        item = self.items[-1]
+        with mock.patch.object(copy_engine, "PREALLOCATE_THRESHOLD", 0):
+            copy_file(item.src, item.dst, size=item.size + 1024 * 1024)
+        self.assertEqual(os.path.getsize(item.dst), os.path.getsize(item.src))
+        self.assertEqual(self._read(item.src), self._read(item.dst))
+
+    def test_verified_engine_records_digests(self):
+        engine = CopyEngine(max_workers=3, copy_func=copy_file_verified)
+        engine.run(self.items)
+        for item in self.items:
+            self.assertEqual(item.digest, hashlib.sha256(self._read(item.src)).hexdigest())
+
+    def test_verify_reread_mismatch(self):
+        item = self.items[-1]
+        with mock.patch.object(copy_engine, "hash_file", return_value="0" * 64) as reread:
+            copy_file_verified(item.src, item.dst, item.size, reread_threshold=item.size + 1)
+            self.assertEqual(reread.call_count, 0)
+            with self.assertRaises(VerifyError):
+                copy_file_verified(item.src, item.dst, item.size, reread_threshold=0)
+
+    def test_failure_raises_copy_error(self):
+        items = self.items[:5] + [CopyItem(os.path.join(self.src, "missing.bin"),
+                                           os.path.join(self.dst, "missing.bin"))]
+        with self.assertRaises(CopyError) as ctx:
+            CopyEngine(max_workers=2).run(items)
+        self.assertIsInstance(ctx.exception.error, FileNotFoundError)
+
+    def test_abort(self):
+        with self.assertRaises(CopyAborted):
+            CopyEngine(is_aborted=lambda: True).run(self.items)
+        self.assertEqual(os.listdir(self.dst), [])
+
+
+@unittest.skipIf(MigrationWorker is None, "缺少依赖")
+class TestSameVolumeRename(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.src = os.path.join(self.test_dir, "app")
+        self.dst = os.path.join(self.test_dir, "lib", "app")
+        os.makedirs(os.path.join(self.src, "sub"))
+        with open(os.path.join(self.src, "sub", "a.bin"), "wb") as f:
+            f.write(b"x" * 100)
+        os.makedirs(self.dst)  # 空目标目录不构成冲突
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_same_device_move_is_one_rename(self):
+        worker = MigrationWorker(self.src, self.dst, "move")
+        results = []
+        worker.finished.connect(lambda ok, msg: results.append(ok))
+        with mock.patch("src.services.migration_service.os.rename", wraps=os.rename) as rename, \
+                mock.patch("src.services.migration_service.build_plan") as build_plan:
+            worker.run()
+        self.assertEqual(results, [True])
+        rename.assert_called_once_with(self.src, self.dst)
+        build_plan.assert_not_called()
+        self.assertFalse(os.path.exists(self.src))
+        with open(os.path.join(self.dst, "sub", "a.bin"), "rb") as f:
+            self.assertEqual(f.read(), b"x" * 100)
+
+    def test_failed_rename_restores_empty_target(self):
+        worker = MigrationWorker(self.src, self.dst, "move")
+        with mock.patch("src.services.migration_service.os.rename", side_effect=PermissionError("locked")):
+            self.assertFalse(worker._try_rename())
+        self.assertTrue(os.path.isdir(self.dst))
+        self.assertTrue(os.path.isfile(os.path.join(self.src, "sub", "a.bin")))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+# coding: utf-8
+"""测试迁移规划"""
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.drivers import copy_plan
+from src.drivers.copy_engine import CopyItem
+from src.drivers.walker import DirListing
+from src.drivers.copy_plan import (
+    InsufficientSpaceError, build_plan, check_free_space, estimate_disk_usage, interleave_by_size
+)
+
+
+def _write(path: str, size: int):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(b"x" * size)
+
+
+class TestCopyPlan(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.src = os.path.join(self.test_dir, "src")
+        self.dst = os.path.join(self.test_dir, "dst")
+        _write(os.path.join(self.src, "a.bin"), 10)
+        _write(os.path.join(self.src, "sub", "b.bin"), 20)
+        _write(os.path.join(self.src, "sub", "deep", "c.bin"), 30)
+        os.makedirs(os.path.join(self.src, "empty"))
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_build_plan(self):
+        plan = build_plan(self.src, self.dst)
+        self.assertEqual(plan.total_size, 60)
+        self.assertEqual(sorted(rel for rel, _, _ in plan.files),
+                         sorted(["a.bin", os.path.join("sub", "b.bin"), os.path.join("sub", "deep", "c.bin")]))
+        # 父目录总在子目录之前
+        self.assertEqual(plan.dirs[0], "")
+        self.assertLess(plan.dirs.index("sub"), plan.dirs.index(os.path.join("sub", "deep")))
+        self.assertIn("empty", plan.dirs)
+
+        items = {item.src: item.dst for item in plan.items()}
+        self.assertEqual(items[os.path.join(self.src, "sub", "b.bin")], os.path.join(self.dst, "sub", "b.bin"))
+
+    def test_unreadable_dir_is_skipped_and_reported(self):
+        locked = os.path.join(self.src, "sub")
+        real_scan = copy_plan.scan_listing
+
+        def scan(path, st=None, collect_files=False):
+            if path == locked:
+                return DirListing(files=[], error=PermissionError(13, "denied", path))
+            return real_scan(path, st, collect_files)
+
+        with mock.patch.object(copy_plan, "scan_listing", side_effect=scan):
+            plan = build_plan(self.src, self.dst)
+        self.assertEqual(plan.unreadable, ["sub"])
+        self.assertEqual([rel for rel, _, _ in plan.files], ["a.bin"])
+        self.assertEqual(plan.total_size, 10)
+
+    def test_single_file_plan(self):
+        src_file = os.path.join(self.src, "a.bin")
+        plan = build_plan(src_file, os.path.join(self.dst, "a.bin"))
+        self.assertEqual((plan.dirs, plan.total_size), ([], 10))
+        self.assertEqual(plan.items()[0].dst, os.path.join(self.dst, "a.bin"))
+
+    def test_interleave_and_space(self):
+        items = [CopyItem(str(size), "", size) for size in (5, 1, 4, 2, 3)]
+        self.assertEqual([item.size for item in interleave_by_size(items)], [5, 1, 4, 2, 3])
+        self.assertEqual(estimate_disk_usage([1, 4096, 4097], cluster_size=4096), 4096 * 4)
+
+        check_free_space(self.dst, 1)
+        with self.assertRaises(InsufficientSpaceError):
+            check_free_space(self.dst, 1 << 62)
+
+
+if __name__ == "__main__":
+    unittest.main()
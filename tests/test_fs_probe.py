@@ -0,0 +1,72 @@
+# coding: utf-8
+"""测试单次系统调用的路径探测"""
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.drivers.fs import probe_path
+from src.models.link import UserLink, LinkStatus
+
+try:
+    from src.services.link_service import ServiceWorker
+except ImportError:  # services 包依赖 PySide6
+    ServiceWorker = None
+
+
+@unittest.skipIf(os.name == "nt", "符号链接创建在 Windows 上需要额外权限")
+class TestProbePath(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.data = os.path.join(self.test_dir, "data")
+        os.makedirs(self.data)
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_plain_and_missing(self):
+        probe = probe_path(self.data)
+        self.assertTrue(probe.exists)
+        self.assertFalse(probe.is_reparse or probe.is_link)
+        st = os.stat(self.data)
+        self.assertEqual((probe.device, probe.file_id), (st.st_dev, st.st_ino))
+
+        self.assertFalse(probe_path(os.path.join(self.test_dir, "missing")).exists)
+
+    def test_links(self):
+        absolute = os.path.join(self.test_dir, "abs_link")
+        os.symlink(self.data, absolute)
+        self.assertEqual(probe_path(absolute).target, self.data)
+
+        relative = os.path.join(self.test_dir, "rel_link")
+        os.symlink("data", relative)
+        probe = probe_path(relative)
+        self.assertTrue(probe.is_link)
+        self.assertEqual(probe.target, self.data)
+
+        dangling = os.path.join(self.test_dir, "dangling")
+        os.symlink(os.path.join(self.test_dir, "gone"), dangling)
+        probe = probe_path(dangling)
+        self.assertTrue(probe.exists and probe.is_link)
+
+
+    @unittest.skipIf(ServiceWorker is None, "缺少依赖")
+    def test_link_through_alias_is_connected(self):
+        # 链接指向数据位置的另一个别名（别名本身也是链接），指纹对比需跟随链接
+        alias = os.path.join(self.test_dir, "alias")
+        os.symlink(self.data, alias)
+        source = os.path.join(self.test_dir, "app")
+        os.symlink(alias, source)
+        link = UserLink(id="x", name="x", source_path=source, target_path=self.data)
+        self.assertEqual(ServiceWorker.check_single_link(link), LinkStatus.CONNECTED)
+
+        os.symlink(self.test_dir, os.path.join(self.test_dir, "other"))
+        link.source_path = os.path.join(self.test_dir, "other")
+        self.assertEqual(ServiceWorker.check_single_link(link), LinkStatus.INVALID)
+
+
+if __name__ == "__main__":
+    unittest.main()
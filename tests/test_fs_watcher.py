@@ -0,0 +1,69 @@
+# coding: utf-8
+"""测试目录变更监听"""
+import os
+import sys
+import shutil
+import tempfile
+import threading
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.drivers.fs_watcher import InotifyDirWatcher, PollingDirWatcher
+
+
+class _Recorder:
+    def __init__(self):
+        self.events = []
+        self.fired = threading.Event()
+
+    def __call__(self, directory, name):
+        self.events.append((directory, name))
+        self.fired.set()
+
+
+class TestDirWatcher(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.watched = os.path.join(self.test_dir, "watched")
+        self.other = os.path.join(self.test_dir, "other")
+        os.makedirs(self.watched)
+        os.makedirs(self.other)
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def _run(self, watcher, recorder):
+        watcher.set_dirs([self.watched])
+        watcher.start()
+        try:
+            os.makedirs(os.path.join(self.other, "ignored"))
+            os.makedirs(os.path.join(self.watched, "app"))
+            self.assertTrue(recorder.fired.wait(5))
+        finally:
+            watcher.stop()
+        self.assertTrue(all(directory == self.watched for directory, _ in recorder.events))
+
+    def test_polling(self):
+        recorder = _Recorder()
+        watcher = PollingDirWatcher(recorder, interval=0.05)
+        self._run(watcher, recorder)
+        self.assertEqual(recorder.events[0], (self.watched, None))
+
+    @unittest.skipUnless(sys.platform.startswith("linux"), "inotify 仅在 Linux 可用")
+    def test_inotify(self):
+        recorder = _Recorder()
+        watcher = InotifyDirWatcher(recorder)
+        self._run(watcher, recorder)
+        self.assertIn((self.watched, "app"), recorder.events)
+
+    def test_set_dirs_diff(self):
+        watcher = PollingDirWatcher(lambda *_: None)
+        watcher.set_dirs([self.watched, self.other])
+        watcher.set_dirs([self.other])
+        self.assertEqual(watcher.dirs, {os.path.normpath(self.other)})
+        self.assertNotIn(self.watched, watcher._signatures)
+
+
+if __name__ == "__main__":
+    unittest.main()
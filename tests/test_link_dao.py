@@ -0,0 +1,97 @@
+# coding: utf-8
+"""测试常驻内存的链接仓库"""
+import os
+import sys
+import json
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.dao.link_dao import _LinkStore
+from src.models.link import UserLink
+
+
+def _make_link(lid: str, src: str, category: str = "games") -> dict:
+    return UserLink(id=lid, name=lid, source_path=src, target_path=f"D:\\Lib\\{lid}", category=category).to_dict()
+
+
+class TestLinkStore(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.config_file = os.path.join(self.test_dir, "links.json")
+        with open(self.config_file, "w", encoding="utf-8") as f:
+            json.dump([_make_link("a", "C:\\Games\\A"), _make_link("b", "C:\\Apps\\B", "apps")], f)
+        # 足够长的防抖间隔，确保测试中由 flush() 显式落盘
+        self.store = _LinkStore(self.config_file, flush_delay=60)
+
+    def tearDown(self):
+        self.store.flush()
+        shutil.rmtree(self.test_dir)
+
+    def test_indexes(self):
+        self.assertEqual(self.store.get("a")["name"], "a")
+        self.assertEqual(self.store.get_by_source("c:\\GAMES\\a")["id"], "a")
+        self.assertEqual([r["id"] for r in self.store.get_by_category("apps")], ["b"])
+
+    def test_updates_coalesce_into_one_write(self):
+        sig_before = self.store._stat_sig()
+        for i in range(100):
+            record = dict(self.store.get("a"), last_known_size=i)
+            self.store.put(record, must_exist=True)
+        # 防抖窗口内不落盘
+        self.assertEqual(self.store._stat_sig(), sig_before)
+
+        self.store.flush()
+        with open(self.config_file, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        self.assertEqual([item["id"] for item in data], ["a", "b"])
+        self.assertEqual(data[0]["last_known_size"], 99)
+
+    def test_failed_write_rearms_with_backoff(self):
+        store = _LinkStore(self.config_file, flush_delay=8)
+        store.put(dict(store.get("a"), last_known_size=1), must_exist=True)
+        with mock.patch("src.dao.link_dao.os.replace", side_effect=PermissionError("locked")), \
+                mock.patch("src.dao.link_dao.threading.Timer") as timer:
+            for _ in range(3):
+                store.flush()
+        # 失败后保留脏数据，并以翻倍（有上限）的间隔重新布置写回
+        self.assertTrue(store._dirty)
+        self.assertEqual([c.args[0] for c in timer.call_args_list], [16, 30, 30])
+        self.assertIs(store._timer, timer.return_value)
+
+        store.flush()
+        self.assertFalse(store._dirty)
+        self.assertEqual(store._retry_delay, 8)
+        with open(self.config_file, "r", encoding="utf-8") as f:
+            self.assertEqual(json.load(f)[0]["last_known_size"], 1)
+
+    def test_reindex_on_move_and_delete(self):
+        record = dict(self.store.get("a"), category="apps", source_path="E:\\A")
+        self.store.put(record, must_exist=True)
+        self.assertIsNone(self.store.get_by_source("C:\\Games\\A"))
+        self.assertEqual(self.store.get_by_category("games"), [])
+        self.assertEqual({r["id"] for r in self.store.get_by_category("apps")}, {"a", "b"})
+
+        self.assertTrue(self.store.remove(["a"]))
+        self.assertIsNone(self.store.get("a"))
+        self.assertFalse(self.store.put(_make_link("x", "C:\\X"), must_exist=True))
+
+    def test_patch_merges_fields(self):
+        # 状态与空间两个 worker 各自只提交自己的字段，互不覆盖
+        self.assertEqual(self.store.patch({"a": {"status": "connected"}, "missing": {"status": "error"}}), 1)
+        self.assertEqual(self.store.patch({"a": {"last_known_size": 42}}), 1)
+        record = self.store.get("a")
+        self.assertEqual((record["status"], record["last_known_size"]), ("connected", 42))
+
+    def test_external_edit_reloads(self):
+        self.store.all()
+        with open(self.config_file, "w", encoding="utf-8") as f:
+            json.dump([_make_link("c", "C:\\C")], f, indent=4)
+        self.assertEqual([r["id"] for r in self.store.all()], ["c"])
+
+
+if __name__ == "__main__":
+    unittest.main()
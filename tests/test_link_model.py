@@ -0,0 +1,96 @@
+# coding: utf-8
+"""测试连接表格模型（ID 索引、增量通知、勾选与排序）"""
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.models.link import UserLink, LinkStatus
+
+try:
+    from PySide6.QtCore import Qt
+    from src.gui.components.link_model import (
+        LinkTableModel, COL_CHECK, COL_NAME, COL_STATUS, COL_SIZE, COL_ACTIONS, ID_ROLE, SIZE_LOADING_ROLE
+    )
+except ImportError:  # 组件依赖 PySide6 / qfluentwidgets
+    LinkTableModel = None
+
+
+def _links(n):
+    return [
+        UserLink(id=f"id{i}", name=f"App{n - i:03d}", source_path=f"C:\\src{i}", target_path=f"D:\\dst{i}",
+                 status=LinkStatus.DISCONNECTED)
+        for i in range(n)
+    ]
+
+
+@unittest.skipIf(LinkTableModel is None, "缺少依赖")
+class TestLinkTableModel(unittest.TestCase):
+    def setUp(self):
+        self.model = LinkTableModel()
+        self.model.set_links(_links(5))
+        self.changes = []
+        self.model.dataChanged.connect(
+            lambda tl, br, roles=None: self.changes.append((tl.row(), tl.column(), br.row(), br.column()))
+        )
+
+    def test_row_lookup(self):
+        self.assertEqual(self.model.rowCount(), 5)
+        self.assertEqual(self.model.row_of("id3"), 3)
+        self.assertEqual(self.model.row_of("missing"), -1)
+        self.assertEqual(self.model.index(3, COL_NAME).data(ID_ROLE), "id3")
+
+    def test_update_notifies_only_changed_cells(self):
+        self.model.set_all_sizes_loading()
+        self.changes.clear()
+        self.model.update_status("id2", LinkStatus.CONNECTED)
+        self.model.update_size("id2", "1.0 MB")
+        self.assertEqual(self.changes, [(2, COL_STATUS, 2, COL_ACTIONS), (2, COL_SIZE, 2, COL_SIZE)])
+        self.assertEqual(self.model.link_at(2).status, LinkStatus.CONNECTED)
+        self.assertEqual(self.model.index(2, COL_SIZE).data(), "1.0 MB")
+        self.assertFalse(self.model.index(2, COL_SIZE).data(SIZE_LOADING_ROLE))
+        self.assertTrue(self.model.index(3, COL_SIZE).data(SIZE_LOADING_ROLE))
+
+        # 相同结果不再通知
+        self.changes.clear()
+        self.model.update_size("id2", "1.0 MB")
+        self.assertEqual(self.changes, [])
+
+    def test_batch_update_emits_once_per_kind(self):
+        model = LinkTableModel()
+        model.set_links(_links(1000))
+        model.set_all_status_loading()
+        model.set_all_sizes_loading()
+        changes = []
+        model.dataChanged.connect(lambda tl, br, roles=None: changes.append((tl.row(), tl.column(), br.row(), br.column())))
+        statuses = {f"id{i}": LinkStatus.CONNECTED for i in range(1000)}
+        sizes = {f"id{i}": "1.0 KB" for i in range(10, 20)}
+        model.apply_updates(statuses, sizes)
+        self.assertEqual(changes, [(0, COL_STATUS, 999, COL_ACTIONS), (10, COL_SIZE, 19, COL_SIZE)])
+        self.assertTrue(model.size_loading_ids.isdisjoint(sizes))
+        self.assertIn("id20", model.size_loading_ids)
+        self.assertEqual(model.link_at(999).status, LinkStatus.CONNECTED)
+
+    def test_checked(self):
+        emitted = []
+        self.model.checked_changed.connect(emitted.append)
+        self.model.setData(self.model.index(1, COL_CHECK), Qt.CheckState.Checked, Qt.ItemDataRole.CheckStateRole)
+        self.assertEqual(self.model.checked_ids(), ["id1"])
+        self.assertEqual(emitted[-1], ["id1"])
+        self.model.set_all_checked(True)
+        self.assertTrue(self.model.is_all_checked())
+        self.model.set_links(_links(5))
+        self.assertEqual(self.model.checked_ids(), [])
+
+    def test_sort_keeps_id_index(self):
+        self.model.sort(COL_NAME, Qt.SortOrder.AscendingOrder)
+        self.assertEqual(self.model.link_at(0).id, "id4")
+        self.assertEqual(self.model.row_of("id4"), 0)
+        self.changes.clear()
+        self.model.update_status("id4", LinkStatus.CONNECTED)
+        self.assertEqual(self.changes, [(0, COL_STATUS, 0, COL_ACTIONS)])
+
+
+if __name__ == "__main__":
+    unittest.main()
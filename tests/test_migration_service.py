@@ -1,6 +1,7 @@
 import os
 import sys
 import shutil
+import tempfile
 import unittest
 
 # 修复导入路径
@@ -16,7 +17,7 @@ class TestMigrationService(unittest.TestCase):
         cls.app = QApplication.instance() or QApplication([])
 
     def setUp(self):
-        self.test_dir = os.path.abspath("test_migration_data")
+        self.test_dir = tempfile.mkdtemp()
         self.src_dir = os.path.join(self.test_dir, "src")
         self.dst_dir = os.path.join(self.test_dir, "dst")
         
@@ -35,13 +36,6 @@ class TestMigrationService(unittest.TestCase):
         if os.path.exists(self.test_dir):
             shutil.rmtree(self.test_dir)
 
-    def test_calculate_size(self):
-        from src.services.migration_service import MigrationWorker
-        worker = MigrationWorker(self.src_dir, self.dst_dir)
-        size = worker.calculate_total_size(self.src_dir)
-        # file1: 5000 bytes, file2: 10000 bytes
-        self.assertEqual(size, 15000)
-
     def test_migration_copy(self):
         finished_success = False
         def on_finished(success, msg):
@@ -0,0 +1,101 @@
+# coding: utf-8
+"""测试已安装程序清单缓存（假注册表，不依赖 Windows）"""
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.drivers.registry import InstalledProgram, RegistryInventoryCache, RegistryReader, UNINSTALL_KEYS
+
+
+class FakeHive(RegistryReader):
+    """{(根键, 子键): (写入时间, [InstalledProgram])}，程序子键的写入时间记录在 subkey_stamps 中"""
+
+    def __init__(self, keys: dict):
+        self.keys = keys
+        self.subkey_stamps = {}
+        self.reads = []
+
+    def last_write_time(self, root, sub_key):
+        entry = self.keys.get((root, sub_key))
+        return entry[0] if entry else None
+
+    def subkey_write_times(self, root, sub_key):
+        return dict(self.subkey_stamps.get((root, sub_key), {}))
+
+    def read_programs(self, root, sub_key):
+        self.reads.append((root, sub_key))
+        return list(self.keys[(root, sub_key)][1])
+
+
+class TestRegistryInventory(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.cache_file = os.path.join(self.test_dir, "registry_cache.json")
+        hklm, wow, hkcu = UNINSTALL_KEYS
+        self.hklm, self.hkcu = hklm, hkcu
+        self.hive = FakeHive({
+            hklm: (100, [InstalledProgram("Python 3.11", "C:\\Py311", "3.11.9", "PSF"),
+                         InstalledProgram("Steam", "C:\\Steam", "2.10", "Valve")]),
+            hkcu: (200, [InstalledProgram("Python 3.11", "C:\\Users\\me\\Py311", "3.11.4", "PSF")]),
+        })
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def _load(self):
+        return RegistryInventoryCache(self.cache_file, reader=self.hive).load()
+
+    def test_multimap_keeps_duplicates(self):
+        inventory = self._load()
+        self.assertEqual(len(inventory), 3)
+        self.assertEqual([p.version for p in inventory.get("Python 3.11")], ["3.11.9", "3.11.4"])
+        self.assertIn(("Python 3.11", "C:\\Users\\me\\Py311"), list(inventory.locations()))
+        self.assertEqual(inventory.get("Steam")[0].publisher, "Valve")
+
+    def test_unchanged_keys_not_reread(self):
+        self._load()
+        self.assertEqual(len(self.hive.reads), 2)
+
+        self.hive.reads.clear()
+        inventory = self._load()
+        self.assertEqual(self.hive.reads, [])
+        self.assertEqual(len(inventory), 3)
+
+        # 仅写入时间变化的键被重新读取
+        self.hive.keys[self.hkcu] = (201, [])
+        inventory = self._load()
+        self.assertEqual(self.hive.reads, [self.hkcu])
+        self.assertEqual(len(inventory.get("Python 3.11")), 1)
+
+    def test_subkey_change_rereads_key(self):
+        # 程序升级只改写自身子键的值，父键写入时间不变
+        self.hive.subkey_stamps[self.hklm] = {"Python311": 10, "Steam": 10}
+        self._load()
+        self.hive.reads.clear()
+
+        self.hive.keys[self.hklm] = (100, [InstalledProgram("Python 3.11", "C:\\Py311", "3.11.10", "PSF"),
+                                           InstalledProgram("Steam", "C:\\Steam", "2.10", "Valve")])
+        self.hive.subkey_stamps[self.hklm] = {"Python311": 11, "Steam": 10}
+        inventory = self._load()
+        self.assertEqual(self.hive.reads, [self.hklm])
+        self.assertEqual(inventory.get("Python 3.11")[0].version, "3.11.10")
+
+        self.hive.reads.clear()
+        self._load()
+        self.assertEqual(self.hive.reads, [])
+
+    def test_scanner_uses_injected_registry(self):
+        try:
+            from src.services.scan_service import SmartScanner
+        except ImportError as e:
+            self.skipTest(f"缺少依赖: {e}")
+        scanner = SmartScanner([], registry=RegistryInventoryCache(self.cache_file, reader=self.hive))
+        self.assertEqual(len(scanner._get_registry_installations()), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,117 @@
+# coding: utf-8
+"""测试流式扫描（假磁盘，不依赖 Windows）"""
+import os
+import sys
+import threading
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.models.template import Template
+from src.drivers.registry import InstallInventory
+
+try:
+    from src.services.scan_service import SmartScanner, _PathSet
+except ImportError as e:  # services 包依赖 PySide6
+    SmartScanner = None
+    _import_error = str(e)
+
+
+class FakeRegistry:
+    def load(self):
+        return InstallInventory()
+
+
+def _make_scanner(templates, drives, drive_release=None):
+    class FakeScanner(SmartScanner):
+        """模板阶段不命中任何路径；每个盘"发现"一个链接"""
+
+        @staticmethod
+        def _get_local_fixed_drives():
+            return list(drives)
+
+        @staticmethod
+        def _group_drives_by_disk(ds):
+            return [[d] for d in ds]
+
+        def _scan_drive(self, drive, usn_ok, seen, protected_prefixes, on_found=None):
+            if drive_release and drive in drive_release:
+                drive_release[drive].wait(5)
+            self._check_cancelled()
+            tpl = Template(id=f"junction_{drive}", name=drive, default_src=drive)
+            found = [tpl]
+            if on_found:
+                on_found(tpl)
+            return found
+
+    scanner = FakeScanner(templates, registry=FakeRegistry())
+    return scanner
+
+
+@unittest.skipIf(SmartScanner is None, "缺少依赖")
+class TestScanStream(unittest.TestCase):
+    def test_events_and_scan_result(self):
+        scanner = _make_scanner([Template(id="a", name="A", default_src="Z:\\missing\\A")], ["X:", "Y:"])
+        events = list(scanner.iter_scan())
+        self.assertEqual(events[0].kind, "stage")
+        self.assertEqual(events[-1].kind, "done")
+        self.assertFalse(events[-1].cancelled)
+        self.assertEqual(events[-1].percent, 100)
+        percents = [e.percent for e in events]
+        self.assertEqual(percents, sorted(percents))
+        found = sorted(e.template.id for e in events if e.kind == "found")
+        self.assertEqual(found, ["junction_X:", "junction_Y:"])
+        self.assertEqual(sorted(t.id for t in scanner.scan()), found)
+
+    def test_fast_drive_streams_before_slow_drive(self):
+        release = threading.Event()
+        scanner = _make_scanner([], ["X:", "Y:"], drive_release={"Y:": release})
+        stream = scanner.iter_scan()
+        first_found = next(e for e in stream if e.kind == "found")
+        # 慢盘尚未放行时，快盘的结果已经产出
+        self.assertEqual(first_found.template.id, "junction_X:")
+        release.set()
+        rest = [e.template.id for e in stream if e.kind == "found"]
+        self.assertEqual(rest, ["junction_Y:"])
+
+    def test_cancel(self):
+        release = threading.Event()
+        scanner = _make_scanner([], ["X:", "Y:"], drive_release={"Y:": release})
+        stream = scanner.iter_scan()
+        next(e for e in stream if e.kind == "found")
+        scanner.cancel()
+        release.set()
+        events = list(stream)
+        self.assertTrue(events[-1].cancelled)
+        self.assertNotIn("junction_Y:", [e.template.id for e in events if e.kind == "found"])
+
+
+@unittest.skipIf(SmartScanner is None, "缺少依赖")
+class TestDiskGroupingAndDedup(unittest.TestCase):
+    def test_group_drives_by_physical_disk(self):
+        disks = {"C:\\": 0, "D:\\": 1, "E:\\": 0, "F:\\": None, "G:\\": None}
+
+        def _disk(drive):
+            if drive == "H:\\":
+                raise OSError("access denied")
+            return disks[drive]
+
+        with mock.patch("src.services.scan_service.get_physical_disk_number", side_effect=_disk):
+            groups = SmartScanner._group_drives_by_disk(["C:\\", "D:\\", "E:\\", "F:\\", "G:\\", "H:\\"])
+        # 同一磁盘的分区合为一组（保持盘符顺序）；无法确定磁盘的卷各自成组
+        self.assertEqual(groups, [["C:\\", "E:\\"], ["D:\\"], ["F:\\"], ["G:\\"], ["H:\\"]])
+
+    def test_path_set_dedup(self):
+        seen = _PathSet([os.path.join("C:", "Games", "Steam")])
+        self.assertIn(os.path.join("c:", "games", "steam"), seen)
+        self.assertFalse(seen.add(os.path.join("C:", "GAMES", "Steam") + os.sep))
+        self.assertFalse(seen.add(os.path.join("C:", "Games", ".", "Other", "..", "Steam")))
+
+        path = os.path.join("D:", "Apps", "Tool")
+        self.assertTrue(seen.add(path))
+        self.assertFalse(seen.add(path.upper()))
+
+
+if __name__ == "__main__":
+    unittest.main()
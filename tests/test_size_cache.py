@@ -0,0 +1,75 @@
+# coding: utf-8
+"""测试目录空间增量缓存"""
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.drivers.size_cache import DirSizeCache
+
+
+def _write(path: str, size: int):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(b"x" * size)
+
+
+class TestDirSizeCache(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.root = os.path.join(self.test_dir, "lib")
+        _write(os.path.join(self.root, "a.bin"), 100)
+        _write(os.path.join(self.root, "sub", "b.bin"), 200)
+        _write(os.path.join(self.root, "sub", "deep", "c.bin"), 300)
+        _write(os.path.join(self.root, "other", "d.bin"), 400)
+        self.cache = DirSizeCache(os.path.join(self.test_dir, "cache.db"))
+
+    def tearDown(self):
+        self.cache.close()
+        shutil.rmtree(self.test_dir)
+
+    def test_full_then_incremental(self):
+        self.assertEqual(self.cache.get_stats(self.root), (1000, 4))
+
+        # 未变化时不再枚举任何目录
+        with mock.patch.object(DirSizeCache, "_scan_dir", wraps=DirSizeCache._scan_dir) as scan:
+            self.assertEqual(self.cache.get_size(self.root), 1000)
+            self.assertEqual(scan.call_count, 0)
+
+        # 仅变化的目录被重新枚举
+        _write(os.path.join(self.root, "sub", "deep", "e.bin"), 50)
+        with mock.patch.object(DirSizeCache, "_scan_dir", wraps=DirSizeCache._scan_dir) as scan:
+            self.assertEqual(self.cache.get_stats(self.root), (1050, 5))
+            self.assertEqual([c.args[0] for c in scan.call_args_list],
+                             [os.path.join(self.root, "sub", "deep")])
+
+    def test_forced_recount_sees_in_place_growth(self):
+        self.assertEqual(self.cache.get_size(self.root), 1000)
+        # 文件原地增长不改变目录 mtime：增量统计看不到，全量重算才能发现
+        with open(os.path.join(self.root, "a.bin"), "ab") as f:
+            f.write(b"x" * 24)
+        self.assertEqual(self.cache.get_size(self.root), 1000)
+        self.assertEqual(self.cache.get_size(self.root, use_cache=False), 1024)
+        self.assertEqual(self.cache.get_size(self.root), 1024)
+
+    def test_removed_subtree_and_missing_root(self):
+        self.cache.get_size(self.root)
+        shutil.rmtree(os.path.join(self.root, "other"))
+        self.assertEqual(self.cache.get_size(self.root), 600)
+        self.assertEqual(len(self.cache._load_subtree(self.root)), 3)
+
+        shutil.rmtree(self.root)
+        self.assertEqual(self.cache.get_size(self.root), 0)
+        self.assertEqual(self.cache._load_subtree(self.root), {})
+
+    def test_abort_does_not_persist(self):
+        self.cache.get_size(self.root, is_aborted=lambda: True)
+        self.assertEqual(self.cache._load_subtree(self.root), {})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,98 @@
+# coding: utf-8
+"""测试 SQLite 存储后端"""
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import json
+
+from src.dao.sqlite_dao import SQLiteDatabase, SQLiteLinkDAO, SQLiteCategoryDAO, SQLiteTemplateDAO
+from src.models.link import UserLink, LinkStatus
+from src.models.category import CategoryNode
+from src.models.template import Template
+
+try:
+    from src.services.template_service import TemplateService
+except ImportError:  # services 包依赖 PySide6
+    TemplateService = None
+
+
+class TestSQLiteDAO(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.db = SQLiteDatabase(os.path.join(self.test_dir, "test.db"))
+        self.links = SQLiteLinkDAO(self.db)
+
+    def tearDown(self):
+        self.db.conn.close()
+        shutil.rmtree(self.test_dir)
+
+    def _add(self, lid, src, category):
+        self.links.add(UserLink(id=lid, name=lid, source_path=src, target_path="D:\\Lib", category=category))
+
+    def test_link_crud_and_indexes(self):
+        self._add("a", "C:\\Games\\A", "games")
+        self._add("b", "C:\\Apps\\B", "apps")
+        self._add("c", "C:\\Games\\C", "games")
+
+        self.assertEqual([l.id for l in self.links.get_all()], ["a", "b", "c"])
+        self.assertEqual([l.id for l in self.links.get_by_category("games")], ["a", "c"])
+        self.assertEqual(self.links.get_by_source_path("c:\\APPS\\b").id, "b")
+
+        link = self.links.get_by_id("a")
+        link.status = LinkStatus.CONNECTED
+        link.category = "apps"
+        self.assertTrue(self.links.update(link))
+        # 更新后顺序保持不变，索引列同步
+        self.assertEqual([l.id for l in self.links.get_all()], ["a", "b", "c"])
+        self.assertEqual([l.id for l in self.links.get_by_category("apps")], ["a", "b"])
+        self.assertEqual(self.links.get_by_id("a").status, LinkStatus.CONNECTED)
+
+        self.assertTrue(self.links.delete_batch(["a", "c"]))
+        self.assertFalse(self.links.delete("missing"))
+        self.assertFalse(self.links.update(UserLink(id="x", name="x", source_path="", target_path="")))
+        self.assertEqual([l.id for l in self.links.get_all()], ["b"])
+
+    def test_json_bridge_round_trip(self):
+        data = {
+            "categories": [CategoryNode(id="games", name="游戏").to_dict(),
+                           CategoryNode(id="games.platforms", name="平台", parent_id="games").to_dict()],
+            "links": [UserLink(id="a", name="a", source_path="C:\\A", target_path="D:\\A").to_dict()],
+        }
+        self.db.import_json(data)
+        categories = SQLiteCategoryDAO(self.db)
+        self.assertEqual(categories.get_by_id("games.platforms").parent_id, "games")
+
+        exported = self.db.export_json(include_templates=False)
+        self.assertEqual(set(exported), {"categories", "links"})
+        self.assertEqual(exported["categories"], data["categories"])
+        self.assertEqual(exported["links"], data["links"])
+
+    @unittest.skipIf(TemplateService is None, "缺少依赖")
+    def test_template_service_export(self):
+        self.db.import_json({
+            "categories": [CategoryNode(id="games", name="游戏").to_dict()],
+            "templates": [Template(id="steam", name="Steam", default_src="C:\\Steam", category_id="games").to_dict()],
+        })
+        self._add("a", "C:\\Games\\A", "games")
+        service = TemplateService(SQLiteTemplateDAO(self.db))
+        path = os.path.join(self.test_dir, "out", "export.json")
+
+        success, _ = service.export_to_file(path, include_categories=True, include_templates=True)
+        self.assertTrue(success)
+        with open(path, encoding="utf-8") as f:
+            exported = json.load(f)
+        self.assertEqual(set(exported), {"categories", "templates"})  # 链接不随模板库导出
+        self.assertEqual([t["id"] for t in exported["templates"]], ["steam"])
+
+        service.export_to_file(path, include_categories=False)
+        with open(path, encoding="utf-8") as f:
+            self.assertEqual(set(json.load(f)), {"templates"})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+# coding: utf-8
+"""测试模板匹配引擎"""
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.models.template import Template
+from src.services.template_matcher import DirectoryIndex, SubstringIndex, TemplateMatcher
+
+
+def _tpl(tpl_id: str, name: str, default_src: str) -> Template:
+    return Template(id=tpl_id, name=name, default_src=default_src)
+
+
+class TestSubstringIndex(unittest.TestCase):
+    def test_matches_linear_scan(self):
+        entries = [("Steam", "a"), ("Visual Studio Code", "b"), ("Steam Link", "c"), ("WeChat", "d"), ("", "e")]
+        index = SubstringIndex(entries)
+        for needle in ("steam", "STUDIO CODE", "team", "we", "chat", "missing", "o"):
+            expected = [e for e in entries if needle.lower() in e[0].lower()]
+            self.assertEqual(index.search(needle), expected, needle)
+
+
+class TestTemplateMatcher(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.drive = os.path.join(self.test_dir, "drive")
+        os.makedirs(os.path.join(self.drive, "Games", "Tencent", "WeChat"))
+        os.makedirs(os.path.join(self.drive, "Apps", "Steam", "steamapps"))
+        os.makedirs(os.path.join(self.test_dir, "default", "Foo"))
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_match_stages(self):
+        registry = [("Steam Client", os.path.join(self.drive, "Apps", "Steam"))]
+        matcher = TemplateMatcher(registry, [self.drive], existing_srcs=set())
+
+        default = os.path.join(self.test_dir, "default", "Foo")
+        self.assertEqual(matcher.match(_tpl("foo", "Foo", default)), default)
+        self.assertEqual(matcher.match(_tpl("steam", "steam", "X:\\nowhere\\Steam")),
+                         os.path.join(self.drive, "Apps", "Steam", "steamapps"))
+        # 深度探测大小写不敏感，返回模板中的特征路径写法
+        self.assertEqual(matcher.match(_tpl("wechat", "WeChat", "C:\\Program Files\\TENCENT\\WeChat")),
+                         os.path.join(self.drive, "Games", "TENCENT", "WeChat"))
+        self.assertIsNone(matcher.match(_tpl("none", "Nothing", "C:\\A\\B")))
+
+        existing = {os.path.normpath(default).lower()}
+        self.assertIsNone(TemplateMatcher([], [], existing).match(_tpl("foo", "Foo", default)))
+
+    def test_directory_listed_once(self):
+        index = DirectoryIndex()
+        self.assertTrue(index.exists(self.drive, "games", "tencent"))
+        os.makedirs(os.path.join(self.drive, "Games", "Late"))
+        # 缓存的列表不会重新列举
+        self.assertFalse(index.exists(self.drive, "Games", "Late"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,176 @@
+# coding: utf-8
+"""测试模板搜索索引（与逐条子串匹配等价、路径段、命中分类与差量维护）"""
+import json
+import os
+import random
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.models.category import CategoryNode
+from src.models.template import Template
+
+try:
+    from src.services import template_search
+    from src.services.template_search import TemplateSearchIndex
+    from src.services.template_service import TemplateService
+except ImportError:  # services 包依赖 PySide6
+    TemplateSearchIndex = None
+
+
+TEMPLATES = [
+    Template(id="steam", name="Steam 游戏库", default_src="C:\\Program Files (x86)\\Steam\\steamapps",
+             category_id="games.platforms", description="Steam 游戏安装目录"),
+    Template(id="chrome", name="Google Chrome 用户数据", default_src="%LOCALAPPDATA%\\Google\\Chrome\\User Data",
+             category_id="browsers", description="Chrome 浏览器缓存和用户数据"),
+    Template(id="vscode", name="VS Code 扩展", default_src="%USERPROFILE%\\.vscode\\extensions",
+             category_id="dev_tools.editors"),
+    Template(id="wechat", name="微信", default_src="%USERPROFILE%\\Documents\\WeChat Files",
+             category_id="social.im", description="微信聊天记录与文件"),
+]
+
+
+class FakeTemplateDAO:
+    def __init__(self, templates):
+        self.templates = list(templates)
+        self.get_all_calls = 0
+
+    def get_all(self):
+        self.get_all_calls += 1
+        return list(self.templates)
+
+    def add(self, template):
+        self.templates.append(template)
+        return True
+
+    def update(self, template):
+        for i, t in enumerate(self.templates):
+            if t.id == template.id:
+                self.templates[i] = template
+                return True
+        return False
+
+    def delete(self, tid):
+        before = len(self.templates)
+        self.templates = [t for t in self.templates if t.id != tid]
+        return len(self.templates) < before
+
+
+@unittest.skipIf(TemplateSearchIndex is None, "缺少依赖")
+class TestTemplateSearchIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = TemplateSearchIndex(TEMPLATES)
+
+    def ids(self, text, category_id="all"):
+        return self.index.search(text, category_id).template_ids
+
+    def test_name_and_description(self):
+        self.assertEqual(self.ids("steam"), ["steam"])
+        self.assertEqual(self.ids("CHROME"), ["chrome"])
+        self.assertEqual(self.ids("缓存"), ["chrome"])
+        self.assertEqual(self.ids("微"), ["wechat"])
+        self.assertEqual(self.ids("数据"), ["chrome"])
+        self.assertEqual(self.ids(""), [t.id for t in TEMPLATES])
+
+    def test_path_segments(self):
+        self.assertEqual(self.ids("localappdata"), ["chrome"])
+        self.assertEqual(self.ids("extensions"), ["vscode"])
+        # 字段之间不会拼接出跨字段的匹配
+        self.assertEqual(self.ids("appdata\\google"), [])
+
+    def test_multiple_terms(self):
+        self.assertEqual(self.ids("google 数据"), ["chrome"])
+        self.assertEqual(self.ids("google steam"), [])
+
+    @unittest.skipIf(TemplateSearchIndex is None or template_search.lazy_pinyin is None, "缺少 pypinyin")
+    def test_pinyin_fields(self):
+        self.assertEqual(self.ids("weixin"), ["wechat"])
+        self.assertIn("wechat", self.ids("wx"))
+
+    def test_pinyin_disabled_without_pypinyin(self):
+        with mock.patch.object(template_search, "lazy_pinyin", None):
+            index = TemplateSearchIndex(TEMPLATES)
+        self.assertEqual(index.search("weixin", "all").template_ids, [])
+        self.assertEqual(index.search("微信", "all").template_ids, ["wechat"])
+
+    def test_category_filter_and_matched_categories(self):
+        result = self.index.search("s", "browsers")
+        self.assertEqual(result.template_ids, ["chrome"])
+        self.assertIn("games.platforms", result.category_ids)
+        self.assertIn("dev_tools.editors", result.category_ids)
+
+    def test_incremental_updates(self):
+        self.index.add(Template(id="netease", name="网易云音乐", default_src="%APPDATA%\\NetEase\\CloudMusic",
+                                category_id="media"))
+        self.assertEqual(self.ids("cloudmusic"), ["netease"])
+        self.index.update(Template(id="steam", name="Steam Library", default_src="D:\\SteamLibrary",
+                                   category_id="games.platforms"))
+        self.assertEqual(self.ids("游戏"), [])
+        self.assertEqual(self.ids("library"), ["steam"])
+        self.index.remove("chrome")
+        self.assertEqual(self.ids("google"), [])
+        self.assertEqual(self.ids(""), ["steam", "vscode", "wechat", "netease"])
+
+    def test_matches_naive_substring_scan(self):
+        rnd = random.Random(7)
+        words = ["steam", "code", "cache", "游戏", "数据", "music", "app", "data"]
+        templates = [
+            Template(id=str(i), name=" ".join(rnd.sample(words, 2)), default_src="C:\\x",
+                     description=rnd.choice(words + [None]))
+            for i in range(300)
+        ]
+        index = TemplateSearchIndex(templates)
+        for i in range(0, 300, 3):
+            index.remove(str(i))
+        live = [t for t in templates if int(t.id) % 3]
+
+        def naive(text, t):
+            fields = [t.name.lower(), (t.description or "").lower(), "c:", "x"]
+            return all(any(term in f for f in fields) for term in text.split())
+
+        for needle in ["st", "eam", "游", "数据", "a", "ach", "music app", "zz"]:
+            expected = [t.id for t in live if naive(needle, t)]
+            self.assertEqual(index.search(needle).template_ids, expected, needle)
+
+
+@unittest.skipIf(TemplateSearchIndex is None, "缺少依赖")
+class TestTemplateServiceSearch(unittest.TestCase):
+    def test_index_reused_and_updated_incrementally(self):
+        dao = FakeTemplateDAO(TEMPLATES)
+        service = TemplateService(dao)
+        self.assertEqual([t.id for t in service.get_filtered_templates("all", "steam")], ["steam"])
+        service.add_template(Template(id="qq", name="QQ", default_src="%APPDATA%\\Tencent\\QQ", category_id="social.im"))
+        service.delete_template("steam")
+        result = service.search_templates("social.im", "")
+        self.assertEqual(result.template_ids, ["wechat", "qq"])
+        self.assertEqual(service.get_filtered_templates("all", "steam"), [])
+        self.assertEqual(dao.get_all_calls, 1)
+
+    def test_write_through_other_instance_invalidates(self):
+        dao = FakeTemplateDAO(TEMPLATES)
+        service, other = TemplateService(dao), TemplateService(dao)
+        service.search_templates()
+        other.delete_template("wechat")
+        self.assertEqual(service.get_filtered_templates("all", "微信"), [])
+
+    def test_export_to_file_without_sqlite(self):
+        class FakeCategoryDAO:
+            def get_all(self):
+                return [CategoryNode(id="browsers", name="浏览器")]
+
+        service = TemplateService(FakeTemplateDAO(TEMPLATES), FakeCategoryDAO())
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "export.json")
+            success, _ = service.export_to_file(path)
+            self.assertTrue(success)
+            with open(path, encoding="utf-8") as f:
+                exported = json.load(f)
+        self.assertEqual([c["id"] for c in exported["categories"]], ["browsers"])
+        self.assertEqual([t["id"] for t in exported["templates"]], [t.id for t in TEMPLATES])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,105 @@
+# coding: utf-8
+"""测试可续传迁移日志"""
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.drivers.transaction import (
+    MigrationJournal, journal_path, list_migration_journals, load_migration_journal, recover_from_crash
+)
+
+
+class TestMigrationJournal(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.journal_dir = os.path.join(self.test_dir, "journals")
+        self.src = os.path.join(self.test_dir, "src")
+        self.dst = os.path.join(self.test_dir, "dst")
+        os.makedirs(self.src)
+        os.makedirs(self.dst)
+        self.journal_file = journal_path(self.src, self.dst, self.journal_dir)
+        for name in ("a.bin", "b.bin"):
+            with open(os.path.join(self.src, name), "wb") as f:
+                f.write(b"x" * 10)
+            shutil.copy2(os.path.join(self.src, name), os.path.join(self.dst, name))
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def _stat(self, name):
+        st = os.stat(os.path.join(self.src, name))
+        return st.st_size, st.st_mtime_ns
+
+    def test_resume_same_migration(self):
+        journal = MigrationJournal.begin("move", self.src, self.dst, True, journal_dir=self.journal_dir)
+        journal.record_file("a.bin", *self._stat("a.bin"))
+        journal.close()
+        # 模拟崩溃时写了一半的行
+        with open(self.journal_file, "a", encoding="utf-8") as f:
+            f.write('{"type": "file", "path": "b.b')
+
+        record = load_migration_journal(self.journal_file)
+        self.assertEqual((record.operation, record.cleanup_source), ("move", True))
+        self.assertEqual(list(record.completed), ["a.bin"])
+
+        resumed = MigrationJournal.begin("move", self.src, self.dst, True, journal_dir=self.journal_dir)
+        self.assertTrue(resumed.is_completed("a.bin", *self._stat("a.bin"), os.path.join(self.dst, "a.bin")))
+        self.assertFalse(resumed.is_completed("b.bin", *self._stat("b.bin"), os.path.join(self.dst, "b.bin")))
+
+        # 目标端文件被截断后不再视为已完成
+        with open(os.path.join(self.dst, "a.bin"), "wb") as f:
+            f.write(b"x")
+        self.assertFalse(resumed.is_completed("a.bin", *self._stat("a.bin"), os.path.join(self.dst, "a.bin")))
+
+        resumed.finish()
+        self.assertIsNone(load_migration_journal(self.journal_file))
+
+    def test_link_context_survives_resume(self):
+        link = {"data": {"name": "App", "source": self.src, "target": self.dst, "category_id": None}}
+        journal = MigrationJournal.begin("copy", self.src, self.dst, True, journal_dir=self.journal_dir, link=link)
+        journal.record_file("a.bin", *self._stat("a.bin"))
+        journal.close()
+        self.assertEqual(load_migration_journal(self.journal_file).link, link)
+
+        resumed = MigrationJournal.begin("copy", self.src, self.dst, True, journal_dir=self.journal_dir)
+        self.assertEqual(resumed.record.link, link)
+        resumed.close()
+
+    def test_cancelled_flag(self):
+        journal = MigrationJournal.begin("copy", self.src, self.dst, journal_dir=self.journal_dir)
+        journal.record_file("a.bin", *self._stat("a.bin"))
+        journal.mark_cancelled()
+        journal.close()
+        self.assertTrue(load_migration_journal(self.journal_file).cancelled)
+
+        # 续传后再次中断（如崩溃）不再视为已取消
+        resumed = MigrationJournal.begin("copy", self.src, self.dst, journal_dir=self.journal_dir)
+        self.assertFalse(resumed.record.cancelled)
+        resumed.close()
+        record = load_migration_journal(self.journal_file)
+        self.assertFalse(record.cancelled)
+        self.assertEqual(list(record.completed), ["a.bin"])
+
+    def test_other_migration_keeps_unfinished_journal(self):
+        journal = MigrationJournal.begin("copy", self.src, self.dst, journal_dir=self.journal_dir)
+        journal.record_file("a.bin", *self._stat("a.bin"))
+        journal.close()
+
+        other = MigrationJournal.begin("copy", self.dst, self.src, journal_dir=self.journal_dir)
+        self.assertEqual(other.record.completed, {})
+        other.close()
+
+        records = list_migration_journals(self.journal_dir)
+        self.assertEqual([(r.source_path, list(r.completed)) for r in records],
+                         [(self.src, ["a.bin"]), (self.dst, [])])
+
+        # 放弃其中一个迁移只删除它自己的日志
+        self.assertTrue(recover_from_crash(records[1]))
+        self.assertEqual([r.source_path for r in list_migration_journals(self.journal_dir)], [self.src])
+
+if __name__ == "__main__":
+    unittest.main()
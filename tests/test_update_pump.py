@@ -0,0 +1,61 @@
+# coding: utf-8
+"""测试 UI 更新泵（按需启动、按键合并、清空即停止）"""
+import os
+import sys
+import time
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+try:
+    from PySide6.QtCore import QCoreApplication
+    from src.gui.common.update_pump import UpdatePump
+    from src.common.signals import signal_bus
+except ImportError:  # 依赖 PySide6
+    UpdatePump = None
+
+
+@unittest.skipIf(UpdatePump is None, "缺少依赖")
+class TestUpdatePump(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QCoreApplication.instance() or QCoreApplication([])
+
+    def setUp(self):
+        self.batches = []
+        self.pump = UpdatePump(self.batches.append, name="test", interval_ms=10)
+
+    def _wait_idle(self, timeout=2.0):
+        deadline = time.monotonic() + timeout
+        while self.pump.is_active() and time.monotonic() < deadline:
+            QCoreApplication.processEvents()
+            time.sleep(0.005)
+
+    def test_idle_until_results_arrive(self):
+        self.assertFalse(self.pump.is_active())
+        self.pump.post("status", "a", 1)
+        self.assertTrue(self.pump.is_active())
+        self._wait_idle()
+        self.assertFalse(self.pump.is_active())
+        self.assertEqual(self.batches, [{"status": {"a": 1}}])
+
+    def test_coalesces_by_key(self):
+        metrics = []
+        signal_bus.ui_batch_applied.connect(lambda name, size, ms: metrics.append((name, size)))
+        for i in range(1000):
+            self.pump.post("status", f"id{i % 100}", i)
+        self.pump.post("size", "id0", 42)
+        self._wait_idle()
+        self.assertEqual(len(self.batches), 1)
+        self.assertEqual(len(self.batches[0]["status"]), 100)
+        self.assertEqual(self.batches[0]["status"]["id0"], 900)
+        self.assertEqual(self.pump.last_batch_size, 101)
+        self.assertIn(("test", 101), metrics)
+
+    def test_flush_without_pending_is_noop(self):
+        self.pump.flush()
+        self.assertEqual(self.batches, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,244 @@
+# coding: utf-8
+"""测试 USN 记录解码与持久化卷索引（使用合成的输出缓冲区，不依赖 Windows）"""
+import os
+import sys
+import shutil
+import struct
+import ctypes
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.drivers import usn_index, usn_records
+from src.drivers.usn_index import UsnIndex
+from src.drivers.usn_records import (
+    FILE_ATTRIBUTE_DIRECTORY, FILE_ATTRIBUTE_HIDDEN, FILE_ATTRIBUTE_REPARSE_POINT, FILE_ATTRIBUTE_SYSTEM,
+    ROOT_REF, USN_REASON_FILE_DELETE, MftTable, PathResolver, build_path, decode_journal_data, decode_name,
+    iter_raw_records, iter_usn_records, next_start, parse_usn_buffer
+)
+
+DIR = FILE_ATTRIBUTE_DIRECTORY
+JUNCTION = FILE_ATTRIBUTE_DIRECTORY | FILE_ATTRIBUTE_REPARSE_POINT
+SEQ = 0x0003 << 48  # 文件引用号高 16 位的序列号
+
+
+def pack_record(ref: int, parent: int, name: str, attrs: int, usn: int = 0, reason: int = 0,
+                major: int = 2) -> bytes:
+    """按 USN_RECORD_V2 布局构造一条记录（8 字节对齐）"""
+    raw_name = name.encode("utf-16-le")
+    length = (60 + len(raw_name) + 7) & ~7
+    header = struct.pack("<IHHQQqqIIIIHH", length, major, 0, ref | SEQ, parent | SEQ, usn, 0,
+                         reason, 0, 0, attrs, len(raw_name), 60)
+    return (header + raw_name).ljust(length, b"\0")
+
+
+def pack_buffer(next_value: int, *records: bytes) -> bytes:
+    return struct.pack("<Q", next_value) + b"".join(records)
+
+
+class TestUsnRecords(unittest.TestCase):
+    def test_decode_buffer(self):
+        data = pack_buffer(
+            42,
+            pack_record(100, ROOT_REF, "Games", DIR, usn=7),
+            pack_record(101, 100, "游戏存档", JUNCTION),
+            pack_record(102, 100, "v3", DIR, major=3),
+        )
+        self.assertEqual(next_start(data), 42)
+        records = list(iter_usn_records(data))
+        self.assertEqual([(r.ref, r.parent, r.name) for r in records],
+                         [(100, ROOT_REF, "Games"), (101, 100, "游戏存档")])
+        self.assertEqual(records[0].usn, 7)
+
+        # 截断的尾部记录被忽略
+        self.assertEqual(len(list(iter_usn_records(data[:-10]))), 2)
+
+    def test_journal_data(self):
+        data = struct.pack("<QqqqqQQ", 0xF000000000000001, 0, 500, 100, 1 << 40, 0, 0)
+        info = decode_journal_data(data)
+        self.assertEqual((info.journal_id, info.next_usn, info.lowest_valid_usn),
+                         (0xF000000000000001, 500, 100))
+
+    def test_build_path(self):
+        records = {ROOT_REF: (ROOT_REF, ".", DIR), 100: (ROOT_REF, "Games", DIR), 101: (100, "Save", JUNCTION)}
+        self.assertEqual(build_path(101, records, "C:\\"), "C:\\Games\\Save")
+        self.assertIsNone(build_path(999, records, "C:\\"))
+
+    def test_undecodable_name_is_reported(self):
+        # 未配对的代理项原样保留；奇数字节的名称无法解码
+        self.assertEqual(decode_name(b"a\x00\x00\xd8"), "a\ud800")
+        self.assertEqual(decode_name(b"a\x00b"), "")
+
+        records = {100: (ROOT_REF, decode_name(b"a\x00b"), DIR), 101: (100, "Save", JUNCTION)}
+        resolver = PathResolver(records, "C:\\")
+        self.assertIsNone(resolver.resolve(101))
+        self.assertEqual([(p.ref, p.kind, p.at) for p in resolver.problems], [(101, "bad_name", 100)])
+
+    def test_resolver_memoizes_and_reports(self):
+        class CountingRecords(dict):
+            calls = 0
+
+            def get(self, ref):
+                CountingRecords.calls += 1
+                return super().get(ref)
+
+        records = CountingRecords({100: (ROOT_REF, "node_modules", DIR)})
+        for i in range(1, 201):
+            records[100 + i] = (100, f"pkg{i}", JUNCTION)
+        # 超过 64 层的深链
+        parent = ROOT_REF
+        for ref in range(1000, 1100):
+            records[ref] = (parent, "d", DIR)
+            parent = ref
+        records[2000] = (2001, "loop_a", JUNCTION)
+        records[2001] = (2000, "loop_b", DIR)
+        records[3000] = (3001, "orphan", JUNCTION)
+
+        resolver = PathResolver(records, "C:\\")
+        paths = [resolver.resolve(100 + i) for i in range(1, 201)]
+        self.assertEqual(paths[0], "C:\\node_modules\\pkg1")
+        self.assertEqual(CountingRecords.calls, 201)  # 共享祖先只查询一次
+
+        self.assertEqual(resolver.resolve(1099).count("\\d"), 100)
+        self.assertIsNone(resolver.resolve(2000))
+        self.assertIsNone(resolver.resolve(3000))
+        self.assertEqual([(p.ref, p.kind, p.at) for p in resolver.problems],
+                         [(2000, "cycle", 2000), (3000, "missing_parent", 3001)])
+
+    def test_mft_table_matches_dict(self):
+        data = pack_buffer(
+            0,
+            pack_record(ROOT_REF, ROOT_REF, ".", DIR),
+            pack_record(130, 120, "Save", JUNCTION),
+            pack_record(100, ROOT_REF, "Games", DIR),
+            pack_record(120, 100, "Ünïcode", DIR),
+        )
+        view = memoryview(data)
+        table = MftTable()
+        for ref, parent, _, _, attrs, start, length in iter_raw_records(data):
+            table.append(ref, parent, attrs, view[start:start + length])
+        table.freeze()
+
+        records = {r.ref: (r.parent, r.name, r.attributes) for r in iter_usn_records(data)}
+        self.assertEqual(len(table), 4)
+        self.assertEqual(list(table.refs), sorted(records))
+        for ref in records:
+            self.assertEqual(table.get(ref), records[ref])
+            self.assertEqual(build_path(ref, table, "D:\\"), build_path(ref, records, "D:\\"))
+        self.assertEqual(build_path(130, table, "D:\\"), "D:\\Games\\Ünïcode\\Save")
+        self.assertIsNone(table.get(110))
+        self.assertEqual([r.name for r in table.iter_records()], [".", "Games", "Ünïcode", "Save"])
+
+    def _mixed_buffer(self) -> bytes:
+        return pack_buffer(
+            0,
+            pack_record(100, ROOT_REF, "Games", DIR, usn=-1 & 0x7FFFFFFF, reason=0x100),
+            pack_record(101, 100, "Save", JUNCTION),
+            pack_record(102, 100, "readme.txt", 0),
+            pack_record(103, ROOT_REF, "All Users", JUNCTION | FILE_ATTRIBUTE_HIDDEN | FILE_ATTRIBUTE_SYSTEM),
+            pack_record(104, 100, "v3", DIR, major=3),
+        )
+
+    def _check_batch(self, use_numpy: bool):
+        data = self._mixed_buffer()
+        batch = parse_usn_buffer(data, use_numpy=use_numpy)
+        self.assertEqual(list(batch.rows()), list(parse_usn_buffer(data, use_numpy=False).rows()))
+        self.assertEqual(batch.column("refs"), [100, 101, 102, 103])
+
+        dirs = batch.directories()
+        self.assertEqual(dirs.column("refs"), [100, 101, 103])
+        self.assertEqual(dirs.select(dirs.user_reparse_mask()).column("refs"), [101])
+        self.assertEqual([r.name for r in dirs.records()], ["Games", "Save", "All Users"])
+
+        # 直接解析 ctypes 缓冲区的视图
+        buf = ctypes.create_string_buffer(data, 4096)
+        view = memoryview(buf).cast("B")[:len(data)]
+        self.assertEqual(list(parse_usn_buffer(view, use_numpy=use_numpy).records()), list(batch.records()))
+
+    def test_batch_struct(self):
+        self._check_batch(use_numpy=False)
+
+    @unittest.skipIf(usn_records.np is None, "未安装 NumPy")
+    def test_batch_numpy(self):
+        self._check_batch(use_numpy=True)
+
+    def test_table_extend(self):
+        data = self._mixed_buffer()
+        table = MftTable()
+        table.extend(parse_usn_buffer(data).directories())
+        table.freeze()
+        self.assertEqual(build_path(101, table, "C:\\"), "C:\\Games\\Save")
+        self.assertEqual(table.get(103), (ROOT_REF, "All Users", JUNCTION | FILE_ATTRIBUTE_HIDDEN | FILE_ATTRIBUTE_SYSTEM))
+
+
+class TestUsnIndex(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.index = UsnIndex(os.path.join(self.test_dir, "usn.db"))
+        full = pack_buffer(
+            0,
+            pack_record(ROOT_REF, ROOT_REF, ".", DIR),
+            pack_record(100, ROOT_REF, "Games", DIR),
+            pack_record(101, 100, "Save", JUNCTION),
+            pack_record(102, 100, "readme.txt", 0),
+            pack_record(103, ROOT_REF, "All Users", JUNCTION | FILE_ATTRIBUTE_HIDDEN | FILE_ATTRIBUTE_SYSTEM),
+        )
+        self.index.replace("C", 0xF000000000000001, 1000, iter_usn_records(full))
+
+    def tearDown(self):
+        self.index.close()
+        shutil.rmtree(self.test_dir)
+
+    def _paths(self):
+        lookup = self.index.lookup("C")
+        return sorted(build_path(ref, lookup, "C:\\") for ref in self.index.reparse_refs("C"))
+
+    def test_full_replace(self):
+        self.assertEqual(self.index.get_state("C"), (0xF000000000000001, 1000))
+        self.assertEqual(self._paths(), ["C:\\Games\\Save"])
+        # 只保存目录条目
+        self.assertIsNone(self.index.get_dir("C", 102))
+
+    def test_apply_changes(self):
+        changes = pack_buffer(
+            1300,
+            pack_record(200, 100, "Mods", JUNCTION, usn=1000),                   # 新建 junction
+            pack_record(100, ROOT_REF, "Library", DIR, usn=1100),                # 重命名父目录
+            pack_record(101, 100, "Save", JUNCTION, usn=1200, reason=USN_REASON_FILE_DELETE),
+        )
+        self.index.apply("C", iter_usn_records(changes), next_start(changes))
+        self.assertEqual(self.index.get_state("C"), (0xF000000000000001, 1300))
+        self.assertEqual(self._paths(), ["C:\\Library\\Mods"])
+
+        self.index.forget("C")
+        self.assertIsNone(self.index.get_state("C"))
+        self.assertEqual(self.index.reparse_refs("C"), [])
+
+    def test_replace_raw_defers_name_decoding(self):
+        full = pack_buffer(
+            0,
+            pack_record(ROOT_REF, ROOT_REF, ".", DIR),
+            pack_record(100, ROOT_REF, "Ünïcode", DIR),
+            pack_record(101, 100, "Save", JUNCTION),
+            pack_record(102, ROOT_REF, "Other", DIR),
+        )
+        table = MftTable()
+        table.extend(parse_usn_buffer(full).directories())
+        table.freeze()
+
+        with mock.patch.object(usn_records, "decode_name", wraps=usn_records.decode_name) as decode, \
+                mock.patch.object(usn_index, "decode_name", wraps=usn_index.decode_name) as index_decode:
+            self.index.replace_raw("D", 7, 500, table.iter_raw())
+            self.assertEqual(decode.call_count + index_decode.call_count, 0)
+            lookup = self.index.lookup("D")
+            paths = [build_path(ref, lookup, "D:\\") for ref in self.index.reparse_refs("D")]
+        self.assertEqual(paths, ["D:\\Ünïcode\\Save"])
+        # 只解码了路径链上的两个目录名
+        self.assertEqual(index_decode.call_count, 2)
+        self.assertEqual(self.index.get_dir("D", 102), (ROOT_REF, "Other", DIR))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,57 @@
+# coding: utf-8
+"""测试并行目录遍历器"""
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.drivers.walker import TreeWalker
+
+
+def _write(path: str, size: int):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(b"x" * size)
+
+
+class TestTreeWalker(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.big = os.path.join(self.test_dir, "big")
+        for i in range(20):
+            for j in range(5):
+                _write(os.path.join(self.big, f"d{i}", f"s{j}", f"f{i}_{j}.bin"), i * 10 + j)
+        self.small = os.path.join(self.test_dir, "small")
+        _write(os.path.join(self.small, "only.bin"), 7)
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_walk_aggregates(self):
+        result = TreeWalker(max_workers=4, top_n=3).walk(self.big)
+        expected = sum(i * 10 + j for i in range(20) for j in range(5))
+        self.assertEqual((result.total_size, result.file_count, result.dir_count), (expected, 100, 121))
+        self.assertEqual([size for size, _ in result.largest], [194, 193, 192])
+        self.assertTrue(result.largest[0][1].endswith("f19_4.bin"))
+
+    def test_iter_walk_multiple_roots(self):
+        missing = os.path.join(self.test_dir, "missing")
+        single_file = os.path.join(self.small, "only.bin")
+        progress = []
+        walker = TreeWalker(max_workers=3, progress_callback=lambda b, f: progress.append((b, f)))
+        results = dict(walker.iter_walk([self.big, self.small, missing, single_file]))
+        self.assertEqual(set(results), {self.big, self.small, missing, single_file})
+        self.assertEqual(results[self.small].total_size, 7)
+        self.assertEqual(results[single_file].file_count, 1)
+        self.assertEqual(results[missing].total_size, 0)
+
+    def test_abort(self):
+        result = TreeWalker(max_workers=2, is_aborted=lambda: True).walk(self.big)
+        self.assertEqual(result.file_count, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,107 @@
+# coding: utf-8
+"""测试链接监听服务（受影响链接的增量探测与监听点调整）"""
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.models.link import UserLink, LinkStatus
+
+try:
+    from src.services.watch_service import LinkWatchService
+except ImportError:  # services 包依赖 PySide6
+    LinkWatchService = None
+
+
+class FakeWatcher:
+    def __init__(self):
+        self.callback = None
+        self.dir_sets = []
+
+    def set_dirs(self, dirs):
+        self.dir_sets.append({os.path.normpath(d) for d in dirs})
+
+    def start(self):
+        pass
+
+    def stop(self):
+        pass
+
+
+class FakeLinkDAO:
+    def __init__(self):
+        self.updates = []
+
+    def update_fields(self, pending):
+        self.updates.append(dict(pending))
+
+    def flush(self):
+        pass
+
+
+class FakeLinkService:
+    def __init__(self, links):
+        self.links = {l.id: l for l in links}
+        self.dao = FakeLinkDAO()
+        self.get_all_calls = 0
+
+    def get_all_links(self):
+        self.get_all_calls += 1
+        return list(self.links.values())
+
+    def get_link_by_id(self, link_id):
+        return self.links.get(link_id)
+
+
+@unittest.skipIf(LinkWatchService is None, "缺少依赖")
+class TestLinkWatchService(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = os.path.realpath(tempfile.mkdtemp())
+        self.lib = os.path.join(self.test_dir, "lib")
+        os.makedirs(os.path.join(self.lib, "a"))
+        os.makedirs(os.path.join(self.lib, "b"))
+        self.apps = os.path.join(self.test_dir, "apps")
+        os.makedirs(os.path.join(self.apps, "b"))
+        self.links = FakeLinkService([
+            # a 的父目录 apps/vendor 尚不存在：监听最近的已存在祖先 apps
+            UserLink(id="a", name="a", source_path=os.path.join(self.apps, "vendor", "a"),
+                     target_path=os.path.join(self.lib, "a"), status=LinkStatus.READY),
+            UserLink(id="b", name="b", source_path=os.path.join(self.apps, "b"),
+                     target_path=os.path.join(self.lib, "b"), status=LinkStatus.ERROR),
+        ])
+        self.watcher = FakeWatcher()
+        self.service = LinkWatchService(self.links, self.watcher)
+        self.service.sync()
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_event_rechecks_and_resyncs_only_affected_links(self):
+        self.assertEqual(self.watcher.dir_sets[-1], {self.apps, self.lib})
+
+        os.makedirs(os.path.join(self.apps, "vendor"))
+        self.service._on_change(self.apps, "vendor")
+        self.service._process()
+
+        # 只探测并重算 a；b 的状态未被重新写回，也没有重新读取全部链接
+        self.assertEqual(self.links.get_all_calls, 1)
+        self.assertEqual(self.links.dao.updates, [])
+        self.assertEqual(self.watcher.dir_sets[-1], {self.apps, os.path.join(self.apps, "vendor"), self.lib})
+        self.assertEqual(set(self.service._affected(os.path.join(self.apps, "vendor"), "a")), {"a"})
+        self.assertEqual(set(self.service._affected(self.apps, "b")), {"b"})
+        self.assertEqual(set(self.service._affected(self.apps, "vendor")), set())
+
+    def test_removed_link_drops_its_watch_points(self):
+        del self.links.links["b"]
+        self.service._on_change(self.apps, "b")
+        self.service._process()
+        self.assertEqual(set(self.service._affected(self.apps, "b")), set())
+        self.assertEqual(set(self.service._affected(self.lib, "a")), {"a"})
+        self.assertEqual(self.links.get_all_calls, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()